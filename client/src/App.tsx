@@ -1,6 +1,6 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { api } from './api'
-import type { Symptome, ResultatDiagnostic } from './types'
+import type { FacetteCategorie, Symptome, ResultatDiagnostic } from './types'
 import SearchBar from './components/SearchBar'
 import SymptomesList from './components/SymptomesList'
 import ResultatDiagnosticComponent from './components/ResultatDiagnostic'
@@ -10,9 +10,11 @@ import { IoClose } from 'react-icons/io5'
 import "./index.css"
 
 const MAX_SYMPTOMES = 5
+const TAILLE_PREMIERE_PAGE = 50
 
 export default function App() {
-  const [symptomes, setSymptomes] = useState<Symptome[]>([])
+  const [categories, setCategories] = useState<FacetteCategorie[]>([])
+  const [nomsSymptomes, setNomsSymptomes] = useState<Record<string, string>>({})
   const [symptomesSelectionnes, setSymptomesSelectionnes] = useState<string[]>([])
   const [resultatsRecherche, setResultatsRecherche] = useState<Symptome[]>([])
   const [resultatDiagnostic, setResultatDiagnostic] = useState<ResultatDiagnostic | null>(null)
@@ -25,12 +27,23 @@ export default function App() {
   const [showModal, setShowModal] = useState(false)
   
   const [modeAffichage, setModeAffichage] = useState<'recherche' | 'liste'>('recherche')
+  const rechercheEnCours = useRef<AbortController | null>(null)
 
-  // Charger les symptômes au démarrage
+  // Noms des symptômes déjà reçus (pages, recherches, suggestions)
+  const memoriserNoms = (liste: Pick<Symptome, 'id' | 'nom'>[]) => {
+    setNomsSymptomes(prev => {
+      const noms = { ...prev }
+      liste.forEach(s => { noms[s.id] = s.nom })
+      return noms
+    })
+  }
+
+  // Charger les catégories et une première page au démarrage
   useEffect(() => {
-    api.getSymptomes()
+    api.getSymptomes({ limit: TAILLE_PREMIERE_PAGE })
       .then(data => {
-        setSymptomes(data.symptomes)
+        setCategories(data.categories)
+        memoriserNoms(data.symptomes)
         // Générer 7 suggestions aléatoires
         const shuffled = [...data.symptomes].sort(() => 0.5 - Math.random())
         setSuggestionsAleatoires(shuffled.slice(0, 7))
@@ -40,24 +53,41 @@ export default function App() {
         setError('Impossible de charger les symptômes. Vérifiez que le serveur est démarré.')
         setIsLoadingSymptomes(false)
       })
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [])
 
-  // Recherche par texte libre
+  // Annuler la recherche en cours (le serveur abandonne aussi son traitement)
+  const annulerRecherche = () => {
+    rechercheEnCours.current?.abort()
+    rechercheEnCours.current = null
+    setIsSearching(false)
+  }
+
+  useEffect(() => () => rechercheEnCours.current?.abort(), [])
+
+  // Recherche par texte libre : une nouvelle recherche remplace la précédente
   const handleSearch = async (texte: string) => {
+    rechercheEnCours.current?.abort()
+    const controleur = new AbortController()
+    rechercheEnCours.current = controleur
     setIsSearching(true)
     setError('')
     try {
-      const data = await api.rechercherSymptomes(texte)
-      setResultatsRecherche(data.resultats)
+      const data = await api.rechercherSymptomes(texte, controleur.signal)
+      if (!controleur.signal.aborted) setResultatsRecherche(data.resultats)
     } catch {
-      setError('Erreur lors de la recherche')
+      if (!controleur.signal.aborted) setError('Erreur lors de la recherche')
     } finally {
-      setIsSearching(false)
+      if (rechercheEnCours.current === controleur) {
+        rechercheEnCours.current = null
+        setIsSearching(false)
+      }
     }
   }
 
   // Sélectionner un symptôme
-  const handleSelectSymptome = (symptome: Symptome) => {
+  const handleSelectSymptome = (symptome: Pick<Symptome, 'id' | 'nom'>) => {
+    memoriserNoms([symptome])
     if (symptomesSelectionnes.length >= MAX_SYMPTOMES) {
       setError(`Maximum ${MAX_SYMPTOMES} symptômes autorisés`)
       return
@@ -113,7 +143,7 @@ export default function App() {
   // Obtenir les noms des symptômes sélectionnés
   const getSymptomesSelectionnesNoms = () => {
     return symptomesSelectionnes
-      .map(id => symptomes.find(s => s.id === id)?.nom)
+      .map(id => nomsSymptomes[id])
       .filter(Boolean)
   }
 
@@ -202,6 +232,7 @@ export default function App() {
                   {modeAffichage === 'recherche' ? (
                     <SearchBar
                       onSearch={handleSearch}
+                      onCancelSearch={annulerRecherche}
                       onSelectSymptome={handleSelectSymptome}
                       resultats={resultatsRecherche}
                       isLoading={isSearching}
@@ -210,9 +241,10 @@ export default function App() {
                   ) : (
                     <div className="max-h-[600px] overflow-y-auto pr-2 custom-scrollbar">
                       <SymptomesList
-                        symptomes={symptomes}
+                        categories={categories}
                         symptomesSelectionnes={symptomesSelectionnes}
                         onToggle={handleToggleSymptome}
+                        onSymptomesCharges={memoriserNoms}
                         maxSelection={MAX_SYMPTOMES}
                       />
                     </div>
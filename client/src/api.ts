@@ -1,23 +1,61 @@
 // Service API pour communiquer avec le backend
+import type { PageSymptomes, ResultatAutocompletion, ResultatRecherche } from './types'
 
 const API_URL = 'http://localhost:5000'
 
+// Résultats des dernières recherches, par requête normalisée (ordre = récence)
+const TAILLE_CACHE_RECHERCHE = 50
+const cacheRecherche = new Map<string, ResultatRecherche>()
+
+export const normaliserRequete = (texte: string) =>
+  texte.trim().toLowerCase().replace(/\s+/g, ' ')
+
 export const api = {
-  // Récupérer tous les symptômes
-  async getSymptomes() {
-    const response = await fetch(`${API_URL}/symptomes`)
+  // Récupérer une page du catalogue (éventuellement d'une seule catégorie)
+  // Sans limit ni curseur, le serveur renvoie toute la sélection
+  async getSymptomes(
+    options: { categorie?: string; sansCategorie?: boolean; limit?: number; curseur?: string | null } = {}
+  ): Promise<PageSymptomes> {
+    const params = new URLSearchParams()
+    if (options.categorie) params.set('categorie', options.categorie)
+    if (options.sansCategorie) params.set('sans_categorie', '1')
+    if (options.limit) params.set('limit', String(options.limit))
+    if (options.curseur) params.set('curseur', options.curseur)
+    const response = await fetch(`${API_URL}/symptomes?${params}`)
     if (!response.ok) throw new Error('Erreur lors du chargement des symptômes')
     return response.json()
   },
 
-  // Rechercher des symptômes par texte libre
-  async rechercherSymptomes(texte: string) {
+  // Rechercher des symptômes par texte libre (annulable, résultats en cache)
+  async rechercherSymptomes(texte: string, signal?: AbortSignal): Promise<ResultatRecherche> {
+    const cle = normaliserRequete(texte)
+    const enCache = cacheRecherche.get(cle)
+    if (enCache) {
+      cacheRecherche.delete(cle)
+      cacheRecherche.set(cle, enCache)
+      return enCache
+    }
+
     const response = await fetch(`${API_URL}/rechercher`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ texte })
+      body: JSON.stringify({ texte }),
+      signal
     })
     if (!response.ok) throw new Error('Erreur lors de la recherche')
+    const data: ResultatRecherche = await response.json()
+
+    cacheRecherche.set(cle, data)
+    if (cacheRecherche.size > TAILLE_CACHE_RECHERCHE) {
+      cacheRecherche.delete(cacheRecherche.keys().next().value!)
+    }
+    return data
+  },
+
+  // Suggestions pendant la saisie (sans inférence côté serveur)
+  async autocompleter(texte: string, signal?: AbortSignal): Promise<ResultatAutocompletion> {
+    const response = await fetch(`${API_URL}/autocomplete?q=${encodeURIComponent(texte)}`, { signal })
+    if (!response.ok) throw new Error('Erreur lors de l\'autocomplétion')
     return response.json()
   },
 
@@ -1,10 +1,12 @@
 import { useState, useEffect, useRef } from 'react'
-import type { Symptome } from '../types'
+import type { Symptome, Suggestion } from '../types'
+import { api } from '../api'
 import { FaSearch } from 'react-icons/fa'
 
 interface SearchBarProps {
   onSearch: (texte: string) => void
-  onSelectSymptome: (symptome: Symptome) => void
+  onCancelSearch: () => void
+  onSelectSymptome: (symptome: Pick<Symptome, 'id' | 'nom'>) => void
   resultats: Symptome[]
   isLoading: boolean
   suggestionsAleatoires: Symptome[]
@@ -12,6 +14,7 @@ interface SearchBarProps {
 
 export default function SearchBar({ 
   onSearch, 
+  onCancelSearch,
   onSelectSymptome, 
   resultats, 
   isLoading,
@@ -19,14 +22,36 @@ export default function SearchBar({
 }: SearchBarProps) {
   const [texte, setTexte] = useState('')
   const [showResults, setShowResults] = useState(false)
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([])
   const debounceTimer = useRef<number | null>(null)
   const searchBarRef = useRef<HTMLDivElement>(null)
 
+  // Autocomplétion à chaque frappe (réponse serveur sans modèle, pas de debounce)
+  useEffect(() => {
+    const texteClean = texte.trim()
+
+    if (texteClean.length < 2) {
+      setSuggestions([])
+      return
+    }
+
+    // Une frappe plus récente annule la requête précédente
+    const controleur = new AbortController()
+    api.autocompleter(texteClean, controleur.signal)
+      .then(data => setSuggestions(data.suggestions))
+      .catch(() => {
+        if (!controleur.signal.aborted) setSuggestions([])
+      })
+    return () => controleur.abort()
+  }, [texte])
+
   // Recherche automatique avec debounce
   useEffect(() => {
     if (debounceTimer.current !== null) {
       clearTimeout(debounceTimer.current)
     }
+    // Le texte a changé : la recherche en cours est périmée
+    onCancelSearch()
 
     const texteClean = texte.trim()
     
@@ -60,9 +85,10 @@ export default function SearchBar({
     return () => document.removeEventListener('mousedown', handleClickOutside)
   }, [])
 
-  const handleSelectSymptome = (symptome: Symptome) => {
+  const handleSelectSymptome = (symptome: Pick<Symptome, 'id' | 'nom'>) => {
     onSelectSymptome(symptome)
     setTexte('')
+    setSuggestions([])
     setShowResults(false)
   }
 
@@ -81,7 +107,6 @@ export default function SearchBar({
           onFocus={() => texte.length >= 3 && setShowResults(true)}
           placeholder="Décrivez le problème (ex: le moteur fait du bruit)..."
           className="w-full px-4 py-3 pr-12 rounded-lg border-2 border-gray-300 focus:border-blue-500 focus:outline-none text-gray-900 placeholder-gray-500 transition-colors"
-          disabled={isLoading}
         />
         <div className="absolute right-3 top-1/2 -translate-y-1/2">
           {isLoading ? (
@@ -92,6 +117,26 @@ export default function SearchBar({
         </div>
       </div>
 
+      {/* Suggestions pendant la saisie, avant la recherche sémantique */}
+      {!showResults && suggestions.length > 0 && (
+        <div className="mt-2 bg-white rounded-lg border-2 border-gray-200 shadow-lg max-h-64 overflow-y-auto">
+          {suggestions.map((suggestion) => (
+            <button
+              key={suggestion.id}
+              onClick={() => handleSelectSymptome(suggestion)}
+              className="w-full text-left px-4 py-2 hover:bg-blue-50 border-b border-gray-100 last:border-b-0 transition-colors"
+            >
+              <span className="text-gray-900">{suggestion.nom}</span>
+              {suggestion.categorie && (
+                <span className="ml-2 text-xs text-gray-500 bg-gray-100 px-2 py-0.5 rounded">
+                  {suggestion.categorie}
+                </span>
+              )}
+            </button>
+          ))}
+        </div>
+      )}
+
       {/* Résultats de recherche (autocomplétion) */}
       {showResults && resultats.length > 0 && (
         <div className="mt-2 bg-white rounded-lg border-2 border-blue-300 shadow-xl max-h-80 overflow-y-auto animate-fadeIn">
@@ -148,7 +193,7 @@ export default function SearchBar({
       )}
 
       {/* Suggestions aléatoires */}
-      {!showResults && suggestionsAleatoires.length > 0 && (
+      {!showResults && suggestions.length === 0 && suggestionsAleatoires.length > 0 && (
         <div className="mt-4">
           <p className="text-sm text-gray-600 mb-2 font-medium">💡 Suggestions rapides :</p>
           <div className="flex flex-wrap gap-2">
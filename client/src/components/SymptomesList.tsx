@@ -1,72 +1,156 @@
-import type { Symptome } from '../types'
+import { useState } from 'react'
+import type { FacetteCategorie, Symptome } from '../types'
+import { api } from '../api'
 
-interface SymptomesListProps {
+const SYMPTOMES_PAR_PAGE = 50
+
+// Symptômes sans catégorie : regroupés sous 'Autre' (clé distincte d'une vraie catégorie 'Autre')
+const CLE_SANS_CATEGORIE = ''
+const LIBELLE_SANS_CATEGORIE = 'Autre'
+
+interface PageCategorie {
   symptomes: Symptome[]
+  curseur: string | null
+  chargement: boolean
+}
+
+interface SymptomesListProps {
+  categories: FacetteCategorie[]
   symptomesSelectionnes: string[]
   onToggle: (id: string) => void
+  onSymptomesCharges: (symptomes: Symptome[]) => void
   maxSelection: number
 }
 
 export default function SymptomesList({ 
-  symptomes, 
+  categories, 
   symptomesSelectionnes, 
   onToggle,
+  onSymptomesCharges,
   maxSelection 
 }: SymptomesListProps) {
-  // Grouper par catégorie
-  const categories = symptomes.reduce((acc, symptome) => {
-    const cat = symptome.categorie || 'Autre'
-    if (!acc[cat]) acc[cat] = []
-    acc[cat].push(symptome)
-    return acc
-  }, {} as Record<string, Symptome[]>)
+  // Symptômes chargés par catégorie, à l'ouverture puis page par page
+  const [pages, setPages] = useState<Record<string, PageCategorie>>({})
 
   const isMaxReached = symptomesSelectionnes.length >= maxSelection
 
+  const chargerPage = async (categorie: string) => {
+    const page = pages[categorie]
+    if (page?.chargement || (page && page.curseur === null)) return
+
+    setPages(prev => ({
+      ...prev,
+      [categorie]: { symptomes: page?.symptomes ?? [], curseur: page?.curseur ?? null, chargement: true }
+    }))
+    try {
+      const data = await api.getSymptomes({
+        categorie: categorie || undefined,
+        sansCategorie: categorie === CLE_SANS_CATEGORIE,
+        limit: SYMPTOMES_PAR_PAGE,
+        curseur: page?.curseur
+      })
+      onSymptomesCharges(data.symptomes)
+      setPages(prev => {
+        // Catégorie refermée pendant le chargement
+        if (!prev[categorie]) return prev
+        return {
+          ...prev,
+          [categorie]: {
+            symptomes: [...prev[categorie].symptomes, ...data.symptomes],
+            curseur: data.curseur_suivant,
+            chargement: false
+          }
+        }
+      })
+    } catch {
+      // Nouvelle tentative au prochain clic (ouverture ou "Afficher plus")
+      setPages(prev => {
+        const suivantes = { ...prev }
+        if (!prev[categorie]?.symptomes.length) delete suivantes[categorie]
+        else suivantes[categorie] = { ...prev[categorie], chargement: false }
+        return suivantes
+      })
+    }
+  }
+
+  const basculerCategorie = (categorie: string) => {
+    if (pages[categorie]) {
+      setPages(prev => {
+        const suivantes = { ...prev }
+        delete suivantes[categorie]
+        return suivantes
+      })
+    } else {
+      chargerPage(categorie)
+    }
+  }
+
   return (
     <div className="space-y-6">
-      {Object.entries(categories).map(([categorie, symptomsInCat]) => (
-        <div key={categorie} className="bg-white rounded-lg border border-gray-200 overflow-hidden">
-          <div className="bg-gray-50 px-4 py-2 border-b border-gray-200">
-            <h3 className="font-semibold text-gray-900">{categorie}</h3>
-          </div>
-          <div className="p-2 grid grid-cols-1 md:grid-cols-2 gap-2">
-            {symptomsInCat.map((symptome) => {
-              const isSelected = symptomesSelectionnes.includes(symptome.id)
-              const isDisabled = !isSelected && isMaxReached
+      {categories.map(({ categorie, total }) => {
+        const cle = categorie ?? CLE_SANS_CATEGORIE
+        const page = pages[cle]
+
+        return (
+          <div key={cle} className="bg-white rounded-lg border border-gray-200 overflow-hidden">
+            <button
+              onClick={() => basculerCategorie(cle)}
+              className="w-full bg-gray-50 px-4 py-2 border-b border-gray-200 flex items-center justify-between text-left"
+            >
+              <h3 className="font-semibold text-gray-900">{categorie ?? LIBELLE_SANS_CATEGORIE}</h3>
+              <span className="text-xs text-gray-500">{total}</span>
+            </button>
+            {page && (
+              <div className="p-2 grid grid-cols-1 md:grid-cols-2 gap-2">
+                {page.symptomes.map((symptome) => {
+                  const isSelected = symptomesSelectionnes.includes(symptome.id)
+                  const isDisabled = !isSelected && isMaxReached
 
-              return (
-                <label
-                  key={symptome.id}
-                  className={`
-                    flex items-start gap-3 p-3 rounded-lg border-2 cursor-pointer transition-all
-                    ${isSelected 
-                      ? 'bg-blue-50 border-blue-500' 
-                      : isDisabled
-                        ? 'bg-gray-50 border-gray-200 opacity-50 cursor-not-allowed'
-                        : 'bg-white border-gray-200 hover:border-blue-300 hover:bg-blue-50'
-                    }
-                  `}
-                >
-                  <input
-                    type="checkbox"
-                    checked={isSelected}
-                    onChange={() => onToggle(symptome.id)}
-                    disabled={isDisabled}
-                    className="mt-1 w-5 h-5 text-blue-600 rounded focus:ring-2 focus:ring-blue-500"
-                  />
-                  <div className="flex-1 min-w-0">
-                    <p className="font-medium text-gray-900 text-sm">{symptome.nom}</p>
-                    {symptome.description && (
-                      <p className="text-xs text-gray-600 mt-1">{symptome.description}</p>
-                    )}
-                  </div>
-                </label>
-              )
-            })}
+                  return (
+                    <label
+                      key={symptome.id}
+                      className={`
+                        flex items-start gap-3 p-3 rounded-lg border-2 cursor-pointer transition-all
+                        ${isSelected 
+                          ? 'bg-blue-50 border-blue-500' 
+                          : isDisabled
+                            ? 'bg-gray-50 border-gray-200 opacity-50 cursor-not-allowed'
+                            : 'bg-white border-gray-200 hover:border-blue-300 hover:bg-blue-50'
+                        }
+                      `}
+                    >
+                      <input
+                        type="checkbox"
+                        checked={isSelected}
+                        onChange={() => onToggle(symptome.id)}
+                        disabled={isDisabled}
+                        className="mt-1 w-5 h-5 text-blue-600 rounded focus:ring-2 focus:ring-blue-500"
+                      />
+                      <div className="flex-1 min-w-0">
+                        <p className="font-medium text-gray-900 text-sm">{symptome.nom}</p>
+                        {symptome.description && (
+                          <p className="text-xs text-gray-600 mt-1">{symptome.description}</p>
+                        )}
+                      </div>
+                    </label>
+                  )
+                })}
+                {page.chargement && (
+                  <p className="text-xs text-gray-500 px-3 py-2">Chargement...</p>
+                )}
+                {!page.chargement && page.curseur && (
+                  <button
+                    onClick={() => chargerPage(cle)}
+                    className="md:col-span-2 text-sm text-blue-600 hover:text-blue-800 py-2"
+                  >
+                    Afficher plus ({total - page.symptomes.length} restants)
+                  </button>
+                )}
+              </div>
+            )}
           </div>
-        </div>
-      ))}
+        )
+      })}
     </div>
   )
 }
@@ -6,11 +6,34 @@ export interface Symptome {
   description?: string
   categorie?: string
   poids: number
+  alias?: string[]
   score_similarite?: number
 }
 
+export type Suggestion = Pick<Symptome, 'id' | 'nom' | 'categorie'>
+
+export interface FacetteCategorie {
+  categorie: string | null
+  total: number
+}
+
+export interface PageSymptomes {
+  succes: boolean
+  total: number
+  symptomes: Symptome[]
+  curseur_suivant: string | null
+  categories: FacetteCategorie[]
+}
+
+export interface ResultatAutocompletion {
+  succes: boolean
+  requete: string
+  suggestions: Suggestion[]
+}
+
 export interface ResultatDiagnostic {
   succes: boolean
+  id_diagnostic?: string  // Absent du diagnostic incertain
   diagnostic: string
   description: string
   gravite: string
@@ -1,19 +1,227 @@
 """API Flask principale"""
-from flask import Flask, request, jsonify
+import atexit
+import functools
+import hmac
+import threading
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import config
-from services import MoteurDiagnostic, AssistantIA
-from utils import valider_requete_diagnostic, valider_recherche
+from services import (
+    MoteurDiagnostic,
+    AssistantIA,
+    BasesTenants,
+    TenantInconnu,
+    SessionsDiagnostic,
+    HistoriqueDiagnostics,
+    CooccurrencesSymptomes,
+)
+from services.tenants import separer_prefixe_tenant
+from utils import (
+    valider_requete_diagnostic,
+    valider_requete_batch,
+    valider_vehicule,
+    valider_vehicules_batch,
+    valider_recherche,
+    valider_autocompletion,
+    valider_pagination_symptomes,
+    valider_creation_session,
+    valider_symptome_session,
+    valider_classement_session,
+    valider_recommandation,
+    valider_limite_recommandations,
+    valider_limite_statistiques,
+    ControleAdmission,
+    ErreurSurcharge,
+    rapport_memoire,
+    journaliser_periodiquement,
+)
+from utils.serialisation import FournisseurJSON, RequeteNegociee
 
 # Initialisation
 app = Flask(__name__)
+# JSON par orjson si installé, MessagePack selon Accept / Content-Type
+app.json = FournisseurJSON(app)
+app.request_class = RequeteNegociee
 CORS(app)
 
-# Services
+class PrefixeTenant:
+    """Middleware WSGI : /tenants/<tenant>/chemin devient /chemin avec l'en-tête X-Tenant"""
+    
+    def __init__(self, application):
+        self.application = application
+    
+    def __call__(self, environ, start_response):
+        tenant, chemin = separer_prefixe_tenant(environ.get('PATH_INFO', ''), config.PREFIXE_TENANT)
+        if tenant is not None:
+            environ['PATH_INFO'] = chemin
+            environ['HTTP_' + config.ENTETE_TENANT.upper().replace('-', '_')] = tenant
+        return self.application(environ, start_response)
+
+app.wsgi_app = PrefixeTenant(app.wsgi_app)
+
+# Services (le modèle d'embeddings se charge en arrière-plan)
 print("Initialisation des services...")
-moteur = MoteurDiagnostic()
+moteur = MoteurDiagnostic(chargement_asynchrone=True)
 assistant_ia = AssistantIA()
-print("Services prêts !")
+# Bases des autres tenants : chargées au premier usage, même modèle d'embeddings
+bases_tenants = BasesTenants(config.TENANTS_DIR, config.TENANTS_MEMOIRE_MAX)
+# Sessions de diagnostic incrémental (en mémoire, propres à ce worker)
+sessions = SessionsDiagnostic(config.SESSION_TTL, config.MAX_SESSIONS)
+# Historique des diagnostics : écrit par lots en arrière-plan, vidé à l'arrêt
+historique = HistoriqueDiagnostics(config.HISTORIQUE_FILE, **config.HISTORIQUE) if config.HISTORIQUE_FILE else None
+# Co-occurrences des symptômes et diagnostics (instantanés périodiques)
+cooccurrences = CooccurrencesSymptomes(config.COOCCURRENCES_FILE, config.COOCCURRENCES_INTERVALLE)
+
+def consigner_diagnostics(source, cas, tenant, moteur_tenant):
+    """Compte les diagnostics rendus et les dépose dans l'historique, sans attendre d'écriture"""
+    cas = list(cas)
+    cooccurrences.enregistrer(cas, moteur_tenant.symptomes, tenant)
+    if historique is not None:
+        historique.enregistrer(source, cas, tenant)
+
+def vider_ecritures():
+    """Écrit l'historique en file et les derniers comptes de co-occurrence (arrêt du worker)"""
+    if historique is not None:
+        historique.fermer()
+    cooccurrences.fermer()
+
+atexit.register(vider_ecritures)
+
+# État exposé par GET /health/ready
+etat = {'pret': False, 'semantique': False, 'erreur': None}
+
+def _preparer_services():
+    """Attend le modèle puis préchauffe le moteur avant d'accepter le trafic"""
+    try:
+        etat['semantique'] = moteur.attendre_vectorisation()
+        moteur.prechauffer()
+        etat['pret'] = True
+        print("Services prêts !")
+    except Exception as e:
+        etat['erreur'] = str(e)
+        print(f"[API] Préchauffage impossible: {e}")
+
+threading.Thread(target=_preparer_services, name='prechauffage', daemon=True).start()
+
+# Limites séparées : l'encodage est coûteux, le scoring des règles non
+admission_recherche = ControleAdmission('recherche', **config.ADMISSION_RECHERCHE)
+admission_diagnostic = ControleAdmission('diagnostic', **config.ADMISSION_DIAGNOSTIC)
+
+def avec_delestage(vue):
+    """
+    Répond 503 avec Retry-After quand le traitement est saturé
+
+    La vue soumet elle-même son étape coûteuse à l'admission (ErreurSurcharge
+    levée par ControleAdmission.admettre).
+    """
+    @functools.wraps(vue)
+    def vue_delestee(*args, **kwargs):
+        try:
+            return vue(*args, **kwargs)
+        except ErreurSurcharge as e:
+            reponse = jsonify({
+                'succes': False,
+                'erreur': str(e)
+            })
+            reponse.headers['Retry-After'] = str(e.retry_after)
+            return reponse, 503
+    return vue_delestee
+
+def avec_admission(controle: ControleAdmission):
+    """Soumet toute la vue à l'admission ; 503 avec Retry-After quand elle est saturée"""
+    def decorateur(vue):
+        @functools.wraps(vue)
+        def vue_admise(*args, **kwargs):
+            with controle.admettre():
+                return vue(*args, **kwargs)
+        return avec_delestage(vue_admise)
+    return decorateur
+
+def avec_tenant(vue):
+    """
+    Choisit le moteur de la requête (g.moteur) : celui du tenant de l'en-tête
+    X-Tenant (g.tenant), chargé au premier usage, ou le moteur par défaut sans
+    en-tête
+    
+    404 si le tenant n'a pas de base de connaissances.
+    """
+    @functools.wraps(vue)
+    def vue_tenant(*args, **kwargs):
+        tenant = request.headers.get(config.ENTETE_TENANT, '').strip()
+        g.tenant = tenant or None
+        try:
+            g.moteur = bases_tenants.obtenir(tenant) if tenant else moteur
+        except TenantInconnu as e:
+            return jsonify({
+                'succes': False,
+                'erreur': str(e)
+            }), 404
+        return vue(*args, **kwargs)
+    return vue_tenant
+
+def avec_session(vue):
+    """
+    Passe à la vue la session de l'URL, verrouillée pendant la requête, et
+    valide la taille du classement renvoyé (g.limite_classement)
+    
+    404 si la session est inconnue ou expirée, 500 (réponse JSON) si la vue
+    échoue.
+    """
+    @functools.wraps(vue)
+    def vue_session(identifiant, *args, **kwargs):
+        try:
+            valide, erreur, g.limite_classement = valider_classement_session(request.args)
+            if not valide:
+                return jsonify({
+                    'succes': False,
+                    'erreur': erreur
+                }), 400
+            session = sessions.obtenir(identifiant)
+            if session is None:
+                return jsonify({
+                    'succes': False,
+                    'erreur': 'Session inconnue ou expirée'
+                }), 404
+            with session.verrou:
+                return vue(session, *args, **kwargs)
+        except Exception as e:
+            print(f"[API] Erreur: {e}")
+            return jsonify({
+                'succes': False,
+                'erreur': f"Erreur serveur: {str(e)}"
+            }), 500
+    return vue_session
+
+def reserve_admin(vue):
+    """Réservé au jeton config.ADMIN_TOKEN ; 404 si aucun jeton n'est configuré"""
+    @functools.wraps(vue)
+    def vue_admin(*args, **kwargs):
+        if not config.ADMIN_TOKEN:
+            return jsonify({
+                'succes': False,
+                'erreur': "Endpoint d'administration désactivé"
+            }), 404
+        schema, _, jeton = request.headers.get('Authorization', '').partition(' ')
+        if schema.lower() != 'bearer':
+            jeton = ''
+        if not hmac.compare_digest(jeton.strip().encode('utf-8'), config.ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({
+                'succes': False,
+                'erreur': "Accès réservé à l'administration"
+            }), 403
+        return vue(*args, **kwargs)
+    return vue_admin
+
+def mesurer_memoire():
+    """Rapport mémoire des services de ce worker"""
+    return rapport_memoire(
+        {'moteur': moteur, 'vectorisation': moteur.vectorisation, 'assistant_ia': assistant_ia,
+         'tenants': bases_tenants, 'cooccurrences': cooccurrences},
+        {'base_compilee': moteur.base.taille} if moteur.base is not None else None
+    )
+
+if config.JOURNAL_MEMOIRE_INTERVALLE > 0:
+    journaliser_periodiquement(mesurer_memoire, config.JOURNAL_MEMOIRE_INTERVALLE)
 
 @app.route('/')
 def index():
@@ -21,22 +229,86 @@ def index():
     return jsonify({
         'message': 'API de diagnostic automobile',
         'version': '2.0',
+        'pret': etat['pret'],
         'endpoints': {
-            'GET /symptomes': 'Liste tous les symptômes disponibles',
+            'GET /health/live': 'Le processus répond',
+            'GET /health/ready': 'Modèle chargé et moteur préchauffé',
+            'GET /symptomes?categorie=&limit=&curseur=': 'Catalogue des symptômes, par page et par catégorie',
             'POST /rechercher': 'Recherche de symptômes par texte libre',
-            'POST /diagnostiquer': 'Effectue un diagnostic'
-        }
+            'POST /rechercher/diagnostics': 'Recherche de diagnostics par panne soupçonnée',
+            'GET /autocomplete?q=': 'Suggestions de symptômes pendant la saisie',
+            'POST /diagnostiquer': 'Effectue un diagnostic',
+            'POST /diagnostiquer/batch': 'Effectue plusieurs diagnostics en une requête',
+            'POST /recommander?limit=': 'Symptômes à vérifier pour départager les diagnostics',
+            'POST /sessions': 'Ouvre une session de diagnostic incrémental',
+            'GET /sessions/<id>?limit=': 'Classement des diagnostics de la session',
+            'POST /sessions/<id>/symptomes': 'Ajoute un symptôme à la session',
+            'DELETE /sessions/<id>/symptomes/<symptome>': 'Retire un symptôme de la session',
+            'GET /sessions/<id>/recommandations?limit=': 'Symptômes à vérifier ensuite dans la session',
+            'DELETE /sessions/<id>': 'Ferme la session',
+            'GET /statistiques/cooccurrences?limit=': 'Fréquences et co-occurrences des symptômes et diagnostics',
+            'GET /debug/memory': 'Mémoire par composant (administration)'
+        },
+        'tenants': 'En-tête X-Tenant ou préfixe /tenants/<tenant>/ : base de connaissances du garage ou de la marque'
     })
 
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    """Sonde de vivacité : le processus répond, même pendant le chargement"""
+    return jsonify({'succes': True, 'statut': 'vivant'})
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Sonde de disponibilité : 503 tant que le préchauffage n'est pas terminé"""
+    statut = 'pret' if etat['pret'] else ('erreur' if etat['erreur'] else 'chargement')
+    reponse = {
+        'succes': etat['pret'],
+        'statut': statut,
+        'recherche_semantique': etat['semantique'],
+        'admission': {
+            'recherche': admission_recherche.statistiques(),
+            'diagnostic': admission_diagnostic.statistiques()
+        },
+        'ia': assistant_ia.statistiques() if assistant_ia.actif else None,
+        'tenants': bases_tenants.statistiques(),
+        'sessions': sessions.statistiques(),
+        'historique': historique.statistiques() if historique is not None else None
+    }
+    if etat['erreur']:
+        reponse['erreur'] = etat['erreur']
+    return jsonify(reponse), (200 if etat['pret'] else 503)
+
 @app.route('/symptomes', methods=['GET'])
+@avec_tenant
 def get_symptomes():
-    """Retourne la liste de tous les symptômes disponibles"""
+    """
+    Retourne le catalogue (ou une page) et le nombre de symptômes par catégorie
+    
+    Query: ?categorie=Freinage&limit=50&curseur=<curseur_suivant>
+    (sans limit ni curseur : tous les symptômes, sans pagination ;
+    sans_categorie=1 : symptômes sans catégorie)
+    """
     try:
-        symptomes = moteur.get_symptomes_disponibles()
+        # Validation
+        valide, erreur, categorie, limite, curseur, sans_categorie = valider_pagination_symptomes(request.args)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        try:
+            page = g.moteur.parcourir_symptomes(categorie, limite, curseur, sans_categorie)
+        except ValueError as e:
+            return jsonify({
+                'succes': False,
+                'erreur': str(e)
+            }), 400
+        
         return jsonify({
             'succes': True,
-            'total': len(symptomes),
-            'symptomes': symptomes
+            **page,
+            'categories': g.moteur.categories_symptomes()
         })
     except Exception as e:
         return jsonify({
@@ -45,6 +317,8 @@ def get_symptomes():
         }), 500
 
 @app.route('/rechercher', methods=['POST'])
+@avec_tenant
+@avec_delestage
 def rechercher_symptomes():
     """
     Recherche des symptômes similaires à partir d'un texte libre
@@ -65,8 +339,8 @@ def rechercher_symptomes():
         # Sécuriser le typage pour l'analyse statique
         assert isinstance(texte, str)
         
-        # Recherche
-        resultats = moteur.rechercher_symptomes(texte, top_k=5)
+        # Recherche : seul l'encodage du texte est soumis à l'admission
+        resultats = g.moteur.rechercher_symptomes(texte, top_k=5, admission=admission_recherche.admettre)
         
         return jsonify({
             'succes': True,
@@ -74,6 +348,77 @@ def rechercher_symptomes():
             'resultats': resultats
         })
         
+    except ErreurSurcharge:
+        raise
+    except Exception as e:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/rechercher/diagnostics', methods=['POST'])
+@avec_tenant
+@avec_delestage
+def rechercher_diagnostics():
+    """
+    Recherche des diagnostics proches d'une panne soupçonnée
+    
+    Body: {"texte": "joint de culasse"}
+    """
+    try:
+        data = request.get_json()
+        
+        # Validation
+        valide, erreur, texte = valider_recherche(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+
+        # Sécuriser le typage pour l'analyse statique
+        assert isinstance(texte, str)
+        
+        return jsonify({
+            'succes': True,
+            'texte_recherche': texte,
+            'resultats': g.moteur.rechercher_diagnostics(texte, top_k=5, admission=admission_recherche.admettre)
+        })
+        
+    except ErreurSurcharge:
+        raise
+    except Exception as e:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/autocomplete', methods=['GET'])
+@avec_tenant
+def autocomplete():
+    """
+    Suggestions de symptômes à chaque frappe (sans inférence de modèle)
+    
+    Query: ?q=fumee%20no&limit=8
+    """
+    try:
+        # Validation
+        valide, erreur, texte, limite = valider_autocompletion(request.args)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+
+        # Sécuriser le typage pour l'analyse statique
+        assert isinstance(texte, str) and isinstance(limite, int)
+        
+        return jsonify({
+            'succes': True,
+            'requete': texte,
+            'suggestions': g.moteur.autocompleter(texte, limite)
+        })
+        
     except Exception as e:
         return jsonify({
             'succes': False,
@@ -81,11 +426,14 @@ def rechercher_symptomes():
         }), 500
 
 @app.route('/diagnostiquer', methods=['POST'])
+@avec_tenant
+@avec_admission(admission_diagnostic)
 def diagnostiquer():
     """
     Effectue un diagnostic basé sur les symptômes fournis
     
-    Body: {"symptomes": ["fumee_noire", "consommation_elevee"]}
+    Body: {"symptomes": ["fumee_noire", "consommation_elevee"],
+           "vehicule": {"carburant": "diesel", "annee": 2012}}  (vehicule facultatif)
     """
     try:
         data = request.get_json()
@@ -97,6 +445,13 @@ def diagnostiquer():
                 'succes': False,
                 'erreur': erreur
             }), 400
+        
+        valide, erreur, vehicule = valider_vehicule(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
 
         # Sécuriser le typage pour l'analyse statique
         assert isinstance(symptomes_ids, list)
@@ -104,11 +459,13 @@ def diagnostiquer():
         print(f"[API] Diagnostic demandé pour: {symptomes_ids}")
         
         # Diagnostic
-        resultat = moteur.diagnostiquer(symptomes_ids)
+        resultat = g.moteur.diagnostiquer(symptomes_ids, vehicule=vehicule)
         
         if not resultat.get('succes'):
             return jsonify(resultat), 400
         
+        consigner_diagnostics('diagnostiquer', [(symptomes_ids, vehicule, resultat)], g.tenant, g.moteur)
+        
         # Reformulation IA - toujours activer pour plus de clarté
         if assistant_ia.actif:
             explication_ia = assistant_ia.reformuler_diagnostic(resultat)
@@ -125,6 +482,309 @@ def diagnostiquer():
             'erreur': f"Erreur serveur: {str(e)}"
         }), 500
 
+@app.route('/diagnostiquer/batch', methods=['POST'])
+@avec_tenant
+@avec_admission(admission_diagnostic)
+def diagnostiquer_batch():
+    """
+    Effectue un diagnostic pour chaque liste de symptômes fournie
+    
+    Body: {"cas": [{"symptomes": ["fumee_noire"], "vehicule": {...}}, ...], "explication_ia": false}
+    """
+    try:
+        data = request.get_json()
+        
+        # Validation
+        valide, erreur, lot_symptomes_ids = valider_requete_batch(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        valide, erreur, vehicules = valider_vehicules_batch(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+
+        # Sécuriser le typage pour l'analyse statique
+        assert isinstance(lot_symptomes_ids, list)
+        assert isinstance(vehicules, list)
+        
+        print(f"[API] Diagnostic groupé demandé pour {len(lot_symptomes_ids)} cas")
+        
+        # Diagnostics (un seul passage matriciel sur les règles)
+        resultats = g.moteur.diagnostiquer_lot(lot_symptomes_ids, vehicules=vehicules)
+        consigner_diagnostics('lot', zip(lot_symptomes_ids, vehicules, resultats), g.tenant, g.moteur)
+        
+        # Reformulation IA uniquement sur demande explicite (un appel par cas)
+        if data.get('explication_ia') is True and assistant_ia.actif:
+            for resultat in resultats:
+                if resultat.get('succes'):
+                    resultat['explication_ia'] = assistant_ia.reformuler_diagnostic(resultat)
+        
+        return jsonify({
+            'succes': True,
+            'total': len(resultats),
+            'resultats': resultats
+        })
+        
+    except Exception as e:
+        print(f"[API] Erreur: {e}")
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/recommander', methods=['POST'])
+@avec_tenant
+@avec_admission(admission_diagnostic)
+def recommander():
+    """
+    Symptômes non encore constatés qui départagent le mieux les diagnostics possibles
+    
+    Body: {"symptomes": ["demarrage_difficile"], "vehicule": {"carburant": "diesel"}}
+    Query: ?limit=5
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        # Validation
+        valide, erreur, symptomes_ids = valider_recommandation(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        valide, erreur, vehicule = valider_vehicule(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        valide, erreur, limite = valider_limite_recommandations(request.args)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+
+        # Sécuriser le typage pour l'analyse statique
+        assert isinstance(symptomes_ids, list) and isinstance(limite, int)
+        
+        return jsonify({
+            'succes': True,
+            'recommandations': g.moteur.recommander_symptomes(symptomes_ids, limite, vehicule=vehicule)
+        })
+        
+    except Exception as e:
+        print(f"[API] Erreur: {e}")
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+def _etat_session(session, statut: int = 200):
+    """Symptômes, classement (g.limite_classement règles) et meilleur diagnostic de la session"""
+    return jsonify({
+        'succes': True,
+        'session': session.id,
+        'symptomes': list(session.symptomes),
+        'classement': session.classement(g.limite_classement),
+        'resultat': session.resultat() if session.symptomes else None
+    }), statut
+
+@app.route('/sessions', methods=['POST'])
+@avec_tenant
+def creer_session():
+    """
+    Ouvre une session : les symptômes sont ensuite ajoutés un à un
+    
+    Body (facultatif): {"symptomes": [...], "vehicule": {"carburant": "diesel"}}
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        # Validation
+        valide, erreur, symptomes_ids = valider_creation_session(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        valide, erreur, vehicule = valider_vehicule(data)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        valide, erreur, g.limite_classement = valider_classement_session(request.args)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        inconnus = [sid for sid in symptomes_ids or [] if sid not in g.moteur.symptomes]
+        if inconnus:
+            return jsonify({
+                'succes': False,
+                'erreur': f"Symptôme inconnu: {inconnus[0]}"
+            }), 400
+        
+        session = sessions.creer(g.moteur, vehicule, config.CORRESPONDANCE_SOUPLE)
+        with session.verrou:
+            for sid in symptomes_ids or []:
+                session.ajouter(sid)
+            return _etat_session(session, 201)
+        
+    except Exception as e:
+        print(f"[API] Erreur: {e}")
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/sessions/<identifiant>', methods=['GET'])
+@avec_session
+def lire_session(session):
+    """Classement courant de la session (Query: ?limit=5)"""
+    return _etat_session(session)
+
+@app.route('/sessions/<identifiant>', methods=['DELETE'])
+def fermer_session(identifiant):
+    """Ferme la session"""
+    try:
+        if not sessions.fermer(identifiant):
+            return jsonify({
+                'succes': False,
+                'erreur': 'Session inconnue ou expirée'
+            }), 404
+        return jsonify({'succes': True})
+    except Exception as e:
+        print(f"[API] Erreur: {e}")
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/sessions/<identifiant>/recommandations', methods=['GET'])
+@avec_session
+def recommander_session(session):
+    """Symptômes à vérifier ensuite, d'après le classement de la session (Query: ?limit=5)"""
+    valide, erreur, limite = valider_limite_recommandations(request.args)
+    if not valide:
+        return jsonify({
+            'succes': False,
+            'erreur': erreur
+        }), 400
+    
+    return jsonify({
+        'succes': True,
+        'session': session.id,
+        'recommandations': session.recommander(limite)
+    })
+
+@app.route('/sessions/<identifiant>/symptomes', methods=['POST'])
+@avec_session
+def ajouter_symptome_session(session):
+    """
+    Ajoute un symptôme : seules les règles qui le citent sont rescorées
+    
+    Body: {"symptome": "fumee_noire"}
+    """
+    valide, erreur, symptome_id = valider_symptome_session(request.get_json(silent=True))
+    if not valide:
+        return jsonify({
+            'succes': False,
+            'erreur': erreur
+        }), 400
+    
+    if symptome_id not in session.moteur.symptomes:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Symptôme inconnu: {symptome_id}"
+        }), 400
+    
+    if symptome_id not in session.symptomes and len(session.symptomes) >= config.MAX_SYMPTOMES_PAR_SESSION:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Maximum {config.MAX_SYMPTOMES_PAR_SESSION} symptômes par session"
+        }), 400
+    
+    session.ajouter(symptome_id)
+    return _etat_session(session)
+
+@app.route('/sessions/<identifiant>/symptomes/<symptome_id>', methods=['DELETE'])
+@avec_session
+def retirer_symptome_session(session, symptome_id):
+    """Retire un symptôme de la session (sans effet s'il n'y était pas)"""
+    session.retirer(symptome_id)
+    return _etat_session(session)
+
+@app.route('/statistiques/cooccurrences', methods=['GET'])
+@avec_tenant
+def statistiques_cooccurrences():
+    """
+    Symptômes, diagnostics et co-occurrences les plus fréquents du tenant,
+    avec les couples symptôme/diagnostic absents de la règle du diagnostic
+    
+    Query: ?limit=20
+    """
+    try:
+        valide, erreur, limite = valider_limite_statistiques(request.args)
+        if not valide:
+            return jsonify({
+                'succes': False,
+                'erreur': erreur
+            }), 400
+        
+        # Sécuriser le typage pour l'analyse statique
+        assert isinstance(limite, int)
+        
+        # Comptes par identifiant de règle, noms seulement dans la réponse
+        symptomes_regles = {
+            diagnostic.id: set(diagnostic.symptomes_requis) | set(diagnostic.symptomes_optionnels)
+            for diagnostic in g.moteur.diagnostics
+        }
+        noms_diagnostics = {diagnostic.id: diagnostic.nom for diagnostic in g.moteur.diagnostics}
+        return jsonify({
+            'succes': True,
+            'tenant': g.tenant,
+            **cooccurrences.resume(g.tenant, limite, symptomes_regles, noms_diagnostics),
+            'instantanes': cooccurrences.statistiques()
+        })
+    except Exception as e:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
+@app.route('/debug/memory', methods=['GET'])
+@reserve_admin
+def debug_memory():
+    """
+    Mémoire de chaque composant des services et RSS du processus (en octets)
+    
+    Header: Authorization: Bearer <ADMIN_TOKEN>
+    """
+    try:
+        return jsonify({
+            'succes': True,
+            **mesurer_memoire()
+        })
+    except Exception as e:
+        return jsonify({
+            'succes': False,
+            'erreur': f"Erreur serveur: {str(e)}"
+        }), 500
+
 if __name__ == '__main__':
     print(f"Démarrage du serveur sur {config.API_HOST}:{config.API_PORT}")
     app.run(
@@ -0,0 +1,336 @@
+"""
+Point d'entrée ASGI : /rechercher, /rechercher/diagnostics et /diagnostiquer asynchrones
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Ces endpoints sont servis par des coroutines : l'encodage s'exécute sur
+un pool de threads dédié et la reformulation Gemini passe par le client
+asynchrone du SDK, si bien qu'une requête qui attend le modèle de langage
+n'occupe aucun thread. Si le client se déconnecte (requête annulée), le
+traitement est abandonné : attente d'admission, encodage pas encore commencé
+et appel Gemini. Les autres routes (et les pré-requêtes CORS) sont
+déléguées à l'application Flask de api.py, sur un pool séparé.
+
+Le tenant (en-tête X-Tenant ou préfixe /tenants/<tenant>/) choisit la base
+de connaissances ; un tenant pas encore chargé l'est hors de la boucle.
+"""
+import asyncio
+import contextlib
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import config
+from api import (
+    app,
+    moteur,
+    assistant_ia,
+    bases_tenants,
+    admission_recherche,
+    admission_diagnostic,
+    consigner_diagnostics,
+    vider_ecritures,
+)
+from services import MoteurDiagnostic, TenantInconnu
+from services.tenants import separer_prefixe_tenant
+from utils import valider_recherche, valider_requete_diagnostic, valider_vehicule, ErreurSurcharge
+from utils.serialisation import decoder, encoder, type_reponse, msgpack
+
+Entetes = List[Tuple[bytes, bytes]]
+
+executeur_encodage = ThreadPoolExecutor(
+    max_workers=config.ASGI_THREADS_ENCODAGE,
+    thread_name_prefix='encodage'
+)
+executeur_flask = ThreadPoolExecutor(
+    max_workers=config.ASGI_THREADS_FLASK,
+    thread_name_prefix='flask'
+)
+
+# Tenant de la requête en cours (historique et co-occurrences des diagnostics)
+tenant_requete: 'contextvars.ContextVar[Optional[str]]' = contextvars.ContextVar('tenant_requete', default=None)
+
+
+async def _rechercher(recherche: Callable[..., List[Dict]], data: Optional[dict]) -> Tuple[Dict, int]:
+    """Valide le texte puis exécute la recherche (encodage) sur le pool dédié"""
+    valide, erreur, texte = valider_recherche(data)
+    if not valide:
+        return {'succes': False, 'erreur': erreur}, 400
+    assert isinstance(texte, str)
+
+    # Seul l'encodage est soumis à l'admission, hors de la boucle d'événements
+    async with admission_recherche.admettre_async():
+        encodage = executeur_encodage.submit(recherche, texte, top_k=5)
+        try:
+            resultats = await asyncio.wrap_future(encodage)
+        except asyncio.CancelledError:
+            # Client déconnecté : un encodage en file est retiré du pool ; déjà
+            # commencé, il garde sa place d'admission jusqu'à la fin
+            if not encodage.cancel():
+                await asyncio.wait([asyncio.wrap_future(encodage)])
+            raise
+
+    return {
+        'succes': True,
+        'texte_recherche': texte,
+        'resultats': resultats
+    }, 200
+
+
+async def rechercher_symptomes(data: Optional[dict], moteur_tenant: MoteurDiagnostic) -> Tuple[Dict, int]:
+    """Version asynchrone de POST /rechercher"""
+    return await _rechercher(moteur_tenant.rechercher_symptomes, data)
+
+
+async def rechercher_diagnostics(data: Optional[dict], moteur_tenant: MoteurDiagnostic) -> Tuple[Dict, int]:
+    """Version asynchrone de POST /rechercher/diagnostics"""
+    return await _rechercher(moteur_tenant.rechercher_diagnostics, data)
+
+
+async def diagnostiquer(data: Optional[dict], moteur_tenant: MoteurDiagnostic) -> Tuple[Dict, int]:
+    """Version asynchrone de POST /diagnostiquer"""
+    valide, erreur, symptomes_ids = valider_requete_diagnostic(data)
+    if not valide:
+        return {'succes': False, 'erreur': erreur}, 400
+    valide, erreur, vehicule = valider_vehicule(data)
+    if not valide:
+        return {'succes': False, 'erreur': erreur}, 400
+    assert isinstance(symptomes_ids, list)
+
+    print(f"[API] Diagnostic demandé pour: {symptomes_ids}")
+
+    # Scoring matriciel : quelques microsecondes, exécuté sur la boucle
+    async with admission_diagnostic.admettre_async():
+        resultat = moteur_tenant.diagnostiquer(symptomes_ids, vehicule=vehicule)
+
+    if not resultat.get('succes'):
+        return resultat, 400
+
+    consigner_diagnostics('diagnostiquer', [(symptomes_ids, vehicule, resultat)], tenant_requete.get(), moteur_tenant)
+
+    # L'attente de Gemini ne bloque ni thread ni place d'admission
+    if assistant_ia.actif:
+        resultat['explication_ia'] = await assistant_ia.reformuler_diagnostic_async(resultat)
+
+    print(f"[API] Diagnostic: {resultat.get('diagnostic')} (confiance: {resultat.get('confiance')})")
+
+    return resultat, 200
+
+
+TraitementAsynchrone = Callable[[Optional[dict], MoteurDiagnostic], Awaitable[Tuple[Dict, int]]]
+
+ROUTES_ASYNCHRONES: Dict[Tuple[str, str], TraitementAsynchrone] = {
+    ('POST', '/rechercher'): rechercher_symptomes,
+    ('POST', '/rechercher/diagnostics'): rechercher_diagnostics,
+    ('POST', '/diagnostiquer'): diagnostiquer,
+}
+
+
+async def _moteur_tenant(tenant: Optional[str]) -> MoteurDiagnostic:
+    """Moteur du tenant (par défaut sans tenant) ; le premier chargement se fait hors de la boucle"""
+    if not tenant:
+        return moteur
+    charge = bases_tenants.en_memoire(tenant)
+    if charge is not None:
+        return charge
+    boucle = asyncio.get_running_loop()
+    return await boucle.run_in_executor(executeur_flask, bases_tenants.obtenir, tenant)
+
+
+def _entete(scope: Dict, nom: bytes) -> Optional[str]:
+    """Valeur d'un en-tête de la requête (nom en minuscules)"""
+    for cle, valeur in scope.get('headers', []):
+        if cle.lower() == nom:
+            return valeur.decode('latin-1').strip()
+    return None
+
+
+def _router_tenant(scope: Dict) -> Dict:
+    """Retire le préfixe /tenants/<tenant>/ du chemin et le reporte dans l'en-tête X-Tenant"""
+    tenant, chemin = separer_prefixe_tenant(scope['path'], config.PREFIXE_TENANT)
+    if tenant is None:
+        return scope
+    entete = config.ENTETE_TENANT.lower().encode('latin-1')
+    entetes = [(cle, valeur) for cle, valeur in scope.get('headers', []) if cle.lower() != entete]
+    return dict(scope, path=chemin, headers=entetes + [(entete, tenant.encode('latin-1'))])
+
+
+async def _lire_corps(receive) -> Optional[bytes]:
+    """Corps complet de la requête, None si le client s'est déconnecté"""
+    morceaux = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        morceaux.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(morceaux)
+
+
+async def _attendre_deconnexion(receive) -> None:
+    """Se termine quand le client ferme la connexion (corps déjà lu)"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def _envoyer(send, statut: int, entetes: Entetes, corps: bytes) -> None:
+    await send({'type': 'http.response.start', 'status': statut, 'headers': entetes})
+    await send({'type': 'http.response.body', 'body': corps})
+
+
+async def _servir_route_asynchrone(
+    traitement: TraitementAsynchrone,
+    corps: bytes,
+    scope: Dict,
+    receive,
+    send
+) -> None:
+    """
+    Exécute une route asynchrone et sérialise sa réponse comme jsonify
+    (JSON, ou MessagePack selon Accept ; corps lu selon Content-Type)
+    
+    Le traitement (chargement du tenant compris) est annulé si le client se
+    déconnecte avant la réponse.
+    """
+    tenant = _entete(scope, config.ENTETE_TENANT.lower().encode('latin-1'))
+    type_contenu = type_reponse(_entete(scope, b'accept'))
+    entetes: Entetes = [
+        (b'content-type', type_contenu.encode('latin-1')),
+        (b'access-control-allow-origin', b'*'),
+    ]
+    if msgpack is not None:
+        entetes.append((b'vary', b'Accept'))
+    try:
+        data = decoder(corps, _entete(scope, b'content-type')) if corps else None
+    except ValueError:
+        data = None
+
+    async def traiter() -> Tuple[Dict, int]:
+        tenant_requete.set(tenant or None)
+        return await traitement(data, await _moteur_tenant(tenant))
+
+    tache = asyncio.ensure_future(traiter())
+    deconnexion = asyncio.ensure_future(_attendre_deconnexion(receive))
+    try:
+        await asyncio.wait({tache, deconnexion}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        deconnexion.cancel()
+    if not tache.done():
+        tache.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await tache
+        print("[API] Client déconnecté, traitement abandonné")
+        return
+
+    try:
+        reponse, statut = tache.result()
+    except ErreurSurcharge as e:
+        reponse, statut = {'succes': False, 'erreur': str(e)}, 503
+        entetes.append((b'retry-after', str(e.retry_after).encode()))
+    except TenantInconnu as e:
+        reponse, statut = {'succes': False, 'erreur': str(e)}, 404
+    except Exception as e:
+        print(f"[API] Erreur: {e}")
+        reponse, statut = {'succes': False, 'erreur': f"Erreur serveur: {str(e)}"}, 500
+
+    await _envoyer(send, statut, entetes, encoder(reponse, type_contenu))
+
+
+def _environ_wsgi(scope: Dict, corps: bytes) -> Dict:
+    """Traduit une requête ASGI en environnement WSGI (PEP 3333)"""
+    serveur = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': serveur[0],
+        'SERVER_PORT': str(serveur[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(corps)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(corps),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for nom, valeur in scope.get('headers', []):
+        cle = nom.decode('latin-1').upper().replace('-', '_')
+        valeur = valeur.decode('latin-1')
+        if cle == 'CONTENT_LENGTH':
+            continue
+        if cle != 'CONTENT_TYPE':
+            cle = f'HTTP_{cle}'
+        environ[cle] = f"{environ[cle]},{valeur}" if cle in environ else valeur
+    return environ
+
+
+def _appeler_flask(environ: Dict) -> Tuple[int, Entetes, bytes]:
+    """Exécute l'application Flask (dans un thread du pool)"""
+    reponse: Dict = {}
+
+    def start_response(statut, entetes, exc_info=None):
+        reponse['statut'] = int(statut.split(' ', 1)[0])
+        reponse['entetes'] = [(n.lower().encode('latin-1'), v.encode('latin-1')) for n, v in entetes]
+
+    morceaux = app(environ, start_response)
+    try:
+        corps = b''.join(morceaux)
+    finally:
+        if hasattr(morceaux, 'close'):
+            morceaux.close()
+    return reponse['statut'], reponse['entetes'], corps
+
+
+async def _cycle_de_vie(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executeur_encodage.shutdown(wait=False)
+            executeur_flask.shutdown(wait=False)
+            # Historique et co-occurrences écrits avant la fin du processus
+            await asyncio.get_running_loop().run_in_executor(None, vider_ecritures)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    """Application ASGI"""
+    if scope['type'] == 'lifespan':
+        await _cycle_de_vie(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    corps = await _lire_corps(receive)
+    if corps is None:
+        return
+
+    scope = _router_tenant(scope)
+    traitement = ROUTES_ASYNCHRONES.get((scope['method'], scope['path']))
+    if traitement is not None:
+        await _servir_route_asynchrone(traitement, corps, scope, receive, send)
+        return
+
+    boucle = asyncio.get_running_loop()
+    statut, entetes, contenu = await boucle.run_in_executor(
+        executeur_flask, _appeler_flask, _environ_wsgi(scope, corps)
+    )
+    await _envoyer(send, statut, entetes, contenu)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print(f"Démarrage du serveur ASGI sur {config.API_HOST}:{config.API_PORT}")
+    uvicorn.run(application, host=config.API_HOST, port=config.API_PORT)
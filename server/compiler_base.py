@@ -0,0 +1,89 @@
+"""Compilation de la base de connaissances en un fichier binaire
+
+Usage:
+    python compiler_base.py data/base.diagkb
+    python compiler_base.py data/base.diagkb --sans-vecteurs
+    python compiler_base.py data/base.diagkb --dimensions 128 --type int8
+    python compiler_base.py data/base.diagkb --seuil-similarite 0.75
+
+Puis démarrer l'API avec BASE_COMPILEE=data/base.diagkb : les symptômes,
+les règles, leurs matrices et les embeddings sont projetés en mémoire
+sans analyse JSON ni encodage au démarrage.
+
+Avec --dimensions ou --type, les embeddings sont réduits et quantifiés ; le
+rappel@k perdu par rapport à la pleine précision est affiché, mesuré sur
+les descriptions et alias des symptômes utilisés comme requêtes.
+
+Les paires de symptômes proches (correspondance souple des règles) sont
+compilées avec les embeddings, au seuil --seuil-similarite. Les embeddings
+des diagnostics (POST /rechercher/diagnostics) sont encodés dans le même
+appel au modèle et partagent la réduction.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+import config
+from services.base_compilee import compiler_base
+from services.reduction import TYPES_STOCKAGE, preparer_vecteurs, rapport_rappel
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Compile symptomes.json et regles.json")
+    parser.add_argument('sortie', nargs='?', default=config.BASE_COMPILEE_FILE or None,
+                        help="Fichier à produire (BASE_COMPILEE par défaut)")
+    parser.add_argument('--symptomes', default=config.SYMPTOMES_FILE, help="Fichier des symptômes")
+    parser.add_argument('--regles', default=config.REGLES_FILE, help="Fichier des règles")
+    parser.add_argument('--sans-vecteurs', action='store_true',
+                        help="Ne pas encoder les embeddings (diagnostic seul)")
+    parser.add_argument('--dimensions', type=int, default=config.EMBEDDINGS_DIMENSIONS,
+                        help="Dimensions des embeddings après réduction (0 = aucune)")
+    parser.add_argument('--type', choices=TYPES_STOCKAGE, default=config.EMBEDDINGS_TYPE,
+                        help="Type de stockage des embeddings")
+    parser.add_argument('--seuil-similarite', type=float, default=config.SEUIL_SIMILARITE_SYMPTOMES,
+                        help="Similarité minimale des symptômes proches (correspondance souple)")
+    args = parser.parse_args(argv)
+
+    if not args.sortie:
+        parser.error("fichier de sortie requis (argument ou variable BASE_COMPILEE)")
+
+    matrice = reduction = matrice_diagnostics = None
+    modele = ''
+    if not args.sans_vecteurs:
+        from services.vectorisation import VectorisationService
+
+        with open(args.symptomes, 'r', encoding='utf-8') as f:
+            symptomes = json.load(f)
+        with open(args.regles, 'r', encoding='utf-8') as f:
+            regles = json.load(f)
+        vectorisation = VectorisationService()
+        vectorisation.vectoriser_symptomes(symptomes, dimensions=0, type_stockage='float32', diagnostics=regles)
+        assert vectorisation.matrice is not None and vectorisation.matrice_diagnostics is not None
+        vecteurs = vectorisation.matrice.valeurs
+        # Réduction ajustée sur les deux index : une seule projection des requêtes
+        reduction, ensemble = preparer_vecteurs(
+            np.vstack([vecteurs, vectorisation.matrice_diagnostics.valeurs]), args.dimensions, args.type)
+        matrice, matrice_diagnostics = ensemble.lignes(0, len(vecteurs)), ensemble.lignes(len(vecteurs))
+        modele = config.EMBEDDING_MODEL
+
+        if reduction is not None or args.type != 'float32':
+            assert vectorisation.model is not None
+            textes = [t for s in symptomes for t in [s.get('description')] + list(s.get('alias') or []) if t]
+            requetes = np.asarray(vectorisation.model.encode(textes, show_progress_bar=False), dtype=np.float32)
+            rapport = rapport_rappel(vecteurs, requetes, reduction, matrice)
+            print(f"[Base] Embeddings {rapport['dimensions']} dimensions en {rapport['type']} : "
+                  f"{rapport['octets']} octets (÷{rapport['compression']})")
+            print("[Base] " + ", ".join(f"{cle} = {valeur:.3f}" for cle, valeur in rapport.items()
+                                         if cle.startswith('rappel')) + f" sur {len(textes)} requêtes")
+
+    compiler_base(args.sortie, args.symptomes, args.regles, matrice, modele, reduction,
+                  args.seuil_similarite, config.MAX_VOISINS_SYMPTOME, matrice_diagnostics)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,60 @@ DEBUG_MODE = os.getenv('FLASK_ENV', 'development') == 'development'
 # Limites
 MAX_SYMPTOMES_PAR_REQUETE = 5
 MIN_SYMPTOMES_PAR_REQUETE = 1
+MAX_CAS_PAR_LOT = 1000  # Diagnostics groupés (POST /diagnostiquer/batch)
+MAX_SUGGESTIONS_AUTOCOMPLETION = 20
+SYMPTOMES_PAR_PAGE = 100  # GET /symptomes?curseur=... sans paramètre limit
+MAX_SYMPTOMES_PAR_PAGE = 500
+
+# Sessions de diagnostic (POST /sessions) : inactivité avant expiration (s),
+# sessions ouvertes au plus (les moins récemment utilisées partent d'abord)
+SESSION_TTL = float(os.getenv('SESSION_TTL', '1800'))
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '10000'))
+MAX_SYMPTOMES_PAR_SESSION = 30
+CLASSEMENT_SESSION = 5  # Règles du classement renvoyé par défaut
+MAX_CLASSEMENT_SESSION = 50
+RECOMMANDATIONS_PAR_DEFAUT = 5  # Symptômes à vérifier proposés (POST /recommander)
+MAX_RECOMMANDATIONS = 20
+
+# Contrôle d'admission : requêtes simultanées, file d'attente, attente max (s)
+# Au-delà, réponse 503 avec Retry-After plutôt qu'un traitement trop tardif
+ADMISSION_RECHERCHE = {
+    'concurrence': int(os.getenv('ADMISSION_RECHERCHE_CONCURRENCE', '4')),
+    'file_max': int(os.getenv('ADMISSION_RECHERCHE_FILE', '16')),
+    'attente_max': float(os.getenv('ADMISSION_RECHERCHE_ATTENTE', '2.0')),
+}
+ADMISSION_DIAGNOSTIC = {
+    'concurrence': int(os.getenv('ADMISSION_DIAGNOSTIC_CONCURRENCE', '16')),
+    'file_max': int(os.getenv('ADMISSION_DIAGNOSTIC_FILE', '64')),
+    'attente_max': float(os.getenv('ADMISSION_DIAGNOSTIC_ATTENTE', '1.0')),
+}
+
+# Point d'entrée ASGI (asgi.py) : pool d'encodage et pool des routes Flask
+ASGI_THREADS_ENCODAGE = int(os.getenv('ASGI_THREADS_ENCODAGE', str(ADMISSION_RECHERCHE['concurrence'])))
+ASGI_THREADS_FLASK = int(os.getenv('ASGI_THREADS_FLASK', '8'))
+
+# Administration : jeton des endpoints /debug (Authorization: Bearer <jeton>)
+# Vide = endpoints de débogage désactivés
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+# Rapport mémoire dans les journaux toutes les N secondes (0 = désactivé)
+JOURNAL_MEMOIRE_INTERVALLE = float(os.getenv('JOURNAL_MEMOIRE_INTERVALLE', '0'))
+
+# Historique des diagnostics (fichier SQLite en mode WAL, vide = désactivé) :
+# requêtes en file, cas par transaction, remplissage d'un lot (s), attente
+# d'une requête quand la file est pleine (s) avant que ses cas soient perdus
+HISTORIQUE_FILE = os.getenv('HISTORIQUE_DIAGNOSTICS', '')
+HISTORIQUE = {
+    'taille_file': int(os.getenv('HISTORIQUE_FILE_MAX', '10000')),
+    'taille_lot': int(os.getenv('HISTORIQUE_LOT', '500')),
+    'intervalle': float(os.getenv('HISTORIQUE_INTERVALLE', '1.0')),
+    'attente_max': float(os.getenv('HISTORIQUE_ATTENTE', '0.05')),
+}
+# Co-occurrences des symptômes et diagnostics (GET /statistiques/cooccurrences) :
+# instantanés cumulés dans un fichier SQLite (vide = en mémoire seulement)
+COOCCURRENCES_FILE = os.getenv('STATISTIQUES_COOCCURRENCES', '')
+COOCCURRENCES_INTERVALLE = float(os.getenv('STATISTIQUES_INTERVALLE', '60'))
+STATISTIQUES_PAR_DEFAUT = 20  # Entrées par liste renvoyée
+MAX_STATISTIQUES = 200
 
 # Seuils de confiance
 SEUIL_CONFIANCE_HAUTE = 0.85  # Match quasi-parfait
@@ -23,9 +77,58 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 SYMPTOMES_FILE = os.path.join(DATA_DIR, 'symptomes.json')
 REGLES_FILE = os.path.join(DATA_DIR, 'regles.json')
 
+# Base compilée (python compiler_base.py) ; vide = chargement des fichiers JSON
+BASE_COMPILEE_FILE = os.getenv('BASE_COMPILEE', '')
+
+# Bases par tenant (garage, marque) : <TENANTS_DIR>/<tenant>/symptomes.json,
+# regles.json et base.diagkb facultative ; choisies par l'en-tête X-Tenant ou
+# le préfixe /tenants/<tenant>/, chargées au premier usage et évincées
+# (moins récemment utilisées d'abord) au-delà du budget mémoire
+TENANTS_DIR = os.getenv('TENANTS_DIR', os.path.join(DATA_DIR, 'tenants'))
+TENANTS_MEMOIRE_MAX = int(float(os.getenv('TENANTS_MEMOIRE_MAX_MO', '512')) * 1024 * 1024)
+ENTETE_TENANT = 'X-Tenant'
+PREFIXE_TENANT = '/tenants/'
+
 # Configuration IA
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
-USE_AI_EXPLANATION = bool(GEMINI_API_KEY)
+# Simulateur local à la place de Gemini (python tests/simulateur_gemini.py)
+IA_SIMULATEUR_URL = os.getenv('IA_SIMULATEUR_URL', '')
+USE_AI_EXPLANATION = bool(GEMINI_API_KEY or IA_SIMULATEUR_URL)
+# Délai maximal d'une reformulation (s) ; au-delà, la description est renvoyée
+IA_TIMEOUT = float(os.getenv('IA_TIMEOUT', '10'))
 
 # Modèle d'embeddings
 EMBEDDING_MODEL = 'all-MiniLM-L6-v2'  # Léger et performant
+
+# Embeddings compacts pour les grands catalogues : dimensions après réduction
+# (0 = 384 d'origine) et stockage 'float32', 'float16' ou 'int8'
+EMBEDDINGS_DIMENSIONS = int(os.getenv('EMBEDDINGS_DIMENSIONS', '0'))
+EMBEDDINGS_TYPE = os.getenv('EMBEDDINGS_TYPE', 'float32')
+
+# Threads d'inférence : les cœurs (quota cgroup compris) sont partagés entre
+# les workers de la machine ; WEB_CONCURRENCY est posé par gunicorn
+NB_WORKERS = int(os.getenv('NB_WORKERS', os.getenv('WEB_CONCURRENCY', '1')))
+THREADS_INFERENCE = int(os.getenv('THREADS_INFERENCE', '0'))  # 0 = cœurs / workers
+THREADS_INTEROP = int(os.getenv('THREADS_INTEROP', '1'))
+
+# Recherche texte : 'hybride' (lexical puis embeddings), 'lexical' ou 'semantique'
+MODE_RECHERCHE = os.getenv('MODE_RECHERCHE', 'hybride')
+# Couverture lexicale à partir de laquelle le modèle n'est pas appelé (1.0 = tous les mots reconnus)
+SEUIL_LEXICAL_CONFIANT = float(os.getenv('SEUIL_LEXICAL_CONFIANT', '1.0'))
+POIDS_LEXICAL_HYBRIDE = float(os.getenv('POIDS_LEXICAL_HYBRIDE', '0.5'))  # Part du score lexical dans la fusion
+# Score minimal d'un symptôme trouvé par les embeddings (recherche sémantique ou hybride)
+SEUIL_RECHERCHE_SYMPTOMES = float(os.getenv('SEUIL_RECHERCHE_SYMPTOMES', '0.5'))
+SEUIL_RECHERCHE_DIAGNOSTICS = 0.3  # Similarité minimale d'un diagnostic (POST /rechercher/diagnostics)
+
+# Correspondance souple des règles : un symptôme proche (similarité des
+# embeddings >= seuil) d'un symptôme de la règle compte pour sa similarité
+CORRESPONDANCE_SOUPLE = os.getenv('CORRESPONDANCE_SOUPLE', 'false').lower() == 'true'
+SEUIL_SIMILARITE_SYMPTOMES = float(os.getenv('SEUIL_SIMILARITE_SYMPTOMES', '0.7'))
+MAX_VOISINS_SYMPTOME = 8  # Symptômes proches gardés au plus par symptôme
+
+# Préchauffage avant de déclarer l'instance prête (GET /health/ready)
+TEXTES_PRECHAUFFAGE = [
+    'le moteur fait du bruit',
+    'fumée noire à l\'échappement',
+    'la voiture ne démarre pas',
+]
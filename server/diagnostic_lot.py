@@ -0,0 +1,218 @@
+"""Diagnostic en ligne de commande d'archives de cas (JSONL ou CSV)
+
+Usage:
+    python diagnostic_lot.py archives.jsonl resultats.jsonl --workers 4
+    python diagnostic_lot.py tickets.csv - --format csv > resultats.jsonl
+
+Chaque cas est lu, diagnostiqué puis écrit au fil de l'eau : la mémoire
+utilisée reste constante quelle que soit la taille du fichier d'entrée.
+
+Formats d'entrée:
+    JSONL : une ligne par cas, {"id": "...", "symptomes": ["...", ...]}
+            et facultativement "vehicule": {"carburant": ..., "annee": ...}
+    CSV   : colonnes "id" (optionnelle) et "symptomes" (IDs séparés par ";")
+"""
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from services import MoteurDiagnostic
+from utils import valider_requete_diagnostic, valider_vehicule
+
+# Base de connaissances du processus (héritée par les workers en mode fork)
+_moteur: Optional[MoteurDiagnostic] = None
+
+Enregistrement = Tuple[int, Union[str, Dict]]
+Cas = Tuple[int, Optional[str], Optional[Dict]]
+
+
+def lire_enregistrements(flux, format_entree: str) -> Iterator[Enregistrement]:
+    """
+    Lit les enregistrements bruts un par un depuis un flux texte
+
+    Le décodage JSON est laissé aux workers pour ne pas limiter le débit
+    au processus principal.
+
+    Args:
+        flux: Fichier ouvert en lecture
+        format_entree: 'jsonl' ou 'csv'
+
+    Yields:
+        (numero_ligne, ligne JSON brute ou ligne CSV)
+    """
+    if format_entree == 'csv':
+        yield from enumerate(csv.DictReader(flux), start=2)
+        return
+
+    for numero, ligne in enumerate(flux, start=1):
+        if ligne.strip():
+            yield numero, ligne
+
+
+def decoder(enregistrement: Enregistrement) -> Cas:
+    """
+    Convertit un enregistrement brut en requête de diagnostic
+
+    Returns:
+        (numero_ligne, id_cas, requete) ; requete vaut None si illisible
+    """
+    numero, brut = enregistrement
+    if isinstance(brut, dict):
+        symptomes = [s for s in (brut.get('symptomes') or '').split(';') if s.strip()]
+        return numero, brut.get('id'), {'symptomes': symptomes}
+
+    try:
+        data = json.loads(brut)
+    except json.JSONDecodeError:
+        return numero, None, None
+    id_cas = data.get('id') if isinstance(data, dict) else None
+    return numero, id_cas, data
+
+
+def decouper(elements: Iterable, taille: int) -> Iterator[List]:
+    """Regroupe les éléments en lots de taille fixe sans matérialiser le flux"""
+    iterateur = iter(elements)
+    while True:
+        lot = list(islice(iterateur, taille))
+        if not lot:
+            return
+        yield lot
+
+
+def _initialiser_worker():
+    """Charge la base de connaissances si elle n'a pas été héritée du parent"""
+    global _moteur
+    if _moteur is None:
+        # Les journaux de chargement ne doivent pas se mêler aux résultats
+        with contextlib.redirect_stdout(sys.stderr):
+            _moteur = MoteurDiagnostic(avec_vectorisation=False)
+
+
+def traiter_lot(lot: List[Enregistrement]) -> Tuple[str, int, int]:
+    """
+    Décode et diagnostique un lot en un seul passage matriciel
+
+    Args:
+        lot: Enregistrements lus par lire_enregistrements
+
+    Returns:
+        (résultats sérialisés en JSONL, nombre de cas, nombre d'erreurs)
+    """
+    _initialiser_worker()
+    assert _moteur is not None
+
+    resultats: List[Dict] = []
+    a_diagnostiquer = []
+    for numero, id_cas, requete in map(decoder, lot):
+        resultat: Dict = {'ligne': numero, 'id': id_cas}
+        valide, erreur, symptomes_ids = valider_requete_diagnostic(requete)
+        vehicule = None
+        if valide:
+            valide, erreur, vehicule = valider_vehicule(requete)
+        if valide:
+            a_diagnostiquer.append((resultat, symptomes_ids, vehicule))
+        else:
+            resultat.update({'succes': False, 'erreur': erreur})
+        resultats.append(resultat)
+
+    diagnostics = _moteur.diagnostiquer_lot(
+        [ids for _, ids, _ in a_diagnostiquer],
+        vehicules=[vehicule for _, _, vehicule in a_diagnostiquer]
+    )
+    for (resultat, _, _), diagnostic in zip(a_diagnostiquer, diagnostics):
+        resultat.update(diagnostic)
+
+    erreurs = sum(1 for r in resultats if not r.get('succes'))
+    texte = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in resultats)
+    return texte, len(resultats), erreurs
+
+
+def executer(lots: Iterable[List[Enregistrement]], workers: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    Traite les lots, en parallèle si demandé, en conservant l'ordre d'entrée
+
+    Le nombre de lots en vol est borné pour garder une mémoire constante.
+    """
+    if workers <= 1:
+        for lot in lots:
+            yield traiter_lot(lot)
+        return
+
+    methodes = multiprocessing.get_all_start_methods()
+    contexte = multiprocessing.get_context('fork' if 'fork' in methodes else None)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexte,
+                             initializer=_initialiser_worker) as executeur:
+        en_vol: deque = deque()
+        for lot in lots:
+            en_vol.append(executeur.submit(traiter_lot, lot))
+            if len(en_vol) >= workers * 2:
+                yield en_vol.popleft().result()
+        while en_vol:
+            yield en_vol.popleft().result()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Diagnostic en lot d'archives de cas")
+    parser.add_argument('entree', help="Fichier de cas (JSONL ou CSV), '-' pour stdin")
+    parser.add_argument('sortie', help="Fichier de résultats JSONL, '-' pour stdout")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                        help="Format d'entrée (déduit de l'extension par défaut)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus de diagnostic")
+    parser.add_argument('--taille-lot', type=int, default=500,
+                        help="Nombre de cas diagnostiqués par passage matriciel")
+    parser.add_argument('--intervalle', type=float, default=10.0,
+                        help="Intervalle en secondes entre deux rapports de débit")
+    args = parser.parse_args(argv)
+
+    format_entree = args.format or ('csv' if args.entree.lower().endswith('.csv') else 'jsonl')
+
+    # Charger la base une seule fois : les workers forkés la partagent
+    _initialiser_worker()
+
+    entree = sys.stdin if args.entree == '-' else open(args.entree, 'r', encoding='utf-8', newline='')
+    sortie = sys.stdout if args.sortie == '-' else open(args.sortie, 'w', encoding='utf-8')
+
+    debut = time.perf_counter()
+    dernier_rapport = debut
+    total = 0
+    erreurs = 0
+
+    try:
+        lots = decouper(lire_enregistrements(entree, format_entree), args.taille_lot)
+        for texte, nb_cas, nb_erreurs in executer(lots, args.workers):
+            sortie.write(texte)
+            total += nb_cas
+            erreurs += nb_erreurs
+
+            maintenant = time.perf_counter()
+            if maintenant - dernier_rapport >= args.intervalle:
+                debit = total / (maintenant - debut)
+                print(f"[Lot] {total} cas traités ({debit:.0f} cas/s)", file=sys.stderr)
+                dernier_rapport = maintenant
+    finally:
+        if entree is not sys.stdin:
+            entree.close()
+        if sortie is not sys.stdout:
+            sortie.close()
+
+    duree = time.perf_counter() - debut
+    debit = total / duree if duree > 0 else 0.0
+    print(f"[Lot] Terminé : {total} cas ({erreurs} en erreur) en {duree:.1f}s, "
+          f"{debit:.0f} cas/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
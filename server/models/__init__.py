@@ -1,5 +1,6 @@
 """Modèles de données"""
 from .symptome import Symptome
 from .diagnostic import Diagnostic
+from .vehicule import Vehicule
 
-__all__ = ['Symptome', 'Diagnostic']
+__all__ = ['Symptome', 'Diagnostic', 'Vehicule']
@@ -14,10 +14,21 @@ class Diagnostic:
     symptomes_requis: List[str]  # IDs des symptômes
     symptomes_optionnels: Optional[List[str]] = None
     conseils: Optional[str] = None
+    # Applicabilité (vide ou None = tous les véhicules), bornes incluses
+    carburants: Optional[List[str]] = None
+    marques: Optional[List[str]] = None
+    annee_min: Optional[int] = None
+    annee_max: Optional[int] = None
+    kilometrage_min: Optional[int] = None
+    kilometrage_max: Optional[int] = None
     
     def __post_init__(self):
         if self.symptomes_optionnels is None:
             self.symptomes_optionnels = []
+        if self.carburants is None:
+            self.carburants = []
+        if self.marques is None:
+            self.marques = []
     
     def to_dict(self):
         """Convertit en dictionnaire"""
@@ -29,7 +40,13 @@ class Diagnostic:
             'cout_estimatif': f"{self.cout_min:,}Ar - {self.cout_max:,}Ar".replace(',', ' '),
             'symptomes_requis': self.symptomes_requis,
             'symptomes_optionnels': self.symptomes_optionnels,
-            'conseils': self.conseils
+            'conseils': self.conseils,
+            'carburants': self.carburants,
+            'marques': self.marques,
+            'annee_min': self.annee_min,
+            'annee_max': self.annee_max,
+            'kilometrage_min': self.kilometrage_min,
+            'kilometrage_max': self.kilometrage_max
         }
     
     @classmethod
@@ -44,5 +61,11 @@ class Diagnostic:
             cout_max=data['cout_max'],
             symptomes_requis=data['symptomes_requis'],
             symptomes_optionnels=data.get('symptomes_optionnels', []),
-            conseils=data.get('conseils')
+            conseils=data.get('conseils'),
+            carburants=data.get('carburants', []),
+            marques=data.get('marques', []),
+            annee_min=data.get('annee_min'),
+            annee_max=data.get('annee_max'),
+            kilometrage_min=data.get('kilometrage_min'),
+            kilometrage_max=data.get('kilometrage_max')
         )
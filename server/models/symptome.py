@@ -1,6 +1,6 @@
 """Modèle pour représenter un symptôme"""
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 @dataclass
 class Symptome:
@@ -10,6 +10,11 @@ class Symptome:
     description: Optional[str] = None
     categorie: Optional[str] = None
     poids: float = 1.0  # Importance du symptôme (0.0 à 1.0)
+    alias: Optional[List[str]] = None  # Autres formulations (autocomplétion)
+    
+    def __post_init__(self):
+        if self.alias is None:
+            self.alias = []
     
     def __hash__(self):
         return hash(self.id)
@@ -26,7 +31,8 @@ class Symptome:
             'nom': self.nom,
             'description': self.description,
             'categorie': self.categorie,
-            'poids': self.poids
+            'poids': self.poids,
+            'alias': self.alias
         }
     
     @classmethod
@@ -37,5 +43,6 @@ class Symptome:
             nom=data['nom'],
             description=data.get('description'),
             categorie=data.get('categorie'),
-            poids=data.get('poids', 1.0)
+            poids=data.get('poids', 1.0),
+            alias=data.get('alias', [])
         )
@@ -0,0 +1,35 @@
+"""Modèle pour représenter le véhicule d'une demande de diagnostic"""
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True)
+class Vehicule:
+    """Contexte véhicule : chaque champ absent ne restreint pas les règles"""
+    carburant: Optional[str] = None  # diesel, essence, hybride...
+    marque: Optional[str] = None
+    annee: Optional[int] = None  # Année du modèle
+    kilometrage: Optional[int] = None
+    
+    @property
+    def vide(self) -> bool:
+        """Aucun champ renseigné"""
+        return all(v is None for v in (self.carburant, self.marque, self.annee, self.kilometrage))
+    
+    def to_dict(self):
+        """Convertit en dictionnaire"""
+        return {
+            'carburant': self.carburant,
+            'marque': self.marque,
+            'annee': self.annee,
+            'kilometrage': self.kilometrage
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crée un Vehicule depuis un dictionnaire"""
+        return cls(
+            carburant=data.get('carburant'),
+            marque=data.get('marque'),
+            annee=data.get('annee'),
+            kilometrage=data.get('kilometrage')
+        )
@@ -2,5 +2,11 @@
 from .vectorisation import VectorisationService
 from .moteur_diagnostic import MoteurDiagnostic
 from .assistant_ia import AssistantIA
+from .tenants import BasesTenants, TenantInconnu
+from .sessions import SessionDiagnostic, SessionsDiagnostic
+from .historique import HistoriqueDiagnostics
+from .cooccurrences import CooccurrencesSymptomes
 
-__all__ = ['VectorisationService', 'MoteurDiagnostic', 'AssistantIA']
+__all__ = ['VectorisationService', 'MoteurDiagnostic', 'AssistantIA', 'BasesTenants', 'TenantInconnu',
+           'SessionDiagnostic', 'SessionsDiagnostic', 'HistoriqueDiagnostics',
+           'CooccurrencesSymptomes']
@@ -0,0 +1,137 @@
+"""Applicabilité des règles selon le véhicule (index bitmap précalculés)"""
+import bisect
+import numpy as np
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from models import Diagnostic, Vehicule
+from utils.texte import normaliser_texte
+
+# Champ du véhicule -> attribut de Diagnostic (liste de valeurs admises)
+CHAMPS_VALEURS = {'carburant': 'carburants', 'marque': 'marques'}
+# Champ du véhicule -> attributs de Diagnostic (bornes incluses)
+CHAMPS_PLAGES = {'annee': ('annee_min', 'annee_max'), 'kilometrage': ('kilometrage_min', 'kilometrage_max')}
+
+BORNE_MIN = np.iinfo(np.int64).min
+BORNE_MAX = np.iinfo(np.int64).max
+
+
+def normaliser_valeur(valeur: str) -> str:
+    """Carburant ou marque comparables ("Citroën " -> "citroen")"""
+    return ' '.join(normaliser_texte(valeur).split())
+
+
+class IndexApplicabilite:
+    """
+    Règles applicables à un véhicule, sans parcourir les règles
+
+    Pour chaque champ, une ligne de bits par cas possible (bit r = règle r
+    applicable) est calculée au chargement :
+    - carburant, marque : une ligne par valeur citée par les règles, plus
+      une ligne pour les autres valeurs (règles sans restriction seulement) ;
+    - année, kilométrage : une ligne par intervalle entre deux bornes
+      consécutives des règles, trouvée par recherche dichotomique.
+    Les règles d'un véhicule sont le ET des lignes de ses champs renseignés.
+    Un champ absent du véhicule, ou qu'aucune règle ne restreint, ne filtre
+    rien.
+    """
+
+    TAILLE_CACHE = 4096  # Combinaisons de lignes mémorisées
+
+    def __init__(
+        self,
+        nb_regles: int,
+        valeurs: Mapping[str, Tuple[Sequence[str], np.ndarray]],
+        plages: Mapping[str, Tuple[np.ndarray, np.ndarray]]
+    ):
+        """
+        Args:
+            nb_regles: Nombre de règles de la base
+            valeurs: Champ -> (valeurs normalisées triées, bits (valeurs + 1) x octets)
+            plages: Champ -> (bornes triées, bits (bornes + 1) x octets)
+        """
+        self.nb_regles = nb_regles
+        self.valeurs = dict(valeurs)
+        self.plages = dict(plages)
+        self._cache: Dict[Tuple, np.ndarray] = {}
+
+    @classmethod
+    def depuis_regles(cls, diagnostics: Sequence[Diagnostic]) -> 'IndexApplicabilite':
+        """Calcule les lignes de bits de chaque champ"""
+        nb_regles = len(diagnostics)
+        valeurs = {}
+        for champ, attribut in CHAMPS_VALEURS.items():
+            admises = [{normaliser_valeur(v) for v in getattr(d, attribut) or []} for d in diagnostics]
+            cles = sorted(set().union(*admises)) if admises else []
+            if not cles:
+                continue
+            universelles = np.array([not a for a in admises], dtype=bool)
+            lignes = np.array([[cle in a for a in admises] for cle in cles], dtype=bool).reshape(len(cles), nb_regles)
+            lignes = np.vstack([lignes | universelles, universelles])
+            valeurs[champ] = (cles, np.packbits(lignes, axis=1))
+
+        plages = {}
+        for champ, (attribut_min, attribut_max) in CHAMPS_PLAGES.items():
+            minimums = np.array([BORNE_MIN if getattr(d, attribut_min) is None else getattr(d, attribut_min)
+                                 for d in diagnostics], dtype=np.int64)
+            maximums = np.array([BORNE_MAX if getattr(d, attribut_max) is None else getattr(d, attribut_max)
+                                 for d in diagnostics], dtype=np.int64)
+            restreintes = (minimums > BORNE_MIN) | (maximums < BORNE_MAX)
+            if not restreintes.any():
+                continue
+            # Intervalles [bornes[i - 1], bornes[i]) : chaque règle les couvre entièrement ou pas du tout
+            bornes = np.unique(np.concatenate([
+                minimums[minimums > BORNE_MIN],
+                maximums[maximums < BORNE_MAX] + 1,
+            ]))
+            representants = np.concatenate(([BORNE_MIN], bornes))
+            lignes = (minimums[np.newaxis, :] <= representants[:, np.newaxis]) & \
+                     (representants[:, np.newaxis] <= maximums[np.newaxis, :])
+            plages[champ] = (bornes, np.packbits(lignes, axis=1))
+
+        return cls(nb_regles, valeurs, plages)
+
+    @property
+    def restreint(self) -> bool:
+        """Au moins une règle ne s'applique pas à tous les véhicules"""
+        return bool(self.valeurs or self.plages)
+
+    def _lignes(self, vehicule: Vehicule) -> List[Tuple[str, int]]:
+        """Ligne de bits de chaque champ renseigné et indexé"""
+        lignes = []
+        for champ, (cles, _) in self.valeurs.items():
+            valeur = getattr(vehicule, champ)
+            if valeur is None:
+                continue
+            valeur = normaliser_valeur(valeur)
+            position = bisect.bisect_left(cles, valeur)
+            trouvee = position < len(cles) and cles[position] == valeur
+            lignes.append((champ, position if trouvee else len(cles)))
+        for champ, (bornes, _) in self.plages.items():
+            valeur = getattr(vehicule, champ)
+            if valeur is not None:
+                lignes.append((champ, int(np.searchsorted(bornes, valeur, side='right'))))
+        return lignes
+
+    def regles_applicables(self, vehicule: Optional[Vehicule]) -> Optional[np.ndarray]:
+        """
+        Positions des règles applicables au véhicule
+
+        Returns:
+            Positions croissantes des règles, None si rien n'est filtré
+            (pas de véhicule, ou aucun champ restreint par les règles)
+        """
+        if vehicule is None or not self.restreint:
+            return None
+        lignes = self._lignes(vehicule)
+        if not lignes:
+            return None
+
+        cle = tuple(lignes)
+        regles = self._cache.get(cle)
+        if regles is None:
+            bits = [self.valeurs[c][1][i] if c in self.valeurs else self.plages[c][1][i] for c, i in lignes]
+            masque = np.bitwise_and.reduce(bits) if len(bits) > 1 else bits[0]
+            regles = np.flatnonzero(np.unpackbits(masque, count=self.nb_regles))
+            if len(self._cache) >= self.TAILLE_CACHE:
+                self._cache.clear()
+            self._cache[cle] = regles
+        return regles
@@ -1,6 +1,25 @@
 """Service d'assistance IA pour reformulation"""
+import asyncio
 import os
+import socket
+import threading
+import time
+from typing import Dict, Optional, Set
 import config
+from utils.memoire import taille_profonde
+
+# Paramètres de génération des reformulations
+GENERATION_CONFIG = {
+    'temperature': 0.7,
+    'max_output_tokens': 200,
+}
+MODELE_GEMINI = 'gemini-2.0-flash'
+
+
+def _est_delai_depasse(erreur: Exception) -> bool:
+    """Délai dépassé, côté simulateur ou SDK (DeadlineExceeded de google.api_core)"""
+    return (isinstance(erreur, (TimeoutError, socket.timeout, asyncio.TimeoutError))
+            or type(erreur).__name__ == 'DeadlineExceeded')
 
 class AssistantIA:
     """Gère l'intégration avec Gemini pour reformulation"""
@@ -8,12 +27,21 @@ class AssistantIA:
     def __init__(self):
         """Initialise le service IA"""
         self.actif = config.USE_AI_EXPLANATION
-        if self.actif:
+        self.options_requete = {'timeout': config.IA_TIMEOUT}
+        self._verrou = threading.Lock()
+        self._compteurs = {'appels': 0, 'echecs': 0, 'delais_depasses': 0}
+        self._duree_totale = 0.0
+        if config.IA_SIMULATEUR_URL:
+            # Simulateur local (tests/simulateur_gemini.py) : tests de charge hors ligne
+            from .client_simulateur_ia import ClientSimulateurIA
+            self.model = ClientSimulateurIA(config.IA_SIMULATEUR_URL, MODELE_GEMINI, config.IA_TIMEOUT)
+            print(f"[IA] Simulateur Gemini activé ({config.IA_SIMULATEUR_URL})")
+        elif self.actif:
             try:
                 from google.generativeai.client import configure
                 from google.generativeai.generative_models import GenerativeModel
                 configure(api_key=config.GEMINI_API_KEY)
-                self.model = GenerativeModel('gemini-2.0-flash')
+                self.model = GenerativeModel(MODELE_GEMINI)
                 print("[IA] Service Gemini activé")
             except Exception as e:
                 print(f"[IA] Erreur initialisation Gemini: {e}")
@@ -21,6 +49,43 @@ class AssistantIA:
         else:
             print("[IA] Service IA désactivé (pas de clé API)")
     
+    def _compter(self, debut: float, erreur: Optional[Exception] = None) -> None:
+        """Comptabilise un appel (durée, échec, délai dépassé)"""
+        with self._verrou:
+            self._compteurs['appels'] += 1
+            self._duree_totale += time.perf_counter() - debut
+            if erreur is not None:
+                self._compteurs['echecs'] += 1
+                if _est_delai_depasse(erreur):
+                    self._compteurs['delais_depasses'] += 1
+    
+    def statistiques(self) -> Dict:
+        """Appels, replis sur la description (échecs dont délais dépassés) et durée moyenne"""
+        with self._verrou:
+            appels = self._compteurs['appels']
+            return {
+                **self._compteurs,
+                'duree_moyenne_ms': round(self._duree_totale / appels * 1000, 1) if appels else 0.0,
+            }
+    
+    def rapport_memoire(self, vus: Optional[Set[int]] = None) -> Dict[str, int]:
+        """Octets occupés par le client Gemini (0 si le service est désactivé)"""
+        vus = set() if vus is None else vus
+        return {
+            'client': taille_profonde(getattr(self, 'model', None), vus) if self.actif else 0,
+        }
+    
+    def _construire_prompt(self, diagnostic_data: dict) -> str:
+        """Prompt de reformulation d'un diagnostic"""
+        return f"""Tu es un mécanicien expert. Reformule ce diagnostic de manière claire et accessible.
+
+Diagnostic : {diagnostic_data.get('diagnostic')}
+Description technique : {diagnostic_data.get('description')}
+Gravité : {diagnostic_data.get('gravite')}
+Symptômes : {', '.join(diagnostic_data.get('symptomes_utilises', []))}
+
+Fournis une explication en 2-3 phrases simples et rassurantes."""
+    
     def reformuler_diagnostic(self, diagnostic_data: dict) -> str:
         """
         Reformule un diagnostic en langage naturel
@@ -34,26 +99,46 @@ class AssistantIA:
         if not self.actif:
             return diagnostic_data.get('description', '')
         
+        debut = time.perf_counter()
         try:
-            prompt = f"""Tu es un mécanicien expert. Reformule ce diagnostic de manière claire et accessible.
-
-Diagnostic : {diagnostic_data.get('diagnostic')}
-Description technique : {diagnostic_data.get('description')}
-Gravité : {diagnostic_data.get('gravite')}
-Symptômes : {', '.join(diagnostic_data.get('symptomes_utilises', []))}
-
-Fournis une explication en 2-3 phrases simples et rassurantes."""
-
             response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': 0.7,
-                    'max_output_tokens': 200,
-                }
+                self._construire_prompt(diagnostic_data),
+                generation_config=GENERATION_CONFIG,
+                request_options=self.options_requete
             )
+            texte = response.text.strip()
             
-            return response.text.strip()
+        except Exception as e:
+            self._compter(debut, e)
+            print(f"[IA] Erreur reformulation: {e}")
+            return diagnostic_data.get('description', '')
+        
+        self._compter(debut)
+        return texte
+    
+    async def reformuler_diagnostic_async(self, diagnostic_data: dict) -> str:
+        """
+        Reformule un diagnostic sans bloquer la boucle d'événements
+        
+        Même contrat que reformuler_diagnostic ; l'appel Gemini passe par le
+        client asynchrone du SDK.
+        """
+        if not self.actif:
+            return diagnostic_data.get('description', '')
+        
+        debut = time.perf_counter()
+        try:
+            response = await self.model.generate_content_async(
+                self._construire_prompt(diagnostic_data),
+                generation_config=GENERATION_CONFIG,
+                request_options=self.options_requete
+            )
+            texte = response.text.strip()
             
         except Exception as e:
+            self._compter(debut, e)
             print(f"[IA] Erreur reformulation: {e}")
             return diagnostic_data.get('description', '')
+        
+        self._compter(debut)
+        return texte
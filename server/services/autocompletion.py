@@ -0,0 +1,189 @@
+"""Autocomplétion des symptômes tolérante aux fautes de frappe"""
+from typing import List, Dict, Set, Optional
+from utils.texte import decouper_mots, normaliser_texte, MOTS_VIDES
+
+
+def distance_edition(a: str, b: str, maximum: int) -> int:
+    """
+    Distance de Damerau-Levenshtein restreinte (transpositions adjacentes)
+
+    Returns:
+        La distance, ou maximum + 1 si elle dépasse maximum
+    """
+    if abs(len(a) - len(b)) > maximum:
+        return maximum + 1
+    precedente2: List[int] = []
+    precedente = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        courante = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cout = 0 if a[i - 1] == b[j - 1] else 1
+            courante[j] = min(precedente[j] + 1, courante[j - 1] + 1, precedente[j - 1] + cout)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                courante[j] = min(courante[j], precedente2[j - 2] + 1)
+        if min(courante) > maximum:
+            return maximum + 1
+        precedente2, precedente = precedente, courante
+    return precedente[-1]
+
+
+def distance_maximale(terme: str) -> int:
+    """Nombre de fautes tolérées selon la longueur du terme saisi"""
+    if len(terme) < 3:
+        return 0
+    if len(terme) < 6:
+        return 1
+    return 2
+
+
+class _NoeudTrie:
+    __slots__ = ('enfants', 'symptomes')
+
+    def __init__(self):
+        self.enfants: Dict[str, '_NoeudTrie'] = {}
+        self.symptomes: Set[int] = set()
+
+
+class Autocompletion:
+    """
+    Suggestions de symptômes à chaque frappe, sans inférence de modèle
+
+    Chaque mot du nom (et des alias) d'un symptôme est inséré dans un trie
+    de préfixes. Quand un terme saisi ne correspond à aucun préfixe, un
+    index de suppressions à la SymSpell retrouve les préfixes proches à une
+    ou deux fautes près.
+    """
+
+    LONGUEUR_MIN_PREFIXE = 3
+
+    def __init__(self, symptomes: List[Dict]):
+        """
+        Args:
+            symptomes: Liste des symptômes avec id, nom, categorie, poids et alias
+        """
+        self._symptomes = [
+            {'id': s['id'], 'nom': s['nom'], 'categorie': s.get('categorie')}
+            for s in symptomes
+        ]
+        self._poids = [s.get('poids', 1.0) for s in symptomes]
+        self._libelles = [
+            [normaliser_texte(l) for l in [s['nom']] + list(s.get('alias') or [])]
+            for s in symptomes
+        ]
+
+        self._racine = _NoeudTrie()
+        # Préfixe -> symptômes, puis suppression -> préfixes (SymSpell)
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._suppressions: Dict[str, Set[str]] = {}
+
+        for i, symptome in enumerate(symptomes):
+            for libelle in [symptome['nom']] + list(symptome.get('alias') or []):
+                for mot in decouper_mots(libelle):
+                    self._inserer(mot, i)
+
+        for prefixe in self._prefixes:
+            for suppression in self._generer_suppressions(prefixe, distance_maximale(prefixe)):
+                self._suppressions.setdefault(suppression, set()).add(prefixe)
+
+    def _inserer(self, mot: str, index: int) -> None:
+        """Ajoute un mot au trie et ses préfixes à l'index SymSpell"""
+        noeud = self._racine
+        for position, caractere in enumerate(mot, start=1):
+            noeud = noeud.enfants.setdefault(caractere, _NoeudTrie())
+            noeud.symptomes.add(index)
+            if position >= self.LONGUEUR_MIN_PREFIXE:
+                self._prefixes.setdefault(mot[:position], set()).add(index)
+
+    @staticmethod
+    def _generer_suppressions(terme: str, distance: int) -> Set[str]:
+        """Toutes les variantes du terme privées d'au plus `distance` caractères"""
+        resultat = {terme}
+        frontiere = {terme}
+        for _ in range(distance):
+            suivante = set()
+            for variante in frontiere:
+                for i in range(len(variante)):
+                    suivante.add(variante[:i] + variante[i + 1:])
+            resultat |= suivante
+            frontiere = suivante
+        return resultat
+
+    def _chercher_prefixe(self, terme: str) -> Optional[Set[int]]:
+        """Symptômes dont un mot commence exactement par le terme"""
+        noeud = self._racine
+        for caractere in terme:
+            suivant = noeud.enfants.get(caractere)
+            if suivant is None:
+                return None
+            noeud = suivant
+        return noeud.symptomes
+
+    def _chercher_approche(self, terme: str) -> Dict[int, int]:
+        """
+        Symptômes dont un préfixe de mot est proche du terme
+
+        Returns:
+            Index du symptôme -> plus petite distance trouvée
+        """
+        maximum = distance_maximale(terme)
+        if maximum == 0:
+            return {}
+
+        distances: Dict[int, int] = {}
+        candidats: Set[str] = set()
+        for suppression in self._generer_suppressions(terme, maximum):
+            candidats |= self._suppressions.get(suppression, set())
+
+        for prefixe in candidats:
+            distance = distance_edition(terme, prefixe, maximum)
+            if distance <= maximum:
+                for index in self._prefixes[prefixe]:
+                    if distance < distances.get(index, maximum + 1):
+                        distances[index] = distance
+        return distances
+
+    def suggerer(self, texte: str, limite: int = 8) -> List[Dict]:
+        """
+        Propose des symptômes pour un texte en cours de saisie
+
+        Tous les termes saisis doivent correspondre (préfixe exact ou
+        approché) à un mot du symptôme ; le dernier terme est traité comme
+        un préfixe incomplet.
+
+        Args:
+            texte: Saisie de l'utilisateur
+            limite: Nombre maximum de suggestions
+
+        Returns:
+            Liste de symptômes (id, nom, categorie)
+        """
+        termes = decouper_mots(texte)
+        significatifs = [t for t in termes if t not in MOTS_VIDES]
+        termes = significatifs or termes
+        if not termes:
+            return []
+
+        candidats: Optional[Dict[int, int]] = None
+        for terme in termes:
+            exacts = self._chercher_prefixe(terme)
+            correspondances = {i: 0 for i in exacts} if exacts else self._chercher_approche(terme)
+
+            if candidats is None:
+                candidats = correspondances
+            else:
+                candidats = {
+                    i: candidats[i] + correspondances[i]
+                    for i in candidats.keys() & correspondances.keys()
+                }
+            if not candidats:
+                return []
+
+        assert candidats is not None
+        requete = normaliser_texte(texte).strip()
+
+        def cle(index: int):
+            commence = any(l.startswith(requete) for l in self._libelles[index])
+            return (candidats[index], not commence, -self._poids[index], len(self._symptomes[index]['nom']))
+
+        meilleurs = sorted(candidats, key=cle)[:limite]
+        return [dict(self._symptomes[i]) for i in meilleurs]
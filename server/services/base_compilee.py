@@ -0,0 +1,501 @@
+"""Base de connaissances compilée en un fichier binaire projeté en mémoire
+
+Le fichier regroupe les symptômes, les règles, les matrices du moteur et
+les embeddings sous forme de tableaux NumPy alignés, plus une table de
+chaînes compacte. Le chargement se fait par mmap en lecture seule : aucun
+JSON n'est analysé, les pages sont partagées entre tous les processus qui
+ouvrent le même fichier, et les objets Symptome/Diagnostic ne sont
+construits qu'à la demande.
+
+Format (petit-boutiste) :
+    en-tête    : magic, version, nombre de sections, empreinte, modèle
+    sections   : nom, dtype, dimensions, position, taille
+    données    : tableaux alignés sur 64 octets
+"""
+import hashlib
+import json
+import mmap
+import struct
+from typing import Dict, List, Iterator, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from models import Symptome, Diagnostic
+from services.matrice_regles import MatriceRegles
+from services.reduction import MatriceEmbeddings, ReductionEmbeddings
+from services.similarite_symptomes import SimilariteSymptomes
+from services.catalogue import IndexCategories
+from services.applicabilite import IndexApplicabilite, CHAMPS_VALEURS, CHAMPS_PLAGES, BORNE_MIN, BORNE_MAX
+
+MAGIC = b'DIAGKB\x00\x00'
+# À incrémenter dès que la disposition change, y compris à l'ajout d'une
+# section : une base d'une autre version est ignorée (repli sur les fichiers
+# JSON) plutôt que lue avec des sections manquantes. Seules les sections qui
+# dépendent des options de compilation (embeddings, réduction, similarité)
+# peuvent manquer, et chaque lecteur doit alors s'en passer.
+#   1 : symptômes, règles, matrices et embeddings
+#   2 : catégories, embeddings réduits, similarité, applicabilité, embeddings des diagnostics
+VERSION_FORMAT = 2
+ALIGNEMENT = 64
+
+_ENTETE = struct.Struct('<8sII32s64s')
+_SECTION = struct.Struct('<24s8sIQQQQ')
+
+
+class ErreurBaseCompilee(Exception):
+    """Fichier absent, corrompu ou d'une version de format différente"""
+
+
+def empreinte_sources(*chemins: str) -> str:
+    """Empreinte des fichiers JSON sources (version de la base de connaissances)"""
+    hachage = hashlib.sha256()
+    for chemin in chemins:
+        with open(chemin, 'rb') as f:
+            hachage.update(f.read())
+    return hachage.hexdigest()[:32]
+
+
+# --- Compilation -------------------------------------------------------------
+
+class _TableChainesEcriture:
+    """Accumule des chaînes uniques et produit la table binaire"""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._chaines: List[bytes] = []
+
+    def ajouter(self, texte: Optional[str]) -> int:
+        if texte is None:
+            return -1
+        if texte not in self._index:
+            self._index[texte] = len(self._chaines)
+            self._chaines.append(texte.encode('utf-8'))
+        return self._index[texte]
+
+    def tableaux(self) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.zeros(len(self._chaines) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in self._chaines], out=positions[1:])
+        donnees = np.frombuffer(b''.join(self._chaines), dtype=np.uint8)
+        return positions, donnees
+
+
+def _listes_indexees(listes: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode une liste de listes en (positions, valeurs) façon CSR"""
+    positions = np.zeros(len(listes) + 1, dtype=np.int64)
+    np.cumsum([len(l) for l in listes], out=positions[1:])
+    valeurs = np.array([v for l in listes for v in l], dtype=np.int32)
+    return positions, valeurs
+
+
+def compiler_base(
+    chemin_sortie: str,
+    symptomes_file: str,
+    regles_file: str,
+    vecteurs: Optional[MatriceEmbeddings] = None,
+    modele: str = '',
+    reduction: Optional[ReductionEmbeddings] = None,
+    seuil_similarite: Optional[float] = None,
+    max_voisins: int = 8,
+    vecteurs_diagnostics: Optional[MatriceEmbeddings] = None
+) -> None:
+    """
+    Compile les fichiers JSON (et les embeddings) en une base binaire
+
+    Args:
+        chemin_sortie: Fichier à produire
+        symptomes_file: Chemin de symptomes.json
+        regles_file: Chemin de regles.json
+        vecteurs: Embeddings normalisés des symptômes (dans l'ordre du
+            fichier), éventuellement réduits et quantifiés, optionnels
+        modele: Nom du modèle qui a produit les embeddings
+        reduction: Projection des requêtes si les embeddings sont réduits
+        seuil_similarite: Seuil des paires de symptômes proches compilées
+            avec les embeddings (None = pas de similarité compilée)
+        max_voisins: Symptômes proches gardés au plus par symptôme
+        vecteurs_diagnostics: Embeddings des diagnostics (dans l'ordre des
+            règles), même projection que ceux des symptômes
+    """
+    with open(symptomes_file, 'r', encoding='utf-8') as f:
+        symptomes = [Symptome.from_dict(d) for d in json.load(f)]
+    with open(regles_file, 'r', encoding='utf-8') as f:
+        diagnostics = [Diagnostic.from_dict(d) for d in json.load(f)]
+
+    matrice = MatriceRegles(diagnostics, {s.id: s.poids for s in symptomes})
+    chaines = _TableChainesEcriture()
+
+    # Colonnes de la matrice : symptômes du catalogue d'abord (même ordre)
+    colonnes = np.array([chaines.ajouter(sid) for sid in matrice.ids_symptomes], dtype=np.int32)
+    tri_colonnes = np.array(
+        sorted(range(len(colonnes)), key=lambda i: matrice.ids_symptomes[i].encode('utf-8')),
+        dtype=np.int32
+    )
+
+    sections: Dict[str, np.ndarray] = {
+        'colonnes': colonnes,
+        'colonnes_tri': tri_colonnes,
+        'sym_nom': np.array([chaines.ajouter(s.nom) for s in symptomes], dtype=np.int32),
+        'sym_description': np.array([chaines.ajouter(s.description) for s in symptomes], dtype=np.int32),
+        'sym_categorie': np.array([chaines.ajouter(s.categorie) for s in symptomes], dtype=np.int32),
+        'sym_poids': np.array([s.poids for s in symptomes], dtype=np.float64),
+        'diag_id': np.array([chaines.ajouter(d.id) for d in diagnostics], dtype=np.int32),
+        'diag_nom': np.array([chaines.ajouter(d.nom) for d in diagnostics], dtype=np.int32),
+        'diag_description': np.array([chaines.ajouter(d.description) for d in diagnostics], dtype=np.int32),
+        'diag_gravite': np.array([chaines.ajouter(d.gravite) for d in diagnostics], dtype=np.int32),
+        'diag_conseils': np.array([chaines.ajouter(d.conseils) for d in diagnostics], dtype=np.int32),
+        'diag_couts': np.array([[d.cout_min, d.cout_max] for d in diagnostics], dtype=np.int64).reshape(-1, 2),
+    }
+    for nom in MatriceRegles.TABLEAUX:
+        sections[f'mat_{nom}'] = getattr(matrice, nom)
+    sections['sym_alias_pos'], sections['sym_alias'] = _listes_indexees(
+        [[chaines.ajouter(a) for a in s.alias or []] for s in symptomes])
+    sections['diag_requis_pos'], sections['diag_requis'] = _listes_indexees(
+        [[matrice.index_symptomes[sid] for sid in d.symptomes_requis] for d in diagnostics])
+    sections['diag_optionnels_pos'], sections['diag_optionnels'] = _listes_indexees(
+        [[matrice.index_symptomes[sid] for sid in d.symptomes_optionnels or []] for d in diagnostics])
+
+    # Applicabilité : champs des règles (bornes absentes = extrêmes int64) et index précalculé
+    sections['diag_carburants_pos'], sections['diag_carburants'] = _listes_indexees(
+        [[chaines.ajouter(c) for c in d.carburants or []] for d in diagnostics])
+    sections['diag_marques_pos'], sections['diag_marques'] = _listes_indexees(
+        [[chaines.ajouter(m) for m in d.marques or []] for d in diagnostics])
+    sections['diag_annees'] = np.array(
+        [[_borne(d.annee_min, BORNE_MIN), _borne(d.annee_max, BORNE_MAX)] for d in diagnostics],
+        dtype=np.int64).reshape(-1, 2)
+    sections['diag_kilometrages'] = np.array(
+        [[_borne(d.kilometrage_min, BORNE_MIN), _borne(d.kilometrage_max, BORNE_MAX)] for d in diagnostics],
+        dtype=np.int64).reshape(-1, 2)
+    applicabilite = IndexApplicabilite.depuis_regles(diagnostics)
+    for champ, (cles, bits) in applicabilite.valeurs.items():
+        sections[f'app_{champ}_cles'] = np.array([chaines.ajouter(c) for c in cles], dtype=np.int32)
+        sections[f'app_{champ}_bits'] = bits
+    for champ, (bornes, bits) in applicabilite.plages.items():
+        sections[f'app_{champ}_bornes'] = bornes
+        sections[f'app_{champ}_bits'] = bits
+
+    if vecteurs is not None:
+        sections['vecteurs'] = vecteurs.valeurs
+        if vecteurs.echelles is not None:
+            sections['vecteurs_echelles'] = vecteurs.echelles
+        if reduction is not None:
+            sections['reduction'] = reduction.composantes
+        if vecteurs_diagnostics is not None:
+            if len(vecteurs_diagnostics) != len(diagnostics):
+                raise ValueError(f"{len(vecteurs_diagnostics)} embeddings pour {len(diagnostics)} diagnostics")
+            sections['diag_vecteurs'] = vecteurs_diagnostics.valeurs
+            if vecteurs_diagnostics.echelles is not None:
+                sections['diag_vecteurs_echelles'] = vecteurs_diagnostics.echelles
+        if seuil_similarite is not None:
+            similarite = SimilariteSymptomes.depuis_embeddings(
+                vecteurs, len(matrice.ids_symptomes), seuil_similarite, max_voisins)
+            for nom in SimilariteSymptomes.TABLEAUX:
+                sections[f'sim_{nom}'] = getattr(similarite, nom)
+            sections['sim_seuil'] = np.array([seuil_similarite], dtype=np.float64)
+
+    sections['chaines_pos'], sections['chaines'] = chaines.tableaux()
+
+    _ecrire(chemin_sortie, sections, empreinte_sources(symptomes_file, regles_file), modele)
+    print(f"[Base] {len(symptomes)} symptômes et {len(diagnostics)} règles compilés dans {chemin_sortie}")
+
+
+def _borne(valeur: Optional[int], absente: int) -> int:
+    return absente if valeur is None else valeur
+
+
+def _ecrire(chemin: str, sections: Dict[str, np.ndarray], empreinte: str, modele: str) -> None:
+    """Écrit l'en-tête, la table des sections et les tableaux alignés"""
+    position = _ENTETE.size + _SECTION.size * len(sections)
+    entrees = []
+    for nom, tableau in sections.items():
+        tableau = np.ascontiguousarray(tableau)
+        position = -(-position // ALIGNEMENT) * ALIGNEMENT
+        forme = tableau.shape + (0,) * (2 - tableau.ndim)
+        entrees.append((nom, tableau, position, forme))
+        position += tableau.nbytes
+
+    with open(chemin, 'wb') as f:
+        f.write(_ENTETE.pack(MAGIC, VERSION_FORMAT, len(sections),
+                             empreinte.encode('ascii'), modele.encode('utf-8')))
+        for nom, tableau, position, forme in entrees:
+            f.write(_SECTION.pack(nom.encode('ascii'), tableau.dtype.str.encode('ascii'),
+                                  tableau.ndim, forme[0], forme[1], position, tableau.nbytes))
+        for _, tableau, position, _ in entrees:
+            f.write(b'\x00' * (position - f.tell()))
+            f.write(tableau.tobytes())
+
+
+# --- Chargement ----------------------------------------------------------------
+
+class TableChaines(Sequence[Optional[str]]):
+    """Accès aux chaînes par index, décodées à la demande"""
+
+    def __init__(self, positions: np.ndarray, donnees: np.ndarray, indices: np.ndarray):
+        self._positions = positions
+        self._donnees = donnees
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return chaine(self._positions, self._donnees, int(self._indices[i]))
+
+
+def chaine(positions: np.ndarray, donnees: np.ndarray, index: int) -> Optional[str]:
+    """Décode la chaîne d'index donné (-1 pour None)"""
+    if index < 0:
+        return None
+    return bytes(donnees[positions[index]:positions[index + 1]]).decode('utf-8')
+
+
+class IndexChaines(Mapping[str, int]):
+    """Position d'un identifiant par recherche dichotomique sur un tri précalculé"""
+
+    def __init__(self, identifiants: TableChaines, tri: np.ndarray):
+        self._identifiants = identifiants
+        self._tri = tri
+
+    def get(self, cle, defaut=None):  # type: ignore[override]
+        cle_octets = cle.encode('utf-8') if isinstance(cle, str) else None
+        if cle_octets is None:
+            return defaut
+        # Dichotomie écrite à la main : bisect n'accepte key= qu'à partir de Python 3.10
+        bas, haut = 0, len(self._tri)
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._identifiants[int(self._tri[milieu])].encode('utf-8') < cle_octets:  # type: ignore[union-attr]
+                bas = milieu + 1
+            else:
+                haut = milieu
+        rang = bas
+        if rang < len(self._tri):
+            position = int(self._tri[rang])
+            if self._identifiants[position] == cle:
+                return position
+        return defaut
+
+    def __getitem__(self, cle: str) -> int:
+        position = self.get(cle)
+        if position is None:
+            raise KeyError(cle)
+        return position
+
+    def __contains__(self, cle) -> bool:
+        return self.get(cle) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (i for i in self._identifiants)  # type: ignore[misc]
+
+    def __len__(self) -> int:
+        return len(self._identifiants)
+
+
+class CatalogueSymptomes(Mapping[str, Symptome]):
+    """Symptômes de la base compilée, construits à la demande"""
+
+    def __init__(self, base: 'BaseCompilee'):
+        self._base = base
+        self._nb = len(base.section('sym_poids'))
+
+    def _construire(self, i: int) -> Symptome:
+        base = self._base
+        debut, fin = base.section('sym_alias_pos')[i:i + 2]
+        return Symptome(
+            id=base.chaine(int(base.section('colonnes')[i])),  # type: ignore[arg-type]
+            nom=base.chaine(int(base.section('sym_nom')[i])),  # type: ignore[arg-type]
+            description=base.chaine(int(base.section('sym_description')[i])),
+            categorie=base.chaine(int(base.section('sym_categorie')[i])),
+            poids=float(base.section('sym_poids')[i]),
+            alias=[base.chaine(int(a)) for a in base.section('sym_alias')[debut:fin]],  # type: ignore[misc]
+        )
+
+    def __getitem__(self, cle: str) -> Symptome:
+        position = self._base.index_colonnes.get(cle)
+        if position is None or position >= self._nb:
+            raise KeyError(cle)
+        return self._construire(position)
+
+    def __contains__(self, cle) -> bool:
+        position = self._base.index_colonnes.get(cle)
+        return position is not None and position < self._nb
+
+    def __iter__(self) -> Iterator[str]:
+        colonnes = self._base.ids_colonnes
+        return (colonnes[i] for i in range(self._nb))  # type: ignore[misc]
+
+    def __len__(self) -> int:
+        return self._nb
+
+    def values(self):  # type: ignore[override]
+        return [self._construire(i) for i in range(self._nb)]
+
+
+class ListeDiagnostics(Sequence[Diagnostic]):
+    """Règles de la base compilée, construites à la demande"""
+
+    def __init__(self, base: 'BaseCompilee'):
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self._base.section('diag_id'))
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        base = self._base
+        colonnes = base.ids_colonnes
+
+        def liste(nom: str) -> List[str]:
+            debut, fin = base.section(f'{nom}_pos')[i:i + 2]
+            return [colonnes[int(c)] for c in base.section(nom)[debut:fin]]  # type: ignore[misc]
+
+        def chaines(nom: str) -> List[str]:
+            debut, fin = base.section(f'{nom}_pos')[i:i + 2]
+            return [base.chaine(int(c)) for c in base.section(nom)[debut:fin]]  # type: ignore[misc]
+
+        def bornes(nom: str) -> List[Optional[int]]:
+            minimum, maximum = (int(b) for b in base.section(nom)[i])
+            return [None if minimum == BORNE_MIN else minimum, None if maximum == BORNE_MAX else maximum]
+
+        cout_min, cout_max = base.section('diag_couts')[i]
+        annee_min, annee_max = bornes('diag_annees')
+        kilometrage_min, kilometrage_max = bornes('diag_kilometrages')
+        return Diagnostic(
+            id=base.chaine(int(base.section('diag_id')[i])),  # type: ignore[arg-type]
+            nom=base.chaine(int(base.section('diag_nom')[i])),  # type: ignore[arg-type]
+            description=base.chaine(int(base.section('diag_description')[i])),  # type: ignore[arg-type]
+            gravite=base.chaine(int(base.section('diag_gravite')[i])),  # type: ignore[arg-type]
+            cout_min=int(cout_min),
+            cout_max=int(cout_max),
+            symptomes_requis=liste('diag_requis'),
+            symptomes_optionnels=liste('diag_optionnels'),
+            conseils=base.chaine(int(base.section('diag_conseils')[i])),
+            carburants=chaines('diag_carburants'),
+            marques=chaines('diag_marques'),
+            annee_min=annee_min,
+            annee_max=annee_max,
+            kilometrage_min=kilometrage_min,
+            kilometrage_max=kilometrage_max,
+        )
+
+
+class BaseCompilee:
+    """Base de connaissances projetée en mémoire (lecture seule)"""
+
+    def __init__(self, chemin: str):
+        """
+        Args:
+            chemin: Fichier produit par compiler_base
+
+        Raises:
+            ErreurBaseCompilee: Fichier illisible ou de format incompatible
+        """
+        try:
+            with open(chemin, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise ErreurBaseCompilee(f"Impossible d'ouvrir {chemin}: {e}")
+
+        if len(self._mmap) < _ENTETE.size:
+            raise ErreurBaseCompilee(f"{chemin}: fichier tronqué")
+        magic, version, nb_sections, empreinte, modele = _ENTETE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ErreurBaseCompilee(f"{chemin}: ce n'est pas une base compilée")
+        if version != VERSION_FORMAT:
+            raise ErreurBaseCompilee(f"{chemin}: format v{version}, v{VERSION_FORMAT} attendu")
+
+        self.chemin = chemin
+        self.empreinte = empreinte.decode('ascii')
+        self.modele = modele.rstrip(b'\x00').decode('utf-8')
+
+        self._sections: Dict[str, np.ndarray] = {}
+        for n in range(nb_sections):
+            nom, dtype, ndim, dim0, dim1, position, taille = _SECTION.unpack_from(
+                self._mmap, _ENTETE.size + n * _SECTION.size)
+            if position + taille > len(self._mmap):
+                raise ErreurBaseCompilee(f"{chemin}: section hors du fichier")
+            forme = (dim0, dim1)[:ndim]
+            tableau = np.frombuffer(self._mmap, dtype=np.dtype(dtype.rstrip(b'\x00').decode('ascii')),
+                                    count=int(np.prod(forme)), offset=position)
+            self._sections[nom.rstrip(b'\x00').decode('ascii')] = tableau.reshape(forme)
+
+        self.ids_colonnes = TableChaines(
+            self.section('chaines_pos'), self.section('chaines'), self.section('colonnes'))
+        self.index_colonnes = IndexChaines(self.ids_colonnes, self.section('colonnes_tri'))
+        self.symptomes = CatalogueSymptomes(self)
+        self.diagnostics = ListeDiagnostics(self)
+
+    @property
+    def taille(self) -> int:
+        """Octets projetés en mémoire (pages partagées entre les workers)"""
+        return len(self._mmap)
+
+    def section(self, nom: str) -> np.ndarray:
+        """Tableau en lecture seule d'une section"""
+        return self._sections[nom]
+
+    def chaine(self, index: int) -> Optional[str]:
+        """Chaîne de la table par son index"""
+        return chaine(self.section('chaines_pos'), self.section('chaines'), index)
+
+    @property
+    def vecteurs(self) -> Optional[MatriceEmbeddings]:
+        """Embeddings normalisés des symptômes, s'ils ont été compilés"""
+        if 'vecteurs' not in self._sections:
+            return None
+        return MatriceEmbeddings(self._sections['vecteurs'], self._sections.get('vecteurs_echelles'))
+    
+    @property
+    def vecteurs_diagnostics(self) -> Optional[MatriceEmbeddings]:
+        """Embeddings normalisés des diagnostics, s'ils ont été compilés"""
+        if 'diag_vecteurs' not in self._sections:
+            return None
+        return MatriceEmbeddings(self._sections['diag_vecteurs'], self._sections.get('diag_vecteurs_echelles'))
+
+    @property
+    def ids_diagnostics(self) -> List[str]:
+        """ID de chaque règle, sans construire les diagnostics"""
+        return [self.chaine(int(i)) for i in self.section('diag_id')]  # type: ignore[misc]
+
+    @property
+    def reduction(self) -> Optional[ReductionEmbeddings]:
+        """Projection des requêtes, si les embeddings ont été réduits"""
+        if 'reduction' not in self._sections:
+            return None
+        return ReductionEmbeddings(self._sections['reduction'])
+
+    @property
+    def similarite_symptomes(self) -> Optional[SimilariteSymptomes]:
+        """Symptômes proches, compilés avec les embeddings"""
+        if 'sim_seuil' not in self._sections:
+            return None
+        return SimilariteSymptomes.depuis_tableaux(
+            {nom: self.section(f'sim_{nom}') for nom in SimilariteSymptomes.TABLEAUX},
+            float(self.section('sim_seuil')[0]))
+
+    def index_categories(self) -> IndexCategories:
+        """Symptômes par catégorie, groupés sur les codes de la table de chaînes"""
+        return IndexCategories(self.section('sym_categorie'), self.chaine)
+
+    def index_applicabilite(self) -> IndexApplicabilite:
+        """Index d'applicabilité compilé : seules les valeurs indexées sont décodées"""
+        valeurs, plages = {}, {}
+        for champ in CHAMPS_VALEURS:
+            if f'app_{champ}_cles' in self._sections:
+                cles = [self.chaine(int(c)) for c in self.section(f'app_{champ}_cles')]
+                valeurs[champ] = (cles, self.section(f'app_{champ}_bits'))
+        for champ in CHAMPS_PLAGES:
+            if f'app_{champ}_bornes' in self._sections:
+                plages[champ] = (self.section(f'app_{champ}_bornes'), self.section(f'app_{champ}_bits'))
+        return IndexApplicabilite(len(self.diagnostics), valeurs, plages)  # type: ignore[arg-type]
+
+    def matrice_regles(self) -> MatriceRegles:
+        """Matrice des règles construite directement sur les tableaux projetés"""
+        return MatriceRegles.depuis_tableaux(
+            self.ids_colonnes,
+            self.index_colonnes,
+            {nom: self.section(f'mat_{nom}') for nom in MatriceRegles.TABLEAUX},
+        )
@@ -0,0 +1,100 @@
+"""Index des symptômes par catégorie et pagination du catalogue"""
+import base64
+import binascii
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def encoder_curseur(position: int) -> str:
+    """Curseur opaque : position du dernier symptôme renvoyé"""
+    return base64.urlsafe_b64encode(str(position).encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decoder_curseur(curseur: str) -> int:
+    """
+    Position encodée dans un curseur
+
+    Raises:
+        ValueError: Curseur illisible
+    """
+    try:
+        position = int(base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)).decode('ascii'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Curseur invalide")
+    if position < 0:
+        raise ValueError("Curseur invalide")
+    return position
+
+
+class IndexCategories:
+    """
+    Positions des symptômes de chaque catégorie, dans l'ordre du catalogue
+
+    Calculé une fois au chargement : une page se lit par recherche
+    dichotomique dans les positions de la catégorie, sans parcourir ni
+    construire le reste du catalogue.
+    """
+
+    def __init__(self, codes: np.ndarray, libelle: Callable[[int], Optional[str]]):
+        """
+        Args:
+            codes: Code de catégorie de chaque symptôme (même code = même catégorie)
+            libelle: Nom de la catégorie d'un code (None = sans catégorie)
+        """
+        codes = np.asarray(codes)
+        self.nb_symptomes = len(codes)
+        self._toutes = np.arange(self.nb_symptomes, dtype=np.int64)
+        self._positions: Dict[Optional[str], np.ndarray] = {}
+
+        # Catégories dans l'ordre de première apparition
+        uniques, premieres, inverses = np.unique(codes, return_index=True, return_inverse=True)
+        ordre = np.argsort(premieres, kind='stable')
+        membres = np.argsort(inverses, kind='stable')
+        bornes = np.concatenate(([0], np.cumsum(np.bincount(inverses, minlength=len(uniques)))))
+        for k in ordre:
+            self._positions[libelle(int(uniques[k]))] = membres[bornes[k]:bornes[k + 1]]
+
+        self.facettes: List[Dict] = [
+            {'categorie': categorie, 'total': len(positions)}
+            for categorie, positions in self._positions.items()
+        ]
+
+    @classmethod
+    def depuis_categories(cls, categories: Sequence[Optional[str]]) -> 'IndexCategories':
+        """Index construit depuis la catégorie de chaque symptôme"""
+        codes: Dict[Optional[str], int] = {}
+        valeurs = np.array([codes.setdefault(c, len(codes)) for c in categories], dtype=np.int64)
+        libelles = list(codes)
+        return cls(valeurs, lambda code: libelles[code])
+
+    def page(
+        self,
+        categorie: Optional[str] = None,
+        limite: Optional[int] = 100,
+        apres: Optional[int] = None,
+        sans_categorie: bool = False
+    ) -> Tuple[np.ndarray, Optional[int], int]:
+        """
+        Positions d'une page du catalogue
+
+        Args:
+            categorie: Catégorie à parcourir (None = tout le catalogue)
+            limite: Taille de la page (None = jusqu'à la fin de la sélection)
+            apres: Position du dernier symptôme de la page précédente
+            sans_categorie: Parcourir les symptômes sans catégorie (categorie ignorée)
+
+        Returns:
+            (positions de la page, position à reprendre ou None, total de la sélection)
+        """
+        if sans_categorie:
+            positions = self._positions.get(None)
+        else:
+            positions = self._toutes if categorie is None else self._positions.get(categorie)
+        if positions is None:
+            return self._toutes[:0], None, 0
+
+        debut = 0 if apres is None else int(np.searchsorted(positions, apres, side='right'))
+        fin = len(positions) if limite is None else debut + limite
+        selection = positions[debut:fin]
+        suivante = int(selection[-1]) if fin < len(positions) and len(selection) else None
+        return selection, suivante, len(positions)
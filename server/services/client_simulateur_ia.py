@@ -0,0 +1,122 @@
+"""Client HTTP du simulateur Gemini local (tests/simulateur_gemini.py)"""
+import asyncio
+import http.client
+import json
+import socket
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class ReponseSimulee:
+    """Réponse au format du SDK : seul `text` est utilisé par AssistantIA"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ClientSimulateurIA:
+    """
+    Remplace GenerativeModel pour parler au simulateur
+
+    Même interface que le SDK (generate_content, generate_content_async,
+    request_options={'timeout': s}). Le délai couvre l'appel entier, y compris
+    une réponse envoyée en plusieurs morceaux ; son dépassement lève
+    TimeoutError.
+    """
+
+    def __init__(self, url: str, modele: str, timeout: float = 10.0):
+        morceaux = urlsplit(url)
+        self._hote = morceaux.hostname or '127.0.0.1'
+        self._port = morceaux.port or 80
+        self._chemin = f"{morceaux.path.rstrip('/')}/v1beta/models/{modele}:generateContent"
+        self._timeout = timeout
+
+    def _corps(self, prompt: str, generation_config: Optional[Dict]) -> bytes:
+        """Requête REST generateContent (paramètres en camelCase)"""
+        config_rest = {
+            ''.join(m.capitalize() if i else m for i, m in enumerate(cle.split('_'))): valeur
+            for cle, valeur in (generation_config or {}).items()
+        }
+        return json.dumps({
+            'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+            'generationConfig': config_rest,
+        }).encode('utf-8')
+
+    def _delai(self, request_options: Optional[Dict]) -> float:
+        return float((request_options or {}).get('timeout', self._timeout))
+
+    @staticmethod
+    def _reponse(statut: int, corps: bytes) -> ReponseSimulee:
+        """
+        Texte d'une réponse generateContent
+
+        Raises:
+            RuntimeError: Erreur HTTP ou réponse sans texte
+        """
+        if statut != 200:
+            raise RuntimeError(f"Simulateur IA: HTTP {statut}")
+        try:
+            parties = json.loads(corps)['candidates'][0]['content']['parts']
+            return ReponseSimulee(''.join(p.get('text', '') for p in parties))
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise RuntimeError("Simulateur IA: réponse illisible")
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict] = None,
+                         request_options: Optional[Dict] = None) -> ReponseSimulee:
+        """Appel bloquant"""
+        delai = self._delai(request_options)
+        fin = time.monotonic() + delai
+        connexion = http.client.HTTPConnection(self._hote, self._port, timeout=delai)
+        try:
+            connexion.request('POST', self._chemin, body=self._corps(prompt, generation_config),
+                              headers={'Content-Type': 'application/json'})
+            # La réponse 'Connection: close' détache le socket de la connexion
+            sock = connexion.sock
+            reponse = connexion.getresponse()
+            corps = b''
+            while True:
+                reste = fin - time.monotonic()
+                if reste <= 0:
+                    raise socket.timeout()
+                sock.settimeout(reste)
+                morceau = reponse.read1(65536)
+                if not morceau:
+                    break
+                corps += morceau
+        except socket.timeout:
+            raise TimeoutError(f"Simulateur IA: pas de réponse en {delai:g}s")
+        finally:
+            connexion.close()
+        return self._reponse(reponse.status, corps)
+
+    async def _echanger(self, contenu: bytes) -> Tuple[int, bytes]:
+        lecteur, ecrivain = await asyncio.open_connection(self._hote, self._port)
+        try:
+            ecrivain.write(
+                f"POST {self._chemin} HTTP/1.1\r\nHost: {self._hote}:{self._port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(contenu)}\r\n"
+                "Connection: close\r\n\r\n".encode('ascii') + contenu
+            )
+            await ecrivain.drain()
+            # Le simulateur ferme la connexion après chaque réponse
+            donnees = await lecteur.read()
+        finally:
+            ecrivain.close()
+        tete, _, corps = donnees.partition(b'\r\n\r\n')
+        try:
+            statut = int(tete.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise RuntimeError("Simulateur IA: réponse illisible")
+        return statut, corps
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict] = None,
+                                     request_options: Optional[Dict] = None) -> ReponseSimulee:
+        """Appel asynchrone : n'occupe aucun thread pendant l'attente"""
+        delai = self._delai(request_options)
+        try:
+            statut, corps = await asyncio.wait_for(
+                self._echanger(self._corps(prompt, generation_config)), delai)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Simulateur IA: pas de réponse en {delai:g}s")
+        return self._reponse(statut, corps)
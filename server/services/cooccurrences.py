@@ -0,0 +1,279 @@
+"""Co-occurrences des symptômes et des diagnostics, tenues à jour à chaque diagnostic"""
+import itertools
+import sqlite3
+import threading
+from collections import Counter
+from typing import Container, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from services.historique import Cas
+from utils.memoire import taille_profonde
+
+
+class Compteurs:
+    """Comptes d'une base de connaissances (tenant) : creux, seules les paires vues existent"""
+
+    __slots__ = ('cas', 'symptomes', 'diagnostics', 'paires', 'symptomes_diagnostics')
+
+    def __init__(self):
+        self.cas = 0
+        self.symptomes: Counter = Counter()
+        self.diagnostics: Counter = Counter()
+        self.paires: Counter = Counter()  # (symptôme a, symptôme b), a < b
+        self.symptomes_diagnostics: Counter = Counter()  # (symptôme, id du diagnostic)
+
+    def ajouter(self, autres: 'Compteurs') -> None:
+        self.cas += autres.cas
+        for nom in self.__slots__[1:]:
+            getattr(self, nom).update(getattr(autres, nom))
+
+    def lignes(self, tenant: str) -> Iterable[Tuple[str, str, str, str, int]]:
+        """(tenant, type, clé a, clé b, n) : format de l'instantané"""
+        if self.cas:
+            yield tenant, 'cas', '', '', self.cas
+        for symptome, n in self.symptomes.items():
+            yield tenant, 'symptome', symptome, '', n
+        for diagnostic, n in self.diagnostics.items():
+            yield tenant, 'diagnostic', diagnostic, '', n
+        for (a, b), n in self.paires.items():
+            yield tenant, 'paire', a, b, n
+        for (symptome, diagnostic), n in self.symptomes_diagnostics.items():
+            yield tenant, 'symptome_diagnostic', symptome, diagnostic, n
+
+
+class CooccurrencesSymptomes:
+    """
+    Fréquences des symptômes, des diagnostics et de leurs co-occurrences
+
+    Chaque diagnostic rendu incrémente quelques compteurs creux (au plus une
+    dizaine de paires pour cinq symptômes), par tenant. Les comptes de ce
+    worker depuis le dernier instantané sont ajoutés périodiquement à une
+    base SQLite (somme, pas remplacement : plusieurs workers et redémarrages
+    cumulent dans le même fichier), dont les totaux sont relus à cette
+    occasion. Les statistiques servies sont ces totaux plus les comptes du
+    worker pas encore écrits. Sans fichier, les comptes restent en mémoire.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS compteurs (
+            tenant TEXT NOT NULL,
+            type TEXT NOT NULL,
+            cle_a TEXT NOT NULL,
+            cle_b TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (tenant, type, cle_a, cle_b)
+        )
+    """
+    AJOUT = """
+        INSERT INTO compteurs (tenant, type, cle_a, cle_b, n) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (tenant, type, cle_a, cle_b) DO UPDATE SET n = n + excluded.n
+    """
+    DELAI_VERROU = 10.0  # Attente maximale du verrou d'écriture d'un autre worker (s)
+
+    def __init__(self, chemin: str = '', intervalle: float = 60.0):
+        """
+        Args:
+            chemin: Fichier SQLite des instantanés (vide = en mémoire seulement)
+            intervalle: Secondes entre deux instantanés (0 = à l'arrêt seulement)
+        """
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self._verrou = threading.Lock()
+        self._verrou_instantane = threading.Lock()
+        self._totaux: Dict[str, Compteurs] = {}  # Dernier instantané relu (tous workers)
+        self._en_ecriture: Dict[str, Compteurs] = {}  # Comptes en cours d'ajout à l'instantané
+        self._ecarts: Dict[str, Compteurs] = {}  # Comptes du worker depuis l'instantané
+        self.compteurs = {'instantanes': 0, 'erreurs': 0}
+        self._arret = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if chemin:
+            connexion = self._connecter()
+            try:
+                with connexion:
+                    connexion.execute(self.SCHEMA)
+                self._totaux = self._relire(connexion)
+            finally:
+                connexion.close()
+            if intervalle > 0:
+                self._thread = threading.Thread(target=self._instantanes_periodiques, name='cooccurrences',
+                                                daemon=True)
+                self._thread.start()
+
+    def _connecter(self) -> sqlite3.Connection:
+        connexion = sqlite3.connect(self.chemin, timeout=self.DELAI_VERROU)
+        connexion.execute('PRAGMA journal_mode=WAL')
+        return connexion
+
+    def enregistrer(self, cas: Iterable[Cas], connus: Container[str], tenant: Optional[str] = None) -> None:
+        """
+        Compte les diagnostics réussis d'une requête, par identifiant de règle
+
+        Le diagnostic incertain (aucune règle retenue, pas d'id_diagnostic)
+        n'est pas compté : il ne dit rien des règles à compléter.
+
+        Args:
+            cas: (symptômes, véhicule, réponse) de chaque diagnostic
+            connus: Symptômes du catalogue (les autres identifiants sont ignorés)
+            tenant: Base de connaissances utilisée (None = par défaut)
+        """
+        comptes = []
+        for symptomes, _, resultat in cas:
+            if resultat.get('succes') and resultat.get('id_diagnostic'):
+                comptes.append((sorted({s for s in symptomes if s in connus}), resultat['id_diagnostic']))
+        if not comptes:
+            return
+        with self._verrou:
+            compteurs = self._ecarts.get(tenant or '')
+            if compteurs is None:
+                compteurs = self._ecarts[tenant or ''] = Compteurs()
+            for symptomes, diagnostic in comptes:
+                compteurs.cas += 1
+                compteurs.diagnostics[diagnostic] += 1
+                compteurs.symptomes.update(symptomes)
+                compteurs.paires.update(itertools.combinations(symptomes, 2))
+                compteurs.symptomes_diagnostics.update((s, diagnostic) for s in symptomes)
+
+    @staticmethod
+    def _relire(connexion: sqlite3.Connection) -> Dict[str, Compteurs]:
+        """Totaux de l'instantané, par tenant"""
+        totaux: Dict[str, Compteurs] = {}
+        for tenant, type_, a, b, n in connexion.execute('SELECT tenant, type, cle_a, cle_b, n FROM compteurs'):
+            compteurs = totaux.get(tenant)
+            if compteurs is None:
+                compteurs = totaux[tenant] = Compteurs()
+            if type_ == 'cas':
+                compteurs.cas = n
+            elif type_ == 'symptome':
+                compteurs.symptomes[a] = n
+            elif type_ == 'diagnostic':
+                compteurs.diagnostics[a] = n
+            elif type_ == 'paire':
+                compteurs.paires[(a, b)] = n
+            elif type_ == 'symptome_diagnostic':
+                compteurs.symptomes_diagnostics[(a, b)] = n
+        return totaux
+
+    def instantane(self) -> bool:
+        """
+        Ajoute les comptes du worker à l'instantané et relit les totaux
+
+        Returns:
+            False si l'écriture a échoué (les comptes sont gardés pour la suivante)
+        """
+        if not self.chemin:
+            return False
+        with self._verrou_instantane:
+            with self._verrou:
+                self._en_ecriture, self._ecarts = self._ecarts, {}
+            try:
+                connexion = self._connecter()
+                try:
+                    with connexion:
+                        for tenant, compteurs in self._en_ecriture.items():
+                            connexion.executemany(self.AJOUT, compteurs.lignes(tenant))
+                    totaux = self._relire(connexion)
+                finally:
+                    connexion.close()
+            except sqlite3.Error as e:
+                print(f"[Cooccurrences] Instantané impossible: {e}")
+                with self._verrou:
+                    for tenant, compteurs in self._en_ecriture.items():
+                        self._ecarts.setdefault(tenant, Compteurs()).ajouter(compteurs)
+                    self._en_ecriture = {}
+                    self.compteurs['erreurs'] += 1
+                return False
+            with self._verrou:
+                self._totaux, self._en_ecriture = totaux, {}
+                self.compteurs['instantanes'] += 1
+            return True
+
+    def _instantanes_periodiques(self) -> None:
+        while not self._arret.wait(self.intervalle):
+            self.instantane()
+
+    def fermer(self) -> None:
+        """Arrête les instantanés périodiques et écrit les derniers comptes (arrêt du worker)"""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.instantane()
+
+    def _cumul(self, tenant: str) -> Compteurs:
+        """Totaux de l'instantané plus les comptes pas encore écrits"""
+        cumul = Compteurs()
+        with self._verrou:
+            for source in (self._totaux, self._en_ecriture, self._ecarts):
+                if tenant in source:
+                    cumul.ajouter(source[tenant])
+        return cumul
+
+    def resume(
+        self,
+        tenant: Optional[str] = None,
+        limite: int = 20,
+        symptomes_regles: Optional[Mapping[str, Set[str]]] = None,
+        noms_diagnostics: Optional[Mapping[str, str]] = None
+    ) -> Dict:
+        """
+        Comptes les plus fréquents d'un tenant
+
+        Args:
+            tenant: Base de connaissances (None = par défaut)
+            limite: Entrées par liste
+            symptomes_regles: Id du diagnostic -> symptômes de sa règle ; marque
+                les couples symptôme/diagnostic absents de la règle (règle à compléter)
+            noms_diagnostics: Id du diagnostic -> nom affiché (None si la règle
+                n'existe plus dans la base)
+
+        Returns:
+            Nombre de cas, symptômes, diagnostics, paires de symptômes (lift =
+            co-occurrence observée / attendue si indépendants) et couples
+            symptôme/diagnostic, par nombre d'occurrences décroissant
+        """
+        noms = noms_diagnostics or {}
+        cumul = self._cumul(tenant or '')
+        total = cumul.cas
+
+        def premiers(compteur: Counter) -> List[Tuple]:
+            return sorted(compteur.items(), key=lambda element: (-element[1], element[0]))[:limite]
+
+        def frequence(n: int) -> float:
+            return round(n / total, 4) if total else 0.0
+
+        couples = []
+        for (symptome, diagnostic), n in premiers(cumul.symptomes_diagnostics):
+            couple = {
+                'symptome': symptome,
+                'id': diagnostic,
+                'diagnostic': noms.get(diagnostic),
+                'occurrences': n,
+                'part_du_diagnostic': round(n / cumul.diagnostics[diagnostic], 4),
+            }
+            if symptomes_regles is not None:
+                couple['dans_regle'] = symptome in symptomes_regles.get(diagnostic, ())
+            couples.append(couple)
+
+        return {
+            'cas': total,
+            'symptomes': [{'id': s, 'occurrences': n, 'frequence': frequence(n)}
+                          for s, n in premiers(cumul.symptomes)],
+            'diagnostics': [{'id': d, 'diagnostic': noms.get(d), 'occurrences': n, 'frequence': frequence(n)}
+                            for d, n in premiers(cumul.diagnostics)],
+            'paires': [{'symptomes': [a, b], 'occurrences': n,
+                        'lift': round(n * total / (cumul.symptomes[a] * cumul.symptomes[b]), 2)}
+                       for (a, b), n in premiers(cumul.paires)],
+            'symptomes_diagnostics': couples,
+        }
+
+    def rapport_memoire(self, vus: Optional[Set[int]] = None) -> Dict[str, int]:
+        """Octets des totaux relus et des comptes pas encore écrits"""
+        vus = set() if vus is None else vus
+        with self._verrou:
+            return {
+                'totaux': taille_profonde(self._totaux, vus),
+                'ecarts': taille_profonde([self._en_ecriture, self._ecarts], vus),
+            }
+
+    def statistiques(self) -> Dict:
+        """Instantanés écrits et en échec"""
+        with self._verrou:
+            return {'fichier': bool(self.chemin), 'intervalle': self.intervalle, **self.compteurs}
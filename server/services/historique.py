@@ -0,0 +1,218 @@
+"""Historique des diagnostics rendus, écrit par lots en arrière-plan"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from models import Vehicule
+
+# Un cas : symptômes demandés, véhicule éventuel, réponse du moteur
+Cas = Tuple[Sequence[str], Optional[Vehicule], Dict[str, Any]]
+
+_FIN = None  # Dépôt qui arrête le thread d'écriture
+
+
+class HistoriqueDiagnostics:
+    """
+    Journal en ajout seul des diagnostics (analyses, audits de garantie)
+
+    Une requête ne fait que déposer ses cas dans une file bornée ; un thread
+    d'écriture la vide par lots (une transaction par lot) dans une base
+    SQLite en mode WAL, où les lectures d'audit ne bloquent pas l'écriture et
+    où plusieurs workers peuvent partager le même fichier. Si l'écriture
+    prend du retard et que la file est pleine, la requête attend au plus
+    `attente_max` secondes puis ses cas sont comptés comme perdus, plutôt que
+    de retarder la réponse. fermer() écrit ce qui reste en file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS diagnostics (
+            id INTEGER PRIMARY KEY,
+            horodatage REAL NOT NULL,
+            source TEXT NOT NULL,
+            tenant TEXT,
+            symptomes TEXT NOT NULL,
+            vehicule TEXT,
+            diagnostic TEXT,
+            gravite TEXT,
+            confiance TEXT,
+            score REAL
+        )
+    """
+    INSERTION = """
+        INSERT INTO diagnostics (horodatage, source, tenant, symptomes, vehicule,
+                                 diagnostic, gravite, confiance, score)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    DELAI_VERROU = 10.0  # Attente maximale du verrou d'écriture d'un autre worker (s)
+
+    def __init__(
+        self,
+        chemin: str,
+        taille_file: int = 10000,
+        taille_lot: int = 500,
+        intervalle: float = 1.0,
+        attente_max: float = 0.05
+    ):
+        """
+        Args:
+            chemin: Fichier SQLite (créé au besoin)
+            taille_file: Requêtes en attente d'écriture au plus
+            taille_lot: Cas écrits par transaction au plus
+            intervalle: Secondes pendant lesquelles un lot se remplit
+            attente_max: Attente d'une requête quand la file est pleine (s)
+        """
+        self.chemin = chemin
+        self.taille_lot = max(1, taille_lot)
+        self.intervalle = intervalle
+        self.attente_max = attente_max
+        self._file: 'queue.Queue[Optional[List[tuple]]]' = queue.Queue(maxsize=max(1, taille_file))
+        self._verrou = threading.Lock()
+        self._ferme = False
+        self.compteurs = {'enregistres': 0, 'perdus': 0, 'lots': 0, 'erreurs': 0}
+
+        # Ouverte ici pour qu'un chemin invalide échoue au démarrage ; seul le
+        # thread d'écriture s'en sert ensuite
+        self._connexion = sqlite3.connect(chemin, timeout=self.DELAI_VERROU, check_same_thread=False)
+        self._connexion.execute('PRAGMA journal_mode=WAL')
+        self._connexion.execute('PRAGMA synchronous=NORMAL')
+        self._connexion.execute(self.SCHEMA)
+        self._connexion.commit()
+
+        self._thread = threading.Thread(target=self._ecrire, name='historique', daemon=True)
+        self._thread.start()
+
+    def enregistrer(self, source: str, cas: Iterable[Cas], tenant: Optional[str] = None) -> bool:
+        """
+        Dépose les diagnostics réussis d'une requête, sans attendre l'écriture
+
+        Args:
+            source: Endpoint d'origine ('diagnostiquer', 'lot'...)
+            cas: (symptômes, véhicule, réponse) de chaque diagnostic
+            tenant: Base de connaissances utilisée (None = par défaut)
+
+        Returns:
+            False si les cas sont perdus (file pleine ou historique fermé)
+        """
+        horodatage = time.time()
+        lignes = [
+            (horodatage, source, tenant, list(symptomes), vehicule, resultat.get('diagnostic'),
+             resultat.get('gravite'), resultat.get('confiance'), resultat.get('score'))
+            for symptomes, vehicule, resultat in cas if resultat.get('succes')
+        ]
+        if not lignes:
+            return True
+        try:
+            if self._ferme:
+                raise queue.Full
+            self._file.put(lignes, timeout=self.attente_max)
+        except queue.Full:
+            with self._verrou:
+                self.compteurs['perdus'] += len(lignes)
+            return False
+        return True
+
+    @staticmethod
+    def _serialiser(ligne: tuple) -> tuple:
+        """Symptômes et véhicule en JSON (fait par le thread d'écriture)"""
+        horodatage, source, tenant, symptomes, vehicule, *resultat = ligne
+        vehicule = None if vehicule is None or vehicule.vide else json.dumps(vehicule.to_dict())
+        return (horodatage, source, tenant, json.dumps(symptomes, ensure_ascii=False), vehicule, *resultat)
+
+    def _ecrire_lot(self, lignes: List[tuple]) -> None:
+        """Une transaction pour tout le lot ; un lot en erreur est journalisé et abandonné"""
+        try:
+            with self._connexion:
+                self._connexion.executemany(self.INSERTION, [self._serialiser(ligne) for ligne in lignes])
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"[Historique] Écriture de {len(lignes)} cas impossible: {e}")
+            with self._verrou:
+                self.compteurs['erreurs'] += len(lignes)
+            return
+        with self._verrou:
+            self.compteurs['enregistres'] += len(lignes)
+            self.compteurs['lots'] += 1
+
+    def _ecrire(self) -> None:
+        """Thread d'écriture : un lot part quand il est plein ou que l'intervalle est écoulé"""
+        fin = False
+        while not fin:
+            depot = self._file.get()
+            if depot is _FIN:
+                break
+            lot = list(depot)
+            echeance = time.monotonic() + self.intervalle
+            while len(lot) < self.taille_lot:
+                restant = echeance - time.monotonic()
+                try:
+                    depot = self._file.get(timeout=restant) if restant > 0 else self._file.get_nowait()
+                except queue.Empty:
+                    break
+                if depot is _FIN:
+                    fin = True
+                    break
+                lot.extend(depot)
+            self._ecrire_lot(lot)
+
+        # Arrêt : ce qui a été déposé avant fermer() est encore écrit
+        reste: List[tuple] = []
+        while True:
+            try:
+                depot = self._file.get_nowait()
+            except queue.Empty:
+                break
+            if depot is not _FIN:
+                reste.extend(depot)
+        for debut in range(0, len(reste), self.taille_lot):
+            self._ecrire_lot(reste[debut:debut + self.taille_lot])
+
+    def fermer(self, delai: float = 10.0) -> bool:
+        """
+        Refuse les nouveaux cas et écrit ceux en file (arrêt du serveur)
+
+        Returns:
+            False si l'écriture n'est pas terminée après `delai` secondes
+        """
+        with self._verrou:
+            deja_ferme, self._ferme = self._ferme, True
+        if not deja_ferme:
+            try:
+                self._file.put(_FIN, timeout=delai)
+            except queue.Full:
+                pass
+        self._thread.join(delai)
+        if self._thread.is_alive():
+            print(f"[Historique] Écriture non terminée, {self._file.qsize()} requêtes en file")
+            return False
+        self._connexion.close()
+        return True
+
+    def derniers(self, limite: int = 100, tenant: Optional[str] = None) -> List[Dict]:
+        """Diagnostics écrits, du plus récent au plus ancien (connexion de lecture séparée)"""
+        connexion = sqlite3.connect(self.chemin, timeout=self.DELAI_VERROU)
+        connexion.row_factory = sqlite3.Row
+        try:
+            if tenant is None:
+                lignes = connexion.execute(
+                    'SELECT * FROM diagnostics ORDER BY id DESC LIMIT ?', (limite,)).fetchall()
+            else:
+                lignes = connexion.execute(
+                    'SELECT * FROM diagnostics WHERE tenant = ? ORDER BY id DESC LIMIT ?', (tenant, limite)).fetchall()
+        finally:
+            connexion.close()
+        return [
+            dict(ligne, symptomes=json.loads(ligne['symptomes']),
+                 vehicule=json.loads(ligne['vehicule']) if ligne['vehicule'] else None)
+            for ligne in lignes
+        ]
+
+    def statistiques(self) -> Dict:
+        """Requêtes en file et compteurs de cas"""
+        with self._verrou:
+            return {
+                'en_attente': self._file.qsize(),
+                'taille_file': self._file.maxsize,
+                'ferme': self._ferme,
+                **self.compteurs,
+            }
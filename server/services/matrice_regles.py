@@ -0,0 +1,183 @@
+"""Compilation des règles de diagnostic en matrices pour un scoring vectorisé"""
+import numpy as np
+from typing import List, Dict, Mapping, Optional, Sequence
+from models import Diagnostic
+
+
+class MatriceRegles:
+    """
+    Représentation matricielle de la base de règles
+
+    Chaque règle devient une ligne, chaque symptôme une colonne. Le score
+    d'un lot de cas est obtenu par quelques produits matriciels au lieu
+    d'une boucle Python sur les règles (même formule que
+    VectorisationService.calculer_score_regle).
+    """
+
+    # Tableaux qui suffisent à reconstruire la matrice (base compilée)
+    TABLEAUX = ('requis', 'optionnels', 'poids', 'poids_regles',
+                'nb_requis', 'nb_optionnels', 'poids_totaux')
+
+    def __init__(self, diagnostics: List[Diagnostic], poids_symptomes: Dict[str, float]):
+        """
+        Args:
+            diagnostics: Règles de diagnostic, dans l'ordre de la base
+            poids_symptomes: Poids de chaque symptôme connu
+        """
+        # Colonnes : symptômes du catalogue puis symptômes cités uniquement par les règles
+        ids_symptomes = list(poids_symptomes)
+        for diagnostic in diagnostics:
+            for sid in diagnostic.symptomes_requis + (diagnostic.symptomes_optionnels or []):
+                if sid not in poids_symptomes and sid not in ids_symptomes:
+                    ids_symptomes.append(sid)
+        self.ids_symptomes: Sequence[str] = ids_symptomes
+        self.index_symptomes: Mapping[str, int] = {sid: i for i, sid in enumerate(self.ids_symptomes)}
+
+        nb_regles = len(diagnostics)
+        nb_symptomes = len(self.ids_symptomes)
+        self.requis = np.zeros((nb_regles, nb_symptomes), dtype=np.float64)
+        self.optionnels = np.zeros((nb_regles, nb_symptomes), dtype=np.float64)
+
+        for r, diagnostic in enumerate(diagnostics):
+            for sid in diagnostic.symptomes_requis:
+                self.requis[r, self.index_symptomes[sid]] = 1.0
+            for sid in diagnostic.symptomes_optionnels or []:
+                self.optionnels[r, self.index_symptomes[sid]] = 1.0
+
+        self.poids = np.array(
+            [poids_symptomes.get(sid, 1.0) for sid in self.ids_symptomes],
+            dtype=np.float64
+        )
+        # Poids des symptômes de chaque règle (requis ∪ optionnels comptés une fois)
+        self.poids_regles = np.maximum(self.requis, self.optionnels) * self.poids
+
+        self.nb_requis = self.requis.sum(axis=1)
+        self.nb_optionnels = self.optionnels.sum(axis=1)
+        self.poids_totaux = self.poids_regles.sum(axis=1)
+
+    @classmethod
+    def depuis_tableaux(
+        cls,
+        ids_symptomes: Sequence[str],
+        index_symptomes: Mapping[str, int],
+        tableaux: Mapping[str, np.ndarray]
+    ) -> 'MatriceRegles':
+        """
+        Reconstruit la matrice à partir de tableaux déjà calculés, sans copie
+        
+        Args:
+            ids_symptomes: ID de chaque colonne
+            index_symptomes: Colonne de chaque ID
+            tableaux: Un tableau par nom de TABLEAUX
+        """
+        matrice = cls.__new__(cls)
+        matrice.ids_symptomes = ids_symptomes
+        matrice.index_symptomes = index_symptomes
+        for nom in cls.TABLEAUX:
+            setattr(matrice, nom, tableaux[nom])
+        return matrice
+
+    @property
+    def nb_regles(self) -> int:
+        return self.requis.shape[0]
+
+    def regles_du_symptome(self, colonne: int) -> np.ndarray:
+        """Positions des règles qui citent le symptôme (requis ou optionnel)"""
+        if getattr(self, '_regles_par_colonne', None) is None:
+            # Calculé au premier usage : (règles x symptômes) parcouru une fois
+            colonnes, regles = np.nonzero((self.requis + self.optionnels).T)
+            debuts = np.zeros(len(self.ids_symptomes) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(colonnes, minlength=len(self.ids_symptomes)), out=debuts[1:])
+            self._regles_par_colonne = (debuts, regles)
+        debuts, regles = self._regles_par_colonne
+        return regles[debuts[colonne]:debuts[colonne + 1]]
+
+    @property
+    def scores_vides(self) -> np.ndarray:
+        """Score de chaque règle sans aucun symptôme présent"""
+        if getattr(self, '_scores_vides', None) is None:
+            self._scores_vides = self.scorer(np.zeros((1, len(self.ids_symptomes))))[0]
+        return self._scores_vides
+
+    def encoder_cas(self, cas: List[List[str]]) -> np.ndarray:
+        """
+        Construit la matrice de présence (cas x symptômes)
+
+        Args:
+            cas: Listes d'IDs de symptômes (IDs inconnus ignorés)
+
+        Returns:
+            Matrice binaire des symptômes présents
+        """
+        presence = np.zeros((len(cas), len(self.ids_symptomes)), dtype=np.float64)
+        for i, symptomes_ids in enumerate(cas):
+            colonnes = [self.index_symptomes[sid] for sid in symptomes_ids if sid in self.index_symptomes]
+            presence[i, colonnes] = 1.0
+        return presence
+
+    def scorer(self, presence: np.ndarray, regles: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcule le score de chaque règle pour chaque cas
+
+        Une présence fractionnaire (correspondance souple, voir
+        SimilariteSymptomes.etendre) compte au prorata : un symptôme requis
+        seulement proche ne rend jamais une règle complète.
+
+        Args:
+            presence: Matrice (cas x symptômes) produite par encoder_cas,
+                valeurs entre 0 et 1
+            regles: Positions des seules règles à scorer (règles applicables
+                au véhicule, voir IndexApplicabilite), toutes si None
+
+        Returns:
+            Matrice (cas x règles) de scores entre 0 et 1, colonnes dans
+            l'ordre de `regles`
+        """
+        if regles is None:
+            requis, optionnels, poids_regles = self.requis, self.optionnels, self.poids_regles
+            nb_requis, nb_optionnels, poids_totaux = self.nb_requis, self.nb_optionnels, self.poids_totaux
+        else:
+            requis, optionnels, poids_regles = self.requis[regles], self.optionnels[regles], self.poids_regles[regles]
+            nb_requis, nb_optionnels, poids_totaux = (
+                self.nb_requis[regles], self.nb_optionnels[regles], self.poids_totaux[regles])
+
+        return self.formule(
+            presence @ requis.T,
+            presence @ optionnels.T,
+            presence @ poids_regles.T,
+            nb_requis[np.newaxis, :],
+            nb_optionnels[np.newaxis, :],
+            poids_totaux[np.newaxis, :],
+        )
+
+    @staticmethod
+    def formule(
+        requis_presents: np.ndarray,
+        optionnels_presents: np.ndarray,
+        poids_presents: np.ndarray,
+        nb_requis: np.ndarray,
+        nb_optionnels: np.ndarray,
+        poids_totaux: np.ndarray
+    ) -> np.ndarray:
+        """
+        Score des règles à partir des sommes de présence (tableaux diffusables)
+
+        Partagée par scorer et par les sessions de diagnostic, qui tiennent
+        ces sommes à jour symptôme par symptôme.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Règles incomplètes : maximum 50% selon la proportion de requis présents
+            score_partiel = np.where(nb_requis > 0, requis_presents / nb_requis, 0.0) * 0.5
+
+            # Règles complètes : 0.8 + bonus optionnels, pondéré par les poids
+            bonus = np.where(nb_optionnels > 0, optionnels_presents / nb_optionnels, 0.0) * 0.2
+            score_complet = 0.8 + bonus
+            score_complet = np.where(
+                poids_totaux > 0,
+                score_complet * poids_presents / poids_totaux,
+                score_complet
+            )
+
+        complet = requis_presents >= nb_requis
+        scores = np.where(complet, score_complet, score_partiel)
+        return np.minimum(scores, 1.0)
@@ -1,29 +1,270 @@
 """Moteur de diagnostic principal"""
+import contextlib
 import json
-from typing import List, Dict
-from models import Symptome, Diagnostic
+import os
+import threading
+import time
+import numpy as np
+from typing import Callable, ContextManager, List, Dict, Mapping, Optional, Sequence, Set, Tuple
+from models import Symptome, Diagnostic, Vehicule
 from services.vectorisation import VectorisationService
+from services.matrice_regles import MatriceRegles
+from services.recherche_lexicale import IndexLexical
+from services.autocompletion import Autocompletion
+from services.base_compilee import BaseCompilee, ErreurBaseCompilee, empreinte_sources
+from services.catalogue import IndexCategories, encoder_curseur, decoder_curseur
+from services.similarite_symptomes import SimilariteSymptomes
+from services.applicabilite import IndexApplicabilite
+from services.recommandation import classer_symptomes
+from utils.memoire import taille_profonde
 import config
 
 class MoteurDiagnostic:
     """Moteur de diagnostic basé sur les règles et la vectorisation"""
     
-    def __init__(self):
-        """Initialise le moteur avec les données et le service de vectorisation"""
-        self.symptomes: Dict[str, Symptome] = {}
-        self.diagnostics: List[Diagnostic] = []
-        self.vectorisation = VectorisationService()
-        self._charger_donnees()
+    def __init__(
+        self,
+        avec_vectorisation: bool = True,
+        base_compilee: Optional[str] = None,
+        chargement_asynchrone: bool = False,
+        symptomes_file: Optional[str] = None,
+        regles_file: Optional[str] = None
+    ):
+        """
+        Initialise le moteur avec les données et le service de vectorisation
+        
+        Args:
+            avec_vectorisation: Charger le modèle d'embeddings (inutile pour
+                les diagnostics seuls, nécessaire pour la recherche texte)
+            base_compilee: Base binaire produite par compiler_base.py
+                (config.BASE_COMPILEE_FILE par défaut) ; les fichiers JSON
+                sont utilisés si elle est absente ou périmée
+            chargement_asynchrone: Charger le modèle et encoder les symptômes
+                en arrière-plan ; la recherche est servie par l'index lexical
+                en attendant (voir attendre_vectorisation)
+            symptomes_file: Catalogue des symptômes (config.SYMPTOMES_FILE par
+                défaut ; fichiers d'un tenant, voir services/tenants.py)
+            regles_file: Règles de diagnostic (config.REGLES_FILE par défaut)
+        """
+        self.symptomes_file = symptomes_file or config.SYMPTOMES_FILE
+        self.regles_file = regles_file or config.REGLES_FILE
+        self.symptomes: Mapping[str, Symptome] = {}
+        self.diagnostics: Sequence[Diagnostic] = []
+        self._index_lexical: Optional[IndexLexical] = None
+        self._index_lexical_diagnostics: Optional[IndexLexical] = None
+        self._positions_diagnostics: Optional[Dict[str, int]] = None
+        self._autocompletion: Optional[Autocompletion] = None
+        self._index_categories: Optional[IndexCategories] = None
+        self._ids_symptomes: Sequence[Optional[str]] = []  # ID par position du catalogue
+        self.similarite: Optional[SimilariteSymptomes] = None  # Correspondance souple
+        self._chargement_asynchrone = chargement_asynchrone
+        self._vectorisation_terminee = threading.Event()
+        
+        # Le modèle se charge pendant la lecture des fichiers de données
+        self.vectorisation = (
+            VectorisationService(chargement_asynchrone=chargement_asynchrone)
+            if avec_vectorisation else None
+        )
+        
+        self.base = self._ouvrir_base_compilee(base_compilee or config.BASE_COMPILEE_FILE)
+        if self.base is not None:
+            self._charger_base_compilee(self.base)
+        else:
+            self._charger_donnees()
+    
+    def _ouvrir_base_compilee(self, chemin: str) -> Optional[BaseCompilee]:
+        """Ouvre la base compilée si elle existe et correspond aux fichiers JSON"""
+        if not chemin or not os.path.exists(chemin):
+            return None
+        
+        try:
+            base = BaseCompilee(chemin)
+        except ErreurBaseCompilee as e:
+            print(f"[Moteur] Base compilée ignorée: {e}")
+            return None
+        
+        sources = [self.symptomes_file, self.regles_file]
+        if all(os.path.exists(f) for f in sources) and base.empreinte != empreinte_sources(*sources):
+            print(f"[Moteur] Base compilée périmée ({chemin}), chargement des fichiers JSON")
+            return None
+        return base
+    
+    def _charger_base_compilee(self, base: BaseCompilee):
+        """Projette la base compilée en mémoire, sans analyse JSON ni encodage"""
+        self.symptomes = base.symptomes
+        self.diagnostics = base.diagnostics
+        self.matrice = base.matrice_regles()
+        self.applicabilite = base.index_applicabilite()
+        self._ids_symptomes = base.ids_colonnes
+        if config.CORRESPONDANCE_SOUPLE:
+            self.similarite = base.similarite_symptomes
+        print(f"[Moteur] Base compilée {base.chemin}: {len(self.symptomes)} symptômes, "
+              f"{len(self.diagnostics)} règles")
+        
+        if self.vectorisation is None:
+            self._vectorisation_terminee.set()
+            return
+        vecteurs_diagnostics = base.vecteurs_diagnostics
+        if base.vecteurs is not None and vecteurs_diagnostics is not None and base.modele == config.EMBEDDING_MODEL:
+            self.vectorisation.charger_vecteurs(
+                base.ids_colonnes, base.index_colonnes, base.vecteurs, base.reduction,
+                base.ids_diagnostics, vecteurs_diagnostics)
+            self._preparer_similarite()
+            self._vectorisation_terminee.set()
+        else:
+            print("[Moteur] Embeddings absents ou d'un autre modèle dans la base compilée")
+            self._lancer_vectorisation(self._liste_symptomes())
+    
+    def _lancer_vectorisation(self, symptomes_list: List[Dict]):
+        """Encode les symptômes et les diagnostics, en arrière-plan si le chargement est asynchrone"""
+        diagnostics_list = self._liste_diagnostics()
+        
+        def vectoriser():
+            try:
+                assert self.vectorisation is not None
+                self.vectorisation.vectoriser_symptomes(symptomes_list, diagnostics=diagnostics_list)
+                self._preparer_similarite()
+            except Exception as e:
+                if not self._chargement_asynchrone:
+                    raise
+                print(f"[Moteur] Vectorisation impossible, recherche lexicale seule: {e}")
+            finally:
+                self._vectorisation_terminee.set()
+        
+        if self._chargement_asynchrone:
+            threading.Thread(target=vectoriser, name='vectorisation', daemon=True).start()
+        else:
+            vectoriser()
+    
+    def _preparer_similarite(self) -> None:
+        """
+        Symptômes proches calculés depuis les embeddings (correspondance souple)
+        
+        Une fois par chargement, sauf si la base compilée les contient déjà.
+        Tant qu'ils ne sont pas prêts, les diagnostics sont exacts.
+        """
+        if not config.CORRESPONDANCE_SOUPLE or self.similarite is not None:
+            return
+        assert self.vectorisation is not None and self.vectorisation.matrice is not None
+        similarite = SimilariteSymptomes.depuis_embeddings(
+            self.vectorisation.matrice, len(self.matrice.ids_symptomes),
+            config.SEUIL_SIMILARITE_SYMPTOMES, config.MAX_VOISINS_SYMPTOME)
+        print(f"[Moteur] Correspondance souple : {similarite.nb_paires} paires de symptômes "
+              f"proches (similarité >= {similarite.seuil})")
+        self.similarite = similarite
+    
+    @property
+    def vectorisation_terminee(self) -> bool:
+        """Encodage terminé (ou sans objet) : les vecteurs ont leur taille définitive"""
+        return self._vectorisation_terminee.is_set()
+    
+    def attendre_vectorisation(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du chargement du modèle et de l'encodage des symptômes
+        
+        Returns:
+            True si la recherche sémantique est disponible
+        """
+        self._vectorisation_terminee.wait(timeout)
+        return self.vectorisation is not None and self.vectorisation.pret
+    
+    def prechauffer(self) -> float:
+        """
+        Exécute des recherches et diagnostics représentatifs
+        
+        Déclenche les initialisations paresseuses (torch, index construits au
+        premier usage) avant l'arrivée du premier vrai utilisateur.
+        
+        Returns:
+            Durée du préchauffage en secondes
+        """
+        debut = time.perf_counter()
+        
+        for texte in config.TEXTES_PRECHAUFFAGE:
+            self.rechercher_symptomes(texte)
+            if self.vectorisation is not None and self.vectorisation.pret:
+                self.vectorisation.trouver_symptomes_similaires(texte)
+            self.autocompleter(texte[:4])
+        
+        # Un diagnostic par règle, unitaire puis groupé
+        lot = [list(d.symptomes_requis) for d in list(self.diagnostics)[:config.MAX_CAS_PAR_LOT]]
+        lot = [ids for ids in lot if ids]
+        if lot:
+            self.diagnostiquer(lot[0])
+            self.diagnostiquer_lot(lot)
+        
+        duree = time.perf_counter() - debut
+        print(f"[Moteur] Préchauffage terminé en {duree:.2f}s")
+        return duree
+    
+    def rapport_memoire(self, vus: Optional[Set[int]] = None) -> Dict[str, int]:
+        """
+        Octets occupés par chaque composant du moteur (hors vectorisation)
+        
+        Avec une base compilée, les tableaux projetés ne sont pas comptés
+        (voir BaseCompilee.taille) : seuls les objets Python le sont.
+        
+        Args:
+            vus: Objets déjà comptés par un autre service du même rapport
+        """
+        vus = set() if vus is None else vus
+        return {
+            'symptomes': taille_profonde(self.symptomes, vus),
+            'regles': taille_profonde(self.diagnostics, vus),
+            'matrice_regles': taille_profonde(getattr(self, 'matrice', None), vus),
+            'applicabilite': taille_profonde(getattr(self, 'applicabilite', None), vus),
+            'index_lexical': taille_profonde(self._index_lexical, vus),
+            'index_lexical_diagnostics': taille_profonde(self._index_lexical_diagnostics, vus),
+            'autocompletion': taille_profonde(self._autocompletion, vus),
+            'index_categories': taille_profonde(self._index_categories, vus),
+            'similarite_symptomes': taille_profonde(self.similarite, vus),
+        }
+    
+    def _liste_symptomes(self) -> List[Dict]:
+        """Symptômes sous forme de dictionnaires, dans l'ordre du catalogue"""
+        return [s.to_dict() for s in self.symptomes.values()]
+    
+    def _liste_diagnostics(self) -> List[Dict]:
+        """Textes indexés de chaque diagnostic, dans l'ordre des règles"""
+        return [{'id': d.id, 'nom': d.nom, 'description': d.description, 'conseils': d.conseils}
+                for d in self.diagnostics]
+    
+    @property
+    def index_lexical(self) -> IndexLexical:
+        """Index lexical (construit au premier usage avec une base compilée)"""
+        if self._index_lexical is None:
+            self._index_lexical = IndexLexical(self._liste_symptomes())
+        return self._index_lexical
+    
+    @property
+    def index_categories(self) -> IndexCategories:
+        """Symptômes par catégorie (construit au premier usage avec une base compilée)"""
+        if self._index_categories is None:
+            assert self.base is not None
+            self._index_categories = self.base.index_categories()
+        return self._index_categories
+    
+    @property
+    def autocompletion(self) -> Autocompletion:
+        """Index d'autocomplétion (construit au premier usage avec une base compilée)"""
+        if self._autocompletion is None:
+            self._autocompletion = Autocompletion(self._liste_symptomes())
+        return self._autocompletion
     
     def _charger_donnees(self):
         """Charge les symptômes et règles depuis les fichiers JSON"""
+        symptomes: Dict[str, Symptome] = {}
+        diagnostics: List[Diagnostic] = []
+        self.symptomes = symptomes
+        self.diagnostics = diagnostics
+        
         # Charger les symptômes
         try:
-            with open(config.SYMPTOMES_FILE, 'r', encoding='utf-8') as f:
+            with open(self.symptomes_file, 'r', encoding='utf-8') as f:
                 symptomes_data = json.load(f)
                 for data in symptomes_data:
                     symptome = Symptome.from_dict(data)
-                    self.symptomes[symptome.id] = symptome
+                    symptomes[symptome.id] = symptome
             print(f"[Moteur] {len(self.symptomes)} symptômes chargés")
         except Exception as e:
             print(f"[Moteur] Erreur chargement symptômes: {e}")
@@ -31,36 +272,111 @@ class MoteurDiagnostic:
         
         # Charger les règles de diagnostic
         try:
-            with open(config.REGLES_FILE, 'r', encoding='utf-8') as f:
+            with open(self.regles_file, 'r', encoding='utf-8') as f:
                 regles_data = json.load(f)
                 for data in regles_data:
                     diagnostic = Diagnostic.from_dict(data)
-                    self.diagnostics.append(diagnostic)
+                    diagnostics.append(diagnostic)
             print(f"[Moteur] {len(self.diagnostics)} règles de diagnostic chargées")
         except Exception as e:
             print(f"[Moteur] Erreur chargement règles: {e}")
             raise
         
-        # Vectoriser les symptômes
-        symptomes_list = [s.to_dict() for s in self.symptomes.values()]
-        self.vectorisation.vectoriser_symptomes(symptomes_list)
+        # Compiler les règles pour le scoring vectorisé
+        poids_symptomes = {sid: s.poids for sid, s in self.symptomes.items()}
+        self.matrice = MatriceRegles(diagnostics, poids_symptomes)
+        self.applicabilite = IndexApplicabilite.depuis_regles(diagnostics)
+        
+        # Indexer les symptômes (index lexical et vecteurs partagent le même ordre)
+        symptomes_list = self._liste_symptomes()
+        self._ids_symptomes = list(symptomes)
+        self._index_categories = IndexCategories.depuis_categories([s['categorie'] for s in symptomes_list])
+        self._index_lexical = IndexLexical(symptomes_list)
+        self._autocompletion = Autocompletion(symptomes_list)
+        if self.vectorisation is not None:
+            self._lancer_vectorisation(symptomes_list)
+        else:
+            self._vectorisation_terminee.set()
     
     def get_symptomes_disponibles(self) -> List[Dict]:
         """Retourne la liste de tous les symptômes disponibles"""
-        return [s.to_dict() for s in self.symptomes.values()]
+        return self._liste_symptomes()
     
-    def rechercher_symptomes(self, texte: str, top_k: int = 5) -> List[Dict]:
+    def categories_symptomes(self) -> List[Dict]:
+        """Catégories du catalogue et nombre de symptômes de chacune"""
+        return self.index_categories.facettes
+    
+    def parcourir_symptomes(
+        self,
+        categorie: Optional[str] = None,
+        limite: Optional[int] = 100,
+        curseur: Optional[str] = None,
+        sans_categorie: bool = False
+    ) -> Dict:
+        """
+        Page du catalogue, éventuellement restreinte à une catégorie
+        
+        Seuls les symptômes de la page sont construits : le coût dépend de
+        la taille de la page, pas de celle du catalogue.
+        
+        Args:
+            categorie: Catégorie à parcourir (None = tout le catalogue)
+            limite: Nombre maximal de symptômes (None = toute la sélection)
+            curseur: curseur_suivant de la page précédente
+            sans_categorie: Parcourir les symptômes sans catégorie
+            
+        Returns:
+            {'total', 'symptomes', 'curseur_suivant'} (curseur None en fin de liste)
+            
+        Raises:
+            ValueError: Curseur invalide
+        """
+        apres = decoder_curseur(curseur) if curseur else None
+        positions, suivante, total = self.index_categories.page(categorie, limite, apres, sans_categorie)
+        return {
+            'total': total,
+            'symptomes': [self.symptomes[self._ids_symptomes[i]].to_dict() for i in positions],  # type: ignore[index]
+            'curseur_suivant': encoder_curseur(suivante) if suivante is not None else None,
+        }
+    
+    def rechercher_symptomes(
+        self,
+        texte: str,
+        top_k: int = 5,
+        mode: Optional[str] = None,
+        admission: Optional[Callable[[], ContextManager]] = None
+    ) -> List[Dict]:
         """
         Recherche des symptômes similaires à partir d'un texte libre
         
         Args:
             texte: Texte saisi par l'utilisateur
             top_k: Nombre de résultats
+            mode: 'hybride', 'lexical' ou 'semantique' (config.MODE_RECHERCHE par défaut)
+            admission: Contexte tenu pendant l'encodage du texte seulement (contrôle
+                d'admission) ; les réponses de l'index lexical ne l'attendent pas
             
         Returns:
             Liste de symptômes avec leur score de similarité
         """
-        resultats = self.vectorisation.trouver_symptomes_similaires(texte, top_k)
+        mode = mode or config.MODE_RECHERCHE
+        vectorisation_prete = self.vectorisation is not None and self.vectorisation.pret
+        admission = admission or contextlib.nullcontext
+        
+        if mode not in ('hybride', 'lexical', 'semantique'):
+            raise ValueError(f"Mode de recherche inconnu: {mode}")
+        
+        if mode == 'lexical' or not vectorisation_prete:
+            # Sans modèle (désactivé ou en cours de chargement), l'index lexical
+            # répond seul, quel que soit le mode : la recherche reste disponible
+            resultats = self.index_lexical.rechercher(texte, top_k)
+        elif mode == 'semantique':
+            assert self.vectorisation is not None
+            with admission():
+                resultats = self.vectorisation.trouver_symptomes_similaires(
+                    texte, top_k, config.SEUIL_RECHERCHE_SYMPTOMES)
+        else:
+            resultats = self._recherche_hybride(texte, top_k, admission)
         
         symptomes_trouves = []
         for symptome_id, score in resultats:
@@ -71,13 +387,126 @@ class MoteurDiagnostic:
         
         return symptomes_trouves
     
-    def diagnostiquer(self, symptomes_ids: List[str]) -> Dict:
+    def rechercher_diagnostics(
+        self,
+        texte: str,
+        top_k: int = 5,
+        admission: Optional[Callable[[], ContextManager]] = None
+    ) -> List[Dict]:
+        """
+        Recherche des diagnostics proches d'une panne soupçonnée ("joint de culasse")
+        
+        Le texte est comparé aux embeddings des diagnostics (nom, description
+        et conseils) ; tant que le modèle n'est pas prêt, un index lexical des
+        diagnostics répond.
+        
+        Args:
+            texte: Texte saisi par l'utilisateur
+            top_k: Nombre de résultats
+            admission: Contexte tenu pendant l'encodage du texte seulement
+            
+        Returns:
+            Liste de diagnostics avec leur score de similarité
+        """
+        if self.vectorisation is not None and self.vectorisation.matrice_diagnostics is not None:
+            with (admission or contextlib.nullcontext)():
+                resultats = self.vectorisation.trouver_diagnostics_similaires(
+                    texte, top_k, config.SEUIL_RECHERCHE_DIAGNOSTICS)
+        else:
+            if self._index_lexical_diagnostics is None:
+                self._index_lexical_diagnostics = IndexLexical(self._liste_diagnostics())
+            resultats = self._index_lexical_diagnostics.rechercher(texte, top_k)
+        
+        if resultats and self._positions_diagnostics is None:
+            ids = self.base.ids_diagnostics if self.base is not None else [d.id for d in self.diagnostics]
+            self._positions_diagnostics = {did: i for i, did in enumerate(ids)}
+        diagnostics_trouves = []
+        for diagnostic_id, score in resultats:
+            position = self._positions_diagnostics.get(diagnostic_id) if self._positions_diagnostics else None
+            if position is not None:
+                complet = self.diagnostics[position].to_dict()
+                diagnostic_dict = {cle: complet[cle] for cle in
+                                   ('id', 'nom', 'description', 'gravite', 'cout_estimatif', 'conseils')}
+                diagnostic_dict['score_similarite'] = round(score, 3)
+                diagnostics_trouves.append(diagnostic_dict)
+        
+        return diagnostics_trouves
+    
+    def autocompleter(self, texte: str, limite: int = 8) -> List[Dict]:
+        """
+        Suggestions de symptômes pour une saisie en cours (sans modèle)
+        
+        Args:
+            texte: Début de saisie, éventuellement avec fautes de frappe
+            limite: Nombre maximum de suggestions
+            
+        Returns:
+            Liste de symptômes (id, nom, categorie)
+        """
+        return self.autocompletion.suggerer(texte, limite)
+    
+    def _recherche_hybride(
+        self,
+        texte: str,
+        top_k: int,
+        admission: Callable[[], ContextManager] = contextlib.nullcontext
+    ) -> List[Tuple[str, float]]:
+        """
+        Recherche lexicale d'abord, fusion avec les embeddings si elle est peu sûre
+        
+        Returns:
+            Liste de tuples (symptome_id, score)
+        """
+        lexicaux = self.index_lexical.rechercher(texte, top_k)
+        if lexicaux and lexicaux[0][1] >= config.SEUIL_LEXICAL_CONFIANT:
+            return lexicaux
+        
+        # Fusion : la couverture lexicale renforce le score sémantique sans jamais le réduire
+        assert self.vectorisation is not None
+        with admission():
+            similarites = self.vectorisation.calculer_similarites(texte)
+        semantiques = np.clip(similarites, 0.0, 1.0)
+        couverture = np.asarray(self.index_lexical.scorer(texte))
+        scores = semantiques + (1.0 - semantiques) * config.POIDS_LEXICAL_HYBRIDE * couverture
+        
+        ordre = np.argsort(-scores, kind='stable')
+        return [
+            (self.index_lexical.ids_symptomes[i], float(scores[i]))
+            for i in ordre[:top_k]
+            if scores[i] >= config.SEUIL_RECHERCHE_SYMPTOMES
+        ]
+    
+    def _scorer(
+        self,
+        cas: List[List[str]],
+        souple: Optional[bool],
+        regles: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Scores (cas x règles), avec la correspondance souple si demandée et prête
+        
+        Seules les règles `regles` sont scorées si elles sont données.
+        """
+        presence = self.matrice.encoder_cas(cas)
+        if (config.CORRESPONDANCE_SOUPLE if souple is None else souple) and self.similarite is not None:
+            presence = self.similarite.etendre(presence)
+        return self.matrice.scorer(presence, regles)
+    
+    def diagnostiquer(
+        self,
+        symptomes_ids: List[str],
+        souple: Optional[bool] = None,
+        vehicule: Optional[Vehicule] = None
+    ) -> Dict:
         """
         Effectue un diagnostic basé sur les symptômes fournis
         Retourne : diagnostic, gravité, coût estimatif, description
         
         Args:
             symptomes_ids: Liste des IDs de symptômes
+            souple: Créditer les symptômes proches de ceux d'une règle
+                (config.CORRESPONDANCE_SOUPLE par défaut)
+            vehicule: Ne scorer que les règles applicables à ce véhicule
             
         Returns:
             Résultat du diagnostic
@@ -96,34 +525,120 @@ class MoteurDiagnostic:
                 'erreur': 'Aucun symptôme valide'
             }
         
-        # Calculer les scores pour chaque règle
-        resultats = []
-        poids_symptomes = {sid: self.symptomes[sid].poids for sid in self.symptomes}
-        
-        for diagnostic in self.diagnostics:
-            score = self.vectorisation.calculer_score_regle(
-                symptomes_valides,
-                diagnostic.symptomes_requis,
-                diagnostic.symptomes_optionnels or [],
-                poids_symptomes
-            )
+        # Calculer les scores des règles applicables en une opération matricielle
+        regles = self.applicabilite.regles_applicables(vehicule)
+        scores = self._scorer([symptomes_valides], souple, regles)[0]
+        return self._construire_reponse(scores, symptomes_valides, regles)
+    
+    def diagnostiquer_lot(
+        self,
+        lot_symptomes_ids: List[List[str]],
+        souple: Optional[bool] = None,
+        vehicules: Optional[Sequence[Optional[Vehicule]]] = None
+    ) -> List[Dict]:
+        """
+        Effectue plusieurs diagnostics en un seul passage sur la base de règles
+        
+        Args:
+            lot_symptomes_ids: Listes d'IDs de symptômes, une par véhicule
+            souple: Créditer les symptômes proches (voir diagnostiquer)
+            vehicules: Véhicule de chaque cas (None = toutes les règles) ;
+                un passage par véhicule distinct
             
-            if score > 0:
-                resultats.append({
-                    'diagnostic': diagnostic,
-                    'score': score
-                })
+        Returns:
+            Résultats de diagnostic dans l'ordre des listes fournies
+        """
+        lot_valides = [[sid for sid in ids if sid in self.symptomes] for ids in lot_symptomes_ids]
+        
+        # Cas regroupés par véhicule : chaque groupe n'est scoré que sur ses règles
+        groupes: Dict[Optional[Vehicule], List[int]] = {}
+        for i, vehicule in enumerate(vehicules or [None] * len(lot_valides)):
+            groupes.setdefault(vehicule, []).append(i)
         
-        # Trier par score décroissant
-        resultats.sort(key=lambda x: x['score'], reverse=True)
+        resultats: List[Dict] = [{} for _ in lot_valides]
+        for vehicule, positions in groupes.items():
+            regles = self.applicabilite.regles_applicables(vehicule)
+            scores = self._scorer([lot_valides[i] for i in positions], souple, regles)
+            for i, scores_cas in zip(positions, scores):
+                if not lot_symptomes_ids[i]:
+                    resultats[i] = {'succes': False, 'erreur': 'Aucun symptôme fourni'}
+                elif not lot_valides[i]:
+                    resultats[i] = {'succes': False, 'erreur': 'Aucun symptôme valide'}
+                else:
+                    resultats[i] = self._construire_reponse(scores_cas, lot_valides[i], regles)
+        return resultats
+    
+    def recommander_symptomes(
+        self,
+        symptomes_ids: List[str],
+        limite: int = 5,
+        souple: Optional[bool] = None,
+        vehicule: Optional[Vehicule] = None
+    ) -> List[Dict]:
+        """
+        Symptômes à vérifier ensuite pour départager les diagnostics possibles
         
-        if not resultats:
+        Les symptômes non encore choisis sont classés par gain d'information
+        attendu sur les règles candidates, pondérées par leur score.
+        
+        Args:
+            symptomes_ids: Symptômes déjà constatés
+            limite: Nombre maximum de symptômes proposés
+            souple, vehicule: Comme pour diagnostiquer
+            
+        Returns:
+            Liste de symptômes (id, nom, categorie, gain en bits, probabilite)
+        """
+        symptomes_valides = [sid for sid in symptomes_ids if sid in self.symptomes]
+        if not symptomes_valides:
+            return []
+        regles = self.applicabilite.regles_applicables(vehicule)
+        scores = self._scorer([symptomes_valides], souple, regles)[0]
+        if regles is None:
+            regles = np.arange(len(scores))
+        return self._recommander(regles, scores, symptomes_valides, limite)
+    
+    def _recommander(self, regles: np.ndarray, scores: np.ndarray, choisis: List[str], limite: int) -> List[Dict]:
+        """Symptômes du catalogue non choisis, par gain décroissant (gain nul exclu)"""
+        exclus = set(choisis)
+        recommandations = []
+        for colonne, gain, probabilite in classer_symptomes(self.matrice, regles, scores):
+            if len(recommandations) >= limite or gain <= 1e-9:
+                break
+            symptome = self.symptomes.get(self.matrice.ids_symptomes[colonne])
+            if symptome is None or symptome.id in exclus:
+                continue
+            recommandations.append({
+                'id': symptome.id,
+                'nom': symptome.nom,
+                'categorie': symptome.categorie,
+                'gain': round(gain, 3),
+                'probabilite': round(probabilite, 3)
+            })
+        return recommandations
+    
+    def _construire_reponse(
+        self,
+        scores: np.ndarray,
+        symptomes_valides: List[str],
+        regles: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        Construit la réponse à partir des scores des règles
+        
+        Args:
+            scores: Score de chaque règle, ou de chaque règle de `regles`
+            symptomes_valides: IDs des symptômes connus
+            regles: Positions des règles scorées (toutes si None)
+        """
+        # Meilleure règle (la première en cas d'égalité, comme un tri stable) ;
+        # égalité au dernier bit près : l'ordre des sommes ne change pas la règle
+        index = int(np.round(scores, 9).argmax()) if len(scores) else 0
+        if not len(scores) or scores[index] <= 0:
             return self._diagnostic_incertain(symptomes_valides)
         
-        # Meilleur diagnostic
-        meilleur = resultats[0]
-        score = meilleur['score']
-        diagnostic = meilleur['diagnostic']
+        score = float(scores[index])
+        diagnostic = self.diagnostics[int(regles[index]) if regles is not None else index]
         
         # Déterminer le niveau de confiance
         if score >= config.SEUIL_CONFIANCE_HAUTE:
@@ -136,6 +651,7 @@ class MoteurDiagnostic:
         # Préparer la réponse (seulement ce qui est demandé dans le sujet)
         reponse = {
             'succes': True,
+            'id_diagnostic': diagnostic.id,
             'diagnostic': diagnostic.nom,
             'description': diagnostic.description,
             'gravite': diagnostic.gravite,
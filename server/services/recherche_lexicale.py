@@ -0,0 +1,109 @@
+"""Index lexical BM25 sur les symptômes"""
+import math
+from collections import Counter
+from typing import List, Dict, Tuple
+from utils.texte import tokeniser
+
+
+class IndexLexical:
+    """
+    Index BM25 sur le nom et la description des symptômes
+
+    Répond sans modèle d'embeddings aux recherches qui contiennent les mots
+    exacts du catalogue ("batterie", "fumée noire").
+    """
+
+    K1 = 1.2
+    B = 0.75
+    POIDS_NOM = 2  # Les termes du nom comptent double
+
+    def __init__(self, symptomes: List[Dict]):
+        """
+        Args:
+            symptomes: Liste des symptômes avec id, nom et description
+        """
+        self.ids_symptomes: List[str] = [s['id'] for s in symptomes]
+        self._frequences: List[Counter] = []
+        self._index: Dict[str, List[int]] = {}
+
+        for i, symptome in enumerate(symptomes):
+            termes = tokeniser(symptome['nom']) * self.POIDS_NOM
+            termes += tokeniser(symptome.get('description') or '')
+            frequences = Counter(termes)
+            self._frequences.append(frequences)
+            for terme in frequences:
+                self._index.setdefault(terme, []).append(i)
+
+        nb_documents = len(symptomes)
+        self._longueurs = [sum(f.values()) for f in self._frequences]
+        self._longueur_moyenne = (sum(self._longueurs) / nb_documents) if nb_documents else 0.0
+        self._idf = {
+            terme: self._calculer_idf(len(documents), nb_documents)
+            for terme, documents in self._index.items()
+        }
+        # IDF d'un terme absent du catalogue (le plus discriminant possible)
+        self._idf_inconnu = self._calculer_idf(0, nb_documents)
+
+    @staticmethod
+    def _calculer_idf(nb_contenant: int, nb_documents: int) -> float:
+        return math.log(1 + (nb_documents - nb_contenant + 0.5) / (nb_contenant + 0.5))
+
+    def scorer(self, texte: str) -> List[float]:
+        """
+        Calcule la couverture lexicale du texte pour chaque symptôme
+
+        La couverture est la part (pondérée par l'IDF) des termes de la
+        requête présents dans le symptôme : 1.0 si tous les termes sont
+        trouvés, 0.0 si aucun.
+
+        Returns:
+            Scores entre 0 et 1 alignés sur ids_symptomes
+        """
+        termes = set(tokeniser(texte))
+        idf_trouves = [0.0] * len(self.ids_symptomes)
+        nb_trouves = [0] * len(self.ids_symptomes)
+        if not termes:
+            return idf_trouves
+
+        idf_total = sum(self._idf.get(t, self._idf_inconnu) for t in termes)
+        for terme in termes:
+            for i in self._index.get(terme, []):
+                idf_trouves[i] += self._idf[terme]
+                nb_trouves[i] += 1
+        # Tous les termes trouvés : exactement 1.0 (une somme de fractions
+        # peut donner 0.9999999999999999 et manquer SEUIL_LEXICAL_CONFIANT)
+        return [
+            1.0 if nb == len(termes) else idf / idf_total
+            for idf, nb in zip(idf_trouves, nb_trouves)
+        ]
+
+    def rechercher(self, texte: str, top_k: int = 5, seuil: float = 0.5) -> List[Tuple[str, float]]:
+        """
+        Trouve les symptômes qui contiennent les termes du texte
+
+        Les résultats sont classés par couverture puis par score BM25.
+
+        Args:
+            texte: Texte saisi par l'utilisateur
+            top_k: Nombre de résultats à retourner
+            seuil: Couverture minimale
+
+        Returns:
+            Liste de tuples (symptome_id, couverture)
+        """
+        termes = tokeniser(texte)
+        couverture = self.scorer(texte)
+        candidats = [i for i, c in enumerate(couverture) if c > 0 and c >= seuil]
+        candidats.sort(key=lambda i: (couverture[i], self._bm25(termes, i)), reverse=True)
+        return [(self.ids_symptomes[i], min(couverture[i], 1.0)) for i in candidats[:top_k]]
+
+    def _bm25(self, termes: List[str], i: int) -> float:
+        """Score BM25 d'un symptôme pour les termes de la requête"""
+        frequences = self._frequences[i]
+        normalisation = self.K1 * (1 - self.B + self.B * self._longueurs[i] / self._longueur_moyenne)
+        score = 0.0
+        for terme in set(termes):
+            tf = frequences.get(terme, 0)
+            if tf:
+                score += self._idf[terme] * tf * (self.K1 + 1) / (tf + normalisation)
+        return score
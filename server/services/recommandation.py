@@ -0,0 +1,79 @@
+"""Symptôme à vérifier ensuite : gain d'information sur les règles candidates"""
+import numpy as np
+from typing import List, Tuple
+from services.matrice_regles import MatriceRegles
+
+# P(symptôme observé | règle) selon la place du symptôme dans la règle
+VRAISEMBLANCE_REQUIS = 0.95
+VRAISEMBLANCE_OPTIONNEL = 0.5
+VRAISEMBLANCE_ABSENT = 0.05  # Symptôme non cité : rare mais possible
+
+MAX_CANDIDATES = 256  # Règles les plus probables prises en compte
+
+
+def _entropies(conjointes: np.ndarray, marginales: np.ndarray) -> np.ndarray:
+    """Entropie (bits) de chaque colonne de conjointes / marginales"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        posterieures = conjointes / marginales
+        termes = np.where(posterieures > 0, posterieures * np.log2(posterieures), 0.0)
+    return -termes.sum(axis=0)
+
+
+def gains_information(probabilites: np.ndarray, vraisemblances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gain d'information attendu de l'observation de chaque symptôme
+
+    Args:
+        probabilites: Probabilité de chaque règle candidate (somme 1)
+        vraisemblances: (règles x symptômes) P(symptôme présent | règle)
+
+    Returns:
+        (gains en bits, probabilité que le symptôme soit présent), par symptôme
+    """
+    presents = probabilites[:, np.newaxis] * vraisemblances
+    absents = probabilites[:, np.newaxis] - presents
+    p_present = presents.sum(axis=0)
+    p_absent = 1.0 - p_present
+
+    initiale = -float(np.sum(probabilites * np.log2(probabilites)))
+    attendue = p_present * _entropies(presents, p_present) + p_absent * _entropies(absents, p_absent)
+    return initiale - attendue, p_present
+
+
+def classer_symptomes(
+    matrice: MatriceRegles,
+    regles: np.ndarray,
+    scores: np.ndarray
+) -> List[Tuple[int, float, float]]:
+    """
+    Colonnes qui départagent le mieux les règles candidates
+
+    Les règles sont pondérées par leur score courant ; seules les
+    MAX_CANDIDATES plus probables et les colonnes qu'elles citent sont
+    évaluées (une colonne citée par aucune ne départage rien).
+
+    Args:
+        matrice: Règles compilées
+        regles: Positions des règles candidates
+        scores: Score courant de chaque règle candidate
+
+    Returns:
+        (colonne, gain, probabilité de présence), gain décroissant
+    """
+    positives = np.flatnonzero(scores > 0)
+    if len(positives) > MAX_CANDIDATES:
+        positives = positives[np.argsort(-scores[positives], kind='stable')[:MAX_CANDIDATES]]
+    if not len(positives):
+        return []
+    regles = np.asarray(regles)[positives]
+    probabilites = scores[positives] / scores[positives].sum()
+
+    requis, optionnels = matrice.requis[regles], matrice.optionnels[regles]
+    colonnes = np.flatnonzero((requis + optionnels).any(axis=0))
+    requis, optionnels = requis[:, colonnes], optionnels[:, colonnes]
+    vraisemblances = np.where(requis > 0, VRAISEMBLANCE_REQUIS,
+                              np.where(optionnels > 0, VRAISEMBLANCE_OPTIONNEL, VRAISEMBLANCE_ABSENT))
+
+    gains, p_present = gains_information(probabilites, vraisemblances)
+    ordre = np.argsort(-np.round(gains, 9), kind='stable')
+    return [(int(colonnes[i]), float(gains[i]), float(p_present[i])) for i in ordre.tolist()]
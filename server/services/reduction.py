@@ -0,0 +1,208 @@
+"""Embeddings compacts : projection ACP et stockage float16 / int8"""
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+TYPES_STOCKAGE = ('float32', 'float16', 'int8')
+
+
+def normaliser(vecteurs: np.ndarray) -> np.ndarray:
+    """Normalise les lignes (norme L2) pour réduire le cosinus à un produit scalaire"""
+    normes = np.linalg.norm(vecteurs, axis=-1, keepdims=True)
+    return vecteurs / np.where(normes > 0, normes, 1.0)
+
+
+class MatriceEmbeddings:
+    """
+    Embeddings normalisés des symptômes, éventuellement quantifiés
+
+    En int8, chaque ligne est stockée avec sa propre échelle (valeur
+    absolue maximale / 127). Les produits scalaires sont calculés par blocs
+    convertis en float32, sans jamais décompresser toute la matrice.
+    """
+
+    TAILLE_BLOC = 8192  # Lignes converties à la fois
+
+    def __init__(self, valeurs: np.ndarray, echelles: Optional[np.ndarray] = None):
+        """
+        Args:
+            valeurs: Matrice (symptômes x dimensions) en float32, float16 ou int8
+            echelles: Échelle de chaque ligne (int8 uniquement)
+        """
+        self.valeurs = valeurs
+        self.echelles = echelles
+
+    @classmethod
+    def compresser(cls, vecteurs: np.ndarray, type_stockage: str = 'float32') -> 'MatriceEmbeddings':
+        """
+        Stocke des vecteurs normalisés dans le type demandé
+
+        Args:
+            vecteurs: Matrice float32 normalisée
+            type_stockage: 'float32', 'float16' ou 'int8'
+        """
+        if type_stockage not in TYPES_STOCKAGE:
+            raise ValueError(f"Type de stockage inconnu: {type_stockage} ({', '.join(TYPES_STOCKAGE)})")
+        vecteurs = np.asarray(vecteurs, dtype=np.float32)
+        if type_stockage != 'int8':
+            return cls(vecteurs.astype(type_stockage))
+
+        maximums = np.abs(vecteurs).max(axis=1)
+        echelles = np.where(maximums > 0, maximums / 127.0, 1.0).astype(np.float32)
+        valeurs = np.round(vecteurs / echelles[:, np.newaxis]).astype(np.int8)
+        return cls(valeurs, echelles)
+
+    def __len__(self) -> int:
+        return len(self.valeurs)
+
+    @property
+    def dimensions(self) -> int:
+        return self.valeurs.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les vecteurs"""
+        return self.valeurs.nbytes + (self.echelles.nbytes if self.echelles is not None else 0)
+
+    def lignes(self, debut: int = 0, fin: Optional[int] = None) -> 'MatriceEmbeddings':
+        """Lignes debut:fin, sans copie (échelles int8 comprises)"""
+        echelles = self.echelles[debut:fin] if self.echelles is not None else None
+        return MatriceEmbeddings(self.valeurs[debut:fin], echelles)
+
+    def decompresser(self, debut: int = 0, fin: Optional[int] = None) -> np.ndarray:
+        """Lignes debut:fin en float32 (échelles int8 appliquées)"""
+        lignes = self.valeurs[debut:fin].astype(np.float32)
+        if self.echelles is not None:
+            lignes *= self.echelles[debut:fin, np.newaxis]
+        return lignes
+
+    def produit(self, requetes: np.ndarray) -> np.ndarray:
+        """
+        Produits scalaires avec une ou plusieurs requêtes normalisées
+
+        Args:
+            requetes: Vecteur (dimensions,) ou matrice (requêtes x dimensions)
+
+        Returns:
+            Scores (symptômes,) ou (symptômes x requêtes)
+        """
+        requetes = np.asarray(requetes, dtype=np.float32)
+        if self.valeurs.dtype == np.float32:
+            scores = self.valeurs @ requetes.T
+        else:
+            scores = np.empty((len(self.valeurs),) + requetes.shape[:-1], dtype=np.float32)
+            for debut in range(0, len(self.valeurs), self.TAILLE_BLOC):
+                bloc = self.valeurs[debut:debut + self.TAILLE_BLOC].astype(np.float32)
+                scores[debut:debut + self.TAILLE_BLOC] = bloc @ requetes.T
+        if self.echelles is not None:
+            scores *= self.echelles.reshape((-1,) + (1,) * (scores.ndim - 1))
+        return scores
+
+
+class ReductionEmbeddings:
+    """
+    Projection des embeddings sur leurs premiers axes principaux
+
+    Les axes sont ceux de la décomposition en valeurs singulières des
+    vecteurs du catalogue, sans centrage : les symptômes vivent (presque)
+    dans le sous-espace retenu, si bien que le produit scalaire d'une
+    requête projetée avec un symptôme reste proche du cosinus d'origine et
+    que les seuils de similarité restent valables. Ajustée une fois (à la
+    compilation de la base) ; les requêtes sont projetées de la même façon.
+    """
+
+    def __init__(self, composantes: np.ndarray):
+        """
+        Args:
+            composantes: Axes retenus (dimensions réduites x dimensions d'origine)
+        """
+        self.composantes = composantes
+
+    @classmethod
+    def ajuster(cls, vecteurs: np.ndarray, dimensions: int) -> 'ReductionEmbeddings':
+        """
+        Calcule les axes principaux des vecteurs
+
+        Le nombre d'axes est borné par le rang des données (un petit
+        catalogue ne peut pas fournir plus d'axes qu'il n'a de symptômes).
+        """
+        vecteurs = normaliser(np.asarray(vecteurs, dtype=np.float32))
+        _, _, axes = np.linalg.svd(vecteurs, full_matrices=False)
+        return cls(np.ascontiguousarray(axes[:dimensions], dtype=np.float32))
+
+    @property
+    def dimensions(self) -> int:
+        return self.composantes.shape[0]
+
+    def projeter(self, vecteurs: np.ndarray) -> np.ndarray:
+        """
+        Projette des vecteurs (normalisés au préalable)
+
+        La norme n'est pas rétablie après projection : la part d'une requête
+        hors du sous-espace du catalogue ne doit pas gonfler ses scores.
+        """
+        vecteurs = normaliser(np.asarray(vecteurs, dtype=np.float32))
+        return vecteurs @ self.composantes.T
+
+
+def preparer_vecteurs(
+    vecteurs: np.ndarray,
+    dimensions: int = 0,
+    type_stockage: str = 'float32'
+) -> Tuple[Optional[ReductionEmbeddings], MatriceEmbeddings]:
+    """
+    Construit la matrice de similarité d'un catalogue
+
+    Args:
+        vecteurs: Embeddings bruts des symptômes
+        dimensions: Dimensions après ACP (0 = pas de réduction)
+        type_stockage: 'float32', 'float16' ou 'int8'
+
+    Returns:
+        (réduction ou None, matrice stockée)
+    """
+    reduction = ReductionEmbeddings.ajuster(vecteurs, dimensions) if dimensions else None
+    projetes = reduction.projeter(vecteurs) if reduction else np.asarray(vecteurs, dtype=np.float32)
+    return reduction, MatriceEmbeddings.compresser(normaliser(projetes), type_stockage)
+
+
+def rapport_rappel(
+    vecteurs: np.ndarray,
+    requetes: np.ndarray,
+    reduction: Optional[ReductionEmbeddings],
+    matrice: MatriceEmbeddings,
+    valeurs_k: Sequence[int] = (1, 5, 10)
+) -> Dict:
+    """
+    Mesure les voisins perdus par la représentation compacte
+
+    Le rappel@k est la part des k symptômes les plus proches en pleine
+    précision retrouvés parmi les k premiers de la représentation compacte,
+    en moyenne sur les requêtes.
+
+    Args:
+        vecteurs: Embeddings complets des symptômes
+        requetes: Embeddings de textes de requête représentatifs
+        reduction: Projection appliquée aux requêtes (None si aucune)
+        matrice: Représentation compacte des symptômes
+    """
+    reference = normaliser(np.asarray(vecteurs, dtype=np.float32)) @ normaliser(
+        np.asarray(requetes, dtype=np.float32)).T
+    projetees = reduction.projeter(requetes) if reduction else normaliser(np.asarray(requetes, dtype=np.float32))
+    compacts = matrice.produit(projetees)
+
+    rappels = {}
+    for k in valeurs_k:
+        k_effectif = min(k, len(vecteurs))
+        attendus = np.argsort(-reference, axis=0, kind='stable')[:k_effectif]
+        obtenus = np.argsort(-compacts, axis=0, kind='stable')[:k_effectif]
+        communs = [len(set(attendus[:, q]) & set(obtenus[:, q])) for q in range(reference.shape[1])]
+        rappels[f'rappel@{k}'] = round(float(np.mean(communs)) / k_effectif, 4) if communs else 1.0
+
+    octets_complets = len(vecteurs) * np.asarray(vecteurs).shape[1] * 4
+    return {
+        'dimensions': matrice.dimensions,
+        'type': str(matrice.valeurs.dtype),
+        'octets': matrice.nbytes,
+        'compression': round(octets_complets / max(matrice.nbytes, 1), 1),
+        **rappels,
+    }
@@ -0,0 +1,266 @@
+"""Sessions de diagnostic incrémental (symptômes ajoutés un à un)"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+import numpy as np
+from models import Vehicule
+from services.matrice_regles import MatriceRegles
+from services.moteur_diagnostic import MoteurDiagnostic
+
+
+class SessionDiagnostic:
+    """
+    Diagnostic tenu à jour pendant l'inspection d'un véhicule
+
+    La session garde la présence (creuse) de chaque colonne et le score de
+    chaque règle touchée. Ajouter ou retirer un symptôme ne rescore que les
+    règles qui le citent (et celles de ses voisins en correspondance
+    souple), à partir des seules colonnes présentes : le coût d'un
+    changement ne dépend pas de la taille de la base. Les sommes sont
+    recalculées plutôt qu'accumulées, pour qu'une suite d'ajouts et de
+    retraits ne fasse pas dériver l'égalité requis présents = requis qui
+    rend une règle complète. Les règles non touchées gardent leur score
+    sans symptôme (MatriceRegles.scores_vides).
+    """
+
+    def __init__(
+        self,
+        identifiant: str,
+        moteur: MoteurDiagnostic,
+        vehicule: Optional[Vehicule] = None,
+        souple: bool = False
+    ):
+        """
+        Args:
+            identifiant: Identifiant opaque communiqué au client
+            moteur: Moteur dont les règles sont scorées (celui du tenant)
+            vehicule: Ne classer que les règles applicables à ce véhicule
+            souple: Créditer les symptômes proches (si la similarité est prête)
+        """
+        self.id = identifiant
+        self.moteur = moteur
+        self.vehicule = vehicule
+        self.similarite = moteur.similarite if souple else None
+        self.symptomes: List[str] = []  # Ordre d'ajout
+        regles = moteur.applicabilite.regles_applicables(vehicule)
+        self._applicables: Optional[Set[int]] = None if regles is None else set(regles.tolist())
+
+        self._presents: Set[int] = set()
+        self._presence: Dict[int, float] = {}  # Colonne -> présence (souple) non nulle
+        self._scores: Dict[int, float] = {}  # Règle citant une colonne présente -> score
+        self.verrou = threading.Lock()
+        self.derniere_activite = time.monotonic()
+
+    def _presence_colonne(self, colonne: int) -> float:
+        """Présence d'une colonne : 1 si choisie, sinon la plus forte similarité avec un symptôme choisi"""
+        if colonne in self._presents:
+            return 1.0
+        if self.similarite is None:
+            return 0.0
+        debuts, voisins, valeurs = self.similarite.debuts, self.similarite.voisins, self.similarite.valeurs
+        presence = 0.0
+        for present in self._presents:
+            for position in range(debuts[present], debuts[present + 1]):
+                if voisins[position] == colonne:
+                    presence = max(presence, float(valeurs[position]))
+        return presence
+
+    def _mettre_a_jour(self, colonne: int) -> None:
+        """Reporte le changement d'une colonne (et de ses voisins) sur les règles qui les citent"""
+        matrice = self.moteur.matrice
+        colonnes = [colonne]
+        if self.similarite is not None:
+            debuts = self.similarite.debuts
+            colonnes += [int(c) for c in self.similarite.voisins[debuts[colonne]:debuts[colonne + 1]]]
+
+        touchees = set()
+        for c in colonnes:
+            presence = self._presence_colonne(c)
+            ecart = presence - self._presence.get(c, 0.0)
+            if ecart == 0.0:
+                continue
+            if presence:
+                self._presence[c] = presence
+            else:
+                del self._presence[c]
+            touchees.update(matrice.regles_du_symptome(c).tolist())
+        if not touchees:
+            return
+
+        regles = np.array(sorted(touchees), dtype=np.int64)
+        colonnes = np.fromiter(self._presence, dtype=np.int64, count=len(self._presence))
+        presence = np.fromiter(self._presence.values(), dtype=np.float64, count=len(self._presence))
+        cites = np.ix_(regles, colonnes)
+        requis = matrice.requis[cites] @ presence
+        scores = MatriceRegles.formule(
+            requis,
+            matrice.optionnels[cites] @ presence,
+            matrice.poids_regles[cites] @ presence,
+            matrice.nb_requis[regles], matrice.nb_optionnels[regles], matrice.poids_totaux[regles],
+        )
+        cite = (matrice.requis[cites] + matrice.optionnels[cites]).any(axis=1)
+        for regle, score, encore_citee in zip(regles.tolist(), scores.tolist(), cite.tolist()):
+            if encore_citee:
+                self._scores[regle] = score
+            else:
+                # Plus aucune colonne présente dans la règle : score sans symptôme
+                self._scores.pop(regle, None)
+
+    def ajouter(self, symptome_id: str) -> bool:
+        """
+        Ajoute un symptôme du catalogue
+
+        Returns:
+            False si le symptôme était déjà présent
+
+        Raises:
+            KeyError: Symptôme inconnu du moteur
+        """
+        if symptome_id not in self.moteur.symptomes:
+            raise KeyError(symptome_id)
+        colonne = self.moteur.matrice.index_symptomes[symptome_id]
+        if colonne in self._presents:
+            return False
+        self._presents.add(colonne)
+        self.symptomes.append(symptome_id)
+        self._mettre_a_jour(colonne)
+        return True
+
+    def retirer(self, symptome_id: str) -> bool:
+        """
+        Retire un symptôme
+
+        Returns:
+            False si le symptôme n'était pas présent
+        """
+        colonne = self.moteur.matrice.index_symptomes.get(symptome_id)
+        if colonne not in self._presents:
+            return False
+        self._presents.remove(colonne)
+        self.symptomes.remove(symptome_id)
+        self._mettre_a_jour(colonne)
+        return True
+
+    def _candidates(self) -> np.ndarray:
+        """Règles classables au score éventuellement non nul, par position croissante"""
+        vides = self.moteur.matrice.scores_vides
+        regles = set(self._scores) | set(np.flatnonzero(vides).tolist())
+        if self._applicables is not None:
+            regles &= self._applicables
+        return np.array(sorted(regles), dtype=np.int64)
+
+    def _score(self, regle: int) -> float:
+        score = self._scores.get(regle)
+        return float(self.moteur.matrice.scores_vides[regle]) if score is None else score
+
+    def classement(self, limite: int) -> List[Dict]:
+        """Règles de meilleur score (positif), la première position en cas d'égalité"""
+        regles = self._candidates()
+        scores = np.array([self._score(r) for r in regles.tolist()])
+        ordre = np.argsort(-np.round(scores, 9), kind='stable')[:limite]
+        classement = []
+        for i in ordre.tolist():
+            if scores[i] <= 0:
+                break
+            diagnostic = self.moteur.diagnostics[int(regles[i])]
+            classement.append({
+                'id': diagnostic.id,
+                'diagnostic': diagnostic.nom,
+                'gravite': diagnostic.gravite,
+                'score': round(float(scores[i]), 2),
+            })
+        return classement
+
+    def recommander(self, limite: int) -> List[Dict]:
+        """Symptômes à vérifier ensuite (voir MoteurDiagnostic.recommander_symptomes)"""
+        if not self.symptomes:
+            return []
+        regles = self._candidates()
+        scores = np.array([self._score(r) for r in regles.tolist()])
+        return self.moteur._recommander(regles, scores, self.symptomes, limite)
+
+    def resultat(self) -> Dict:
+        """Réponse de POST /diagnostiquer pour les symptômes de la session"""
+        if not self.symptomes:
+            return {'succes': False, 'erreur': 'Aucun symptôme fourni'}
+        regles = self._candidates()
+        scores = np.array([self._score(r) for r in regles.tolist()])
+        return self.moteur._construire_reponse(scores, list(self.symptomes), regles)
+
+
+class SessionsDiagnostic:
+    """
+    Sessions ouvertes, expirées après une période d'inactivité
+
+    Les sessions sont rangées de la moins à la plus récemment utilisée :
+    les expirées sont retirées en tête à chaque accès, et la plus ancienne
+    part quand le nombre maximum est atteint. Une session garde le moteur
+    qui l'a créée, même si son tenant est évincé entre-temps.
+    """
+
+    def __init__(self, ttl: float, max_sessions: int):
+        """
+        Args:
+            ttl: Secondes d'inactivité avant expiration
+            max_sessions: Sessions ouvertes au plus
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[str, SessionDiagnostic]' = OrderedDict()
+        self._verrou = threading.Lock()
+        self.compteurs = {'creees': 0, 'expirees': 0, 'evincees': 0}
+
+    def _purger(self, maintenant: float) -> None:
+        """Retire les sessions expirées (appelé sous le verrou)"""
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if maintenant - session.derniere_activite < self.ttl:
+                break
+            del self._sessions[session.id]
+            self.compteurs['expirees'] += 1
+
+    def creer(
+        self,
+        moteur: MoteurDiagnostic,
+        vehicule: Optional[Vehicule] = None,
+        souple: bool = False
+    ) -> SessionDiagnostic:
+        """Ouvre une session (évince la plus ancienne au-delà du maximum)"""
+        session = SessionDiagnostic(secrets.token_urlsafe(16), moteur, vehicule, souple)
+        with self._verrou:
+            self._purger(session.derniere_activite)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.compteurs['evincees'] += 1
+            self._sessions[session.id] = session
+            self.compteurs['creees'] += 1
+        return session
+
+    def obtenir(self, identifiant: str) -> Optional[SessionDiagnostic]:
+        """Session active (son inactivité repart de zéro), None si inconnue ou expirée"""
+        maintenant = time.monotonic()
+        with self._verrou:
+            self._purger(maintenant)
+            session = self._sessions.get(identifiant)
+            if session is not None:
+                session.derniere_activite = maintenant
+                self._sessions.move_to_end(identifiant)
+            return session
+
+    def fermer(self, identifiant: str) -> bool:
+        """Ferme une session ; False si elle n'existait pas"""
+        with self._verrou:
+            return self._sessions.pop(identifiant, None) is not None
+
+    def statistiques(self) -> Dict:
+        """Sessions ouvertes et compteurs"""
+        with self._verrou:
+            self._purger(time.monotonic())
+            return {
+                'ouvertes': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'ttl': self.ttl,
+                **self.compteurs,
+            }
@@ -0,0 +1,106 @@
+"""Similarité entre symptômes pour la correspondance souple des règles"""
+import numpy as np
+from typing import Mapping
+from services.reduction import MatriceEmbeddings
+
+
+class SimilariteSymptomes:
+    """
+    Symptômes proches de chaque symptôme, d'après leurs embeddings
+
+    Matrice creuse (colonnes de MatriceRegles x colonnes) stockée ligne par
+    ligne : les voisins de la colonne i sont voisins[debuts[i]:debuts[i + 1]],
+    de similarité valeurs[...]. Seules les paires au-dessus du seuil sont
+    gardées (au plus max_voisins par symptôme) ; la diagonale est implicite.
+    Calculée une fois par version de la base (chargement ou compilation).
+    """
+
+    # Tableaux qui suffisent à reconstruire la matrice (base compilée)
+    TABLEAUX = ('debuts', 'voisins', 'valeurs')
+
+    TAILLE_BLOC = 1024  # Symptômes comparés à tout le catalogue à la fois
+
+    def __init__(self, debuts: np.ndarray, voisins: np.ndarray, valeurs: np.ndarray, seuil: float):
+        self.debuts = debuts
+        self.voisins = voisins
+        self.valeurs = valeurs
+        self.seuil = seuil
+
+    @classmethod
+    def depuis_embeddings(
+        cls,
+        vecteurs: MatriceEmbeddings,
+        nb_colonnes: int,
+        seuil: float,
+        max_voisins: int = 8
+    ) -> 'SimilariteSymptomes':
+        """
+        Compare chaque symptôme à tout le catalogue, par blocs
+
+        Args:
+            vecteurs: Embeddings normalisés, une ligne par colonne du
+                catalogue (les colonnes suivantes, citées seulement par les
+                règles, n'ont pas de voisins)
+            nb_colonnes: Nombre de colonnes de la matrice des règles
+            seuil: Similarité cosinus minimale d'une paire retenue
+            max_voisins: Voisins gardés au plus par symptôme (les plus proches)
+        """
+        n = len(vecteurs)
+        k = min(max_voisins, n - 1)
+        nombres = np.zeros(nb_colonnes, dtype=np.int64)
+        voisins, valeurs = [], []
+
+        for debut in range(0, n if k > 0 else 0, cls.TAILLE_BLOC):
+            bloc = vecteurs.decompresser(debut, debut + cls.TAILLE_BLOC)
+            scores = vecteurs.produit(bloc).T  # (bloc x catalogue)
+            lignes = np.arange(len(bloc))
+            scores[lignes, debut + lignes] = -np.inf
+
+            candidats = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            similarites = np.take_along_axis(scores, candidats, axis=1)
+            retenus = similarites >= seuil
+            nombres[debut:debut + len(bloc)] = retenus.sum(axis=1)
+            voisins.append(candidats[retenus].astype(np.int32))
+            valeurs.append(similarites[retenus].astype(np.float32))
+
+        debuts = np.zeros(nb_colonnes + 1, dtype=np.int64)
+        np.cumsum(nombres, out=debuts[1:])
+        return cls(
+            debuts,
+            np.concatenate(voisins) if voisins else np.zeros(0, dtype=np.int32),
+            np.concatenate(valeurs) if valeurs else np.zeros(0, dtype=np.float32),
+            seuil,
+        )
+
+    @classmethod
+    def depuis_tableaux(cls, tableaux: Mapping[str, np.ndarray], seuil: float) -> 'SimilariteSymptomes':
+        """Reconstruit la matrice à partir de tableaux déjà calculés, sans copie"""
+        return cls(tableaux['debuts'], tableaux['voisins'], tableaux['valeurs'], seuil)
+
+    @property
+    def nb_paires(self) -> int:
+        return len(self.voisins)
+
+    def etendre(self, presence: np.ndarray) -> np.ndarray:
+        """
+        Présence souple : chaque voisin d'un symptôme présent compte pour sa similarité
+
+        Args:
+            presence: Matrice binaire (cas x symptômes) de MatriceRegles.encoder_cas
+
+        Returns:
+            Matrice (cas x symptômes) : 1 pour un symptôme choisi, la plus
+            forte similarité avec un symptôme choisi pour un voisin, 0 sinon
+        """
+        cas, colonnes = np.nonzero(presence >= 1.0)
+        nombres = self.debuts[colonnes + 1] - self.debuts[colonnes]
+        total = int(nombres.sum())
+        souple = presence.copy()
+        if total == 0:
+            return souple
+
+        # Positions des voisins de chaque symptôme présent, mises bout à bout
+        decalages = np.arange(total) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+        positions = np.repeat(self.debuts[colonnes], nombres) + decalages
+        np.maximum.at(souple, (np.repeat(cas, nombres), self.voisins[positions]), self.valeurs[positions])
+        return souple
@@ -0,0 +1,201 @@
+"""Bases de connaissances par tenant (garage, marque)"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from services.moteur_diagnostic import MoteurDiagnostic
+
+# Le nom vient du client et désigne un dossier : ni séparateur ni '..'
+MOTIF_TENANT = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}')
+FICHIERS_TENANT = ('symptomes.json', 'regles.json')
+BASE_COMPILEE_TENANT = 'base.diagkb'
+
+
+class TenantInconnu(LookupError):
+    """Tenant au nom invalide ou sans base de connaissances"""
+
+
+def separer_prefixe_tenant(chemin: str, prefixe: str) -> Tuple[Optional[str], str]:
+    """
+    Sépare le tenant d'un chemin préfixé
+
+    Exemple : ('/tenants/', '/tenants/garage_nord/rechercher') ->
+    ('garage_nord', '/rechercher') ; (None, chemin) sans préfixe.
+    """
+    if not chemin.startswith(prefixe):
+        return None, chemin
+    tenant, _, reste = chemin[len(prefixe):].partition('/')
+    return tenant, '/' + reste
+
+
+def taille_moteur(moteur: MoteurDiagnostic, vus: Optional[Set[int]] = None, projetee: bool = True) -> int:
+    """
+    Octets propres à un moteur : données, index, vecteurs et base projetée
+
+    Le modèle d'embeddings, partagé par tous les moteurs, n'est pas compté.
+
+    Args:
+        vus: Objets déjà comptés par un autre service du même rapport
+        projetee: Compter aussi le fichier de la base compilée projeté en mémoire
+    """
+    vus = set() if vus is None else vus
+    if moteur.vectorisation is not None and moteur.vectorisation.model is not None:
+        vus.add(id(moteur.vectorisation.model))
+    total = sum(moteur.rapport_memoire(vus).values())
+    if moteur.vectorisation is not None:
+        total += sum(moteur.vectorisation.rapport_memoire(vus).values())
+    if projetee and moteur.base is not None:
+        total += moteur.base.taille
+    return total
+
+
+class BasesTenants:
+    """
+    Moteurs de diagnostic par tenant, chargés au premier usage
+
+    Chaque tenant a son dossier <dossier>/<tenant>/ avec symptomes.json,
+    regles.json et, facultative, base.diagkb (compiler_base.py). Tous les
+    moteurs partagent le modèle d'embeddings du processus : un tenant ne
+    coûte que son catalogue, ses règles, ses index et ses vecteurs.
+
+    Au-delà du budget mémoire, les tenants les moins récemment utilisés sont
+    évincés (une requête en cours garde son moteur jusqu'à la fin). Le tenant
+    qui vient d'être chargé n'est jamais évincé, même seul au-delà du budget.
+    Ses vecteurs sont encodés en arrière-plan : le budget est vérifié de
+    nouveau une fois l'encodage terminé, à leur taille réelle.
+    """
+
+    def __init__(self, dossier: str, memoire_max: int, avec_vectorisation: bool = True):
+        """
+        Args:
+            dossier: Dossier contenant un sous-dossier par tenant
+            memoire_max: Budget en octets de l'ensemble des tenants chargés
+            avec_vectorisation: Recherche sémantique dans les moteurs des tenants
+        """
+        self.dossier = dossier
+        self.memoire_max = memoire_max
+        self.avec_vectorisation = avec_vectorisation
+        # Du moins au plus récemment utilisé
+        self._moteurs: 'OrderedDict[str, MoteurDiagnostic]' = OrderedDict()
+        self._chargements: Dict[str, threading.Lock] = {}
+        self._verrou = threading.Lock()
+        self.compteurs = {'chargements': 0, 'evictions': 0}
+
+    def _dossier_tenant(self, tenant: str) -> str:
+        """Dossier du tenant ; TenantInconnu si le nom ou les fichiers sont invalides"""
+        if not MOTIF_TENANT.fullmatch(tenant):
+            raise TenantInconnu(f"Nom de tenant invalide: {tenant[:64]}")
+        dossier = os.path.join(self.dossier, tenant)
+        if not all(os.path.isfile(os.path.join(dossier, f)) for f in FICHIERS_TENANT):
+            raise TenantInconnu(f"Tenant inconnu: {tenant}")
+        return dossier
+
+    def tenants_disponibles(self) -> List[str]:
+        """Tenants qui ont une base de connaissances sur le disque"""
+        if not os.path.isdir(self.dossier):
+            return []
+        disponibles = []
+        for nom in sorted(os.listdir(self.dossier)):
+            try:
+                self._dossier_tenant(nom)
+            except TenantInconnu:
+                continue
+            disponibles.append(nom)
+        return disponibles
+
+    def en_memoire(self, tenant: str) -> Optional[MoteurDiagnostic]:
+        """Moteur du tenant s'il est chargé (marqué comme récemment utilisé), None sinon"""
+        with self._verrou:
+            moteur = self._moteurs.get(tenant)
+            if moteur is not None:
+                self._moteurs.move_to_end(tenant)
+            return moteur
+
+    def obtenir(self, tenant: str) -> MoteurDiagnostic:
+        """
+        Moteur du tenant, chargé au premier usage
+
+        Les requêtes concurrentes pour un tenant qui se charge attendent ce
+        chargement plutôt que d'en lancer un autre. La recherche sémantique
+        du tenant est disponible dès que ses symptômes sont encodés (index
+        lexical en attendant, comme pour le moteur par défaut).
+
+        Raises:
+            TenantInconnu: Nom invalide ou dossier sans symptomes.json et regles.json
+        """
+        moteur = self.en_memoire(tenant)
+        if moteur is not None:
+            return moteur
+        dossier = self._dossier_tenant(tenant)
+
+        with self._verrou:
+            chargement = self._chargements.setdefault(tenant, threading.Lock())
+        with chargement:
+            moteur = self.en_memoire(tenant)
+            if moteur is not None:
+                return moteur
+            try:
+                moteur = MoteurDiagnostic(
+                    avec_vectorisation=self.avec_vectorisation,
+                    base_compilee=os.path.join(dossier, BASE_COMPILEE_TENANT),
+                    chargement_asynchrone=True,
+                    symptomes_file=os.path.join(dossier, FICHIERS_TENANT[0]),
+                    regles_file=os.path.join(dossier, FICHIERS_TENANT[1]),
+                )
+                with self._verrou:
+                    self._moteurs[tenant] = moteur
+                    self.compteurs['chargements'] += 1
+            finally:
+                with self._verrou:
+                    self._chargements.pop(tenant, None)
+        print(f"[Tenants] Base {tenant} chargée ({len(moteur.symptomes)} symptômes, "
+              f"{len(moteur.diagnostics)} règles)")
+
+        self._evincer(garder=tenant)
+        if not moteur.vectorisation_terminee:
+            threading.Thread(target=self._evincer_apres_vectorisation, args=(tenant, moteur),
+                             name=f'budget-{tenant}', daemon=True).start()
+        return moteur
+
+    def _evincer_apres_vectorisation(self, tenant: str, moteur: MoteurDiagnostic) -> None:
+        """Revérifie le budget quand les vecteurs du tenant ont leur taille définitive"""
+        moteur.attendre_vectorisation()
+        self._evincer(garder=tenant)
+
+    def _evincer(self, garder: str) -> None:
+        """Décharge les tenants les moins récemment utilisés jusqu'à tenir dans le budget"""
+        with self._verrou:
+            residents = list(self._moteurs.items())
+        # Mesure hors du verrou : parcourir les index prend du temps
+        tailles = {nom: taille_moteur(moteur) for nom, moteur in residents}
+        total = sum(tailles.values())
+        if total <= self.memoire_max:
+            return
+
+        with self._verrou:
+            for nom in list(self._moteurs):
+                if total <= self.memoire_max:
+                    break
+                if nom == garder or nom not in tailles:
+                    continue
+                del self._moteurs[nom]
+                total -= tailles[nom]
+                self.compteurs['evictions'] += 1
+                print(f"[Tenants] Base {nom} évincée ({tailles[nom] / 1024 / 1024:.1f} Mo)")
+
+    def rapport_memoire(self, vus: Optional[Set[int]] = None) -> Dict[str, int]:
+        """Octets de chaque tenant chargé, hors bases projetées (voir taille_moteur)"""
+        vus = set() if vus is None else vus
+        with self._verrou:
+            residents = list(self._moteurs.items())
+        return {nom: taille_moteur(moteur, vus, projetee=False) for nom, moteur in residents}
+
+    def statistiques(self) -> Dict:
+        """Tenants chargés (du moins au plus récemment utilisé) et compteurs"""
+        with self._verrou:
+            return {
+                'charges': list(self._moteurs),
+                'memoire_max': self.memoire_max,
+                **self.compteurs,
+            }
@@ -1,36 +1,286 @@
 """Service de vectorisation et calcul de similarité"""
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterator, Mapping, Sequence, Set, Tuple, Optional
 import config
+from utils.ressources import calculer_repartition, appliquer_repartition
+from utils.memoire import taille_profonde
+from services.reduction import MatriceEmbeddings, ReductionEmbeddings, normaliser, preparer_vecteurs
+
+
+class VecteursParId(Mapping[str, np.ndarray]):
+    """Vue par identifiant sur les lignes d'une matrice d'embeddings (sans copie)"""
+    
+    def __init__(self, ids: Sequence[str], index: Mapping[str, int], matrice: np.ndarray):
+        self._ids = ids
+        self._index = index
+        self._matrice = matrice
+    
+    def __getitem__(self, symptome_id: str) -> np.ndarray:
+        position = self._index.get(symptome_id)
+        if position is None or position >= len(self._matrice):
+            raise KeyError(symptome_id)
+        return self._matrice[position]
+    
+    def __iter__(self) -> Iterator[str]:
+        return (self._ids[i] for i in range(len(self._matrice)))
+    
+    def __len__(self) -> int:
+        return len(self._matrice)
+
+
+def texte_diagnostic(diagnostic: Mapping) -> str:
+    """Texte encodé pour un diagnostic : nom, description et conseils"""
+    return '. '.join(t.strip().rstrip('.') for t in (
+        diagnostic.get('nom'), diagnostic.get('description'), diagnostic.get('conseils')) if t and t.strip())
+
+
+# Un modèle par nom et par processus, partagé par tous les moteurs (tenants)
+_modeles: Dict[str, object] = {}
+_verrou_modeles = threading.Lock()
+
+
+def modele_partage(nom: str):
+    """
+    Modèle d'embeddings du processus, chargé au premier appel
+    
+    Les appels concurrents attendent le chargement en cours ; un échec n'est
+    pas mémorisé (l'appel suivant réessaie).
+    """
+    with _verrou_modeles:
+        modele = _modeles.get(nom)
+        if modele is None:
+            # Borner les threads de torch avant qu'il ne dimensionne ses pools
+            repartition = calculer_repartition()
+            appliquer_repartition(repartition)
+            print(f"[Ressources] {repartition}")
+            
+            # Import tardif : les outils sans recherche texte n'importent pas transformers
+            from sentence_transformers import SentenceTransformer
+            
+            print(f"[Vectorisation] Chargement du modèle {nom}...")
+            modele = SentenceTransformer(nom)
+            _modeles[nom] = modele
+            print("[Vectorisation] Modèle chargé avec succès")
+        return modele
+
 
 class VectorisationService:
-    """Gère la vectorisation des symptômes et le calcul de similarité"""
+    """Gère la vectorisation des symptômes et des diagnostics, et le calcul de similarité"""
+    
+    def __init__(self, chargement_asynchrone: bool = False):
+        """
+        Initialise le modèle d'embeddings
+        
+        Args:
+            chargement_asynchrone: Charger le modèle dans un thread pour que
+                l'appelant poursuive son initialisation en parallèle
+        """
+        self.model = None
+        self.erreur_chargement: Optional[Exception] = None
+        self._modele_charge = threading.Event()
+        self.symptomes_vectors: Mapping[str, np.ndarray] = {}
+        self.ids_symptomes: Sequence[str] = []
+        # Vecteurs stockés (réduits et quantifiés si configuré) et projection des requêtes
+        self.matrice: Optional[MatriceEmbeddings] = None
+        self.reduction: Optional[ReductionEmbeddings] = None
+        # Second index : diagnostics (nom, description, conseils), même projection
+        self.ids_diagnostics: Sequence[str] = []
+        self.matrice_diagnostics: Optional[MatriceEmbeddings] = None
+        
+        if chargement_asynchrone:
+            threading.Thread(target=self._charger_modele, name='chargement-modele', daemon=True).start()
+        else:
+            self._charger_modele()
+            if self.erreur_chargement is not None:
+                raise self.erreur_chargement
+    
+    def _charger_modele(self) -> None:
+        """Charge le modèle d'embeddings et signale la fin du chargement"""
+        try:
+            self.model = modele_partage(config.EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"[Vectorisation] Erreur chargement du modèle: {e}")
+            self.erreur_chargement = e
+        finally:
+            self._modele_charge.set()
     
-    def __init__(self):
-        """Initialise le modèle d'embeddings"""
-        print(f"[Vectorisation] Chargement du modèle {config.EMBEDDING_MODEL}...")
-        self.model = SentenceTransformer(config.EMBEDDING_MODEL)
-        self.symptomes_vectors = {}
-        print("[Vectorisation] Modèle chargé avec succès")
+    @property
+    def pret(self) -> bool:
+        """Modèle chargé et vecteurs des symptômes disponibles"""
+        return self.model is not None and self.matrice is not None
     
-    def vectoriser_symptomes(self, symptomes: List[Dict]) -> None:
+    def attendre_modele(self, timeout: Optional[float] = None) -> bool:
         """
-        Pré-calcule les vecteurs pour tous les symptômes de la base
+        Attend la fin du chargement du modèle
+        
+        Returns:
+            True si le modèle est utilisable
+        """
+        self._modele_charge.wait(timeout)
+        return self.model is not None
+    
+    def vectoriser_symptomes(
+        self,
+        symptomes: List[Dict],
+        dimensions: Optional[int] = None,
+        type_stockage: Optional[str] = None,
+        diagnostics: Optional[List[Dict]] = None
+    ) -> None:
+        """
+        Pré-calcule les vecteurs pour tous les symptômes (et diagnostics) de la base
+        
+        Symptômes et diagnostics sont encodés en un seul appel au modèle ; la
+        réduction éventuelle est ajustée sur l'ensemble, si bien qu'une requête
+        projetée une fois se compare aux deux index. Attend la fin du
+        chargement du modèle s'il est asynchrone.
         
         Args:
             symptomes: Liste des symptômes avec id et nom
+            dimensions: Dimensions après réduction (config.EMBEDDINGS_DIMENSIONS
+                par défaut, 0 = vecteurs complets)
+            type_stockage: 'float32', 'float16' ou 'int8'
+                (config.EMBEDDINGS_TYPE par défaut)
+            diagnostics: Diagnostics avec id, nom, description et conseils
+                (None = pas d'index des diagnostics)
+        """
+        if not self.attendre_modele():
+            raise RuntimeError(f"Modèle d'embeddings indisponible: {self.erreur_chargement}")
+        assert self.model is not None
+        diagnostics = diagnostics or []
+        
+        print(f"[Vectorisation] Vectorisation de {len(symptomes)} symptômes"
+              + (f" et {len(diagnostics)} diagnostics..." if diagnostics else "..."))
+        
+        textes = [s['nom'] for s in symptomes] + [texte_diagnostic(d) for d in diagnostics]
+        vectors = np.asarray(self.model.encode(textes, show_progress_bar=False), dtype=np.float32)
+        
+        reduction, matrice = preparer_vecteurs(
+            vectors,
+            config.EMBEDDINGS_DIMENSIONS if dimensions is None else dimensions,
+            type_stockage or config.EMBEDDINGS_TYPE
+        )
+        
+        # Les vecteurs individuels sont des vues sur la matrice (pas de copie)
+        ids = [s['id'] for s in symptomes]
+        self.ids_symptomes = ids
+        self.matrice = matrice.lignes(0, len(symptomes))
+        self.symptomes_vectors = VecteursParId(ids, {sid: i for i, sid in enumerate(ids)}, self.matrice.valeurs)
+        self.reduction = reduction
+        if diagnostics:
+            self.ids_diagnostics = [d['id'] for d in diagnostics]
+            self.matrice_diagnostics = matrice.lignes(len(symptomes))
+        
+        print(f"[Vectorisation] {len(textes)} vecteurs créés "
+              f"({matrice.dimensions} dimensions, {matrice.valeurs.dtype})")
+    
+    def charger_vecteurs(
+        self,
+        ids: Sequence[str],
+        index: Mapping[str, int],
+        matrice: MatriceEmbeddings,
+        reduction: Optional[ReductionEmbeddings] = None,
+        ids_diagnostics: Sequence[str] = (),
+        matrice_diagnostics: Optional[MatriceEmbeddings] = None
+    ) -> None:
+        """
+        Utilise des vecteurs déjà calculés (base compilée) au lieu de les encoder
+        
+        Args:
+            ids: ID du symptôme de chaque ligne
+            index: Ligne de chaque ID
+            matrice: Embeddings normalisés (lecture seule acceptée)
+            reduction: Projection des requêtes si les vecteurs sont réduits
+            ids_diagnostics: ID du diagnostic de chaque ligne de matrice_diagnostics
+            matrice_diagnostics: Embeddings des diagnostics (même projection)
+        """
+        self.ids_symptomes = ids
+        self.symptomes_vectors = VecteursParId(ids, index, matrice.valeurs)
+        self.reduction = reduction
+        self.matrice = matrice
+        self.ids_diagnostics = ids_diagnostics
+        self.matrice_diagnostics = matrice_diagnostics
+        print(f"[Vectorisation] {len(matrice)} vecteurs chargés depuis la base compilée "
+              f"({matrice.dimensions} dimensions, {matrice.valeurs.dtype})")
+    
+    def rapport_memoire(self, vus: Optional[Set[int]] = None) -> Dict[str, int]:
         """
-        print(f"[Vectorisation] Vectorisation de {len(symptomes)} symptômes...")
+        Octets occupés par le modèle, les vecteurs et la projection
         
-        textes = [s['nom'] for s in symptomes]
-        vectors = self.model.encode(textes, show_progress_bar=False)
+        Le modèle est compté par ses poids (le tokenizer natif n'est pas
+        visible depuis Python).
         
-        for symptome, vector in zip(symptomes, vectors):
-            self.symptomes_vectors[symptome['id']] = vector
+        Args:
+            vus: Objets déjà comptés par un autre service du même rapport
+        """
+        vus = set() if vus is None else vus
+        return {
+            'modele': taille_profonde(self.model, vus),
+            'vecteurs': taille_profonde([self.matrice, self.symptomes_vectors, self.ids_symptomes], vus),
+            'vecteurs_diagnostics': taille_profonde([self.matrice_diagnostics, self.ids_diagnostics], vus),
+            'reduction': taille_profonde(self.reduction, vus),
+        }
+    
+    def calculer_similarites(self, texte_libre: str) -> np.ndarray:
+        """
+        Calcule la similarité cosinus entre un texte et tous les symptômes
+        
+        Args:
+            texte_libre: Texte saisi par l'utilisateur
+            
+        Returns:
+            Scores alignés sur ids_symptomes
+        """
+        if self.matrice is None or self.model is None:
+            return np.zeros(0, dtype=np.float32)
+        
+        vector_utilisateur = self.model.encode([texte_libre], show_progress_bar=False)[0]
+        return self.similarites_vecteur(np.asarray(vector_utilisateur, dtype=np.float32))
+    
+    def similarites_vecteur(self, vecteur: np.ndarray) -> np.ndarray:
+        """
+        Similarité cosinus entre un embedding de requête et tous les symptômes
+        
+        Args:
+            vecteur: Embedding produit par le modèle (non normalisé accepté)
+            
+        Returns:
+            Scores alignés sur ids_symptomes
+        """
+        if self.matrice is None:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrice.produit(self._projeter(vecteur))
+    
+    def _projeter(self, vecteur: np.ndarray) -> np.ndarray:
+        """Embedding de requête normalisé, projeté comme les vecteurs stockés"""
+        vecteur = normaliser(np.asarray(vecteur, dtype=np.float32))
+        if self.reduction is not None:
+            vecteur = self.reduction.projeter(vecteur)
+        return vecteur
+    
+    def trouver_diagnostics_similaires(
+        self,
+        texte_libre: str,
+        top_k: int = 5,
+        seuil: float = 0.3
+    ) -> List[Tuple[str, float]]:
+        """
+        Trouve les diagnostics les plus proches d'une panne soupçonnée
+        
+        Args:
+            texte_libre: Texte saisi ("joint de culasse")
+            top_k: Nombre de résultats à retourner
+            seuil: Score minimum de similarité
+            
+        Returns:
+            Liste de tuples (diagnostic_id, score)
+        """
+        if not texte_libre.strip() or self.matrice_diagnostics is None or self.model is None:
+            return []
         
-        print(f"[Vectorisation] {len(self.symptomes_vectors)} vecteurs créés")
+        vecteur = self.model.encode([texte_libre], show_progress_bar=False)[0]
+        scores = self.matrice_diagnostics.produit(self._projeter(vecteur))
+        return self._classer(scores, self.ids_diagnostics, top_k, seuil)
     
     def trouver_symptomes_similaires(
         self, 
@@ -52,24 +302,34 @@ class VectorisationService:
         if not texte_libre.strip():
             return []
         
-        # Vectoriser le texte de l'utilisateur
-        vector_utilisateur = self.model.encode([texte_libre], show_progress_bar=False)[0]
+        # Similarité avec tous les symptômes en un seul produit matriciel
+        return self.classer_symptomes(self.calculer_similarites(texte_libre), top_k, seuil)
+    
+    def classer_symptomes(self, scores: np.ndarray, top_k: int = 5, seuil: float = 0.5) -> List[Tuple[str, float]]:
+        """
+        Retient les meilleurs symptômes d'un vecteur de scores
         
-        # Calculer la similarité avec tous les symptômes
-        similarites = []
-        for symptome_id, symptome_vector in self.symptomes_vectors.items():
-            score = cosine_similarity(
-                vector_utilisateur.reshape(1, -1),
-                symptome_vector.reshape(1, -1)
-            )[0][0]
+        Args:
+            scores: Scores alignés sur ids_symptomes
+            top_k: Nombre de résultats à retourner
+            seuil: Score minimum de similarité
             
-            if score >= seuil:
-                similarites.append((symptome_id, float(score)))
-        
-        # Trier par score décroissant
-        similarites.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            Liste de tuples (symptome_id, score)
+        """
+        return self._classer(scores, self.ids_symptomes, top_k, seuil)
+    
+    @staticmethod
+    def _classer(scores: np.ndarray, ids: Sequence[str], top_k: int, seuil: float) -> List[Tuple[str, float]]:
+        """Meilleurs identifiants d'un vecteur de scores aligné sur ids"""
+        # Trier par score décroissant (tri stable pour les égalités)
+        ordre = np.argsort(-scores, kind='stable')
         
-        return similarites[:top_k]
+        return [
+            (ids[i], float(scores[i]))
+            for i in ordre[:top_k]
+            if scores[i] >= seuil
+        ]
     
     def calculer_score_regle(
         self,
@@ -0,0 +1,137 @@
+"""
+Benchmarks des chemins critiques du moteur
+
+Usage:
+    python tests/benchmarks.py
+    python tests/benchmarks.py --json mesures.json
+
+Chaque mesure est le temps d'un appel en microsecondes (minimum sur
+plusieurs répétitions, le plus stable d'une exécution à l'autre). Une
+charge de calibration est mesurée en même temps pour comparer des
+machines différentes (voir perf_regression.py).
+"""
+import argparse
+import json
+import sys
+import os
+import timeit
+from typing import Callable, Dict, List, Optional
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+CAS = ['fumee_noire', 'consommation_elevee', 'perte_puissance']
+TEXTE = "le moteur fait du bruit et fume"
+TAILLE_LOT = 1000
+REPETITIONS = 5
+
+
+def _calibration() -> float:
+    """Charge de référence : boucle Python et petit produit matriciel"""
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    matrice = np.arange(64 * 64, dtype=np.float64).reshape(64, 64)
+    return total + float((matrice @ matrice)[0, 0])
+
+
+def mesurer(fonction: Callable[[], object], repetitions: int = REPETITIONS) -> float:
+    """Durée d'un appel en microsecondes (minimum des répétitions)"""
+    chronometre = timeit.Timer(fonction)
+    nombre, _ = chronometre.autorange()
+    return min(chronometre.repeat(repeat=repetitions, number=nombre)) / nombre * 1e6
+
+
+def construire_benchmarks(moteur) -> Dict[str, Callable[[], object]]:
+    """
+    Fonctions à mesurer pour un moteur chargé
+
+    Les mesures de similarité ne sont disponibles que si le modèle
+    d'embeddings est chargé ; similarite_symptomes exclut l'encodage (coût
+    du modèle) pour ne mesurer que le code du service.
+    """
+    poids = {sid: s.poids for sid, s in moteur.symptomes.items()}
+    regles = [(d.symptomes_requis, d.symptomes_optionnels or []) for d in moteur.diagnostics]
+    lot = [CAS[:1 + i % len(CAS)] for i in range(TAILLE_LOT)]
+
+    benchmarks: Dict[str, Callable[[], object]] = {
+        'calibration': _calibration,
+        'diagnostiquer': lambda: moteur.diagnostiquer(CAS),
+        f'diagnostiquer_lot_{TAILLE_LOT}': lambda: moteur.diagnostiquer_lot(lot),
+        'recherche_lexicale': lambda: moteur.rechercher_symptomes(TEXTE, mode='lexical'),
+        'autocompletion': lambda: moteur.autocompleter("fumee no"),
+    }
+
+    vectorisation = moteur.vectorisation
+    if vectorisation is not None:
+        # Score règle par règle (implémentation de référence du scoring matriciel)
+        benchmarks['calculer_score_regle'] = lambda: [
+            vectorisation.calculer_score_regle(CAS, requis, optionnels, poids)
+            for requis, optionnels in regles
+        ]
+
+    if vectorisation is not None and vectorisation.pret:
+        assert vectorisation.matrice is not None
+        dimensions = (vectorisation.reduction.composantes.shape[1] if vectorisation.reduction is not None
+                      else vectorisation.matrice.dimensions)
+        requete = np.random.default_rng(0).standard_normal(dimensions).astype(np.float32)
+        benchmarks['similarite_symptomes'] = lambda: vectorisation.classer_symptomes(
+            vectorisation.similarites_vecteur(requete))
+        benchmarks['trouver_symptomes_similaires'] = lambda: vectorisation.trouver_symptomes_similaires(TEXTE)
+    return benchmarks
+
+
+def charger_moteur():
+    """Moteur complet, ou sans embeddings si le modèle est indisponible"""
+    from services import MoteurDiagnostic
+
+    try:
+        return MoteurDiagnostic()
+    except Exception as e:
+        print(f"⚠️  Modèle indisponible ({e}) : benchmarks de similarité ignorés", file=sys.stderr)
+        return MoteurDiagnostic(avec_vectorisation=False)
+
+
+def executer_benchmarks(moteur=None, selection: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Exécute la suite de benchmarks
+
+    Args:
+        moteur: Moteur à mesurer (chargé par défaut)
+        selection: Noms des benchmarks à exécuter (tous par défaut)
+
+    Returns:
+        Durée d'un appel en microsecondes par benchmark
+    """
+    if moteur is None:
+        moteur = charger_moteur()
+    benchmarks = construire_benchmarks(moteur)
+
+    # Premier appel hors mesure : index paresseux, caches
+    for fonction in benchmarks.values():
+        fonction()
+
+    mesures = {}
+    for nom, fonction in benchmarks.items():
+        if selection and nom != 'calibration' and nom not in selection:
+            continue
+        mesures[nom] = round(mesurer(fonction), 3)
+    return mesures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques du moteur")
+    parser.add_argument('--json', metavar='FICHIER', help="Écrire les mesures en JSON")
+    args = parser.parse_args(argv)
+
+    mesures = executer_benchmarks()
+    for nom, duree in mesures.items():
+        print(f"{nom:<32}{duree:>12.2f} µs")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(mesures, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
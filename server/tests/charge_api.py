@@ -0,0 +1,280 @@
+"""
+Test de charge de l'API (serveur doit être lancé)
+
+Usage:
+    python tests/charge_api.py --concurrence 32 --duree 30
+    python tests/charge_api.py --melange symptomes=1,rechercher=2,diagnostiquer=7 --json rapport.json
+
+Des threads clients envoient en boucle des requêtes GET /symptomes,
+POST /rechercher et POST /diagnostiquer selon le mélange demandé, chacun sur
+sa propre connexion HTTP persistante. Le rapport donne, par endpoint, le
+débit, la répartition des codes HTTP et les latences p50/p95/p99, en texte
+et en JSON. Bibliothèque standard uniquement.
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+ENDPOINTS = ('symptomes', 'rechercher', 'diagnostiquer')
+MELANGE_DEFAUT = 'symptomes=1,rechercher=3,diagnostiquer=6'
+
+TEXTES_RECHERCHE = [
+    "le moteur fait du bruit",
+    "fumée noire à l'échappement",
+    "la voiture ne démarre pas",
+    "problème de freins",
+    "la batterie se décharge",
+    "odeur de brûlé",
+    "vibrations dans le volant",
+    "voyant moteur allumé",
+]
+
+
+def analyser_melange(texte: str) -> Dict[str, float]:
+    """
+    Lit un mélange 'endpoint=poids,...'
+
+    Raises:
+        ValueError: Endpoint inconnu, poids invalide ou mélange vide
+    """
+    melange = {}
+    for element in texte.split(','):
+        if not element.strip():
+            continue
+        nom, _, poids = element.partition('=')
+        nom = nom.strip()
+        if nom not in ENDPOINTS:
+            raise ValueError(f"Endpoint inconnu: {nom} ({', '.join(ENDPOINTS)})")
+        melange[nom] = float(poids) if poids else 1.0
+        if melange[nom] < 0:
+            raise ValueError(f"Poids négatif pour {nom}")
+    if not melange or sum(melange.values()) <= 0:
+        raise ValueError("Mélange vide")
+    return melange
+
+
+def percentile(valeurs_triees: Sequence[float], p: float) -> float:
+    """Percentile au rang le plus proche d'une liste déjà triée"""
+    if not valeurs_triees:
+        return 0.0
+    rang = max(1, min(len(valeurs_triees), int(-(-p * len(valeurs_triees) // 100))))
+    return valeurs_triees[rang - 1]
+
+
+class _Client:
+    """Connexion HTTP persistante d'un thread de charge"""
+
+    def __init__(self, url: str, timeout: float):
+        morceaux = urlsplit(url)
+        self._classe = http.client.HTTPSConnection if morceaux.scheme == 'https' else http.client.HTTPConnection
+        self._hote = morceaux.netloc
+        self._prefixe = morceaux.path.rstrip('/')
+        self._timeout = timeout
+        self._connexion: Optional[http.client.HTTPConnection] = None
+
+    def envoyer(self, methode: str, chemin: str, corps: Optional[dict] = None) -> Tuple[int, bytes]:
+        """Envoie une requête ; statut 0 en cas d'erreur réseau"""
+        contenu = json.dumps(corps).encode('utf-8') if corps is not None else None
+        entetes = {'Content-Type': 'application/json'} if contenu is not None else {}
+        reutilisee = self._connexion is not None
+        if self._connexion is None:
+            self._connexion = self._classe(self._hote, timeout=self._timeout)
+        try:
+            self._connexion.request(methode, self._prefixe + chemin, body=contenu, headers=entetes)
+            reponse = self._connexion.getresponse()
+            return reponse.status, reponse.read()
+        except (OSError, http.client.HTTPException):
+            self.fermer()
+            # Connexion persistante fermée par le serveur entre deux requêtes
+            if reutilisee:
+                return self.envoyer(methode, chemin, corps)
+            return 0, b''
+
+    def fermer(self) -> None:
+        if self._connexion is not None:
+            self._connexion.close()
+            self._connexion = None
+
+
+def _requete(endpoint: str, generateur: random.Random, ids_symptomes: List[str]) -> Tuple[str, str, Optional[dict]]:
+    """Méthode, chemin et corps d'une requête aléatoire pour un endpoint"""
+    if endpoint == 'symptomes':
+        return 'GET', '/symptomes', None
+    if endpoint == 'rechercher':
+        return 'POST', '/rechercher', {'texte': generateur.choice(TEXTES_RECHERCHE)}
+    nombre = generateur.randint(1, min(3, len(ids_symptomes)))
+    return 'POST', '/diagnostiquer', {'symptomes': generateur.sample(ids_symptomes, nombre)}
+
+
+def executer_charge(
+    url: str,
+    duree: float,
+    concurrence: int,
+    melange: Dict[str, float],
+    timeout: float = 10.0,
+    graine: int = 0
+) -> Dict:
+    """
+    Lance la charge et mesure chaque requête
+
+    Args:
+        url: Adresse de l'API
+        duree: Durée de la charge en secondes
+        concurrence: Nombre de threads clients
+        melange: Poids de chaque endpoint
+        timeout: Délai maximal d'une requête en secondes
+        graine: Graine des tirages aléatoires (reproductibilité)
+
+    Returns:
+        Rapport (voir construire_rapport)
+
+    Raises:
+        RuntimeError: API injoignable
+    """
+    client = _Client(url, timeout)
+    statut, contenu = client.envoyer('GET', '/symptomes')
+    client.fermer()
+    if statut != 200:
+        raise RuntimeError(f"API injoignable sur {url} (statut {statut})")
+    ids_symptomes = [s['id'] for s in json.loads(contenu)['symptomes']]
+
+    endpoints = list(melange)
+    poids = [melange[e] for e in endpoints]
+    mesures: List[List[Tuple[str, int, float]]] = [[] for _ in range(concurrence)]
+    fin = time.perf_counter() + duree
+
+    def travailler(numero: int) -> None:
+        generateur = random.Random(graine + numero)
+        client = _Client(url, timeout)
+        try:
+            while time.perf_counter() < fin:
+                endpoint = generateur.choices(endpoints, poids)[0]
+                methode, chemin, corps = _requete(endpoint, generateur, ids_symptomes)
+                debut = time.perf_counter()
+                statut, _ = client.envoyer(methode, chemin, corps)
+                mesures[numero].append((endpoint, statut, time.perf_counter() - debut))
+        finally:
+            client.fermer()
+
+    debut = time.perf_counter()
+    threads = [threading.Thread(target=travailler, args=(i,), daemon=True) for i in range(concurrence)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ecoule = time.perf_counter() - debut
+
+    return construire_rapport([m for liste in mesures for m in liste], ecoule, url, concurrence, melange)
+
+
+def construire_rapport(
+    mesures: List[Tuple[str, int, float]],
+    ecoule: float,
+    url: str,
+    concurrence: int,
+    melange: Dict[str, float]
+) -> Dict:
+    """
+    Agrège les mesures (endpoint, statut, latence en secondes)
+
+    Les requêtes réussies sont les réponses 2xx ; les 503 du contrôle
+    d'admission sont comptés à part des autres erreurs.
+    """
+    def statistiques(selection: List[Tuple[str, int, float]]) -> Dict:
+        latences = sorted(latence * 1000 for _, _, latence in selection)
+        statuts: Dict[str, int] = {}
+        for _, statut, _ in selection:
+            statuts[str(statut)] = statuts.get(str(statut), 0) + 1
+        reussies = sum(1 for _, statut, _ in selection if 200 <= statut < 300)
+        delestees = statuts.get('503', 0)
+        return {
+            'requetes': len(selection),
+            'reussies': reussies,
+            'delestees': delestees,
+            'erreurs': len(selection) - reussies - delestees,
+            'debit': round(len(selection) / ecoule, 1) if ecoule > 0 else 0.0,
+            'debit_utile': round(reussies / ecoule, 1) if ecoule > 0 else 0.0,
+            'latence_ms': {
+                'p50': round(percentile(latences, 50), 2),
+                'p95': round(percentile(latences, 95), 2),
+                'p99': round(percentile(latences, 99), 2),
+                'max': round(latences[-1], 2) if latences else 0.0,
+            },
+            'statuts': statuts,
+        }
+
+    return {
+        'url': url,
+        'duree_s': round(ecoule, 2),
+        'concurrence': concurrence,
+        'melange': melange,
+        'total': statistiques(mesures),
+        'endpoints': {
+            endpoint: statistiques([m for m in mesures if m[0] == endpoint])
+            for endpoint in melange
+        },
+    }
+
+
+def formater_rapport(rapport: Dict) -> str:
+    """Tableau texte du rapport"""
+    lignes = [
+        f"Charge sur {rapport['url']} : {rapport['concurrence']} clients pendant {rapport['duree_s']}s",
+        "",
+        f"{'endpoint':<15}{'requêtes':>10}{'req/s':>9}{'utiles/s':>10}{'503':>7}{'erreurs':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}",
+    ]
+    for nom, stats in list(rapport['endpoints'].items()) + [('total', rapport['total'])]:
+        latence = stats['latence_ms']
+        lignes.append(
+            f"{nom:<15}{stats['requetes']:>10}{stats['debit']:>9}{stats['debit_utile']:>10}"
+            f"{stats['delestees']:>7}{stats['erreurs']:>9}"
+            f"{latence['p50']:>9}{latence['p95']:>9}{latence['p99']:>9}"
+        )
+    return "\n".join(lignes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Test de charge concurrent de l'API de diagnostic")
+    parser.add_argument('--url', default='http://localhost:5000', help="Adresse de l'API")
+    parser.add_argument('--duree', type=float, default=10.0, help="Durée en secondes")
+    parser.add_argument('--concurrence', type=int, default=8, help="Nombre de clients simultanés")
+    parser.add_argument('--melange', default=MELANGE_DEFAUT,
+                        help=f"Poids des endpoints (défaut: {MELANGE_DEFAUT})")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Délai maximal par requête (s)")
+    parser.add_argument('--graine', type=int, default=0, help="Graine des tirages aléatoires")
+    parser.add_argument('--json', metavar='FICHIER', help="Écrire le rapport JSON ('-' = sortie standard)")
+    args = parser.parse_args(argv)
+
+    try:
+        melange = analyser_melange(args.melange)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.concurrence < 1 or args.duree <= 0:
+        parser.error("--concurrence et --duree doivent être positifs")
+
+    try:
+        rapport = executer_charge(args.url, args.duree, args.concurrence, melange, args.timeout, args.graine)
+    except RuntimeError as e:
+        print(f"❌ {e}. Lancez d'abord: python api.py", file=sys.stderr)
+        return 2
+
+    sortie_texte = sys.stderr if args.json == '-' else sys.stdout
+    print(formater_rapport(rapport), file=sortie_texte)
+    if args.json == '-':
+        print(json.dumps(rapport, indent=2, ensure_ascii=False))
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+    return 1 if rapport['total']['erreurs'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Contrôle des régressions de performance
+
+Usage:
+    python tests/perf_regression.py                    # compare à la référence
+    python tests/perf_regression.py --mettre-a-jour    # enregistre la référence
+
+Exécute tests/benchmarks.py et compare chaque mesure à la référence
+enregistrée dans tests/perf_reference.json. Les durées sont ramenées à la
+machine de référence par le rapport des calibrations, puis comparées avec
+la tolérance de la mesure (ou la tolérance globale). Une mesure hors
+tolérance est reprise (avec la calibration) avant de conclure, pour ne pas
+échouer sur un pic de charge passager de la machine. Code de sortie 1 si
+un chemin critique a ralenti au-delà de sa tolérance.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from tests.benchmarks import charger_moteur, executer_benchmarks
+
+REFERENCE_DEFAUT = os.path.join(os.path.dirname(__file__), 'perf_reference.json')
+TOLERANCE_DEFAUT = 0.30  # Ralentissement accepté (+30%)
+ESSAIS = 3               # Mesures d'une régression avant de la confirmer
+
+
+def comparer(mesures: Dict[str, float], reference: Dict) -> Tuple[List[str], List[str]]:
+    """
+    Compare des mesures à une référence
+
+    Args:
+        mesures: Durées en µs, calibration comprise
+        reference: Contenu de perf_reference.json
+
+    Returns:
+        (régressions, lignes du rapport)
+    """
+    tolerance_globale = reference.get('tolerance', TOLERANCE_DEFAUT)
+    facteur = mesures['calibration'] / reference['calibration_us']
+    lignes = [
+        f"Calibration : {mesures['calibration']:.1f} µs (référence {reference['calibration_us']:.1f} µs, "
+        f"machine ×{facteur:.2f})",
+        "",
+        f"{'mesure':<32}{'référence':>12}{'attendu':>12}{'mesuré':>12}{'écart':>9}{'tolérance':>11}  statut",
+    ]
+    regressions = []
+
+    for nom, duree in mesures.items():
+        if nom == 'calibration':
+            continue
+        entree = reference['mesures'].get(nom)
+        if entree is None:
+            lignes.append(f"{nom:<32}{'-':>12}{'-':>12}{duree:>12.2f}{'':>9}{'':>11}  sans référence")
+            continue
+
+        tolerance = entree.get('tolerance', tolerance_globale)
+        attendu = entree['us'] * facteur
+        ecart = duree / attendu - 1
+        if ecart > tolerance:
+            statut = "❌ RÉGRESSION"
+            regressions.append(nom)
+        elif ecart < -tolerance:
+            statut = "⚡ plus rapide (mettre à jour la référence)"
+        else:
+            statut = "✓"
+        lignes.append(f"{nom:<32}{entree['us']:>12.2f}{attendu:>12.2f}{duree:>12.2f}"
+                      f"{ecart:>+9.0%}{tolerance:>+11.0%}  {statut}")
+
+    for nom in reference['mesures']:
+        if nom not in mesures:
+            lignes.append(f"{nom:<32}{reference['mesures'][nom]['us']:>12.2f}{'':>12}{'-':>12}{'':>9}{'':>11}  non mesuré")
+    return regressions, lignes
+
+
+def mettre_a_jour(chemin: str, mesures: Dict[str, float]) -> None:
+    """Enregistre les mesures comme référence, en conservant les tolérances"""
+    reference: Dict = {'calibration_us': 0.0, 'tolerance': TOLERANCE_DEFAUT, 'mesures': {}}
+    if os.path.exists(chemin):
+        with open(chemin, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+
+    reference['calibration_us'] = mesures['calibration']
+    for nom, duree in mesures.items():
+        if nom != 'calibration':
+            reference['mesures'].setdefault(nom, {})['us'] = duree
+
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Compare les benchmarks à la référence enregistrée")
+    parser.add_argument('--reference', default=REFERENCE_DEFAUT, help="Fichier de référence JSON")
+    parser.add_argument('--mettre-a-jour', action='store_true',
+                        help="Enregistrer les mesures comme nouvelle référence")
+    parser.add_argument('--essais', type=int, default=ESSAIS,
+                        help=f"Mesures d'une régression avant de la confirmer (défaut: {ESSAIS})")
+    parser.add_argument('--benchmark', action='append', dest='selection', metavar='NOM',
+                        help="Limiter à un benchmark (répétable)")
+    args = parser.parse_args(argv)
+
+    moteur = charger_moteur()
+    mesures = executer_benchmarks(moteur, args.selection)
+
+    if args.mettre_a_jour:
+        mettre_a_jour(args.reference, mesures)
+        print(f"✓ Référence enregistrée dans {args.reference} ({len(mesures) - 1} mesures)")
+        return 0
+
+    if not os.path.exists(args.reference):
+        print(f"❌ Référence introuvable: {args.reference} (lancer avec --mettre-a-jour)")
+        return 2
+    with open(args.reference, 'r', encoding='utf-8') as f:
+        reference = json.load(f)
+
+    regressions, lignes = comparer(mesures, reference)
+    for _ in range(args.essais - 1):
+        if not regressions:
+            break
+        # Meilleure durée de chaque essai, calibration comprise
+        reprise = executer_benchmarks(moteur, regressions)
+        mesures = {nom: min(duree, reprise.get(nom, duree)) for nom, duree in mesures.items()}
+        regressions, lignes = comparer(mesures, reference)
+    print("\n".join(lignes))
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) de performance: {', '.join(regressions)}")
+        return 1
+    print("\n✅ Aucune régression de performance")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -69,7 +69,31 @@ def main():
     else:
         print("\n⏭️  Tests d'intégration ignorés")
         resultats.append(('Tests d\'Intégration', None))
-    
+
+    # Régressions de performance (comparées à tests/perf_reference.json)
+    print("\n" + "⏱️ " * 35)
+    print("PHASE 3: RÉGRESSIONS DE PERFORMANCE")
+    print("⏱️ " * 35)
+
+    print("\nVoulez-vous comparer les benchmarks à la référence ? (o/n)")
+
+    reponse = input().strip().lower()
+
+    if reponse in ['o', 'oui', 'y', 'yes']:
+        print("\n" + "=" * 70)
+        print("📋 Benchmarks des Chemins Critiques")
+        print("=" * 70)
+        try:
+            from tests.perf_regression import main as controler_performances
+            success = controler_performances([]) == 0
+        except Exception as e:
+            print(f"\n❌ ERREUR dans perf_regression.py: {e}")
+            success = False
+        resultats.append(('Régressions de Performance', success))
+    else:
+        print("\n⏭️  Contrôle de performance ignoré")
+        resultats.append(('Régressions de Performance', None))
+
     # Résumé final
     print("\n" + "=" * 70)
     print("📊 RÉSUMÉ DES TESTS")
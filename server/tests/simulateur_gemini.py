@@ -0,0 +1,206 @@
+"""
+Simulateur local de l'API Gemini (tests de charge hors ligne)
+
+Usage:
+    python tests/simulateur_gemini.py --latence-ms 800 --dispersion 0.5
+    python tests/simulateur_gemini.py --taux-erreur 0.05 --taux-blocage 0.02 --morceaux 5
+    IA_SIMULATEUR_URL=http://127.0.0.1:8765 python api.py
+
+Répond à POST /v1beta/models/<modele>:generateContent comme l'API REST de
+Gemini, après une latence tirée d'une loi log-normale (médiane et
+dispersion). Une fraction des requêtes reçoit une erreur HTTP, une autre ne
+reçoit jamais de réponse (délais dépassés côté client). Avec --morceaux, la
+réponse est envoyée en plusieurs morceaux espacés, comme une génération en
+flux. Bibliothèque standard uniquement.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+PREFIXE_CHEMIN = '/v1beta/models/'
+SUFFIXE_CHEMIN = ':generateContent'
+
+
+@dataclass
+class ParametresSimulation:
+    """Comportement du simulateur"""
+    latence_ms: float = 800.0       # Médiane du délai avant le premier octet
+    dispersion: float = 0.5         # Écart-type du log de la latence (0 = constante)
+    taux_erreur: float = 0.0        # Fraction des requêtes en erreur
+    code_erreur: int = 503
+    taux_blocage: float = 0.0       # Fraction des requêtes sans réponse
+    duree_blocage: float = 300.0    # Secondes avant fermeture d'une requête bloquée
+    morceaux: int = 1               # Morceaux de la réponse (1 = réponse d'un bloc)
+    intervalle_ms: float = 50.0     # Délai entre deux morceaux
+    graine: Optional[int] = None
+
+
+def tirer_latence(generateur: random.Random, mediane_ms: float, dispersion: float) -> float:
+    """Latence log-normale en secondes"""
+    if dispersion <= 0:
+        return mediane_ms / 1000
+    return generateur.lognormvariate(math.log(max(mediane_ms, 1e-3)), dispersion) / 1000
+
+
+def texte_simule(prompt: str) -> str:
+    """Explication déterministe construite depuis le prompt de AssistantIA"""
+    diagnostic = next(
+        (ligne.partition(':')[2].strip() for ligne in prompt.splitlines() if ligne.startswith('Diagnostic')),
+        'ce problème'
+    )
+    return (f"Votre véhicule présente probablement : {diagnostic}. "
+            "Un mécanicien pourra confirmer rapidement. Explication simulée.")
+
+
+class _Gestionnaire(BaseHTTPRequestHandler):
+    """Une requête generateContent"""
+    server: 'ServeurSimulateur'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _envoyer_json(self, statut: int, donnees: Dict, morceaux: int = 1, intervalle: float = 0.0) -> None:
+        corps = json.dumps(donnees, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Connection', 'close')
+        if morceaux <= 1:
+            self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+
+        # Sans Content-Length : le corps se termine à la fermeture de la connexion
+        taille = -(-len(corps) // max(morceaux, 1))
+        try:
+            for debut in range(0, len(corps), taille):
+                if debut:
+                    time.sleep(intervalle)
+                self.wfile.write(corps[debut:debut + taille])
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client parti (délai dépassé)
+
+    def do_POST(self):
+        self.close_connection = True
+        if not (self.path.startswith(PREFIXE_CHEMIN) and self.path.endswith(SUFFIXE_CHEMIN)):
+            self._envoyer_json(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+            return
+        try:
+            longueur = int(self.headers.get('Content-Length', 0))
+            requete = json.loads(self.rfile.read(longueur))
+            prompt = ''.join(p.get('text', '') for c in requete['contents'] for p in c['parts'])
+        except (ValueError, KeyError, TypeError):
+            self._envoyer_json(400, {'error': {'code': 400, 'message': 'Invalid request', 'status': 'INVALID_ARGUMENT'}})
+            return
+
+        parametres = self.server.parametres
+        issue, latence = self.server.tirer_issue()
+        if issue == 'blocage':
+            time.sleep(parametres.duree_blocage)
+            return
+        time.sleep(latence)
+        if issue == 'erreur':
+            self._envoyer_json(parametres.code_erreur, {'error': {
+                'code': parametres.code_erreur, 'message': 'Erreur simulée', 'status': 'UNAVAILABLE'}})
+            return
+        self._envoyer_json(200, {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': texte_simule(prompt)}]},
+                'finishReason': 'STOP',
+            }],
+            'usageMetadata': {'promptTokenCount': len(prompt.split())},
+        }, parametres.morceaux, parametres.intervalle_ms / 1000)
+
+
+class ServeurSimulateur(ThreadingHTTPServer):
+    """Serveur HTTP du simulateur (un thread par requête)"""
+    daemon_threads = True
+    request_queue_size = 1024  # Rafales de connexions des tests de charge
+
+    def __init__(self, adresse, parametres: ParametresSimulation):
+        super().__init__(adresse, _Gestionnaire)
+        self.parametres = parametres
+        self._generateur = random.Random(parametres.graine)
+        self._verrou = threading.Lock()
+        self.compteurs = {'requetes': 0, 'succes': 0, 'erreur': 0, 'blocage': 0}
+
+    @property
+    def url(self) -> str:
+        hote, port = self.server_address[:2]
+        return f"http://{hote}:{port}"
+
+    def tirer_issue(self):
+        """(issue, latence en s) d'une requête : 'succes', 'erreur' ou 'blocage'"""
+        p = self.parametres
+        with self._verrou:
+            tirage = self._generateur.random()
+            latence = tirer_latence(self._generateur, p.latence_ms, p.dispersion)
+            if tirage < p.taux_blocage:
+                issue = 'blocage'
+            elif tirage < p.taux_blocage + p.taux_erreur:
+                issue = 'erreur'
+            else:
+                issue = 'succes'
+            self.compteurs['requetes'] += 1
+            self.compteurs[issue] += 1
+        return issue, latence
+
+
+def demarrer(parametres: ParametresSimulation, hote: str = '127.0.0.1', port: int = 0) -> ServeurSimulateur:
+    """Lance le simulateur dans un thread démon (port 0 = port libre)"""
+    serveur = ServeurSimulateur((hote, port), parametres)
+    threading.Thread(target=serveur.serve_forever, name='simulateur-gemini', daemon=True).start()
+    return serveur
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande"""
+    defauts = ParametresSimulation()
+    parser = argparse.ArgumentParser(description="Simulateur local de l'API Gemini")
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latence-ms', type=float, default=defauts.latence_ms,
+                        help="Latence médiane avant le premier octet (ms)")
+    parser.add_argument('--dispersion', type=float, default=defauts.dispersion,
+                        help="Dispersion log-normale de la latence (0 = constante)")
+    parser.add_argument('--taux-erreur', type=float, default=0.0, help="Fraction de réponses en erreur")
+    parser.add_argument('--code-erreur', type=int, default=defauts.code_erreur, help="Code HTTP des erreurs")
+    parser.add_argument('--taux-blocage', type=float, default=0.0, help="Fraction de requêtes sans réponse")
+    parser.add_argument('--morceaux', type=int, default=1, help="Réponse envoyée en N morceaux")
+    parser.add_argument('--intervalle-ms', type=float, default=defauts.intervalle_ms,
+                        help="Délai entre deux morceaux (ms)")
+    parser.add_argument('--graine', type=int, default=None, help="Graine des tirages aléatoires")
+    args = parser.parse_args(argv)
+
+    if not (0 <= args.taux_erreur <= 1 and 0 <= args.taux_blocage <= 1
+            and args.taux_erreur + args.taux_blocage <= 1):
+        parser.error("--taux-erreur et --taux-blocage doivent être des fractions de somme <= 1")
+    if args.morceaux < 1 or args.latence_ms < 0:
+        parser.error("--morceaux doit être >= 1 et --latence-ms positive")
+
+    parametres = ParametresSimulation(
+        latence_ms=args.latence_ms, dispersion=args.dispersion,
+        taux_erreur=args.taux_erreur, code_erreur=args.code_erreur,
+        taux_blocage=args.taux_blocage, morceaux=args.morceaux,
+        intervalle_ms=args.intervalle_ms, graine=args.graine,
+    )
+    serveur = ServeurSimulateur((args.hote, args.port), parametres)
+    print(f"Simulateur Gemini sur {serveur.url} (IA_SIMULATEUR_URL={serveur.url})")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        print(f"\n{serveur.compteurs}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
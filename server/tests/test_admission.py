@@ -0,0 +1,131 @@
+"""Tests du contrôle d'admission"""
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from utils.admission import ControleAdmission, ErreurSurcharge
+
+def _occuper(controle, duree, demarre):
+    with controle.admettre():
+        demarre.set()
+        time.sleep(duree)
+
+def test_attente_maximale():
+    """Test refus après l'attente maximale en file"""
+    print("\n=== Test Attente Maximale ===")
+
+    controle = ControleAdmission('test', concurrence=1, file_max=4, attente_max=0.05)
+    demarre = threading.Event()
+    occupant = threading.Thread(target=_occuper, args=(controle, 0.3, demarre))
+    occupant.start()
+    demarre.wait()
+
+    debut = time.perf_counter()
+    try:
+        with controle.admettre():
+            assert False, "Requête admise malgré la place occupée"
+    except ErreurSurcharge as e:
+        assert e.retry_after >= 1
+        assert 'attente' in str(e)
+    assert time.perf_counter() - debut < 0.25
+    print("✓ Refus après attente_max, sans attendre la fin du traitement")
+
+    occupant.join()
+    with controle.admettre():
+        pass
+    stats = controle.statistiques()
+    assert stats['rejets'] == 1 and stats['en_cours'] == 0 and stats['en_attente'] == 0
+    print(f"✓ Place libérée et statistiques cohérentes: {stats}")
+
+def test_file_pleine():
+    """Test refus immédiat quand la file est pleine"""
+    print("\n=== Test File Pleine ===")
+
+    controle = ControleAdmission('test', concurrence=1, file_max=0, attente_max=5)
+    demarre = threading.Event()
+    occupant = threading.Thread(target=_occuper, args=(controle, 0.2, demarre))
+    occupant.start()
+    demarre.wait()
+
+    debut = time.perf_counter()
+    try:
+        with controle.admettre():
+            assert False, "Requête admise malgré la file pleine"
+    except ErreurSurcharge as e:
+        assert 'file' in str(e)
+    assert time.perf_counter() - debut < 0.1
+    occupant.join()
+    print("✓ Refus immédiat sans attente")
+
+def test_concurrence():
+    """Test nombre maximal de requêtes simultanées"""
+    print("\n=== Test Concurrence ===")
+
+    controle = ControleAdmission('test', concurrence=3, file_max=20, attente_max=5)
+    maximum = [0]
+    verrou = threading.Lock()
+
+    def traiter():
+        with controle.admettre():
+            with verrou:
+                maximum[0] = max(maximum[0], controle.statistiques()['en_cours'])
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=traiter) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert maximum[0] <= 3
+    assert controle.statistiques()['rejets'] == 0
+    print(f"✓ 12 requêtes servies, au plus {maximum[0]} simultanées")
+
+def test_endpoints_recherche():
+    """Test Flask : seul l'encodage attend une place, les réponses lexicales passent"""
+    print("\n=== Test Endpoints Recherche ===")
+
+    import api
+
+    api.moteur.attendre_vectorisation()
+    precedent = api.admission_recherche
+    api.admission_recherche = ControleAdmission('recherche', concurrence=1, file_max=0, attente_max=0.01)
+    try:
+        client = api.app.test_client()
+        nom = next(iter(api.moteur.symptomes.values())).nom
+        with api.admission_recherche.admettre():  # Encodage saturé
+            reponse = client.post('/rechercher', json={'texte': nom})
+            assert reponse.status_code == 200 and reponse.get_json()['resultats'], reponse.get_json()
+            print("✓ Correspondance lexicale sûre servie sans place d'admission")
+
+            for route in ('/rechercher', '/rechercher/diagnostics'):
+                reponse = client.post(route, json={'texte': 'un bruit bizarre quand je roule'})
+                assert reponse.status_code == 503 and int(reponse.headers['Retry-After']) >= 1
+                assert reponse.get_json()['succes'] is False
+            assert client.post('/rechercher', json={'texte': ''}).status_code == 400
+            print("✓ Encodage saturé : 503 avec Retry-After, validation toujours servie")
+
+        assert client.post('/rechercher', json={'texte': 'un bruit bizarre quand je roule'}).status_code == 200
+        assert api.admission_recherche.statistiques()['en_cours'] == 0
+        print("✓ Place libérée après l'encodage")
+    finally:
+        api.admission_recherche = precedent
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS CONTRÔLE D'ADMISSION")
+    print("=" * 50)
+
+    try:
+        test_attente_maximale()
+        test_file_pleine()
+        test_concurrence()
+        test_endpoints_recherche()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS CONTRÔLE D'ADMISSION PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -1,6 +1,9 @@
 """Tests de l'API en direct (serveur doit être lancé)"""
+import sys
+import os
 import requests
 import json
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 API_URL = "http://localhost:5000"
 
@@ -35,6 +38,17 @@ def test_get_symptomes():
         for symptome in data['symptomes'][:3]:
             print(f"  - {symptome['nom']} (poids: {symptome['poids']})")
         
+        # Une catégorie, deux symptômes par page
+        categorie = data['categories'][0]
+        response = requests.get(f"{API_URL}/symptomes", params={'categorie': categorie['categorie'], 'limit': 2})
+        page = response.json()
+        assert page['total'] == categorie['total'] and len(page['symptomes']) <= 2
+        if page['curseur_suivant']:
+            response = requests.get(f"{API_URL}/symptomes", params={
+                'categorie': categorie['categorie'], 'limit': 2, 'curseur': page['curseur_suivant']})
+            assert response.status_code == 200 and response.json()['symptomes']
+        print(f"✓ {len(data['categories'])} catégories, pagination de '{categorie['categorie']}'")
+        
         return True
     except Exception as e:
         print(f"❌ Erreur: {e}")
@@ -192,6 +206,25 @@ def test_validation_erreurs():
         print(f"❌ Erreur: {e}")
         return False
 
+def test_charge_concurrente():
+    """Test de l'API sous charge concurrente (voir tests/charge_api.py)"""
+    print("\n=== Test Charge Concurrente ===")
+    
+    try:
+        from tests.charge_api import executer_charge, analyser_melange, formater_rapport
+        
+        rapport = executer_charge(API_URL, 5, 8, analyser_melange("symptomes=1,rechercher=3,diagnostiquer=6"))
+        print(formater_rapport(rapport))
+        
+        total = rapport['total']
+        assert total['erreurs'] == 0, f"{total['erreurs']} erreurs: {total['statuts']}"
+        assert total['reussies'] > 0
+        print(f"✓ {total['reussies']} requêtes réussies sur 8 clients simultanés")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        return False
+
 def main():
     """Exécute tous les tests de l'API"""
     print("=" * 70)
@@ -212,6 +245,7 @@ def main():
     resultats.append(("POST /diagnostiquer (exact)", test_diagnostic_exact()))
     resultats.append(("POST /diagnostiquer (partiel)", test_diagnostic_partiel()))
     resultats.append(("Validation erreurs", test_validation_erreurs()))
+    resultats.append(("Charge concurrente", test_charge_concurrente()))
     
     # Résumé
     print("\n" + "=" * 70)
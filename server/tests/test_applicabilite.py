@@ -0,0 +1,163 @@
+"""Tests de l'applicabilité des règles selon le véhicule"""
+import sys
+import os
+import random
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import config
+from models import Diagnostic, Vehicule
+from services import MoteurDiagnostic
+from services.applicabilite import IndexApplicabilite, normaliser_valeur
+from services.base_compilee import BaseCompilee, compiler_base
+
+CARBURANTS = ['diesel', 'essence', 'hybride']
+MARQUES = ['Peugeot', 'Renault', 'Citroën', 'Toyota']
+
+def _regle(i, **applicabilite):
+    return Diagnostic(id=f'r{i}', nom=f'Règle {i}', description='', gravite='Léger',
+                      cout_min=0, cout_max=0, symptomes_requis=['fumee_noire'], **applicabilite)
+
+def _applicable(regle, vehicule):
+    """Référence : parcours de la règle champ par champ"""
+    if vehicule.carburant is not None and regle.carburants and \
+            normaliser_valeur(vehicule.carburant) not in {normaliser_valeur(c) for c in regle.carburants}:
+        return False
+    if vehicule.marque is not None and regle.marques and \
+            normaliser_valeur(vehicule.marque) not in {normaliser_valeur(m) for m in regle.marques}:
+        return False
+    for valeur, minimum, maximum in [(vehicule.annee, regle.annee_min, regle.annee_max),
+                                     (vehicule.kilometrage, regle.kilometrage_min, regle.kilometrage_max)]:
+        if valeur is None:
+            continue
+        if (minimum is not None and valeur < minimum) or (maximum is not None and valeur > maximum):
+            return False
+    return True
+
+def _regles_aleatoires(generateur, nombre):
+    regles = []
+    for i in range(nombre):
+        champs = {}
+        if generateur.random() < 0.4:
+            champs['carburants'] = generateur.sample(CARBURANTS, generateur.randint(1, 2))
+        if generateur.random() < 0.3:
+            champs['marques'] = generateur.sample(MARQUES, generateur.randint(1, 2))
+        if generateur.random() < 0.3:
+            champs['annee_min'] = generateur.randint(1995, 2015)
+        if generateur.random() < 0.3:
+            champs['annee_max'] = generateur.randint(2005, 2025)
+        if generateur.random() < 0.3:
+            champs['kilometrage_min'] = generateur.choice([50000, 100000, 150000])
+        regles.append(_regle(i, **champs))
+    return regles
+
+def _vehicules_aleatoires(generateur, nombre):
+    return [Vehicule(
+        carburant=generateur.choice(CARBURANTS + ['GPL', None]),
+        marque=generateur.choice(MARQUES + ['citroen', 'Fiat', None]),
+        annee=generateur.choice([None, 1990, 2005, 2010, 2015, 2025]),
+        kilometrage=generateur.choice([None, 0, 49999, 50000, 150000, 300000]),
+    ) for _ in range(nombre)]
+
+def test_index_bitmap():
+    """Test index comparé à un parcours de toutes les règles"""
+    print("\n=== Test Index Bitmap ===")
+
+    generateur = random.Random(4)
+    regles = _regles_aleatoires(generateur, 300)
+    index = IndexApplicabilite.depuis_regles(regles)
+    for vehicule in _vehicules_aleatoires(generateur, 500):
+        attendues = [r for r, regle in enumerate(regles) if _applicable(regle, vehicule)]
+        obtenues = index.regles_applicables(vehicule)
+        obtenues = list(range(len(regles))) if obtenues is None else list(obtenues)
+        assert obtenues == attendues, vehicule
+    print("✓ 500 véhicules : mêmes règles que le parcours complet")
+
+    assert index.regles_applicables(None) is None
+    assert index.regles_applicables(Vehicule()) is None
+    assert IndexApplicabilite.depuis_regles([_regle(0), _regle(1)]).regles_applicables(Vehicule('diesel')) is None
+    print("✓ Sans véhicule ni restriction : aucun filtrage")
+
+    bornes = IndexApplicabilite.depuis_regles([_regle(0, annee_min=2010, annee_max=2015)])
+    assert [len(bornes.regles_applicables(Vehicule(annee=a))) for a in (2009, 2010, 2015, 2016)] == [0, 1, 1, 0]
+    print("✓ Bornes incluses")
+
+def test_diagnostic_vehicule():
+    """Test règles essence écartées pour un diesel, lot par véhicule"""
+    print("\n=== Test Diagnostic par Véhicule ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    cas = ['demarrage_difficile', 'ralenti_irregulier']
+    sans = moteur.diagnostiquer(cas)
+    essence = moteur.diagnostiquer(cas, vehicule=Vehicule(carburant='Essence'))
+    diesel = moteur.diagnostiquer(cas, vehicule=Vehicule(carburant='diesel'))
+    assert sans['diagnostic'] == essence['diagnostic'] == "Bougies d'allumage défectueuses"
+    assert diesel['diagnostic'] != sans['diagnostic']
+    print(f"✓ Diesel : {diesel['diagnostic']}")
+
+    vehicules = [None, Vehicule(carburant='diesel'), Vehicule(carburant='essence', annee=2010), None]
+    lot = [cas, cas, cas, ['fumee_noire']]
+    assert moteur.diagnostiquer_lot(lot, vehicules=vehicules) == \
+        [moteur.diagnostiquer(ids, vehicule=v) for ids, v in zip(lot, vehicules)]
+    print("✓ Lot : chaque cas scoré sur les règles de son véhicule")
+
+    moteur.applicabilite = IndexApplicabilite.depuis_regles(
+        [_regle(i, carburants=['essence']) for i in range(len(moteur.diagnostics))])
+    assert moteur.diagnostiquer(cas, vehicule=Vehicule(carburant='diesel'))['diagnostic'] == 'Diagnostic incertain'
+    print("✓ Aucune règle applicable : diagnostic incertain")
+
+def test_base_compilee():
+    """Test champs et index relus depuis la base compilée"""
+    print("\n=== Test Applicabilité Compilée ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'base.diagkb')
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE)
+        base = BaseCompilee(chemin)
+        moteur_json = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+        bougies = next(d for d in base.diagnostics if d.id == 'diag_bougies')
+        assert bougies.carburants == ['essence', 'hybride', 'gpl'] and bougies.annee_min is None
+
+        index = base.index_applicabilite()
+        for vehicule in _vehicules_aleatoires(random.Random(2), 100):
+            relues = index.regles_applicables(vehicule)
+            attendues = moteur_json.applicabilite.regles_applicables(vehicule)
+            assert (relues is None and attendues is None) or list(relues) == list(attendues)
+        print("✓ Règles et index identiques aux fichiers JSON")
+
+def test_endpoint():
+    """Test contexte véhicule dans POST /diagnostiquer et /diagnostiquer/batch"""
+    print("\n=== Test Endpoint Véhicule ===")
+
+    import api
+    client = api.app.test_client()
+    corps = {'symptomes': ['demarrage_difficile', 'ralenti_irregulier'], 'vehicule': {'carburant': 'diesel'}}
+    reponse = client.post('/diagnostiquer', json=corps)
+    assert reponse.status_code == 200 and reponse.get_json()['diagnostic'] != "Bougies d'allumage défectueuses"
+
+    reponse = client.post('/diagnostiquer', json={**corps, 'vehicule': {'annee': '2012'}})
+    assert reponse.status_code == 400 and 'annee' in reponse.get_json()['erreur']
+    print("✓ Véhicule pris en compte, champ invalide refusé")
+
+    reponse = client.post('/diagnostiquer/batch', json={'cas': [corps, {'symptomes': corps['symptomes']}]})
+    resultats = reponse.get_json()['resultats']
+    assert resultats[0]['diagnostic'] != resultats[1]['diagnostic'] == "Bougies d'allumage défectueuses"
+    print("✓ Lot : un véhicule par cas")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS APPLICABILITÉ")
+    print("=" * 50)
+
+    try:
+        test_index_bitmap()
+        test_diagnostic_vehicule()
+        test_base_compilee()
+        test_endpoint()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS APPLICABILITÉ PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
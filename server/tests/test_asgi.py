@@ -0,0 +1,149 @@
+"""Tests du point d'entrée ASGI (sans serveur, requêtes simulées)"""
+import sys
+import os
+import asyncio
+import json
+import time
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import config
+import asgi
+
+async def _requete(methode, chemin, corps=None, query=b'', deconnexion=None):
+    """
+    Envoie une requête à l'application ASGI et retourne (statut, entêtes, JSON)
+
+    Comme un serveur réel, receive() attend après le corps tant que le client
+    est connecté ; `deconnexion` (secondes) simule un client qui abandonne.
+    Retourne None si aucune réponse n'a été envoyée.
+    """
+    contenu = json.dumps(corps).encode() if corps is not None else b''
+    scope = {
+        'type': 'http', 'method': methode, 'path': chemin, 'query_string': query,
+        'headers': [(b'content-type', b'application/json')],
+        'server': ('test', 80), 'scheme': 'http', 'http_version': '1.1',
+    }
+    messages = [{'type': 'http.request', 'body': contenu, 'more_body': False}]
+    reponse = {}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        if deconnexion is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(deconnexion)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            reponse['statut'] = message['status']
+            reponse['entetes'] = dict(message['headers'])
+        else:
+            reponse['corps'] = message['body']
+
+    await asgi.application(scope, receive, send)
+    if not reponse:
+        return None
+    return reponse['statut'], reponse['entetes'], json.loads(reponse['corps'])
+
+def test_contrat_identique():
+    """Test réponses identiques à l'API Flask"""
+    print("\n=== Test Contrat JSON ===")
+
+    asgi.moteur.attendre_vectorisation()
+    client = asgi.app.test_client()
+    requetes = [
+        ('/rechercher', {'texte': 'fumée noire'}),
+        ('/rechercher', {'texte': 'ab'}),
+        ('/diagnostiquer', {'symptomes': ['fumee_noire', 'consommation_elevee']}),
+        ('/diagnostiquer', {'symptomes': []}),
+    ]
+    for chemin, corps in requetes:
+        statut, entetes, data = asyncio.run(_requete('POST', chemin, corps))
+        attendu = client.post(chemin, json=corps)
+        assert statut == attendu.status_code
+        assert data == attendu.get_json()
+        assert entetes[b'access-control-allow-origin'] == b'*'
+    print(f"✓ {len(requetes)} requêtes identiques (statut et corps)")
+
+    statut, _, data = asyncio.run(_requete('GET', '/symptomes'))
+    assert statut == 200 and data['total'] == len(asgi.moteur.symptomes)
+    statut, _, data = asyncio.run(_requete('GET', '/autocomplete', query=b'q=batt'))
+    assert statut == 200 and data['suggestions']
+    print("✓ Autres routes déléguées à Flask")
+
+def test_requetes_lentes_concurrentes():
+    """Test nombreuses reformulations IA lentes servies en parallèle"""
+    print("\n=== Test Requêtes Lentes Concurrentes ===")
+
+    assistant = asgi.assistant_ia
+    actif, reformuler = assistant.actif, assistant.reformuler_diagnostic_async
+
+    async def reformuler_lentement(diagnostic_data):
+        await asyncio.sleep(0.3)
+        return "Explication"
+
+    async def lancer(nombre):
+        return await asyncio.gather(*[
+            _requete('POST', '/diagnostiquer', {'symptomes': ['fumee_noire']})
+            for _ in range(nombre)
+        ])
+
+    assistant.actif, assistant.reformuler_diagnostic_async = True, reformuler_lentement
+    try:
+        debut = time.perf_counter()
+        reponses = asyncio.run(lancer(200))
+        duree = time.perf_counter() - debut
+    finally:
+        assistant.actif, assistant.reformuler_diagnostic_async = actif, reformuler
+
+    assert all(statut == 200 and data['explication_ia'] == "Explication" for statut, _, data in reponses)
+    assert duree < 3, f"Requêtes sérialisées ({duree:.2f}s)"
+    print(f"✓ 200 diagnostics avec appel IA de 0.3s servis en {duree:.2f}s")
+
+def test_client_deconnecte():
+    """Test recherche abandonnée quand le client se déconnecte"""
+    print("\n=== Test Client Déconnecté ===")
+
+    asgi.moteur.attendre_vectorisation()
+    appels = []
+    rechercher = asgi.moteur.rechercher_symptomes
+    asgi.moteur.rechercher_symptomes = lambda texte, top_k=5: appels.append(texte) or []
+
+    # Threads d'encodage occupés : la recherche reste en file
+    liberer = threading.Event()
+    occupations = [asgi.executeur_encodage.submit(liberer.wait)
+                   for _ in range(config.ASGI_THREADS_ENCODAGE)]
+    try:
+        reponse = asyncio.run(_requete('POST', '/rechercher', {'texte': 'bruit moteur'}, deconnexion=0.05))
+        assert reponse is None
+        assert asgi.admission_recherche.statistiques()['en_cours'] == 0
+    finally:
+        liberer.set()
+        for occupation in occupations:
+            occupation.result()
+        asgi.moteur.rechercher_symptomes = rechercher
+    assert appels == [], "Encodage exécuté pour un client parti"
+    print("✓ Aucune réponse ni encodage, place d'admission rendue")
+
+    statut, _, data = asyncio.run(_requete('POST', '/rechercher', {'texte': 'bruit moteur'}, deconnexion=5))
+    assert statut == 200 and data['succes']
+    print("✓ Client toujours connecté servi normalement")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS POINT D'ENTRÉE ASGI")
+    print("=" * 50)
+
+    try:
+        test_contrat_identique()
+        test_requetes_lentes_concurrentes()
+        test_client_deconnecte()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS ASGI PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,77 @@
+"""Tests de l'autocomplétion"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services.autocompletion import Autocompletion, distance_edition
+
+SYMPTOMES = [
+    {'id': 'fumee_noire', 'nom': "Fumée noire à l'échappement", 'categorie': 'Échappement', 'poids': 0.9},
+    {'id': 'fumee_blanche', 'nom': "Fumée blanche à l'échappement", 'categorie': 'Échappement', 'poids': 0.9},
+    {'id': 'batterie_faible', 'nom': 'Batterie faible', 'categorie': 'Électrique', 'poids': 0.9},
+    {'id': 'moteur_chauffe', 'nom': 'Le moteur chauffe', 'categorie': 'Moteur', 'poids': 1.0,
+     'alias': ['surchauffe']},
+]
+
+def test_distance_edition():
+    """Test distance de Damerau-Levenshtein"""
+    print("\n=== Test Distance d'Édition ===")
+    
+    assert distance_edition("batterie", "batterie", 2) == 0
+    assert distance_edition("bateri", "batteri", 2) == 1
+    assert distance_edition("chuaffe", "chauffe", 2) == 1  # transposition
+    assert distance_edition("abc", "xyzabc", 2) == 3  # au-delà du maximum
+    print("✓ Distances correctes (substitution, transposition, plafond)")
+
+def test_suggestions():
+    """Test suggestions par préfixe et tolérance aux fautes"""
+    print("\n=== Test Suggestions ===")
+    
+    auto = Autocompletion(SYMPTOMES)
+    
+    ids = [s['id'] for s in auto.suggerer("fum")]
+    assert set(ids) == {'fumee_noire', 'fumee_blanche'}
+    print(f"✓ Préfixe 'fum' -> {ids}")
+    
+    ids = [s['id'] for s in auto.suggerer("fumée no")]
+    assert ids == ['fumee_noire']
+    print("✓ Plusieurs termes combinés")
+    
+    ids = [s['id'] for s in auto.suggerer("batery")]
+    assert ids == ['batterie_faible']
+    print("✓ Faute de frappe tolérée ('batery')")
+    
+    ids = [s['id'] for s in auto.suggerer("surchau")]
+    assert ids == ['moteur_chauffe']
+    print("✓ Alias indexés")
+    
+    assert auto.suggerer("xyzzy") == []
+    assert auto.suggerer("") == []
+    print("✓ Aucune suggestion pour une saisie inconnue ou vide")
+    
+    suggestion = auto.suggerer("batt")[0]
+    assert set(suggestion) == {'id', 'nom', 'categorie'}
+    print("✓ Format des suggestions")
+    
+    debut = time.perf_counter()
+    for _ in range(1000):
+        auto.suggerer("echapement")
+    duree_ms = time.perf_counter() - debut  # 1000 appels : secondes totales = ms par appel
+    print(f"✓ {duree_ms:.3f} ms par suggestion approchée")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS DE L'AUTOCOMPLÉTION")
+    print("=" * 50)
+    
+    try:
+        test_distance_edition()
+        test_suggestions()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS AUTOCOMPLÉTION PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,132 @@
+"""Tests de la base de connaissances compilée"""
+import sys
+import os
+import struct
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import json
+import numpy as np
+import config
+from services import MoteurDiagnostic
+from services.base_compilee import BaseCompilee, ErreurBaseCompilee, VERSION_FORMAT, compiler_base
+from services.reduction import preparer_vecteurs
+
+def test_compilation_et_chargement():
+    """Test aller-retour JSON -> base compilée -> objets"""
+    print("\n=== Test Compilation et Chargement ===")
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'base.diagkb')
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE)
+        print(f"✓ Base compilée ({os.path.getsize(chemin)} octets)")
+        
+        base = BaseCompilee(chemin)
+        assert base.vecteurs is None
+        assert not base.section('mat_requis').flags.writeable
+        print("✓ Tableaux projetés en lecture seule")
+        
+        moteur_json = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+        moteur_base = MoteurDiagnostic(avec_vectorisation=False, base_compilee=chemin)
+        assert moteur_base.base is not None
+        
+        assert moteur_base.get_symptomes_disponibles() == moteur_json.get_symptomes_disponibles()
+        assert [d.to_dict() for d in moteur_base.diagnostics] == [d.to_dict() for d in moteur_json.diagnostics]
+        print(f"✓ {len(moteur_base.symptomes)} symptômes et {len(moteur_base.diagnostics)} règles identiques")
+        
+        assert moteur_base.categories_symptomes() == moteur_json.categories_symptomes()
+        page_json = moteur_json.parcourir_symptomes(limite=10)
+        page_base = moteur_base.parcourir_symptomes(limite=10, curseur=page_json['curseur_suivant'])
+        assert page_base == moteur_json.parcourir_symptomes(limite=10, curseur=page_json['curseur_suivant'])
+        print("✓ Catégories et pages identiques")
+        
+        assert 'fumee_noire' in moteur_base.symptomes
+        assert 'symptome_inexistant' not in moteur_base.symptomes
+        assert moteur_base.symptomes['fumee_noire'].nom == moteur_json.symptomes['fumee_noire'].nom
+        for position, sid in enumerate(base.ids_colonnes):
+            assert base.index_colonnes[sid] == position
+        assert all(base.index_colonnes.get(cle) is None for cle in ('', 'zzz', '\U0010ffff', 42))
+        print("✓ Recherche par ID (dichotomie sur la table triée)")
+        
+        lot = [
+            ['fumee_noire', 'consommation_elevee'],
+            ['moteur_chauffe', 'fuite_liquide', 'voyant_temperature'],
+            ['symptome_inexistant'],
+        ]
+        assert moteur_base.diagnostiquer_lot(lot) == moteur_json.diagnostiquer_lot(lot)
+        assert moteur_base.autocompleter("batery") == moteur_json.autocompleter("batery")
+        print("✓ Diagnostics et autocomplétion identiques")
+
+def test_embeddings_compacts():
+    """Test embeddings réduits et quantifiés dans la base compilée"""
+    print("\n=== Test Embeddings Compacts ===")
+    
+    with open(config.SYMPTOMES_FILE, 'r', encoding='utf-8') as f:
+        nb_symptomes = len(json.load(f))
+    vecteurs = np.random.default_rng(0).standard_normal((nb_symptomes, 384)).astype(np.float32)
+    reduction, matrice = preparer_vecteurs(vecteurs, 32, 'int8')
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'base.diagkb')
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE, matrice, config.EMBEDDING_MODEL, reduction)
+        
+        base = BaseCompilee(chemin)
+        assert base.vecteurs is not None and base.reduction is not None
+        assert base.vecteurs.valeurs.dtype == np.int8 and base.vecteurs.valeurs.shape == (nb_symptomes, 32)
+        assert np.array_equal(base.vecteurs.echelles, matrice.echelles)
+        assert np.array_equal(base.reduction.composantes, reduction.composantes)
+        
+        requete = reduction.projeter(vecteurs[3])
+        assert np.allclose(base.vecteurs.produit(requete), matrice.produit(requete))
+        print(f"✓ Embeddings {base.vecteurs.valeurs.shape} int8 relus ({base.vecteurs.nbytes} octets)")
+
+def test_base_invalide():
+    """Test rejet des fichiers invalides"""
+    print("\n=== Test Base Invalide ===")
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'invalide.diagkb')
+        with open(chemin, 'wb') as f:
+            f.write(b'pas une base' * 20)
+        
+        try:
+            BaseCompilee(chemin)
+            assert False, "Fichier invalide accepté"
+        except ErreurBaseCompilee as e:
+            print(f"✓ Fichier invalide rejeté: {e}")
+        
+        # Le moteur se replie sur les fichiers JSON
+        moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee=chemin)
+        assert moteur.base is None
+        assert len(moteur.symptomes) > 0
+        print("✓ Repli sur les fichiers JSON")
+        
+        # Base d'une version de format antérieure (sections manquantes)
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE)
+        with open(chemin, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('<I', VERSION_FORMAT - 1))
+        try:
+            BaseCompilee(chemin)
+            assert False, "Version de format antérieure acceptée"
+        except ErreurBaseCompilee as e:
+            assert f"v{VERSION_FORMAT} attendu" in str(e)
+        assert MoteurDiagnostic(avec_vectorisation=False, base_compilee=chemin).base is None
+        print(f"✓ Format v{VERSION_FORMAT - 1} ignoré, repli sur les fichiers JSON")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS DE LA BASE COMPILÉE")
+    print("=" * 50)
+    
+    try:
+        test_compilation_et_chargement()
+        test_embeddings_compacts()
+        test_base_invalide()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS BASE COMPILÉE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
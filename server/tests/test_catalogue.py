@@ -0,0 +1,139 @@
+"""Tests du catalogue paginé et indexé par catégorie"""
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services import MoteurDiagnostic
+from services.catalogue import IndexCategories, encoder_curseur, decoder_curseur
+from utils.validation import valider_pagination_symptomes
+
+def test_index_categories():
+    """Test facettes et pages d'une catégorie"""
+    print("\n=== Test Index Catégories ===")
+
+    index = IndexCategories.depuis_categories(['Moteur', 'Freins', 'Moteur', None, 'Moteur', 'Freins'])
+    assert index.facettes == [
+        {'categorie': 'Moteur', 'total': 3},
+        {'categorie': 'Freins', 'total': 2},
+        {'categorie': None, 'total': 1},
+    ]
+    print("✓ Facettes dans l'ordre du catalogue")
+
+    positions, suivante, total = index.page('Moteur', limite=2)
+    assert list(positions) == [0, 2] and suivante == 2 and total == 3
+    positions, suivante, _ = index.page('Moteur', limite=2, apres=suivante)
+    assert list(positions) == [4] and suivante is None
+    positions, suivante, total = index.page(None, limite=10)
+    assert list(positions) == list(range(6)) and suivante is None and total == 6
+    positions, suivante, total = index.page('Inconnue')
+    assert len(positions) == 0 and total == 0
+    print("✓ Pages par curseur, sans doublon ni oubli")
+
+    positions, suivante, total = index.page('Moteur', limite=None, apres=0)
+    assert list(positions) == [2, 4] and suivante is None and total == 3
+    positions, suivante, total = index.page(None, limite=None, sans_categorie=True)
+    assert list(positions) == [3] and suivante is None and total == 1
+    print("✓ Sélection entière sans limite, symptômes sans catégorie")
+
+    # Codes entiers (table de chaînes de la base compilée)
+    index = IndexCategories(np.array([3, -1, 3, 7]), lambda code: None if code < 0 else f"c{code}")
+    assert [f['categorie'] for f in index.facettes] == ['c3', None, 'c7']
+    print("✓ Index construit sur des codes")
+
+    assert decoder_curseur(encoder_curseur(1234)) == 1234
+    for curseur in ('%%%', encoder_curseur(-1), 'YWJj'):
+        try:
+            decoder_curseur(curseur)
+            assert False, f"Curseur accepté: {curseur}"
+        except ValueError:
+            pass
+    print("✓ Curseurs invalides refusés")
+
+def test_parcours_moteur():
+    """Test parcours complet du catalogue page par page"""
+    print("\n=== Test Parcours du Catalogue ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    complet = moteur.get_symptomes_disponibles()
+    facettes = moteur.categories_symptomes()
+    assert sum(f['total'] for f in facettes) == len(complet)
+
+    vus, curseur = [], None
+    while True:
+        page = moteur.parcourir_symptomes(limite=7, curseur=curseur)
+        assert len(page['symptomes']) <= 7 and page['total'] == len(complet)
+        vus.extend(page['symptomes'])
+        curseur = page['curseur_suivant']
+        if curseur is None:
+            break
+    assert vus == complet
+    print(f"✓ {len(vus)} symptômes parcourus par pages de 7")
+
+    categorie = facettes[0]['categorie']
+    page = moteur.parcourir_symptomes(categorie, limite=100)
+    assert page['total'] == facettes[0]['total'] == len(page['symptomes'])
+    assert all(s['categorie'] == categorie for s in page['symptomes'])
+    assert page['curseur_suivant'] is None
+    print(f"✓ Catégorie '{categorie}': {page['total']} symptômes")
+
+def test_endpoint():
+    """Test GET /symptomes : catalogue entier par défaut, paginé sur demande"""
+    print("\n=== Test Endpoint Symptômes ===")
+
+    import api
+
+    client = api.app.test_client()
+    complet = api.moteur.get_symptomes_disponibles()
+    data = client.get('/symptomes').get_json()
+    assert data['succes'] and data['total'] == len(complet) and data['symptomes'] == complet
+    assert data['curseur_suivant'] is None and data['categories'] == api.moteur.categories_symptomes()
+    print(f"✓ Sans limit ni curseur : {data['total']} symptômes, sans pagination")
+
+    page = client.get('/symptomes?limit=2').get_json()
+    assert len(page['symptomes']) == 2 and page['curseur_suivant']
+    suite = client.get(f"/symptomes?curseur={page['curseur_suivant']}").get_json()
+    assert suite['symptomes'] == complet[2:2 + 100]
+    print("✓ limit ou curseur : pagination")
+
+    sans_categorie = client.get('/symptomes?sans_categorie=1').get_json()
+    assert sans_categorie['symptomes'] == [s for s in complet if s['categorie'] is None]
+    print(f"✓ {sans_categorie['total']} symptôme(s) sans catégorie")
+
+def test_validation_pagination():
+    """Test validation des paramètres de GET /symptomes"""
+    print("\n=== Test Validation Pagination ===")
+
+    valide, _, categorie, limite, curseur, sans_categorie = valider_pagination_symptomes({})
+    assert valide and categorie is None and limite is None and curseur is None and not sans_categorie
+    valide, _, categorie, limite, *_ = valider_pagination_symptomes({'categorie': ' Freinage ', 'limit': '20'})
+    assert valide and categorie == 'Freinage' and limite == 20
+    valide, _, _, limite, curseur, _ = valider_pagination_symptomes({'curseur': 'Mzg'})
+    assert valide and limite == 100 and curseur == 'Mzg'
+    valide, _, categorie, _, _, sans_categorie = valider_pagination_symptomes({'sans_categorie': '1'})
+    assert valide and categorie is None and sans_categorie
+    print("✓ Paramètres valides acceptés, pagination seulement si demandée")
+
+    for args in ({'limit': 'abc'}, {'limit': '0'}, {'limit': '10000'}, {'curseur': 'x' * 100},
+                 {'categorie': 'Freinage', 'sans_categorie': '1'}):
+        valide, erreur, *_ = valider_pagination_symptomes(args)
+        assert not valide and erreur, args
+    print("✓ Limites et curseurs invalides rejetés")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS CATALOGUE")
+    print("=" * 50)
+
+    try:
+        test_index_categories()
+        test_parcours_moteur()
+        test_endpoint()
+        test_validation_pagination()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS CATALOGUE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,99 @@
+"""Tests de l'outil de charge (sur un serveur factice local)"""
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from tests.charge_api import analyser_melange, percentile, executer_charge, formater_rapport
+
+class _ApiFactice(BaseHTTPRequestHandler):
+    """Répond comme l'API ; une recherche sur trois est délestée (503)"""
+    protocol_version = 'HTTP/1.1'
+    compteur = 0
+    verrou = threading.Lock()
+
+    def _repondre(self, statut, corps):
+        contenu = json.dumps(corps).encode()
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def do_GET(self):
+        self._repondre(200, {'succes': True, 'symptomes': [{'id': 'fumee_noire'}, {'id': 'batterie_faible'}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/rechercher':
+            with _ApiFactice.verrou:
+                _ApiFactice.compteur += 1
+                delestee = _ApiFactice.compteur % 3 == 0
+            if delestee:
+                self._repondre(503, {'succes': False, 'erreur': 'Serveur surchargé'})
+                return
+        self._repondre(200, {'succes': True})
+
+    def log_message(self, *args):
+        pass
+
+def test_outils():
+    """Test lecture du mélange et percentiles"""
+    print("\n=== Test Mélange et Percentiles ===")
+
+    assert analyser_melange("symptomes=1,rechercher=3") == {'symptomes': 1.0, 'rechercher': 3.0}
+    assert analyser_melange("diagnostiquer") == {'diagnostiquer': 1.0}
+    for invalide in ("inconnu=1", "rechercher=-1", "rechercher=0", ""):
+        try:
+            analyser_melange(invalide)
+            assert False, f"Mélange accepté: {invalide!r}"
+        except ValueError:
+            pass
+    print("✓ Mélange lu et validé")
+
+    valeurs = list(range(1, 101))
+    assert percentile(valeurs, 50) == 50 and percentile(valeurs, 95) == 95 and percentile(valeurs, 99) == 99
+    assert percentile([7], 99) == 7 and percentile([], 50) == 0.0
+    print("✓ Percentiles au rang le plus proche")
+
+def test_charge_concurrente():
+    """Test charge concurrente et rapport par endpoint"""
+    print("\n=== Test Charge Concurrente ===")
+
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), _ApiFactice)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{serveur.server_address[1]}"
+        rapport = executer_charge(url, 0.5, 4, analyser_melange("symptomes=1,rechercher=1,diagnostiquer=2"))
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+
+    total = rapport['total']
+    assert total['requetes'] > 0 and total['erreurs'] == 0
+    assert total['requetes'] == sum(e['requetes'] for e in rapport['endpoints'].values())
+    assert rapport['endpoints']['rechercher']['delestees'] > 0
+    assert rapport['endpoints']['diagnostiquer']['delestees'] == 0
+    latence = total['latence_ms']
+    assert 0 < latence['p50'] <= latence['p95'] <= latence['p99'] <= latence['max']
+    json.dumps(rapport)
+    print(formater_rapport(rapport))
+    print(f"✓ {total['requetes']} requêtes, {total['debit']} req/s, 503 comptés à part")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS OUTIL DE CHARGE")
+    print("=" * 50)
+
+    try:
+        test_outils()
+        test_charge_concurrente()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS OUTIL DE CHARGE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,128 @@
+"""Tests des statistiques de co-occurrence"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services import CooccurrencesSymptomes
+
+CATALOGUE = {'a', 'b', 'c'}
+
+NOMS = {'d1': 'D1', 'd2': 'D2', 'd3': 'D3'}
+
+def _cas(symptomes, identifiant, succes=True):
+    return (symptomes, None, {'succes': succes, 'id_diagnostic': identifiant, 'diagnostic': NOMS[identifiant]})
+
+def test_comptes():
+    """Test fréquences, paires et couples symptôme/diagnostic"""
+    print("\n=== Test Comptes ===")
+
+    cooccurrences = CooccurrencesSymptomes()
+    cooccurrences.enregistrer([_cas(['a', 'b'], 'd1'), _cas(['b', 'a', 'inconnu'], 'd1')], CATALOGUE)
+    cooccurrences.enregistrer([_cas(['c'], 'd2'), _cas(['a'], 'd2', succes=False)], CATALOGUE)
+    cooccurrences.enregistrer([_cas(['a'], 'd3')], CATALOGUE, tenant='garage_a')
+    incertain = {'succes': True, 'diagnostic': 'Diagnostic incertain', 'gravite': 'Inconnu'}
+    cooccurrences.enregistrer([(['a', 'c'], None, incertain)], CATALOGUE)
+
+    resume = cooccurrences.resume(symptomes_regles={'d1': {'a'}, 'd2': {'c'}}, noms_diagnostics={'d1': 'D1'})
+    assert resume['cas'] == 3
+    assert resume['symptomes'] == [{'id': 'a', 'occurrences': 2, 'frequence': 0.6667},
+                                   {'id': 'b', 'occurrences': 2, 'frequence': 0.6667},
+                                   {'id': 'c', 'occurrences': 1, 'frequence': 0.3333}]
+    assert resume['diagnostics'] == [{'id': 'd1', 'diagnostic': 'D1', 'occurrences': 2, 'frequence': 0.6667},
+                                     {'id': 'd2', 'diagnostic': None, 'occurrences': 1, 'frequence': 0.3333}]
+    assert resume['paires'] == [{'symptomes': ['a', 'b'], 'occurrences': 2, 'lift': 1.5}]
+    couples = {(c['symptome'], c['id']): c for c in resume['symptomes_diagnostics']}
+    assert couples[('b', 'd1')]['part_du_diagnostic'] == 1.0 and not couples[('b', 'd1')]['dans_regle']
+    assert couples[('a', 'd1')]['dans_regle'] and couples[('c', 'd2')]['dans_regle']
+    assert couples[('b', 'd1')]['diagnostic'] == 'D1' and couples[('c', 'd2')]['diagnostic'] is None
+    print("✓ Symptômes inconnus, échecs et diagnostic incertain ignorés, b hors de la règle de d1 signalé")
+    print("✓ Comptes par identifiant, nom seulement dans la réponse (None si la règle n'existe plus)")
+
+    assert cooccurrences.resume('garage_a')['cas'] == 1
+    assert len(cooccurrences.resume(limite=1)['symptomes']) == 1
+    print("✓ Comptes séparés par tenant, listes limitées")
+
+def test_instantanes():
+    """Test instantanés cumulés entre workers et redémarrages"""
+    print("\n=== Test Instantanés ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'cooccurrences.db')
+        worker_1 = CooccurrencesSymptomes(chemin, intervalle=0)
+        worker_2 = CooccurrencesSymptomes(chemin, intervalle=0)
+        worker_1.enregistrer([_cas(['a', 'b'], 'd1')], CATALOGUE)
+        worker_2.enregistrer([_cas(['a', 'b'], 'd1'), _cas(['c'], 'd2')], CATALOGUE)
+
+        assert worker_1.instantane() and worker_2.instantane()
+        assert worker_2.resume()['cas'] == 3 and worker_2.resume()['paires'][0]['occurrences'] == 2
+        assert worker_1.resume()['cas'] == 1
+        assert worker_1.instantane() and worker_1.resume()['cas'] == 3
+        print("✓ Comptes des deux workers additionnés, relus à l'instantané")
+
+        worker_1.enregistrer([_cas(['c'], 'd2')], CATALOGUE)
+        assert worker_1.resume()['cas'] == 4
+        worker_1.fermer()
+        worker_2.fermer()
+        redemarre = CooccurrencesSymptomes(chemin, intervalle=0)
+        assert redemarre.resume()['cas'] == 4
+        assert redemarre.resume(noms_diagnostics=NOMS)['diagnostics'] == [
+            {'id': 'd1', 'diagnostic': 'D1', 'occurrences': 2, 'frequence': 0.5},
+            {'id': 'd2', 'diagnostic': 'D2', 'occurrences': 2, 'frequence': 0.5}]
+        assert worker_1.statistiques()['instantanes'] == 3
+        print("✓ Fermeture : derniers comptes écrits, repris au redémarrage")
+
+def test_endpoint():
+    """Test GET /statistiques/cooccurrences après des diagnostics"""
+    print("\n=== Test Endpoint Co-occurrences ===")
+
+    import api
+
+    precedent = api.cooccurrences
+    api.cooccurrences = CooccurrencesSymptomes()
+    try:
+        client = api.app.test_client()
+        resultat = client.post('/diagnostiquer', json={'symptomes': ['fumee_noire', 'consommation_elevee']})
+        client.post('/diagnostiquer/batch', json={'cas': [{'symptomes': ['fumee_noire']}]})
+        identifiant = resultat.get_json()['id_diagnostic']
+        regle = next(d for d in api.moteur.diagnostics if d.id == identifiant)
+        assert resultat.get_json()['diagnostic'] == regle.nom
+
+        # Aucune règle ne correspond : diagnostic incertain, non compté
+        incertain = client.post('/diagnostiquer', json={'symptomes': ['bruit_anormal']}).get_json()
+        assert incertain['diagnostic'] == 'Diagnostic incertain' and 'id_diagnostic' not in incertain
+
+        reponse = client.get('/statistiques/cooccurrences?limit=5')
+        data = reponse.get_json()
+        assert reponse.status_code == 200 and data['cas'] == 2, data
+        assert data['symptomes'][0] == {'id': 'fumee_noire', 'occurrences': 2, 'frequence': 1.0}
+        assert data['paires'][0]['symptomes'] == ['consommation_elevee', 'fumee_noire']
+        assert {'id': identifiant, 'diagnostic': regle.nom} in [
+            {'id': d['id'], 'diagnostic': d['diagnostic']} for d in data['diagnostics']]
+        for couple in data['symptomes_diagnostics']:
+            if couple['id'] == identifiant:
+                attendu = couple['symptome'] in regle.symptomes_requis + regle.symptomes_optionnels
+                assert couple['dans_regle'] == attendu and couple['diagnostic'] == regle.nom
+        print(f"✓ {data['cas']} cas comptés, couples de « {regle.nom} » comparés à sa règle")
+
+        assert client.get('/statistiques/cooccurrences?limit=0').status_code == 400
+        print("✓ Limite invalide refusée")
+    finally:
+        api.cooccurrences = precedent
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS CO-OCCURRENCES")
+    print("=" * 50)
+
+    try:
+        test_comptes()
+        test_instantanes()
+        test_endpoint()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS CO-OCCURRENCES PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
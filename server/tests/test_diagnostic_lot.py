@@ -0,0 +1,72 @@
+"""Tests du diagnostic en lot en ligne de commande"""
+import sys
+import os
+import io
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import diagnostic_lot
+
+def test_lecture_formats():
+    """Test lecture des cas JSONL et CSV"""
+    print("\n=== Test Lecture des Cas ===")
+
+    jsonl = io.StringIO(
+        '{"id": "a", "symptomes": ["fumee_noire"]}\n'
+        '\n'
+        'pas du json\n'
+    )
+    cas = [diagnostic_lot.decoder(e) for e in diagnostic_lot.lire_enregistrements(jsonl, 'jsonl')]
+    assert cas[0] == (1, 'a', {'id': 'a', 'symptomes': ['fumee_noire']})
+    assert cas[1] == (3, None, None)
+    print("✓ JSONL lu ligne par ligne (lignes vides ignorées)")
+
+    csv_flux = io.StringIO('id,symptomes\nb,fumee_noire;consommation_elevee\n')
+    cas = [diagnostic_lot.decoder(e) for e in diagnostic_lot.lire_enregistrements(csv_flux, 'csv')]
+    assert cas == [(2, 'b', {'symptomes': ['fumee_noire', 'consommation_elevee']})]
+    print("✓ CSV lu avec symptômes séparés par ';'")
+
+    lots = list(diagnostic_lot.decouper(range(7), 3))
+    assert lots == [[0, 1, 2], [3, 4, 5], [6]]
+    print("✓ Découpage en lots OK")
+
+def test_execution_cli():
+    """Test exécution complète du diagnostic en lot"""
+    print("\n=== Test Exécution CLI ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        entree = os.path.join(dossier, 'cas.jsonl')
+        sortie = os.path.join(dossier, 'resultats.jsonl')
+        with open(entree, 'w', encoding='utf-8') as f:
+            for i in range(25):
+                f.write(json.dumps({'id': f'cas{i}', 'symptomes': ['fumee_noire', 'consommation_elevee']}) + '\n')
+            f.write(json.dumps({'id': 'vide', 'symptomes': []}) + '\n')
+
+        code = diagnostic_lot.main([entree, sortie, '--workers', '1', '--taille-lot', '10'])
+        assert code == 0
+
+        with open(sortie, 'r', encoding='utf-8') as f:
+            resultats = [json.loads(ligne) for ligne in f]
+
+    assert len(resultats) == 26
+    assert [r['id'] for r in resultats[:25]] == [f'cas{i}' for i in range(25)]
+    assert resultats[0]['diagnostic'] == "Problème d'injection"
+    assert resultats[-1]['succes'] == False
+    print(f"✓ {len(resultats)} résultats écrits dans l'ordre d'entrée")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS DU DIAGNOSTIC EN LOT")
+    print("=" * 50)
+
+    try:
+        test_lecture_formats()
+        test_execution_cli()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS DIAGNOSTIC EN LOT PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
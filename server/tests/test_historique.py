@@ -0,0 +1,118 @@
+"""Tests de l'historique des diagnostics"""
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from models import Vehicule
+from services import HistoriqueDiagnostics
+
+def _resultat(nom, succes=True):
+    return {'succes': succes, 'diagnostic': nom, 'gravite': 'Modéré', 'confiance': 'Haute', 'score': 0.9}
+
+def test_ecriture_par_lots():
+    """Test cas écrits par lots en mode WAL, seuls les diagnostics réussis"""
+    print("\n=== Test Écriture par Lots ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        historique = HistoriqueDiagnostics(os.path.join(dossier, 'historique.db'), taille_lot=50, intervalle=60)
+        for i in range(120):
+            assert historique.enregistrer('diagnostiquer', [(['fumee_noire'], None, _resultat(f'd{i}'))])
+        assert historique.enregistrer('lot', [
+            (['fumee_noire'], Vehicule(carburant='diesel'), _resultat('lot')),
+            (['inconnu'], None, _resultat('échec', succes=False)),
+        ], tenant='garage_a')
+        assert historique.fermer()
+
+        stats = historique.statistiques()
+        assert stats['enregistres'] == 121 and stats['lots'] == 3 and stats['perdus'] == 0, stats
+        print(f"✓ 121 cas en {stats['lots']} transactions, l'échec ignoré")
+
+        derniers = historique.derniers(limite=5)
+        assert derniers[0]['diagnostic'] == 'lot' and derniers[0]['tenant'] == 'garage_a'
+        assert derniers[0]['vehicule']['carburant'] == 'diesel' and derniers[0]['symptomes'] == ['fumee_noire']
+        assert historique.derniers(tenant='garage_a') == derniers[:1]
+        connexion = sqlite3.connect(historique.chemin)
+        assert connexion.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        connexion.close()
+        print("✓ Tenant, véhicule et symptômes relus, journal WAL")
+
+def test_contre_pression():
+    """Test file pleine : attente bornée puis cas perdus, le reste écrit à la fermeture"""
+    print("\n=== Test Contre-pression ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        historique = HistoriqueDiagnostics(os.path.join(dossier, 'historique.db'), taille_file=2, taille_lot=1,
+                                           intervalle=0, attente_max=0.01)
+        # Disque bloqué : le premier lot ne s'écrit qu'au signal
+        debloque, commence = threading.Event(), threading.Event()
+        ecrire_lot = historique._ecrire_lot
+        def ecrire_lentement(lignes):
+            commence.set()
+            debloque.wait()
+            ecrire_lot(lignes)
+        historique._ecrire_lot = ecrire_lentement
+
+        assert historique.enregistrer('diagnostiquer', [(['a'], None, _resultat('bloque'))])
+        assert commence.wait(5)
+        acceptes = [historique.enregistrer('diagnostiquer', [(['a'], None, _resultat(f'd{i}'))]) for i in range(4)]
+        assert acceptes == [True, True, False, False], acceptes
+        assert historique.statistiques()['perdus'] == 2
+        print("✓ File pleine : requête rendue après l'attente maximale, cas comptés perdus")
+
+        debloque.set()
+        assert historique.fermer()
+        assert historique.statistiques()['enregistres'] == 3
+        assert not historique.enregistrer('diagnostiquer', [(['a'], None, _resultat('tard'))])
+        print("✓ Fermeture : file vidée, nouveaux cas refusés")
+
+def test_endpoints():
+    """Test /diagnostiquer, /diagnostiquer/batch et la version ASGI enregistrés"""
+    print("\n=== Test Endpoints Historique ===")
+
+    import api
+    from tests.test_asgi import _requete
+
+    precedent = api.historique
+    with tempfile.TemporaryDirectory() as dossier:
+        api.historique = HistoriqueDiagnostics(os.path.join(dossier, 'historique.db'), intervalle=0)
+        try:
+            client = api.app.test_client()
+            assert client.post('/diagnostiquer', json={'symptomes': ['fumee_noire']}).status_code == 200
+            assert client.post('/diagnostiquer/batch', json={'cas': [
+                {'symptomes': ['demarrage_difficile'], 'vehicule': {'carburant': 'essence'}},
+                {'symptomes': ['fumee_noire']},
+            ]}).status_code == 200
+            statut, _, _ = asyncio.run(_requete('POST', '/diagnostiquer', {'symptomes': ['fumee_noire']}))
+            assert statut == 200
+            assert client.post('/diagnostiquer', json={'symptomes': []}).status_code == 400
+            assert api.historique.fermer()
+
+            derniers = api.historique.derniers()
+            assert [d['source'] for d in derniers] == ['diagnostiquer', 'lot', 'lot', 'diagnostiquer'], derniers
+            assert derniers[2]['vehicule'] == {'carburant': 'essence', 'marque': None, 'annee': None,
+                                               'kilometrage': None}
+            assert all(d['tenant'] is None for d in derniers)
+            print("✓ 4 diagnostics enregistrés, requête invalide ignorée")
+        finally:
+            api.historique = precedent
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS HISTORIQUE")
+    print("=" * 50)
+
+    try:
+        test_ecriture_par_lots()
+        test_contre_pression()
+        test_endpoints()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS HISTORIQUE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -73,6 +73,34 @@ def test_recherche_symptomes(moteur):
     if resultats:
         print(f"  Meilleur: {resultats[0]['nom']} (score: {resultats[0]['score_similarite']:.3f})")
 
+def test_recherche_hybride(moteur):
+    """Test des modes de recherche lexical, sémantique et hybride"""
+    print("\n=== Test Recherche Hybride ===")
+    
+    # Terme littéral : l'index lexical répond seul
+    resultats = moteur.rechercher_symptomes("batterie", top_k=5, mode='hybride')
+    assert resultats
+    assert all('batterie' in r['id'] for r in resultats)
+    assert resultats == moteur.rechercher_symptomes("batterie", top_k=5, mode='lexical')
+    print(f"✓ 'batterie' servi par l'index lexical: {[r['id'] for r in resultats]}")
+    
+    # Texte libre : fusion avec les embeddings
+    resultats = moteur.rechercher_symptomes("le moteur fait du bruit", top_k=5, mode='hybride')
+    semantiques = moteur.rechercher_symptomes("le moteur fait du bruit", top_k=5, mode='semantique')
+    for r in resultats:
+        assert 0 <= r['score_similarite'] <= 1
+    print(f"✓ Fusion: {len(resultats)} résultats (sémantique seul: {len(semantiques)})")
+    
+    # Modèle indisponible : repli lexical
+    vectorisation = moteur.vectorisation
+    moteur.vectorisation = None
+    try:
+        resultats = moteur.rechercher_symptomes("fumée noire", top_k=3)
+        assert resultats[0]['id'] == 'fumee_noire'
+    finally:
+        moteur.vectorisation = vectorisation
+    print("✓ Recherche disponible sans modèle (repli lexical)")
+
 def test_diagnostic_exact(moteur):
     """Test diagnostic avec correspondance exacte"""
     print("\n=== Test Diagnostic Exact ===")
@@ -188,6 +216,59 @@ def test_validation_limites(moteur):
     assert resultat['succes'] == False
     print(f"✓ Liste vide rejetée OK")
 
+def test_diagnostic_lot(moteur):
+    """Test diagnostic groupé et cohérence avec le calcul règle par règle"""
+    print("\n=== Test Diagnostic Groupé ===")
+    
+    lot = [
+        ['fumee_noire', 'consommation_elevee'],
+        ['moteur_chauffe', 'fuite_liquide', 'voyant_temperature'],
+        ['symptome_inexistant'],
+        ['demarrage_difficile', 'batterie_faible'],
+    ]
+    resultats = moteur.diagnostiquer_lot(lot)
+    
+    assert len(resultats) == len(lot)
+    for symptomes_ids, resultat in zip(lot, resultats):
+        assert resultat == moteur.diagnostiquer(symptomes_ids)
+    print(f"✓ {len(resultats)} résultats dans l'ordre, identiques au diagnostic unitaire")
+    
+    # Les scores matriciels reproduisent calculer_score_regle
+    poids = {sid: s.poids for sid, s in moteur.symptomes.items()}
+    scores = moteur.matrice.scorer(moteur.matrice.encoder_cas(lot[:2]))
+    for i, symptomes_ids in enumerate(lot[:2]):
+        for r, diagnostic in enumerate(moteur.diagnostics):
+            attendu = moteur.vectorisation.calculer_score_regle(
+                symptomes_ids,
+                diagnostic.symptomes_requis,
+                diagnostic.symptomes_optionnels or [],
+                poids
+            )
+            assert abs(scores[i, r] - attendu) < 1e-9
+    print("✓ Scores matriciels identiques au calcul règle par règle")
+
+def test_chargement_asynchrone():
+    """Test chargement du modèle en arrière-plan puis préchauffage"""
+    print("\n=== Test Chargement Asynchrone ===")
+    
+    from services import MoteurDiagnostic
+    
+    moteur = MoteurDiagnostic(chargement_asynchrone=True)
+    
+    # La recherche répond pendant le chargement (repli lexical si besoin)
+    resultats = moteur.rechercher_symptomes("fumée noire", top_k=3)
+    assert resultats[0]['id'] == 'fumee_noire'
+    print("✓ Recherche servie pendant le chargement du modèle")
+    
+    assert moteur.attendre_vectorisation(timeout=120), "Modèle non chargé"
+    assert len(moteur.vectorisation.symptomes_vectors) == len(moteur.symptomes)
+    print("✓ Modèle chargé et symptômes encodés en arrière-plan")
+    
+    duree = moteur.prechauffer()
+    assert duree >= 0
+    assert moteur._index_lexical is not None and moteur._autocompletion is not None
+    print(f"✓ Préchauffage en {duree:.2f}s")
+
 if __name__ == '__main__':
     print("=" * 60)
     print("TESTS D'INTÉGRATION DU SYSTÈME")
@@ -200,12 +281,15 @@ if __name__ == '__main__':
         # Tests fonctionnels
         symptomes = test_get_symptomes(moteur)
         test_recherche_symptomes(moteur)
+        test_recherche_hybride(moteur)
         test_diagnostic_exact(moteur)
         test_diagnostic_partiel(moteur)
         test_diagnostic_avec_optionnels(moteur)
         test_diagnostic_incertain(moteur)
         test_diagnostics_alternatifs(moteur)
         test_validation_limites(moteur)
+        test_diagnostic_lot(moteur)
+        test_chargement_asynchrone()
         
         print("\n" + "=" * 60)
         print("✅ TOUS LES TESTS D'INTÉGRATION PASSÉS")
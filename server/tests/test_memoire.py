@@ -0,0 +1,131 @@
+"""Tests de la mesure mémoire par composant"""
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import config
+from utils.memoire import taille_profonde, memoire_processus, rapport_memoire, formater_rapport
+
+class _TenseurFactice:
+    def __init__(self, n):
+        self.n = n
+
+    def nelement(self):
+        return self.n
+
+    def element_size(self):
+        return 4
+
+class _ModeleFactice:
+    """Interface d'un module torch : parameters() et buffers()"""
+    def parameters(self):
+        return iter([_TenseurFactice(1000), _TenseurFactice(24)])
+
+    def buffers(self):
+        return iter([_TenseurFactice(8)])
+
+class _Service:
+    def __init__(self, **composants):
+        self.composants = composants
+
+    def rapport_memoire(self, vus):
+        return {nom: taille_profonde(objet, vus) for nom, objet in self.composants.items()}
+
+def test_taille_profonde():
+    """Test comptage des objets, tableaux et modèles"""
+    print("\n=== Test Taille Profonde ===")
+
+    tableau = np.zeros((100, 64), dtype=np.float32)
+    assert taille_profonde(tableau) >= tableau.nbytes
+    assert taille_profonde({'vecteurs': tableau}) > taille_profonde(tableau)
+    print("✓ Données numpy comptées")
+
+    # Vue : les données sont comptées une seule fois, par la base
+    vus = set()
+    total = taille_profonde(tableau, vus) + taille_profonde(tableau[10:20], vus)
+    assert total < tableau.nbytes + 1000
+    print("✓ Vues et objets partagés comptés une fois")
+
+    # Tableau projeté (base compilée) : seul l'en-tête est compté
+    projete = np.frombuffer(memoryview(bytes(40000)), dtype=np.float32)
+    assert taille_profonde(projete) < 1000
+    print("✓ Tableaux projetés exclus")
+
+    assert taille_profonde(_ModeleFactice()) == (1000 + 24 + 8) * 4
+    assert taille_profonde(None) == 0
+    print("✓ Modèle compté par ses poids")
+
+def test_rapport():
+    """Test rapport par service et RSS"""
+    print("\n=== Test Rapport Mémoire ===")
+
+    vecteurs = np.ones((500, 32), dtype=np.float32)
+    rapport = rapport_memoire({
+        'vectorisation': _Service(modele=_ModeleFactice(), vecteurs=vecteurs),
+        'moteur': _Service(copie=vecteurs, symptomes=['a', 'b']),
+        'assistant_ia': None,
+    }, {'base_compilee': 4096})
+
+    assert set(rapport['composants']) == {'vectorisation', 'moteur'}
+    assert rapport['composants']['vectorisation']['vecteurs'] >= vecteurs.nbytes
+    assert rapport['composants']['moteur']['copie'] == 0
+    assert rapport['fichiers_projetes'] == {'base_compilee': 4096}
+    assert rapport['total_composants'] == sum(
+        sum(d.values()) for d in rapport['composants'].values())
+    print("✓ Composants par service, objets partagés comptés une fois")
+
+    if sys.platform.startswith('linux'):
+        processus = memoire_processus()
+        assert processus['rss'] > 0 and processus['pic_rss'] >= processus['rss']
+        assert rapport['non_attribue'] is not None
+        print(f"✓ RSS du processus: {processus['rss'] // 1024} Ko")
+
+    assert formater_rapport(rapport).startswith('RSS ')
+    print("✓ Résumé pour les journaux")
+
+def test_endpoint():
+    """Test GET /debug/memory réservé à l'administration"""
+    print("\n=== Test Endpoint /debug/memory ===")
+
+    import api
+    client = api.app.test_client()
+    jeton_initial = config.ADMIN_TOKEN
+    try:
+        config.ADMIN_TOKEN = ''
+        assert client.get('/debug/memory').status_code == 404
+        print("✓ Désactivé sans jeton configuré")
+
+        config.ADMIN_TOKEN = 'secret'
+        assert client.get('/debug/memory').status_code == 403
+        assert client.get('/debug/memory', headers={'Authorization': 'Bearer faux'}).status_code == 403
+        print("✓ Jeton absent ou incorrect refusé")
+
+        api.moteur.attendre_vectorisation()
+        reponse = client.get('/debug/memory', headers={'Authorization': 'Bearer secret'})
+        assert reponse.status_code == 200
+        data = reponse.get_json()
+        assert data['succes'] is True
+        assert {'symptomes', 'regles', 'matrice_regles', 'index_lexical'} <= set(data['composants']['moteur'])
+        assert {'modele', 'vecteurs'} <= set(data['composants']['vectorisation'])
+        assert data['composants']['vectorisation']['vecteurs'] > 0
+        print(f"✓ Rapport: {data['total_composants']} octets attribués")
+    finally:
+        config.ADMIN_TOKEN = jeton_initial
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS MÉMOIRE")
+    print("=" * 50)
+
+    try:
+        test_taille_profonde()
+        test_rapport()
+        test_endpoint()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS MÉMOIRE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
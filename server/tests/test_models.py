@@ -30,7 +30,13 @@ def test_symptome_creation():
     # Test from_dict
     symptome2 = Symptome.from_dict(symptome_dict)
     assert symptome2.id == symptome.id
+    assert symptome2.alias == []
     print("✓ Conversion from_dict OK")
+    
+    # Test alias
+    symptome3 = Symptome.from_dict({'id': 's3', 'nom': 'Surchauffe', 'alias': ['moteur chaud']})
+    assert symptome3.to_dict()['alias'] == ['moteur chaud']
+    print("✓ Alias conservés")
 
 def test_diagnostic_creation():
     """Test création d'un diagnostic"""
@@ -0,0 +1,77 @@
+"""Tests du contrôle des régressions de performance (sans exécuter les benchmarks)"""
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from tests.perf_regression import comparer, mettre_a_jour
+
+REFERENCE = {
+    'calibration_us': 100.0,
+    'tolerance': 0.3,
+    'mesures': {
+        'diagnostiquer': {'us': 20.0},
+        'autocompletion': {'us': 10.0, 'tolerance': 0.5},
+        'ancienne_mesure': {'us': 5.0},
+    },
+}
+
+def test_comparaison():
+    """Test détection des régressions"""
+    print("\n=== Test Comparaison ===")
+
+    regressions, _ = comparer({'calibration': 100.0, 'diagnostiquer': 25.0, 'autocompletion': 14.0}, REFERENCE)
+    assert regressions == [], regressions
+    print("✓ Écarts dans les tolérances acceptés (globale et par mesure)")
+
+    regressions, lignes = comparer({'calibration': 100.0, 'diagnostiquer': 27.0, 'autocompletion': 16.0}, REFERENCE)
+    assert regressions == ['diagnostiquer', 'autocompletion'], regressions
+    assert any('RÉGRESSION' in ligne and ligne.startswith('diagnostiquer') for ligne in lignes)
+    print("✓ Ralentissements hors tolérance détectés")
+
+    # Machine deux fois plus lente : la calibration absorbe l'écart
+    regressions, _ = comparer({'calibration': 200.0, 'diagnostiquer': 44.0, 'autocompletion': 21.0}, REFERENCE)
+    assert regressions == []
+    print("✓ Durées normalisées par la calibration")
+
+    regressions, lignes = comparer({'calibration': 100.0, 'diagnostiquer': 20.0, 'nouvelle': 1.0}, REFERENCE)
+    assert regressions == []
+    assert any('sans référence' in ligne for ligne in lignes)
+    assert any('non mesuré' in ligne for ligne in lignes)
+    print("✓ Mesures nouvelles ou absentes signalées sans échec")
+
+def test_mise_a_jour():
+    """Test écriture de la référence"""
+    print("\n=== Test Mise à Jour ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'reference.json')
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump(REFERENCE, f)
+
+        mettre_a_jour(chemin, {'calibration': 120.0, 'autocompletion': 8.0, 'nouvelle': 3.0})
+        with open(chemin, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+
+        assert reference['calibration_us'] == 120.0
+        assert reference['mesures']['autocompletion'] == {'us': 8.0, 'tolerance': 0.5}
+        assert reference['mesures']['nouvelle'] == {'us': 3.0}
+        assert reference['mesures']['diagnostiquer'] == {'us': 20.0}
+    print("✓ Durées remplacées, tolérances conservées")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS CONTRÔLE DE PERFORMANCE")
+    print("=" * 50)
+
+    try:
+        test_comparaison()
+        test_mise_a_jour()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS CONTRÔLE DE PERFORMANCE PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
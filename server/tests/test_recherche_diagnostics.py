@@ -0,0 +1,120 @@
+"""Tests de la recherche sémantique de diagnostics"""
+import sys
+import os
+import asyncio
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import config
+from services import MoteurDiagnostic
+from services.base_compilee import BaseCompilee, compiler_base
+from services.reduction import preparer_vecteurs
+from services.vectorisation import VectorisationService, texte_diagnostic
+
+def test_encodage_unique():
+    """Test symptômes et diagnostics encodés en un seul appel au modèle"""
+    print("\n=== Test Encodage Unique ===")
+
+    with open(config.SYMPTOMES_FILE, 'r', encoding='utf-8') as f:
+        symptomes = json.load(f)
+    with open(config.REGLES_FILE, 'r', encoding='utf-8') as f:
+        regles = json.load(f)
+
+    vectorisation = VectorisationService()
+    appels = []
+    encoder = vectorisation.model.encode
+    vectorisation.model.encode = lambda textes, **options: appels.append(len(textes)) or encoder(textes, **options)
+    try:
+        vectorisation.vectoriser_symptomes(symptomes, dimensions=16, type_stockage='int8', diagnostics=regles)
+    finally:
+        vectorisation.model.encode = encoder
+    assert appels == [len(symptomes) + len(regles)], appels
+    assert len(vectorisation.matrice) == len(symptomes) and len(vectorisation.matrice_diagnostics) == len(regles)
+    assert vectorisation.matrice_diagnostics.dimensions == vectorisation.reduction.dimensions == 16
+    print(f"✓ Un appel pour {appels[0]} textes, une seule réduction")
+
+    assert texte_diagnostic({'nom': 'Joint de culasse défectueux', 'description': 'Fuite.', 'conseils': None}) == \
+        'Joint de culasse défectueux. Fuite'
+    print("✓ Texte encodé : nom, description et conseils")
+
+def test_recherche():
+    """Test panne soupçonnée retrouvée, repli lexical sans modèle"""
+    print("\n=== Test Recherche de Diagnostics ===")
+
+    moteur = MoteurDiagnostic(base_compilee='')
+    assert moteur.attendre_vectorisation()
+    resultats = moteur.rechercher_diagnostics('joint de culasse')
+    assert resultats and resultats[0]['id'] == 'diag_joint_culasse', resultats
+    assert set(resultats[0]) == {'id', 'nom', 'description', 'gravite', 'cout_estimatif', 'conseils',
+                                 'score_similarite'}
+    print(f"✓ Embeddings : {resultats[0]['nom']} ({resultats[0]['score_similarite']})")
+
+    sans_modele = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    assert sans_modele.rechercher_diagnostics('joint de culasse')[0]['id'] == 'diag_joint_culasse'
+    print("✓ Sans modèle : index lexical des diagnostics")
+
+def test_base_compilee():
+    """Test embeddings des diagnostics relus depuis la base, sans encodage"""
+    print("\n=== Test Diagnostics Compilés ===")
+
+    moteur_json = MoteurDiagnostic(base_compilee='')
+    assert moteur_json.attendre_vectorisation()
+    vectorisation = moteur_json.vectorisation
+    reduction, ensemble = preparer_vecteurs(
+        np.vstack([vectorisation.matrice.valeurs, vectorisation.matrice_diagnostics.valeurs]), 0, 'float16')
+    nb_symptomes = len(vectorisation.matrice)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'base.diagkb')
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE, ensemble.lignes(0, nb_symptomes),
+                      config.EMBEDDING_MODEL, reduction, vecteurs_diagnostics=ensemble.lignes(nb_symptomes))
+        base = BaseCompilee(chemin)
+        assert base.vecteurs_diagnostics.valeurs.dtype == np.float16
+        assert base.ids_diagnostics == [d.id for d in moteur_json.diagnostics]
+
+        moteur = MoteurDiagnostic(base_compilee=chemin)
+        assert moteur.attendre_vectorisation()
+        assert moteur.vectorisation.matrice_diagnostics.valeurs.base is not None
+        compiles = moteur.rechercher_diagnostics('courroie de distribution')
+        assert [r['id'] for r in compiles] == \
+            [r['id'] for r in moteur_json.rechercher_diagnostics('courroie de distribution')]
+        print(f"✓ {len(base.ids_diagnostics)} embeddings de diagnostics projetés depuis la base")
+
+def test_endpoint():
+    """Test POST /rechercher/diagnostics (Flask et ASGI)"""
+    print("\n=== Test Endpoint Recherche de Diagnostics ===")
+
+    import api
+    from tests.test_asgi import _requete
+
+    assert api.moteur.attendre_vectorisation()
+    client = api.app.test_client()
+    reponse = client.post('/rechercher/diagnostics', json={'texte': 'joint de culasse'})
+    data = reponse.get_json()
+    assert reponse.status_code == 200 and data['resultats'][0]['id'] == 'diag_joint_culasse'
+    assert client.post('/rechercher/diagnostics', json={'texte': 'ab'}).status_code == 400
+    print("✓ Flask : résultats et texte trop court refusé")
+
+    statut, _, asynchrone = asyncio.run(_requete('POST', '/rechercher/diagnostics', {'texte': 'joint de culasse'}))
+    assert statut == 200 and asynchrone['resultats'] == data['resultats']
+    print("✓ ASGI : mêmes résultats")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS RECHERCHE DE DIAGNOSTICS")
+    print("=" * 50)
+
+    try:
+        test_encodage_unique()
+        test_recherche()
+        test_base_compilee()
+        test_endpoint()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS RECHERCHE DE DIAGNOSTICS PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,125 @@
+"""Tests de l'index lexical"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from utils.texte import decouper_mots, normaliser_texte, tokeniser
+from services.recherche_lexicale import IndexLexical
+
+SYMPTOMES = [
+    {'id': 'fumee_noire', 'nom': "Fumée noire à l'échappement", 'description': 'Émission de fumée noire'},
+    {'id': 'fumee_blanche', 'nom': "Fumée blanche à l'échappement", 'description': 'Émission de fumée blanche épaisse'},
+    {'id': 'batterie_faible', 'nom': 'Batterie faible', 'description': 'La batterie se décharge rapidement'},
+    {'id': 'voyant_batterie', 'nom': 'Voyant batterie allumé', 'description': None},
+]
+
+def test_tokenisation():
+    """Test normalisation et découpage du texte"""
+    print("\n=== Test Tokenisation ===")
+    
+    assert normaliser_texte("Fumée Noire") == "fumee noire"
+    print("✓ Accents et majuscules normalisés")
+    
+    assert tokeniser("La fumée noire à l'échappement") == ['fumee', 'noire', 'echappement']
+    assert decouper_mots("La fumée noire à l'échappement") == ['la', 'fumee', 'noire', 'a', 'l', 'echappement']
+    print("✓ Mots vides et élisions retirés (découpage commun avec l'autocomplétion)")
+    
+    assert tokeniser("freins") == tokeniser("frein")
+    print("✓ Pluriels ramenés au singulier")
+
+def test_recherche_lexicale():
+    """Test recherche BM25 et couverture"""
+    print("\n=== Test Recherche Lexicale ===")
+    
+    index = IndexLexical(SYMPTOMES)
+    
+    resultats = index.rechercher("fumee noire")
+    assert resultats[0] == ('fumee_noire', 1.0)
+    assert all(sid != 'fumee_blanche' for sid, _ in resultats)
+    print(f"✓ 'fumee noire' -> {resultats}")
+    
+    resultats = index.rechercher("BATTERIE")
+    assert {sid for sid, _ in resultats} == {'batterie_faible', 'voyant_batterie'}
+    # Le terme apparaît deux fois dans batterie_faible (nom et description)
+    assert resultats[0][0] == 'batterie_faible'
+    print(f"✓ 'BATTERIE' -> {resultats}")
+    
+    couverture = index.scorer("fumée moteur")
+    assert 0 < couverture[0] < 1
+    assert couverture[2] == 0
+    print("✓ Couverture partielle pour un terme absent")
+    
+    assert index.rechercher("xyz inconnu") == []
+    assert index.rechercher("le la les") == []
+    print("✓ Aucun résultat sans terme connu")
+
+def test_raccourci_lexical():
+    """Test noms exacts du catalogue servis par l'index seul, sans encodage"""
+    print("\n=== Test Raccourci Lexical ===")
+    
+    from services import MoteurDiagnostic
+    moteur = MoteurDiagnostic(base_compilee='')
+    assert moteur.attendre_vectorisation()
+    appels = []
+    encoder = moteur.vectorisation.model.encode
+    moteur.vectorisation.model.encode = lambda *args, **options: appels.append(args) or encoder(*args, **options)
+    try:
+        for symptome in moteur.symptomes.values():
+            for texte in (symptome.nom, f"{symptome.nom} {symptome.description or ''}"):
+                resultats = moteur.rechercher_symptomes(texte, mode='hybride')
+                assert resultats and resultats[0]['score_similarite'] == 1.0, texte
+    finally:
+        moteur.vectorisation.model.encode = encoder
+    assert not appels, f"{len(appels)} encodages"
+    print(f"✓ {len(moteur.symptomes)} noms (et nom + description) sans appel au modèle")
+
+def test_demarrage_a_froid():
+    """Test recherche servie par l'index lexical tant que le modèle charge, quel que soit le mode"""
+    print("\n=== Test Démarrage à Froid ===")
+    
+    import threading
+    from services import MoteurDiagnostic
+    from services.vectorisation import VectorisationService
+    
+    # Encodage des symptômes bloqué : le modèle n'est pas prêt
+    encoder = VectorisationService.vectoriser_symptomes
+    debloque = threading.Event()
+    def encoder_plus_tard(service, *args, **kwargs):
+        debloque.wait(5)
+        return encoder(service, *args, **kwargs)
+    VectorisationService.vectoriser_symptomes = encoder_plus_tard
+    try:
+        moteur = MoteurDiagnostic(base_compilee='', chargement_asynchrone=True)
+        assert not moteur.vectorisation.pret
+        for mode in ('hybride', 'semantique', 'lexical'):
+            resultats = moteur.rechercher_symptomes("batterie", top_k=3, mode=mode)
+            assert resultats == moteur.rechercher_symptomes("batterie", top_k=3, mode='lexical'), mode
+            assert resultats and 'batterie' in resultats[0]['id']
+    finally:
+        debloque.set()
+        VectorisationService.vectoriser_symptomes = encoder
+    assert moteur.attendre_vectorisation()
+    try:
+        moteur.rechercher_symptomes("batterie", mode='inconnu')
+        assert False, "mode inconnu accepté"
+    except ValueError:
+        pass
+    print("✓ Modes hybride et sémantique servis par l'index lexical pendant le chargement")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS DE L'INDEX LEXICAL")
+    print("=" * 50)
+    
+    try:
+        test_tokenisation()
+        test_recherche_lexicale()
+        test_raccourci_lexical()
+        test_demarrage_a_froid()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS INDEX LEXICAL PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,124 @@
+"""Tests de la recommandation du symptôme à vérifier"""
+import sys
+import os
+import math
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from models import Diagnostic
+from services import MoteurDiagnostic, SessionsDiagnostic
+from services.matrice_regles import MatriceRegles
+from services.recommandation import classer_symptomes, gains_information
+
+def _entropie(probabilites):
+    return -sum(p * math.log2(p) for p in probabilites if p > 0)
+
+def _gain_reference(probabilites, vraisemblances, colonne):
+    """Gain d'information calculé règle par règle"""
+    present = [p * v[colonne] for p, v in zip(probabilites, vraisemblances)]
+    absent = [p * (1 - v[colonne]) for p, v in zip(probabilites, vraisemblances)]
+    gain = _entropie(probabilites)
+    for conjointes in (present, absent):
+        marginale = sum(conjointes)
+        if marginale > 0:
+            gain -= marginale * _entropie([c / marginale for c in conjointes])
+    return gain
+
+def _regle(i, requis, optionnels=()):
+    return Diagnostic(id=f'r{i}', nom=f'Règle {i}', description='', gravite='Léger', cout_min=0, cout_max=0,
+                      symptomes_requis=list(requis), symptomes_optionnels=list(optionnels))
+
+def test_gains():
+    """Test gains vectorisés comparés au calcul symptôme par symptôme"""
+    print("\n=== Test Gain d'Information ===")
+
+    generateur = np.random.default_rng(0)
+    probabilites = generateur.dirichlet(np.ones(12))
+    vraisemblances = generateur.choice([0.05, 0.5, 0.95], size=(12, 30))
+    gains, p_present = gains_information(probabilites, vraisemblances)
+    attendus = [_gain_reference(probabilites, vraisemblances, j) for j in range(30)]
+    assert np.allclose(gains, attendus) and np.allclose(p_present, probabilites @ vraisemblances)
+    assert np.all(gains >= -1e-12)
+    print("✓ Mêmes gains que le calcul par symptôme, jamais négatifs")
+
+    # Deux règles qui ne diffèrent que par c : c les départage, a non
+    poids = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+    matrice = MatriceRegles([_regle(0, ['a', 'b']), _regle(1, ['a', 'c'])], poids)
+    classement = classer_symptomes(matrice, np.arange(2), np.array([0.5, 0.5]))
+    colonnes = [matrice.ids_symptomes[c] for c, gain, _ in classement if gain > 1e-9]
+    assert set(colonnes) == {'b', 'c'}, classement
+    assert classer_symptomes(matrice, np.arange(2), np.zeros(2)) == []
+    print("✓ Symptôme commun à toutes les candidates : gain nul")
+
+def test_moteur_et_session():
+    """Test symptômes choisis exclus, session et moteur d'accord"""
+    print("\n=== Test Recommandation du Moteur ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    choisis = ['demarrage_difficile']
+    recommandations = moteur.recommander_symptomes(choisis, limite=4)
+    assert 0 < len(recommandations) <= 4
+    assert all(r['id'] in moteur.symptomes and r['id'] not in choisis for r in recommandations)
+    assert [r['gain'] for r in recommandations] == sorted((r['gain'] for r in recommandations), reverse=True)
+    assert moteur.recommander_symptomes(['inconnu']) == []
+    print(f"✓ À vérifier : {', '.join(r['id'] for r in recommandations)}")
+
+    session = SessionsDiagnostic(ttl=60, max_sessions=1).creer(moteur)
+    assert session.recommander(4) == []
+    session.ajouter(choisis[0])
+    assert session.recommander(4) == recommandations
+    print("✓ Session : mêmes recommandations que le moteur")
+
+def test_grande_base():
+    """Test temps de réponse sur des milliers de règles"""
+    print("\n=== Test Grande Base ===")
+
+    generateur = random.Random(1)
+    ids = [f's{i}' for i in range(800)]
+    regles = [_regle(i, generateur.sample(ids, 3), generateur.sample(ids, 2)) for i in range(5000)]
+    matrice = MatriceRegles(regles, {sid: 1.0 for sid in ids})
+    scores = matrice.scorer(matrice.encoder_cas([ids[:4]]))[0]
+
+    debut = time.perf_counter()
+    classement = classer_symptomes(matrice, np.arange(matrice.nb_regles), scores)
+    duree = time.perf_counter() - debut
+    assert classement and duree < 0.5, duree
+    print(f"✓ 5000 règles : {duree * 1000:.1f} ms")
+
+def test_endpoint():
+    """Test POST /recommander et GET /sessions/<id>/recommandations"""
+    print("\n=== Test Endpoint Recommandation ===")
+
+    import api
+    client = api.app.test_client()
+    reponse = client.post('/recommander?limit=3', json={'symptomes': ['demarrage_difficile']})
+    data = reponse.get_json()
+    assert reponse.status_code == 200 and 0 < len(data['recommandations']) <= 3
+    assert client.post('/recommander', json={'symptomes': []}).status_code == 400
+    assert client.post('/recommander?limit=0', json={'symptomes': ['fumee_noire']}).status_code == 400
+    print("✓ Recommandations et requêtes invalides refusées")
+
+    identifiant = client.post('/sessions', json={'symptomes': ['demarrage_difficile']}).get_json()['session']
+    reponse = client.get(f'/sessions/{identifiant}/recommandations?limit=3')
+    assert reponse.get_json()['recommandations'] == data['recommandations']
+    print("✓ Session : mêmes recommandations")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS RECOMMANDATION")
+    print("=" * 50)
+
+    try:
+        test_gains()
+        test_moteur_et_session()
+        test_grande_base()
+        test_endpoint()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS RECOMMANDATION PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
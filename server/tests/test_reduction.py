@@ -0,0 +1,89 @@
+"""Tests des embeddings compacts (réduction et quantification)"""
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services.reduction import (
+    MatriceEmbeddings, ReductionEmbeddings, normaliser, preparer_vecteurs, rapport_rappel
+)
+
+def _catalogue(nb_symptomes=2000, dimensions=384, rang=48, graine=0):
+    """Embeddings synthétiques concentrés sur un sous-espace, comme ceux d'un modèle"""
+    generateur = np.random.default_rng(graine)
+    base = generateur.standard_normal((rang, dimensions)).astype(np.float32)
+    vecteurs = generateur.standard_normal((nb_symptomes, rang)).astype(np.float32) @ base
+    vecteurs += 0.05 * generateur.standard_normal((nb_symptomes, dimensions)).astype(np.float32)
+    requetes = vecteurs[:200] + 0.3 * generateur.standard_normal((200, dimensions)).astype(np.float32)
+    return vecteurs, requetes
+
+def test_quantification():
+    """Test stockage float16 et int8"""
+    print("\n=== Test Quantification ===")
+
+    vecteurs = normaliser(_catalogue(nb_symptomes=300)[0])
+    requete = vecteurs[7]
+    reference = vecteurs @ requete
+
+    for type_stockage, tolerance in (('float32', 1e-6), ('float16', 2e-3), ('int8', 2e-2)):
+        matrice = MatriceEmbeddings.compresser(vecteurs, type_stockage)
+        scores = matrice.produit(requete)
+        assert scores.shape == (300,)
+        assert np.abs(scores - reference).max() < tolerance, type_stockage
+        assert matrice.produit(vecteurs[:3]).shape == (300, 3)
+    print("✓ Scores float16 et int8 proches de la pleine précision")
+
+    matrice = MatriceEmbeddings.compresser(vecteurs, 'int8')
+    assert matrice.valeurs.dtype == np.int8 and matrice.echelles is not None
+    assert matrice.nbytes < vecteurs.nbytes / 3.5
+    print(f"✓ int8 : {vecteurs.nbytes} -> {matrice.nbytes} octets")
+
+    try:
+        MatriceEmbeddings.compresser(vecteurs, 'int4')
+        assert False, "Type inconnu accepté"
+    except ValueError:
+        print("✓ Type de stockage inconnu refusé")
+
+def test_reduction_et_rappel():
+    """Test réduction de dimension et rapport de rappel@k"""
+    print("\n=== Test Réduction et Rappel ===")
+
+    vecteurs, requetes = _catalogue()
+    reduction, matrice = preparer_vecteurs(vecteurs, 128, 'int8')
+    assert isinstance(reduction, ReductionEmbeddings)
+    assert reduction.dimensions == 128 and matrice.dimensions == 128
+    assert reduction.projeter(requetes[0]).shape == (128,)
+
+    rapport = rapport_rappel(vecteurs, requetes, reduction, matrice)
+    assert rapport['compression'] >= 11
+    assert rapport['rappel@1'] >= 0.9 and rapport['rappel@10'] >= 0.9
+    print(f"✓ 384 -> 128 dimensions en int8 : {rapport}")
+
+    # Les scores restent des cosinus : les seuils de similarité s'appliquent toujours
+    complets = normaliser(vecteurs) @ normaliser(requetes[0])
+    compacts = matrice.produit(reduction.projeter(requetes[0]))
+    assert np.abs(complets - compacts).max() < 0.05
+    print("✓ Scores réduits proches des cosinus d'origine")
+
+    # Petit catalogue : pas plus d'axes que de symptômes
+    reduction, matrice = preparer_vecteurs(vecteurs[:40], 128, 'float16')
+    assert reduction is not None and reduction.dimensions == 40
+    rapport = rapport_rappel(vecteurs[:40], requetes[:40], reduction, matrice)
+    assert rapport['rappel@5'] >= 0.95
+    print(f"✓ Réduction bornée par le rang : {reduction.dimensions} axes")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS EMBEDDINGS COMPACTS")
+    print("=" * 50)
+
+    try:
+        test_quantification()
+        test_reduction_et_rappel()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS EMBEDDINGS COMPACTS PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
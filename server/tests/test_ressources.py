@@ -0,0 +1,68 @@
+"""Tests de la répartition des threads d'inférence"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from utils.ressources import lire_quota_cgroup, cpus_disponibles, calculer_repartition
+
+def _ecrire(racine, chemin, contenu):
+    chemin = os.path.join(racine, chemin)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    with open(chemin, 'w') as f:
+        f.write(contenu)
+
+def test_quota_cgroup():
+    """Test lecture des quotas cgroup v1 et v2"""
+    print("\n=== Test Quota cgroup ===")
+
+    with tempfile.TemporaryDirectory() as racine:
+        assert lire_quota_cgroup(racine) is None
+        _ecrire(racine, 'cpu.max', 'max 100000\n')
+        assert lire_quota_cgroup(racine) is None
+        _ecrire(racine, 'cpu.max', '250000 100000\n')
+        assert lire_quota_cgroup(racine) == 2.5
+        assert cpus_disponibles(racine) <= 2.5
+    print("✓ cgroup v2 (cpu.max)")
+
+    with tempfile.TemporaryDirectory() as racine:
+        _ecrire(racine, 'cpu/cpu.cfs_quota_us', '-1\n')
+        _ecrire(racine, 'cpu/cpu.cfs_period_us', '100000\n')
+        assert lire_quota_cgroup(racine) is None
+        _ecrire(racine, 'cpu/cpu.cfs_quota_us', '400000\n')
+        assert lire_quota_cgroup(racine) == 4.0
+    print("✓ cgroup v1 (cfs_quota_us)")
+
+def test_repartition():
+    """Test partage des cœurs entre workers"""
+    print("\n=== Test Répartition ===")
+
+    assert calculer_repartition(workers=1, threads_inference=0, cpus=8).threads_inference == 8
+    assert calculer_repartition(workers=4, threads_inference=0, cpus=8).threads_inference == 2
+    assert calculer_repartition(workers=3, threads_inference=0, cpus=8).threads_inference == 2
+    print("✓ Cœurs partagés sans sursouscription")
+
+    assert calculer_repartition(workers=16, threads_inference=0, cpus=8).threads_inference == 1
+    assert calculer_repartition(workers=2, threads_inference=0, cpus=1.5).threads_inference == 1
+    print("✓ Au moins un thread par worker")
+
+    repartition = calculer_repartition(workers=4, threads_inference=3, cpus=8)
+    assert repartition.threads_inference == 3
+    assert '4 worker(s)' in str(repartition)
+    print(f"✓ Forçage par configuration: {repartition}")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS RÉPARTITION CPU")
+    print("=" * 50)
+
+    try:
+        test_quota_cgroup()
+        test_repartition()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS RÉPARTITION CPU PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
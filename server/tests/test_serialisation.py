@@ -0,0 +1,128 @@
+"""Tests de la sérialisation JSON rapide et MessagePack"""
+import sys
+import os
+import asyncio
+import json
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from utils import serialisation
+from utils.serialisation import encoder_json, decoder, encoder, type_reponse
+
+def test_encodage_json():
+    """Test même document que l'encodeur standard de jsonify"""
+    print("\n=== Test Encodage JSON ===")
+
+    donnees = {'z': 1, 'a': [1.5, None, True], 'nom': 'Bougies défectueuses', 'score': np.float64(0.25),
+               'vecteur': np.arange(3)}
+    encode = encoder_json(donnees)
+    attendu = {'a': [1.5, None, True], 'nom': 'Bougies défectueuses', 'score': 0.25, 'vecteur': [0, 1, 2], 'z': 1}
+    assert json.loads(encode) == attendu and list(json.loads(encode)) == sorted(attendu)
+    assert decoder(encode, 'application/json') == attendu
+    print(f"✓ Clés triées, types numpy convertis ({'orjson' if serialisation.orjson else 'json'})")
+
+    import api
+    catalogue = api.app.test_client().get('/symptomes?limit=500').get_json()
+    debut = time.perf_counter()
+    for _ in range(50):
+        json.dumps(catalogue, sort_keys=True, separators=(',', ':'))
+    standard = time.perf_counter() - debut
+    debut = time.perf_counter()
+    for _ in range(50):
+        encoder_json(catalogue)
+    rapide = time.perf_counter() - debut
+    print(f"✓ Catalogue : {standard * 20:.2f} ms (json) / {rapide * 20:.2f} ms par réponse")
+
+def test_negociation():
+    """Test format choisi par Accept, JSON par défaut"""
+    print("\n=== Test Négociation ===")
+
+    assert type_reponse(None) == type_reponse('*/*') == 'application/json'
+    assert type_reponse('application/json, application/msgpack') == 'application/json'
+    if serialisation.msgpack is None:
+        assert type_reponse('application/msgpack') == 'application/json'
+        print("✓ msgpack non installé : toujours JSON")
+        return
+    assert type_reponse('application/msgpack') == 'application/msgpack'
+    assert type_reponse('application/json;q=0.5, application/x-msgpack') == 'application/x-msgpack'
+    assert decoder(encoder({'a': [1, 'é']}, 'application/msgpack'), 'application/msgpack') == {'a': [1, 'é']}
+    try:
+        decoder(b'\xc1', 'application/msgpack')
+        assert False, "corps invalide accepté"
+    except ValueError:
+        pass
+    print("✓ MessagePack seulement s'il est préféré")
+
+def test_endpoints():
+    """Test corps et réponses MessagePack (Flask et ASGI), contrat JSON inchangé"""
+    print("\n=== Test Endpoints ===")
+
+    import api
+    from tests.test_asgi import _requete
+
+    client = api.app.test_client()
+    corps = {'symptomes': ['fumee_noire', 'consommation_elevee']}
+    reponse = client.post('/diagnostiquer', json=corps)
+    assert reponse.mimetype == 'application/json' and reponse.data.endswith(b'\n')
+    attendu = reponse.get_json()
+    print("✓ JSON par défaut")
+
+    if serialisation.msgpack is None:
+        print("✓ msgpack non installé : tests MessagePack ignorés")
+        return
+    msgpack = serialisation.msgpack
+    reponse = client.post('/diagnostiquer', data=msgpack.packb(corps), content_type='application/msgpack',
+                          headers={'Accept': 'application/msgpack'})
+    assert reponse.status_code == 200 and reponse.mimetype == 'application/msgpack'
+    assert 'Accept' in reponse.headers.get('Vary', '')
+    assert msgpack.unpackb(reponse.data) == attendu
+    assert len(reponse.data) < len(json.dumps(attendu).encode())
+    invalide = client.post('/diagnostiquer', data=b'\xc1', content_type='application/msgpack')
+    assert invalide.status_code == client.post('/diagnostiquer', data=b'{', content_type='application/json').status_code
+    assert invalide.get_json()['succes'] is False
+    print("✓ Flask : même réponse en MessagePack, corps invalide traité comme un JSON invalide")
+
+    portee_json = asyncio.run(_requete('POST', '/diagnostiquer', corps))
+    assert portee_json[0] == 200 and portee_json[2] == attendu
+
+    async def requete_msgpack():
+        messages = [{'type': 'http.request', 'body': msgpack.packb(corps), 'more_body': False}]
+        recu = {}
+
+        async def receive():
+            return messages.pop(0) if messages else await asyncio.sleep(3600)
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                recu['statut'], recu['entetes'] = message['status'], dict(message['headers'])
+            else:
+                recu['corps'] = message['body']
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/diagnostiquer', 'query_string': b'',
+                 'headers': [(b'content-type', b'application/msgpack'), (b'accept', b'application/msgpack')]}
+        from asgi import application
+        await application(scope, receive, send)
+        return recu
+
+    recu = asyncio.run(requete_msgpack())
+    assert recu['statut'] == 200 and recu['entetes'][b'content-type'] == b'application/msgpack'
+    assert msgpack.unpackb(recu['corps']) == attendu
+    print("✓ ASGI : corps et réponse MessagePack")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS SÉRIALISATION")
+    print("=" * 50)
+
+    try:
+        test_encodage_json()
+        test_negociation()
+        test_endpoints()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS SÉRIALISATION PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,157 @@
+"""Tests des sessions de diagnostic incrémental"""
+import sys
+import os
+import random
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from models import Vehicule
+from services import MoteurDiagnostic, SessionsDiagnostic
+from services.similarite_symptomes import SimilariteSymptomes
+
+def _scores_session(session):
+    """Score de chaque règle vu par la session (règles non touchées : score sans symptôme)"""
+    return np.array([session._score(r) for r in range(session.moteur.matrice.nb_regles)])
+
+def _suivre(moteur, session, generateur, etapes):
+    """Ajouts et retraits au hasard, comparés à chaque étape au scoring complet"""
+    ids = list(moteur.symptomes)
+    souple = session.similarite is not None
+    for _ in range(etapes):
+        if session.symptomes and generateur.random() < 0.4:
+            session.retirer(generateur.choice(session.symptomes))
+        else:
+            session.ajouter(generateur.choice(ids))
+        attendus = moteur._scorer([session.symptomes], souple)[0]
+        assert np.allclose(_scores_session(session), attendus, atol=1e-9), session.symptomes
+        if session.symptomes:
+            assert session.resultat() == moteur.diagnostiquer(
+                session.symptomes, souple=souple, vehicule=session.vehicule)
+
+def test_scores_incrementaux():
+    """Test scores tenus à jour égaux au scoring complet"""
+    print("\n=== Test Scores Incrémentaux ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    sessions = SessionsDiagnostic(ttl=60, max_sessions=10)
+    _suivre(moteur, sessions.creer(moteur), random.Random(3), 300)
+    print("✓ 300 ajouts et retraits : mêmes scores et même diagnostic")
+
+    session = sessions.creer(moteur, Vehicule(carburant='diesel'))
+    _suivre(moteur, session, random.Random(5), 100)
+    for sid in ['demarrage_difficile', 'ralenti_irregulier']:
+        session.ajouter(sid)
+    assert "Bougies d'allumage défectueuses" not in [r['diagnostic'] for r in session.classement(50)]
+    print("✓ Véhicule : règles non applicables hors du classement")
+
+    session = sessions.creer(moteur)
+    assert session.ajouter('fumee_noire') and not session.ajouter('fumee_noire')
+    assert session.retirer('fumee_noire') and not session.retirer('fumee_noire')
+    assert session.classement(5) == [] and not session._scores
+    try:
+        session.ajouter('inconnu')
+        assert False, "symptôme inconnu accepté"
+    except KeyError:
+        pass
+    print("✓ Doublons et retraits sans effet, retour à l'état vide")
+
+def test_correspondance_souple():
+    """Test voisins crédités puis retirés avec le symptôme"""
+    print("\n=== Test Session Souple ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    nb_colonnes = len(moteur.matrice.ids_symptomes)
+    generateur = np.random.default_rng(2)
+    # Voisinage aléatoire non symétrique : trois voisins par symptôme
+    voisins = np.concatenate([generateur.choice(np.delete(np.arange(nb_colonnes), i), 3, replace=False)
+                              for i in range(nb_colonnes)]).astype(np.int32)
+    valeurs = generateur.uniform(0.7, 0.95, len(voisins)).astype(np.float32)
+    debuts = np.arange(0, len(voisins) + 1, 3)
+    moteur.similarite = SimilariteSymptomes(debuts, voisins, valeurs, 0.7)
+
+    session = SessionsDiagnostic(ttl=60, max_sessions=10).creer(moteur, souple=True)
+    _suivre(moteur, session, random.Random(7), 300)
+    print("✓ Présences souples recalculées sur les seuls voisins")
+
+def test_expiration():
+    """Test expiration après inactivité et nombre maximum de sessions"""
+    print("\n=== Test Expiration ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    sessions = SessionsDiagnostic(ttl=60, max_sessions=2)
+    a, b = sessions.creer(moteur), sessions.creer(moteur)
+    assert sessions.obtenir(a.id) is a
+    c = sessions.creer(moteur)
+    assert sessions.obtenir(b.id) is None and sessions.obtenir(c.id) is c
+    print("✓ Au-delà du maximum, la moins récemment utilisée part")
+
+    a.derniere_activite -= 61
+    assert sessions.obtenir(a.id) is None
+    stats = sessions.statistiques()
+    assert stats['ouvertes'] == 1 and stats['expirees'] == 1 and stats['evincees'] == 1, stats
+    assert sessions.fermer(c.id) and not sessions.fermer(c.id)
+    print("✓ Session inactive expirée")
+
+def test_routes():
+    """Test ouverture, ajout, retrait et fermeture par l'API"""
+    print("\n=== Test Routes Sessions ===")
+
+    import api
+    client = api.app.test_client()
+
+    reponse = client.post('/sessions', json={'symptomes': ['demarrage_difficile'], 'vehicule': {'carburant': 'diesel'}})
+    assert reponse.status_code == 201
+    identifiant = reponse.get_json()['session']
+    assert reponse.get_json()['symptomes'] == ['demarrage_difficile']
+
+    reponse = client.post(f'/sessions/{identifiant}/symptomes?limit=3', json={'symptome': 'ralenti_irregulier'})
+    data = reponse.get_json()
+    attendu = api.moteur.diagnostiquer(['demarrage_difficile', 'ralenti_irregulier'],
+                                       vehicule=Vehicule(carburant='diesel'))
+    assert reponse.status_code == 200 and data['resultat'] == attendu
+    assert 0 < len(data['classement']) <= 3 and data['classement'][0]['diagnostic'] == attendu['diagnostic']
+    print(f"✓ Classement en direct : {data['classement'][0]['diagnostic']}")
+
+    reponse = client.delete(f'/sessions/{identifiant}/symptomes/demarrage_difficile')
+    assert reponse.get_json()['symptomes'] == ['ralenti_irregulier']
+    assert client.post(f'/sessions/{identifiant}/symptomes', json={'symptome': 'inconnu'}).status_code == 400
+    assert client.get(f'/sessions/{identifiant}?limit=0').status_code == 400
+    assert client.post('/sessions', json={'symptomes': ['inconnu']}).status_code == 400
+    print("✓ Symptôme inconnu et limite invalide refusés")
+
+    session = api.sessions.obtenir(identifiant)
+    recommander = session.recommander
+    def echec(limite):
+        raise RuntimeError("index corrompu")
+    session.recommander = echec
+    try:
+        reponse = client.get(f'/sessions/{identifiant}/recommandations')
+        assert reponse.status_code == 500 and reponse.is_json
+        assert reponse.get_json() == {'succes': False, 'erreur': 'Erreur serveur: index corrompu'}
+    finally:
+        session.recommander = recommander
+    assert not session.verrou.locked()
+    print("✓ Erreur inattendue : 500 au format JSON, session déverrouillée")
+
+    assert client.delete(f'/sessions/{identifiant}').status_code == 200
+    reponse = client.get(f'/sessions/{identifiant}')
+    assert reponse.status_code == 404 and reponse.get_json()['succes'] is False
+    print("✓ Session fermée : 404")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS SESSIONS")
+    print("=" * 50)
+
+    try:
+        test_scores_incrementaux()
+        test_correspondance_souple()
+        test_expiration()
+        test_routes()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS SESSIONS PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
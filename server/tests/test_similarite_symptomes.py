@@ -0,0 +1,147 @@
+"""Tests de la similarité entre symptômes (correspondance souple des règles)"""
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import config
+from services import MoteurDiagnostic
+from services.base_compilee import BaseCompilee, compiler_base
+from services.reduction import MatriceEmbeddings, normaliser
+from services.similarite_symptomes import SimilariteSymptomes
+
+def _vecteurs():
+    """a et a' proches (cos 0.9), b et c éloignés de tout"""
+    return normaliser(np.array([
+        [1.0, 0.0, 0.0],
+        [0.9, np.sqrt(1 - 0.81), 0.0],
+        [0.0, 0.0, 1.0],
+        [-1.0, 0.0, 0.0],
+    ], dtype=np.float32))
+
+def test_matrice_creuse():
+    """Test paires seuillées et présence souple"""
+    print("\n=== Test Matrice Creuse ===")
+
+    similarite = SimilariteSymptomes.depuis_embeddings(MatriceEmbeddings(_vecteurs()), 5, seuil=0.8)
+    assert similarite.nb_paires == 2
+    assert list(similarite.debuts) == [0, 1, 2, 2, 2, 2]
+    assert list(similarite.voisins) == [1, 0]
+    assert np.allclose(similarite.valeurs, 0.9)
+    print("✓ Seules les paires au-dessus du seuil sont gardées (diagonale exclue)")
+
+    quantifiee = SimilariteSymptomes.depuis_embeddings(MatriceEmbeddings.compresser(_vecteurs(), 'int8'), 5, 0.8)
+    assert list(quantifiee.voisins) == [1, 0] and np.allclose(quantifiee.valeurs, 0.9, atol=0.01)
+    print("✓ Embeddings int8 : mêmes paires")
+
+    presence = np.array([[1, 0, 0, 0, 0], [0, 1, 1, 0, 0], [0, 0, 0, 0, 1]], dtype=np.float64)
+    souple = similarite.etendre(presence)
+    assert np.allclose(souple, [[1, 0.9, 0, 0, 0], [0.9, 1, 1, 0, 0], [0, 0, 0, 0, 1]])
+    assert np.array_equal(presence[:, 2:], souple[:, 2:])
+    print("✓ Voisins des symptômes choisis crédités de leur similarité")
+
+    proches = SimilariteSymptomes.depuis_embeddings(MatriceEmbeddings(_vecteurs()), 4, seuil=-1.0, max_voisins=1)
+    assert proches.nb_paires == 4 and list(proches.voisins[:2]) == [1, 0]
+    print("✓ Au plus max_voisins voisins, les plus proches")
+
+def test_diagnostic_souple():
+    """Test symptôme proche d'un symptôme requis"""
+    print("\n=== Test Diagnostic Souple ===")
+
+    moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee='')
+    colonnes = moteur.matrice.index_symptomes
+    voyant, chauffe = colonnes['voyant_temperature'], colonnes['moteur_chauffe']
+
+    # voyant_temperature <-> moteur_chauffe à 0.8
+    nb_colonnes = len(moteur.matrice.ids_symptomes)
+    nombres = np.zeros(nb_colonnes, dtype=np.int64)
+    nombres[[voyant, chauffe]] = 1
+    debuts = np.concatenate(([0], np.cumsum(nombres)))
+    voisins = np.array([chauffe, voyant] if voyant < chauffe else [voyant, chauffe], dtype=np.int32)
+    moteur.similarite = SimilariteSymptomes(debuts, voisins, np.full(2, 0.8, dtype=np.float32), 0.8)
+
+    cas = ['voyant_temperature', 'fuite_liquide']
+    exact = moteur.diagnostiquer(cas, souple=False)
+    souple = moteur.diagnostiquer(cas, souple=True)
+    assert souple['score'] > exact['score']
+    assert souple['symptomes_utilises'] == exact['symptomes_utilises']
+    print(f"✓ {souple['diagnostic']}: {exact['score']} -> {souple['score']}")
+
+    # Le crédit souple ne fait jamais baisser un score
+    lot = [list(d.symptomes_requis) for d in moteur.diagnostics] + [['voyant_temperature'], cas]
+    exacts = moteur._scorer(lot, souple=False)
+    souples = moteur._scorer(lot, souple=True)
+    assert np.all(souples >= exacts - 1e-12)
+    assert [r['diagnostic'] for r in moteur.diagnostiquer_lot(lot[:-2], souple=True)] == \
+        [r['diagnostic'] for r in moteur.diagnostiquer_lot(lot[:-2], souple=False)]
+    print("✓ Scores jamais réduits, règles complètes inchangées")
+
+def test_base_compilee():
+    """Test paires compilées avec les embeddings, relues sans calcul"""
+    print("\n=== Test Similarité Compilée ===")
+
+    with open(config.SYMPTOMES_FILE, 'r', encoding='utf-8') as f:
+        nb_symptomes = len(json.load(f))
+    vecteurs = normaliser(np.random.default_rng(1).standard_normal((nb_symptomes, 8)).astype(np.float32))
+    matrice = MatriceEmbeddings(vecteurs)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'base.diagkb')
+        compiler_base(chemin, config.SYMPTOMES_FILE, config.REGLES_FILE, matrice, config.EMBEDDING_MODEL,
+                      seuil_similarite=0.6, max_voisins=4)
+        base = BaseCompilee(chemin)
+        relue = base.similarite_symptomes
+        assert relue is not None and relue.seuil == 0.6
+
+        attendue = SimilariteSymptomes.depuis_embeddings(matrice, len(base.ids_colonnes), 0.6, 4)
+        for nom in SimilariteSymptomes.TABLEAUX:
+            assert np.array_equal(getattr(relue, nom), getattr(attendue, nom))
+        assert relue.nb_paires > 0 and np.all(relue.valeurs >= 0.6)
+        print(f"✓ {relue.nb_paires} paires relues depuis la base")
+
+        souple_initiale = config.CORRESPONDANCE_SOUPLE
+        config.CORRESPONDANCE_SOUPLE = True
+        try:
+            moteur = MoteurDiagnostic(avec_vectorisation=False, base_compilee=chemin)
+        finally:
+            config.CORRESPONDANCE_SOUPLE = souple_initiale
+        assert moteur.similarite is not None and moteur.similarite.nb_paires == relue.nb_paires
+        print("✓ Moteur sans modèle : similarité prise dans la base")
+
+def test_chargement_json():
+    """Test similarité calculée après l'encodage des symptômes"""
+    print("\n=== Test Similarité au Chargement ===")
+
+    souple_initiale = config.CORRESPONDANCE_SOUPLE
+    config.CORRESPONDANCE_SOUPLE = True
+    try:
+        moteur = MoteurDiagnostic(base_compilee='')
+    finally:
+        config.CORRESPONDANCE_SOUPLE = souple_initiale
+    assert moteur.attendre_vectorisation() and moteur.similarite is not None
+    similarite = moteur.similarite
+    assert len(similarite.debuts) == len(moteur.matrice.ids_symptomes) + 1
+    assert np.all(similarite.valeurs >= config.SEUIL_SIMILARITE_SYMPTOMES)
+    assert np.all(np.diff(similarite.debuts) <= config.MAX_VOISINS_SYMPTOME)
+    assert moteur.diagnostiquer(['voyant_temperature'], souple=True)['succes']
+    print(f"✓ {similarite.nb_paires} paires au-dessus de {similarite.seuil}")
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS SIMILARITÉ ENTRE SYMPTÔMES")
+    print("=" * 50)
+
+    try:
+        test_matrice_creuse()
+        test_diagnostic_souple()
+        test_base_compilee()
+        test_chargement_json()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS SIMILARITÉ PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
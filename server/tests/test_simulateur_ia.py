@@ -0,0 +1,133 @@
+"""Tests du simulateur Gemini local et des replis de AssistantIA"""
+import sys
+import os
+import asyncio
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import config
+from services import AssistantIA
+from tests.simulateur_gemini import ParametresSimulation, demarrer
+
+DIAGNOSTIC = {
+    'diagnostic': "Problème d'injection",
+    'description': "Injecteurs encrassés",
+    'gravite': 'Moyen',
+    'symptomes_utilises': ['Fumée noire'],
+}
+
+def _assistant(serveur, timeout=2.0):
+    """AssistantIA branché sur un simulateur"""
+    url, delai = config.IA_SIMULATEUR_URL, config.IA_TIMEOUT
+    config.IA_SIMULATEUR_URL, config.IA_TIMEOUT = serveur.url, timeout
+    try:
+        assistant = AssistantIA()
+    finally:
+        config.IA_SIMULATEUR_URL, config.IA_TIMEOUT = url, delai
+    assistant.actif = True
+    return assistant
+
+def test_reformulation_simulee():
+    """Test appels bloquant et asynchrone, réponse en un bloc ou en morceaux"""
+    print("\n=== Test Reformulation Simulée ===")
+
+    serveur = demarrer(ParametresSimulation(latence_ms=20, dispersion=0))
+    try:
+        assistant = _assistant(serveur)
+        texte = assistant.reformuler_diagnostic(DIAGNOSTIC)
+        assert "Problème d'injection" in texte and "simulée" in texte
+        assert asyncio.run(assistant.reformuler_diagnostic_async(DIAGNOSTIC)) == texte
+        print("✓ Explication simulée (bloquant et asynchrone)")
+
+        serveur.parametres.morceaux, serveur.parametres.intervalle_ms = 4, 20
+        assert assistant.reformuler_diagnostic(DIAGNOSTIC) == texte
+        assert asyncio.run(assistant.reformuler_diagnostic_async(DIAGNOSTIC)) == texte
+        print("✓ Réponse en 4 morceaux réassemblée")
+
+        stats = assistant.statistiques()
+        assert stats['appels'] == 4 and stats['echecs'] == 0
+        assert serveur.compteurs['succes'] == 4
+    finally:
+        serveur.shutdown()
+
+def test_replis():
+    """Test erreurs et délais dépassés : repli sur la description"""
+    print("\n=== Test Replis ===")
+
+    serveur = demarrer(ParametresSimulation(latence_ms=10, dispersion=0, taux_erreur=1.0))
+    try:
+        assistant = _assistant(serveur, timeout=0.3)
+        assert assistant.reformuler_diagnostic(DIAGNOSTIC) == DIAGNOSTIC['description']
+        assert asyncio.run(assistant.reformuler_diagnostic_async(DIAGNOSTIC)) == DIAGNOSTIC['description']
+        assert assistant.statistiques()['echecs'] == 2
+        assert assistant.statistiques()['delais_depasses'] == 0
+        print("✓ Erreur HTTP 503 : description renvoyée")
+
+        serveur.parametres.taux_erreur, serveur.parametres.taux_blocage = 0.0, 1.0
+        serveur.parametres.duree_blocage = 1.0
+        debut = time.perf_counter()
+        assert assistant.reformuler_diagnostic(DIAGNOSTIC) == DIAGNOSTIC['description']
+        assert asyncio.run(assistant.reformuler_diagnostic_async(DIAGNOSTIC)) == DIAGNOSTIC['description']
+        duree = time.perf_counter() - debut
+        assert duree < 0.9, f"Délai non respecté ({duree:.2f}s)"
+        print(f"✓ Sans réponse : repli après le délai ({duree:.2f}s pour 2 appels)")
+
+        # Flux trop lent : le délai couvre toute la réponse, pas chaque lecture
+        serveur.parametres.taux_blocage = 0.0
+        serveur.parametres.morceaux, serveur.parametres.intervalle_ms = 5, 150
+        assert assistant.reformuler_diagnostic(DIAGNOSTIC) == DIAGNOSTIC['description']
+        assert asyncio.run(assistant.reformuler_diagnostic_async(DIAGNOSTIC)) == DIAGNOSTIC['description']
+        assert assistant.statistiques()['delais_depasses'] == 4
+        print("✓ Réponse en flux trop lente interrompue")
+    finally:
+        serveur.shutdown()
+
+def test_diagnostic_de_bout_en_bout():
+    """Test POST /diagnostiquer avec le simulateur (Flask et ASGI)"""
+    print("\n=== Test Diagnostic de Bout en Bout ===")
+
+    import api
+    import asgi
+    from tests.test_asgi import _requete
+
+    serveur = demarrer(ParametresSimulation(latence_ms=200, dispersion=0))
+    assistant_initial = api.assistant_ia
+    try:
+        api.assistant_ia = asgi.assistant_ia = _assistant(serveur)
+        reponse = api.app.test_client().post('/diagnostiquer', json={'symptomes': ['fumee_noire']})
+        assert reponse.status_code == 200
+        assert "simulée" in reponse.get_json()['explication_ia']
+        print("✓ Flask : explication du simulateur")
+
+        async def lancer(nombre):
+            return await asyncio.gather(*[
+                _requete('POST', '/diagnostiquer', {'symptomes': ['fumee_noire']})
+                for _ in range(nombre)
+            ])
+
+        debut = time.perf_counter()
+        reponses = asyncio.run(lancer(50))
+        duree = time.perf_counter() - debut
+        assert all(statut == 200 and "simulée" in data['explication_ia'] for statut, _, data in reponses)
+        assert duree < 2, f"Appels IA sérialisés ({duree:.2f}s)"
+        print(f"✓ ASGI : 50 diagnostics avec appel de 0.2s en {duree:.2f}s")
+    finally:
+        api.assistant_ia = asgi.assistant_ia = assistant_initial
+        serveur.shutdown()
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS SIMULATEUR IA")
+    print("=" * 50)
+
+    try:
+        test_reformulation_simulee()
+        test_replis()
+        test_diagnostic_de_bout_en_bout()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS SIMULATEUR IA PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
@@ -0,0 +1,197 @@
+"""Tests des bases de connaissances par tenant"""
+import sys
+import os
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import config
+from services import BasesTenants, TenantInconnu
+from services.tenants import separer_prefixe_tenant, taille_moteur
+from services.vectorisation import VectorisationService
+
+# Règle propre à la marque : reconnaissable dans les réponses
+REGLE_MARQUE = {
+    'id': 'diag_marque',
+    'nom': 'Défaut connu de la marque',
+    'description': 'Problème récurrent sur ce modèle',
+    'gravite': 'Moyen',
+    'cout_min': 10000,
+    'cout_max': 20000,
+    'symptomes_requis': ['fumee_noire'],
+    'symptomes_optionnels': [],
+    'conseils': 'Rappel constructeur',
+}
+
+def _creer_tenants(dossier, noms):
+    """Un dossier par tenant : catalogue par défaut, une seule règle"""
+    for nom in noms:
+        os.makedirs(os.path.join(dossier, nom))
+        shutil.copy(config.SYMPTOMES_FILE, os.path.join(dossier, nom, 'symptomes.json'))
+        with open(os.path.join(dossier, nom, 'regles.json'), 'w', encoding='utf-8') as f:
+            json.dump([REGLE_MARQUE], f)
+
+def test_noms_et_prefixe():
+    """Test préfixe de chemin et noms refusés"""
+    print("\n=== Test Noms de Tenants ===")
+
+    assert separer_prefixe_tenant('/tenants/garage_nord/rechercher', '/tenants/') == ('garage_nord', '/rechercher')
+    assert separer_prefixe_tenant('/rechercher', '/tenants/') == (None, '/rechercher')
+    print("✓ Préfixe /tenants/<tenant>/ retiré du chemin")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        _creer_tenants(dossier, ['garage_nord'])
+        os.makedirs(os.path.join(dossier, 'incomplet'))
+        bases = BasesTenants(dossier, 10**9, avec_vectorisation=False)
+        assert bases.tenants_disponibles() == ['garage_nord']
+        for nom in ['..', 'a/b', '', 'incomplet', 'absent', 'x' * 65]:
+            try:
+                bases.obtenir(nom)
+                assert False, f"{nom!r} accepté"
+            except TenantInconnu:
+                pass
+        assert bases.statistiques()['charges'] == []
+        print("✓ Noms invalides et dossiers incomplets refusés")
+
+def test_chargement_et_eviction():
+    """Test chargement au premier usage et éviction LRU sous le budget"""
+    print("\n=== Test Éviction LRU ===")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        _creer_tenants(dossier, ['a', 'b', 'c'])
+        bases = BasesTenants(dossier, 10**9, avec_vectorisation=False)
+        moteur_a = bases.obtenir('a')
+        assert bases.obtenir('a') is moteur_a and bases.compteurs['chargements'] == 1
+        assert moteur_a.diagnostiquer(['fumee_noire'])['diagnostic'] == REGLE_MARQUE['nom']
+        print("✓ Chargé une fois, règles du tenant")
+
+        # Budget pour deux tenants : le moins récemment utilisé part
+        taille = taille_moteur(moteur_a)
+        bases.memoire_max = int(taille * 2.5)
+        bases.obtenir('b')
+        bases.obtenir('a')
+        bases.obtenir('c')
+        stats = bases.statistiques()
+        assert stats['charges'] == ['a', 'c'] and stats['evictions'] == 1, stats
+        print(f"✓ b évincé ({taille / 1024:.0f} Ko par tenant)")
+
+        # Un tenant seul au-delà du budget reste chargé
+        bases.memoire_max = 1
+        bases.obtenir('b')
+        assert bases.statistiques()['charges'] == ['b']
+        print("✓ Le tenant demandé n'est jamais évincé")
+
+def test_budget_apres_vectorisation():
+    """Test budget revérifié quand les vecteurs du tenant chargé sont encodés"""
+    print("\n=== Test Budget après Vectorisation ===")
+
+    import api
+    api.moteur.attendre_vectorisation()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        _creer_tenants(dossier, ['a', 'b'])
+        bases = BasesTenants(dossier, 10**9)
+        moteur_a = bases.obtenir('a')
+        moteur_a.attendre_vectorisation()
+        taille = taille_moteur(moteur_a)
+        vecteurs = moteur_a.vectorisation.matrice.nbytes + moteur_a.vectorisation.matrice_diagnostics.nbytes
+
+        # a et b tiennent tant que b n'a pas de vecteurs, plus une fois b encodé
+        bases.memoire_max = 2 * taille - vecteurs // 2
+        encoder = VectorisationService.vectoriser_symptomes
+        debloque = threading.Event()
+        def encoder_plus_tard(service, *args, **kwargs):
+            debloque.wait(5)
+            return encoder(service, *args, **kwargs)
+        VectorisationService.vectoriser_symptomes = encoder_plus_tard
+        try:
+            moteur_b = bases.obtenir('b')
+            assert bases.statistiques()['charges'] == ['a', 'b']
+            debloque.set()
+            assert moteur_b.attendre_vectorisation()
+        finally:
+            VectorisationService.vectoriser_symptomes = encoder
+        for _ in range(500):
+            if bases.statistiques()['charges'] == ['b']:
+                break
+            time.sleep(0.01)
+        assert bases.statistiques()['charges'] == ['b'], bases.statistiques()
+        print(f"✓ a évincé une fois les vecteurs de b encodés ({vecteurs / 1024:.0f} Ko de vecteurs)")
+
+def test_modele_partage():
+    """Test un seul modèle d'embeddings pour tous les tenants"""
+    print("\n=== Test Modèle Partagé ===")
+
+    import api
+
+    with tempfile.TemporaryDirectory() as dossier:
+        _creer_tenants(dossier, ['a', 'b'])
+        bases = BasesTenants(dossier, 10**9)
+        moteur_a, moteur_b = bases.obtenir('a'), bases.obtenir('b')
+        assert moteur_a.attendre_vectorisation() and moteur_b.attendre_vectorisation()
+        assert api.moteur.attendre_vectorisation()
+        assert moteur_a.vectorisation.model is moteur_b.vectorisation.model is api.moteur.vectorisation.model
+        assert moteur_a.rechercher_symptomes('fumée noire', top_k=1)[0]['id'] == 'fumee_noire'
+        assert taille_moteur(moteur_a) < sum(moteur_a.vectorisation.rapport_memoire().values()) + \
+            sum(moteur_a.rapport_memoire().values())
+        print("✓ Même modèle, non compté dans la taille d'un tenant")
+
+def test_routes():
+    """Test choix du tenant par en-tête et par préfixe (Flask et ASGI)"""
+    print("\n=== Test Routes par Tenant ===")
+
+    import api
+    import asgi
+    from tests.test_asgi import _requete
+
+    bases_initiales = api.bases_tenants
+    with tempfile.TemporaryDirectory() as dossier:
+        _creer_tenants(dossier, ['marque_x'])
+        api.bases_tenants = asgi.bases_tenants = BasesTenants(dossier, 10**9, avec_vectorisation=False)
+        try:
+            client = api.app.test_client()
+            corps = {'symptomes': ['fumee_noire']}
+            defaut = client.post('/diagnostiquer', json=corps).get_json()
+            entete = client.post('/diagnostiquer', json=corps, headers={'X-Tenant': 'marque_x'}).get_json()
+            prefixe = client.post('/tenants/marque_x/diagnostiquer', json=corps).get_json()
+            assert defaut['diagnostic'] != REGLE_MARQUE['nom']
+            assert entete['diagnostic'] == prefixe['diagnostic'] == REGLE_MARQUE['nom']
+            print("✓ Flask : en-tête X-Tenant et préfixe")
+
+            reponse = client.get('/autocomplete?q=fum', headers={'X-Tenant': 'inconnu'})
+            assert reponse.status_code == 404 and reponse.get_json()['succes'] is False
+            assert client.get('/tenants/marque_x/symptomes').get_json()['total'] == len(api.moteur.symptomes)
+            print("✓ Tenant inconnu : 404")
+
+            statut, _, data = asyncio.run(_requete('POST', '/tenants/marque_x/diagnostiquer', corps))
+            assert statut == 200 and data['diagnostic'] == REGLE_MARQUE['nom']
+            statut, _, data = asyncio.run(_requete('POST', '/tenants/inconnu/rechercher', {'texte': 'fumée'}))
+            assert statut == 404 and data['succes'] is False
+            statut, _, data = asyncio.run(_requete('GET', '/tenants/marque_x/autocomplete', query=b'q=fum'))
+            assert statut == 200 and data['suggestions']
+            print("✓ ASGI : routes asynchrones et déléguées à Flask")
+        finally:
+            api.bases_tenants = asgi.bases_tenants = bases_initiales
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TESTS TENANTS")
+    print("=" * 50)
+
+    try:
+        test_noms_et_prefixe()
+        test_chargement_et_eviction()
+        test_budget_apres_vectorisation()
+        test_modele_partage()
+        test_routes()
+        print("\n" + "=" * 50)
+        print("✅ TOUS LES TESTS TENANTS PASSÉS")
+        print("=" * 50)
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC: {e}")
+    except Exception as e:
+        print(f"\n❌ ERREUR: {e}")
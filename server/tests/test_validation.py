@@ -3,7 +3,9 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from utils.validation import valider_requete_diagnostic, valider_recherche
+import config
+from utils.validation import valider_requete_diagnostic, valider_requete_batch, valider_recherche, valider_vehicule
+from utils.validation import valider_creation_session, valider_symptome_session, valider_classement_session
 
 def test_validation_diagnostic():
     """Test validation des requêtes de diagnostic"""
@@ -58,6 +60,38 @@ def test_validation_diagnostic():
     assert symptomes[0] == 'symptome1'
     print("✓ Nettoyage des espaces OK")
 
+def test_validation_batch():
+    """Test validation des requêtes de diagnostic groupé"""
+    print("\n=== Test Validation Batch ===")
+    
+    # Test valide
+    valide, erreur, lot = valider_requete_batch({
+        'cas': [{'symptomes': ['s1', ' s2 ']}, {'symptomes': ['s3']}]
+    })
+    assert valide == True
+    assert erreur is None
+    assert lot == [['s1', 's2'], ['s3']]
+    print("✓ Lot valide accepté et nettoyé")
+    
+    # Test lot vide
+    valide, erreur, _ = valider_requete_batch({'cas': []})
+    assert valide == False
+    print("✓ Lot vide rejeté")
+    
+    # Test type invalide
+    valide, erreur, _ = valider_requete_batch({'cas': 'pas une liste'})
+    assert valide == False
+    assert "liste" in erreur
+    print("✓ Type invalide rejeté")
+    
+    # Test cas invalide : l'index est indiqué
+    valide, erreur, _ = valider_requete_batch({
+        'cas': [{'symptomes': ['s1']}, {'symptomes': []}]
+    })
+    assert valide == False
+    assert "Cas 1" in erreur
+    print("✓ Cas invalide signalé avec son index")
+
 def test_validation_recherche():
     """Test validation des recherches"""
     print("\n=== Test Validation Recherche ===")
@@ -111,6 +145,48 @@ def test_validation_recherche():
     assert texte == 'test recherche'
     print("✓ Nettoyage du texte OK")
 
+def test_validation_vehicule():
+    """Test validation du contexte véhicule"""
+    print("\n=== Test Validation Véhicule ===")
+    
+    # Absent ou vide : pas de filtrage
+    assert valider_vehicule({'symptomes': ['a']}) == (True, None, None)
+    assert valider_vehicule({'vehicule': {}}) == (True, None, None)
+    print("✓ Véhicule facultatif")
+    
+    valide, erreur, vehicule = valider_vehicule({
+        'vehicule': {'carburant': ' diesel ', 'marque': 'Peugeot', 'annee': 2012, 'kilometrage': 180000}
+    })
+    assert valide == True
+    assert vehicule.carburant == 'diesel' and vehicule.annee == 2012
+    print("✓ Véhicule complet accepté")
+    
+    for vehicule in ['diesel', {'couleur': 'rouge'}, {'annee': '2012'}, {'annee': True},
+                     {'kilometrage': -1}, {'carburant': ''}, {'marque': 'x' * 51}]:
+        valide, erreur, _ = valider_vehicule({'vehicule': vehicule})
+        assert valide == False and erreur
+    print("✓ Champs invalides rejetés")
+
+def test_validation_session():
+    """Test validation des routes de session"""
+    print("\n=== Test Validation Session ===")
+    
+    assert valider_creation_session(None) == (True, None, [])
+    assert valider_creation_session({'symptomes': [' a ', '']}) == (True, None, ['a'])
+    assert valider_creation_session({'symptomes': ['a'] * (config.MAX_SYMPTOMES_PAR_SESSION + 1)})[0] == False
+    assert valider_creation_session({'symptomes': 'a'})[0] == False
+    print("✓ Ouverture sans corps ou avec symptômes initiaux")
+    
+    assert valider_symptome_session({'symptome': ' fumee_noire '}) == (True, None, 'fumee_noire')
+    for data in [None, {}, {'symptome': ''}, {'symptome': ['a']}]:
+        assert valider_symptome_session(data)[0] == False
+    print("✓ Symptôme ajouté : chaîne non vide")
+    
+    assert valider_classement_session({}) == (True, None, config.CLASSEMENT_SESSION)
+    for limite in ['0', 'x', str(config.MAX_CLASSEMENT_SESSION + 1)]:
+        assert valider_classement_session({'limit': limite})[0] == False
+    print("✓ Taille du classement bornée")
+
 if __name__ == '__main__':
     print("=" * 50)
     print("TESTS DE VALIDATION")
@@ -118,7 +194,10 @@ if __name__ == '__main__':
     
     try:
         test_validation_diagnostic()
+        test_validation_batch()
         test_validation_recherche()
+        test_validation_vehicule()
+        test_validation_session()
         print("\n" + "=" * 50)
         print("✅ TOUS LES TESTS VALIDATION PASSÉS")
         print("=" * 50)
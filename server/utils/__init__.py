@@ -1,4 +1,41 @@
 """Utilitaires"""
-from .validation import valider_requete_diagnostic, valider_recherche
+from .validation import (
+    valider_requete_diagnostic,
+    valider_requete_batch,
+    valider_vehicule,
+    valider_vehicules_batch,
+    valider_recherche,
+    valider_autocompletion,
+    valider_pagination_symptomes,
+    valider_creation_session,
+    valider_symptome_session,
+    valider_classement_session,
+    valider_recommandation,
+    valider_limite_recommandations,
+    valider_limite_statistiques,
+)
+from .ressources import calculer_repartition, appliquer_repartition
+from .admission import ControleAdmission, ErreurSurcharge
+from .memoire import rapport_memoire, journaliser_periodiquement
 
-__all__ = ['valider_requete_diagnostic', 'valider_recherche']
+__all__ = [
+    'valider_requete_diagnostic',
+    'valider_requete_batch',
+    'valider_vehicule',
+    'valider_vehicules_batch',
+    'valider_recherche',
+    'valider_autocompletion',
+    'valider_pagination_symptomes',
+    'valider_creation_session',
+    'valider_symptome_session',
+    'valider_classement_session',
+    'valider_recommandation',
+    'valider_limite_recommandations',
+    'valider_limite_statistiques',
+    'calculer_repartition',
+    'appliquer_repartition',
+    'ControleAdmission',
+    'ErreurSurcharge',
+    'rapport_memoire',
+    'journaliser_periodiquement',
+]
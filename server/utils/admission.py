@@ -0,0 +1,144 @@
+"""Contrôle d'admission des requêtes coûteuses (délestage sous surcharge)"""
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncIterator, Dict, Iterator
+
+
+class ErreurSurcharge(Exception):
+    """Requête refusée : file pleine ou attente trop longue"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ControleAdmission:
+    """
+    File d'attente bornée devant un traitement à concurrence limitée
+
+    Au plus `concurrence` requêtes s'exécutent en même temps, au plus
+    `file_max` attendent leur tour, et aucune n'attend plus de `attente_max`
+    secondes : sous une rafale, les requêtes en excès sont refusées tout de
+    suite au lieu d'occuper le CPU pour des clients qui auront abandonné.
+    """
+
+    LISSAGE = 0.2  # Poids de la dernière mesure dans la durée moyenne
+    INTERVALLE_SONDAGE = 0.005  # Secondes entre deux essais en mode asynchrone
+
+    def __init__(self, nom: str, concurrence: int, file_max: int, attente_max: float):
+        """
+        Args:
+            nom: Nom du traitement (messages d'erreur)
+            concurrence: Requêtes exécutées simultanément
+            file_max: Requêtes en attente au-delà desquelles on refuse
+            attente_max: Attente maximale en file, en secondes
+        """
+        self.nom = nom
+        self.concurrence = max(1, concurrence)
+        self.file_max = max(0, file_max)
+        self.attente_max = attente_max
+        self._places = threading.Semaphore(self.concurrence)
+        self._verrou = threading.Lock()
+        self._en_attente = 0
+        self._en_cours = 0
+        self._rejets = 0
+        self._duree_moyenne = 0.0
+
+    def _estimer_retry_after(self) -> int:
+        """Secondes avant qu'une place se libère, d'après la durée moyenne"""
+        attente = self._duree_moyenne * (self._en_attente + 1) / self.concurrence
+        return max(1, math.ceil(attente))
+
+    def _refuser(self, raison: str) -> ErreurSurcharge:
+        with self._verrou:
+            self._rejets += 1
+            retry_after = self._estimer_retry_after()
+        return ErreurSurcharge(f"Serveur surchargé ({self.nom}): {raison}", retry_after)
+
+    def _entrer_en_file(self) -> None:
+        with self._verrou:
+            plein = self._en_attente >= self.file_max and self._en_cours >= self.concurrence
+            if not plein:
+                self._en_attente += 1
+        if plein:
+            raise self._refuser("file d'attente pleine")
+
+    def _sortir_de_file(self, obtenue: bool) -> None:
+        with self._verrou:
+            self._en_attente -= 1
+            if obtenue:
+                self._en_cours += 1
+
+    def _terminer(self, debut: float) -> None:
+        duree = time.perf_counter() - debut
+        with self._verrou:
+            self._en_cours -= 1
+            if self._duree_moyenne:
+                self._duree_moyenne += self.LISSAGE * (duree - self._duree_moyenne)
+            else:
+                self._duree_moyenne = duree
+        self._places.release()
+
+    @contextmanager
+    def admettre(self) -> Iterator[None]:
+        """
+        Attend une place d'exécution
+
+        Raises:
+            ErreurSurcharge: File pleine ou place non obtenue à temps
+        """
+        self._entrer_en_file()
+        obtenue = False
+        try:
+            obtenue = self._places.acquire(timeout=self.attente_max)
+        finally:
+            self._sortir_de_file(obtenue)
+        if not obtenue:
+            raise self._refuser("attente maximale dépassée")
+
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._terminer(debut)
+
+    @asynccontextmanager
+    async def admettre_async(self) -> AsyncIterator[None]:
+        """
+        Équivalent de admettre() pour une coroutine
+
+        L'attente ne bloque pas la boucle d'événements : la place est
+        sondée à intervalle court, ce qui ne laisse aucune place réservée
+        si la requête est annulée pendant l'attente.
+        """
+        self._entrer_en_file()
+        obtenue = False
+        try:
+            limite = time.perf_counter() + self.attente_max
+            obtenue = self._places.acquire(blocking=False)
+            while not obtenue and time.perf_counter() < limite:
+                await asyncio.sleep(self.INTERVALLE_SONDAGE)
+                obtenue = self._places.acquire(blocking=False)
+        finally:
+            self._sortir_de_file(obtenue)
+        if not obtenue:
+            raise self._refuser("attente maximale dépassée")
+
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._terminer(debut)
+
+    def statistiques(self) -> Dict:
+        """Occupation courante et nombre de requêtes refusées"""
+        with self._verrou:
+            return {
+                'en_cours': self._en_cours,
+                'en_attente': self._en_attente,
+                'rejets': self._rejets,
+                'duree_moyenne_ms': round(self._duree_moyenne * 1000, 1)
+            }
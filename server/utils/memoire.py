@@ -0,0 +1,186 @@
+"""Mémoire occupée par les composants et par le processus"""
+import os
+import sys
+import threading
+import types
+from collections import deque
+from typing import Callable, Dict, Optional, Set
+import numpy as np
+
+# Objets partagés par tout le processus : jamais attribués à un composant
+_IGNORES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType,
+)
+
+
+def _est_modele_torch(objet) -> bool:
+    """Module torch (ou équivalent) dont les poids sont des tenseurs"""
+    return callable(getattr(type(objet), 'parameters', None)) and not isinstance(objet, type)
+
+
+def taille_modele(modele) -> int:
+    """Octets des poids et tampons d'un module torch (sans le tokenizer natif)"""
+    tenseurs = list(modele.parameters())
+    if callable(getattr(modele, 'buffers', None)):
+        tenseurs += list(modele.buffers())
+    return sum(t.nelement() * t.element_size() for t in tenseurs)
+
+
+def taille_profonde(objet, vus: Optional[Set[int]] = None) -> int:
+    """
+    Octets occupés par un objet et tout ce qu'il référence
+
+    Les tableaux numpy comptent leurs données ; les vues sur un fichier
+    projeté en mémoire (base compilée) ne comptent que leur en-tête : ces
+    pages sont partagées entre workers et comptées à part. Les poids d'un
+    modèle torch sont comptés par ses tenseurs.
+
+    Args:
+        objet: Racine du parcours
+        vus: Identifiants déjà comptés, à partager entre les composants d'un
+            même rapport pour qu'un objet commun ne soit compté qu'une fois
+    """
+    if vus is None:
+        vus = set()
+    total = 0
+    pile = [objet]
+    while pile:
+        courant = pile.pop()
+        if courant is None or id(courant) in vus or isinstance(courant, _IGNORES):
+            continue
+        vus.add(id(courant))
+
+        if _est_modele_torch(courant):
+            total += taille_modele(courant)
+            continue
+        total += sys.getsizeof(courant)
+
+        if isinstance(courant, np.ndarray):
+            # Vue : les données appartiennent à la base (tableau, bytes ou mmap)
+            if courant.base is not None and not isinstance(courant.base, memoryview):
+                pile.append(courant.base)
+        elif isinstance(courant, dict):
+            pile.extend(list(courant.keys()))
+            pile.extend(list(courant.values()))
+        elif isinstance(courant, (list, tuple, set, frozenset, deque)):
+            pile.extend(list(courant))
+        elif not isinstance(courant, (str, bytes, bytearray, int, float, complex, bool, memoryview)):
+            attributs = getattr(courant, '__dict__', None)
+            if isinstance(attributs, dict):
+                pile.append(attributs)
+            for classe in type(courant).__mro__:
+                for nom in getattr(classe, '__slots__', ()):
+                    try:
+                        pile.append(getattr(courant, nom))
+                    except Exception:
+                        continue
+    return total
+
+
+def memoire_processus() -> Dict[str, int]:
+    """
+    Mémoire résidente du processus en octets
+
+    Sous Linux, distingue la mémoire anonyme (tas, poids du modèle) des
+    pages de fichiers projetés (base compilée, bibliothèques), partagées
+    entre workers. Ailleurs, seul le pic de RSS est connu (vide sous
+    Windows).
+    """
+    champs = {'VmRSS': 'rss', 'RssAnon': 'rss_anonyme', 'RssFile': 'rss_fichiers', 'VmHWM': 'pic_rss'}
+    memoire: Dict[str, int] = {}
+    try:
+        with open('/proc/self/status') as f:
+            for ligne in f:
+                cle, _, valeur = ligne.partition(':')
+                if cle in champs:
+                    memoire[champs[cle]] = int(valeur.split()[0]) * 1024
+    except OSError:
+        try:
+            import resource
+        except ImportError:
+            return memoire
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memoire['pic_rss'] = pic if sys.platform == 'darwin' else pic * 1024
+    return memoire
+
+
+def rapport_memoire(services: Dict[str, object], fichiers: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Mémoire des composants de chaque service et du processus
+
+    Les objets partagés entre services ne sont comptés qu'une fois (dans le
+    premier service qui les référence). `non_attribue` est la mémoire
+    anonyme du processus qui n'appartient à aucun composant : interpréteur,
+    bibliothèques natives, caches de l'allocateur.
+
+    Args:
+        services: Nom -> service exposant rapport_memoire(vus) (None ignoré)
+        fichiers: Octets des fichiers projetés en mémoire, par nom
+
+    Returns:
+        {'processus', 'composants', 'fichiers_projetes', 'total_composants', 'non_attribue'}
+    """
+    vus: Set[int] = set()
+    composants = {
+        nom: service.rapport_memoire(vus)  # type: ignore[attr-defined]
+        for nom, service in services.items() if service is not None
+    }
+    total = sum(sum(details.values()) for details in composants.values())
+    processus = memoire_processus()
+    anonyme = processus.get('rss_anonyme', processus.get('rss'))
+    return {
+        'processus': {'pid': os.getpid(), **processus},
+        'composants': composants,
+        'fichiers_projetes': fichiers or {},
+        'total_composants': total,
+        'non_attribue': anonyme - total if anonyme is not None else None,
+    }
+
+
+def formater_octets(octets: float) -> str:
+    """Taille lisible (Ko, Mo, Go)"""
+    for unite in ('o', 'Ko', 'Mo'):
+        if abs(octets) < 1024:
+            return f"{octets:.0f} {unite}" if unite == 'o' else f"{octets:.1f} {unite}"
+        octets /= 1024
+    return f"{octets:.2f} Go"
+
+
+def formater_rapport(rapport: Dict) -> str:
+    """Résumé d'une ligne d'un rapport mémoire (pour les journaux)"""
+    parties = [f"RSS {formater_octets(rapport['processus'].get('rss', 0))}"]
+    for service, composants in rapport['composants'].items():
+        details = ', '.join(f"{nom} {formater_octets(octets)}" for nom, octets in composants.items())
+        parties.append(f"{service}: {details}")
+    return ' | '.join(parties)
+
+
+def journaliser_periodiquement(
+    mesurer: Callable[[], Dict],
+    intervalle: float,
+    arret: Optional[threading.Event] = None
+) -> threading.Thread:
+    """
+    Écrit un rapport mémoire dans les journaux toutes les `intervalle` secondes
+
+    Args:
+        mesurer: Fonction produisant le rapport (voir formater_rapport)
+        intervalle: Période en secondes
+        arret: Événement qui interrompt la journalisation
+
+    Returns:
+        Thread démon lancé
+    """
+    arret = arret or threading.Event()
+
+    def journaliser() -> None:
+        while not arret.wait(intervalle):
+            try:
+                print(f"[Mémoire] {formater_rapport(mesurer())}")
+            except Exception as e:
+                print(f"[Mémoire] Mesure impossible: {e}")
+
+    thread = threading.Thread(target=journaliser, name='journal-memoire', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,126 @@
+"""Répartition des cœurs CPU entre workers et threads d'inférence"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+import config
+
+# Bibliothèques de calcul qui dimensionnent leur pool de threads au chargement
+VARIABLES_THREADS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+@dataclass
+class RepartitionCPU:
+    """Budget CPU d'un worker"""
+    cpus: float  # Cœurs disponibles pour le conteneur
+    workers: int  # Workers qui se partagent ces cœurs
+    threads_inference: int  # Threads intra-op de torch par worker
+    threads_interop: int  # Threads inter-op de torch par worker
+
+    def __str__(self) -> str:
+        return (f"{self.cpus:g} CPU / {self.workers} worker(s) -> "
+                f"{self.threads_inference} thread(s) d'inférence, "
+                f"{self.threads_interop} inter-op par worker")
+
+
+def lire_quota_cgroup(racine: str = '/sys/fs/cgroup') -> Optional[float]:
+    """
+    Lit le quota CPU du conteneur (cgroup v2 puis v1)
+
+    Returns:
+        Nombre de cœurs alloués (éventuellement fractionnaire), None sans quota
+    """
+    # cgroup v2 : "max 100000" ou "200000 100000"
+    try:
+        with open(os.path.join(racine, 'cpu.max')) as f:
+            quota, periode = f.read().split()[:2]
+        if quota != 'max' and int(periode) > 0:
+            return int(quota) / int(periode)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1 : quota à -1 quand il n'y a pas de limite
+    for dossier in ('cpu', 'cpu,cpuacct', ''):
+        try:
+            with open(os.path.join(racine, dossier, 'cpu.cfs_quota_us')) as f:
+                quota = int(f.read())
+            with open(os.path.join(racine, dossier, 'cpu.cfs_period_us')) as f:
+                periode = int(f.read())
+        except (OSError, ValueError):
+            continue
+        if quota > 0 and periode > 0:
+            return quota / periode
+        return None
+    return None
+
+
+def cpus_disponibles(racine_cgroup: str = '/sys/fs/cgroup') -> float:
+    """Cœurs utilisables : affinité du processus bornée par le quota cgroup"""
+    try:
+        cpus: float = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = lire_quota_cgroup(racine_cgroup)
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return cpus
+
+
+def calculer_repartition(
+    workers: Optional[int] = None,
+    threads_inference: Optional[int] = None,
+    cpus: Optional[float] = None
+) -> RepartitionCPU:
+    """
+    Partage les cœurs disponibles entre les workers
+
+    Chaque worker reçoit au moins un thread ; au-delà d'un worker par cœur,
+    le système est volontairement sous-alloué plutôt que sursouscrit.
+
+    Args:
+        workers: Workers par machine (config.NB_WORKERS par défaut)
+        threads_inference: Forçage du nombre de threads (config.THREADS_INFERENCE
+            par défaut, 0 = automatique)
+        cpus: Cœurs disponibles (détectés par défaut)
+    """
+    workers = max(1, workers if workers is not None else config.NB_WORKERS)
+    if threads_inference is None:
+        threads_inference = config.THREADS_INFERENCE
+    if cpus is None:
+        cpus = cpus_disponibles()
+
+    if not threads_inference:
+        threads_inference = max(1, int(cpus // workers))
+    return RepartitionCPU(
+        cpus=cpus,
+        workers=workers,
+        threads_inference=threads_inference,
+        threads_interop=config.THREADS_INTEROP or 1
+    )
+
+
+def appliquer_repartition(repartition: RepartitionCPU) -> None:
+    """
+    Limite les pools de threads du processus courant
+
+    À appeler avant le premier calcul : les variables d'environnement
+    s'appliquent aux bibliothèques pas encore chargées, les pools de torch
+    sont redimensionnés directement. Une variable déjà fixée dans
+    l'environnement par l'opérateur est conservée.
+    """
+    for variable in VARIABLES_THREADS:
+        os.environ.setdefault(variable, str(repartition.threads_inference))
+    # Les tokenizers Rust ont leur propre pool, inutile face aux workers
+    if repartition.workers > 1:
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(repartition.threads_inference)
+    try:
+        torch.set_num_interop_threads(repartition.threads_interop)
+    except RuntimeError:
+        # Impossible une fois qu'un calcul parallèle a démarré
+        pass
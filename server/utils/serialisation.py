@@ -0,0 +1,131 @@
+"""Sérialisation des réponses et des corps de requête : JSON (orjson si installé) ou MessagePack"""
+import json
+from typing import Any, Optional
+from flask import Request, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+try:
+    import orjson
+except ImportError:  # Encodeur de la bibliothèque standard
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Réponses et corps JSON uniquement
+    msgpack = None
+
+TYPE_JSON = 'application/json'
+TYPES_MSGPACK = ('application/msgpack', 'application/x-msgpack')
+
+
+def _convertir(objet: Any) -> Any:
+    """Types non natifs : tableaux et scalaires numpy, puis ceux de l'encodeur de Flask"""
+    if callable(getattr(objet, 'tolist', None)):
+        return objet.tolist()
+    return DefaultJSONProvider.default(objet)
+
+
+def encoder_json(donnees: Any, indenter: bool = False) -> bytes:
+    """
+    JSON aux clés triées, comme jsonify
+
+    orjson (plusieurs fois plus rapide) écrit les caractères non ASCII en
+    UTF-8 au lieu de séquences \\uXXXX : même document une fois décodé.
+    """
+    if orjson is not None:
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indenter:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(donnees, default=_convertir, option=options)
+    if indenter:
+        return json.dumps(donnees, default=_convertir, sort_keys=True, indent=2).encode('utf-8')
+    return json.dumps(donnees, default=_convertir, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def decoder_json(corps: Any) -> Any:
+    """Texte ou octets UTF-8 ; ValueError si le JSON est invalide"""
+    if orjson is not None:
+        return orjson.loads(corps)
+    return json.loads(corps)
+
+
+def est_msgpack(type_contenu: Optional[str]) -> bool:
+    """Type MIME MessagePack (paramètres ignorés), si msgpack est installé"""
+    if msgpack is None or not type_contenu:
+        return False
+    return type_contenu.split(';', 1)[0].strip().lower() in TYPES_MSGPACK
+
+
+def type_reponse(accept: Optional[str]) -> str:
+    """
+    Format de la réponse d'après l'en-tête Accept
+
+    JSON par défaut (en-tête absent, */* ou préférence égale) ; MessagePack
+    seulement si le client le préfère et que msgpack est installé.
+    """
+    if msgpack is None or not accept:
+        return TYPE_JSON
+    acceptes = parse_accept_header(accept, MIMEAccept)
+    return acceptes.best_match((TYPE_JSON,) + TYPES_MSGPACK, default=TYPE_JSON) or TYPE_JSON
+
+
+def encoder(donnees: Any, type_contenu: str, indenter: bool = False) -> bytes:
+    """Corps de réponse au format choisi par type_reponse"""
+    if est_msgpack(type_contenu):
+        return msgpack.packb(donnees, default=_convertir, use_bin_type=True)
+    return encoder_json(donnees, indenter) + b'\n'
+
+
+def decoder(corps: bytes, type_contenu: Optional[str]) -> Any:
+    """
+    Corps de requête MessagePack (Content-Type correspondant) ou JSON
+
+    Raises:
+        ValueError: Corps invalide
+    """
+    if est_msgpack(type_contenu):
+        try:
+            return msgpack.unpackb(corps, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ValueError(f"Corps MessagePack invalide: {e}") from e
+    return decoder_json(corps)
+
+
+class FournisseurJSON(DefaultJSONProvider):
+    """
+    Sérialisation de jsonify et request.get_json()
+
+    Réponses encodées par orjson quand il est installé, ou en MessagePack
+    quand l'en-tête Accept le préfère : toutes les routes en profitent sans
+    changement. Le JSON reste le format par défaut.
+    """
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return decoder_json(s)
+
+    def response(self, *args, **kwargs):
+        donnees = self._prepare_response_obj(args, kwargs)
+        type_contenu = type_reponse(request.headers.get('Accept')) if has_request_context() else TYPE_JSON
+        indenter = self.compact is False or (self.compact is None and self._app.debug)
+        reponse = self._app.response_class(encoder(donnees, type_contenu, indenter), mimetype=type_contenu)
+        if msgpack is not None:
+            reponse.vary.add('Accept')
+        return reponse
+
+
+class RequeteNegociee(Request):
+    """request.get_json() lit aussi les corps Content-Type: application/msgpack"""
+
+    def get_json(self, force: bool = False, silent: bool = False, cache: bool = True) -> Optional[Any]:
+        if not est_msgpack(self.mimetype):
+            return super().get_json(force=force, silent=silent, cache=cache)
+        try:
+            return decoder(self.get_data(cache=cache), self.mimetype)
+        except ValueError as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
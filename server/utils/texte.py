@@ -0,0 +1,63 @@
+"""Normalisation et découpage du texte libre"""
+import re
+import unicodedata
+from typing import List
+
+# Mots vides français fréquents dans les descriptions de pannes
+MOTS_VIDES = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'au', 'aux', 'et', 'ou',
+    'en', 'dans', 'par', 'pour', 'sur', 'avec', 'sans', 'ce', 'ces', 'cette',
+    'il', 'elle', 'on', 'ma', 'mon', 'mes', 'sa', 'son', 'ses', 'qui', 'que',
+    'est', 'sont', 'ne', 'pas', 'plus', 'tres', 'quand', 'lors', 'a',
+}
+
+_SEPARATEURS = re.compile(r'[^a-z0-9]+')
+
+
+def normaliser_texte(texte: str) -> str:
+    """
+    Met le texte en minuscules et retire les accents
+
+    Args:
+        texte: Texte brut
+
+    Returns:
+        Texte normalisé ("Fumée noire" -> "fumee noire")
+    """
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(c for c in decompose if not unicodedata.combining(c))
+
+
+def decouper_mots(texte: str) -> List[str]:
+    """
+    Découpe un texte en mots normalisés (mots vides et pluriels conservés)
+
+    Découpage commun à l'index lexical (tokeniser) et à l'autocomplétion.
+
+    Args:
+        texte: Texte brut
+
+    Returns:
+        Liste des mots dans l'ordre du texte ("Fumée noire" -> ['fumee', 'noire'])
+    """
+    return [m for m in _SEPARATEURS.split(normaliser_texte(texte)) if m]
+
+
+def raciniser(mot: str) -> str:
+    """Réduit un mot à une forme simple (pluriels en -s/-x)"""
+    if len(mot) > 3 and mot[-1] in 'sx':
+        return mot[:-1]
+    return mot
+
+
+def tokeniser(texte: str) -> List[str]:
+    """
+    Découpe un texte en termes normalisés, sans mots vides
+
+    Args:
+        texte: Texte brut
+
+    Returns:
+        Liste des termes dans l'ordre du texte
+    """
+    return [raciniser(m) for m in decouper_mots(texte) if len(m) > 1 and m not in MOTS_VIDES]
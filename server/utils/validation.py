@@ -1,7 +1,11 @@
 """Validation des entrées utilisateur"""
 from typing import Tuple, List, Optional
+from models import Vehicule
 import config
 
+# Bornes des champs numériques du véhicule
+LIMITES_VEHICULE = {'annee': (1900, 2100), 'kilometrage': (0, 10_000_000)}
+
 def valider_requete_diagnostic(data: dict) -> Tuple[bool, Optional[str], Optional[List[str]]]:
     """
     Valide une requête de diagnostic
@@ -38,6 +42,101 @@ def valider_requete_diagnostic(data: dict) -> Tuple[bool, Optional[str], Optiona
     
     return True, None, symptomes_clean
 
+def valider_requete_batch(data: dict) -> Tuple[bool, Optional[str], Optional[List[List[str]]]]:
+    """
+    Valide une requête de diagnostic groupé
+    
+    Body attendu: {"cas": [{"symptomes": [...]}, ...]}
+    
+    Args:
+        data: Données de la requête
+        
+    Returns:
+        (valide, message_erreur, lot_symptomes_ids)
+    """
+    if not isinstance(data, dict):
+        return False, "Format de requête invalide", None
+    
+    cas = data.get('cas', [])
+    
+    if not isinstance(cas, list):
+        return False, "Les cas doivent être une liste", None
+    
+    if not cas:
+        return False, "Au moins un cas est requis", None
+    
+    if len(cas) > config.MAX_CAS_PAR_LOT:
+        return False, f"Maximum {config.MAX_CAS_PAR_LOT} cas par lot", None
+    
+    lot = []
+    for index, requete in enumerate(cas):
+        valide, erreur, symptomes_ids = valider_requete_diagnostic(requete)
+        if not valide:
+            return False, f"Cas {index}: {erreur}", None
+        lot.append(symptomes_ids)
+    
+    return True, None, lot
+
+def valider_vehicule(data: dict) -> Tuple[bool, Optional[str], Optional[Vehicule]]:
+    """
+    Valide le véhicule facultatif d'une requête de diagnostic
+    
+    Body attendu: {"symptomes": [...], "vehicule": {"carburant": "diesel",
+    "marque": "Peugeot", "annee": 2012, "kilometrage": 180000}}
+    
+    Args:
+        data: Données de la requête (ou d'un cas d'un lot)
+        
+    Returns:
+        (valide, message_erreur, vehicule) ; vehicule vaut None sans contexte
+    """
+    brut = data.get('vehicule') if isinstance(data, dict) else None
+    if brut is None:
+        return True, None, None
+    
+    if not isinstance(brut, dict):
+        return False, "Le véhicule doit être un objet", None
+    
+    inconnus = sorted(set(brut) - {'carburant', 'marque', *LIMITES_VEHICULE})
+    if inconnus:
+        return False, f"Champ du véhicule inconnu: {inconnus[0]}", None
+    
+    champs = {}
+    for champ in ('carburant', 'marque'):
+        valeur = brut.get(champ)
+        if valeur is None:
+            continue
+        if not isinstance(valeur, str) or not valeur.strip() or len(valeur) > 50:
+            return False, f"Le champ {champ} doit être un texte de 1 à 50 caractères", None
+        champs[champ] = valeur.strip()
+    
+    for champ, (minimum, maximum) in LIMITES_VEHICULE.items():
+        valeur = brut.get(champ)
+        if valeur is None:
+            continue
+        if isinstance(valeur, bool) or not isinstance(valeur, int) or not minimum <= valeur <= maximum:
+            return False, f"Le champ {champ} doit être un entier entre {minimum} et {maximum}", None
+        champs[champ] = valeur
+    
+    vehicule = Vehicule(**champs)
+    return True, None, (None if vehicule.vide else vehicule)
+
+def valider_vehicules_batch(data: dict) -> Tuple[bool, Optional[str], Optional[List[Optional[Vehicule]]]]:
+    """
+    Valide le véhicule de chaque cas d'un lot (après valider_requete_batch)
+    
+    Returns:
+        (valide, message_erreur, vehicules) ; un véhicule (ou None) par cas
+    """
+    vehicules = []
+    for index, requete in enumerate(data['cas']):
+        valide, erreur, vehicule = valider_vehicule(requete)
+        if not valide:
+            return False, f"Cas {index}: {erreur}", None
+        vehicules.append(vehicule)
+    
+    return True, None, vehicules
+
 def valider_recherche(data: dict) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     Valide une requête de recherche de symptômes
@@ -68,3 +167,206 @@ def valider_recherche(data: dict) -> Tuple[bool, Optional[str], Optional[str]]:
         return False, "Le texte est trop long (maximum 200 caractères)", None
     
     return True, None, texte
+
+def valider_autocompletion(args: dict) -> Tuple[bool, Optional[str], Optional[str], Optional[int]]:
+    """
+    Valide les paramètres d'autocomplétion (GET /autocomplete?q=...&limit=...)
+    
+    Args:
+        args: Paramètres de la requête
+        
+    Returns:
+        (valide, message_erreur, texte, limite)
+    """
+    texte = (args.get('q') or '').strip()
+    
+    if len(texte) > 200:
+        return False, "Le texte est trop long (maximum 200 caractères)", None, None
+    
+    limite_brute = args.get('limit', 8)
+    try:
+        limite = int(limite_brute)
+    except (TypeError, ValueError):
+        return False, "La limite doit être un entier", None, None
+    
+    if limite < 1 or limite > config.MAX_SUGGESTIONS_AUTOCOMPLETION:
+        return False, f"La limite doit être comprise entre 1 et {config.MAX_SUGGESTIONS_AUTOCOMPLETION}", None, None
+    
+    return True, None, texte, limite
+
+def valider_pagination_symptomes(
+    args: dict
+) -> Tuple[bool, Optional[str], Optional[str], Optional[int], Optional[str], bool]:
+    """
+    Valide les paramètres de parcours du catalogue
+    (GET /symptomes?categorie=...&sans_categorie=1&limit=...&curseur=...)
+    
+    Sans limit ni curseur, le catalogue (ou la catégorie) est renvoyé en entier.
+    
+    Args:
+        args: Paramètres de la requête
+        
+    Returns:
+        (valide, message_erreur, categorie, limite (None = sans pagination), curseur, sans_categorie)
+    """
+    categorie = (args.get('categorie') or '').strip() or None
+    curseur = (args.get('curseur') or '').strip() or None
+    sans_categorie = (args.get('sans_categorie') or '').strip().lower() in ('1', 'true', 'oui')
+    
+    if categorie is not None and len(categorie) > 100:
+        return False, "La catégorie est trop longue (maximum 100 caractères)", None, None, None, False
+    
+    if categorie is not None and sans_categorie:
+        return False, "Paramètres categorie et sans_categorie incompatibles", None, None, None, False
+    
+    if curseur is not None and len(curseur) > 64:
+        return False, "Curseur invalide", None, None, None, False
+    
+    if 'limit' not in args and curseur is None:
+        return True, None, categorie, None, None, sans_categorie
+    
+    limite_brute = args.get('limit', config.SYMPTOMES_PAR_PAGE)
+    try:
+        limite = int(limite_brute)
+    except (TypeError, ValueError):
+        return False, "La limite doit être un entier", None, None, None, False
+    
+    if limite < 1 or limite > config.MAX_SYMPTOMES_PAR_PAGE:
+        return (False, f"La limite doit être comprise entre 1 et {config.MAX_SYMPTOMES_PAR_PAGE}",
+                None, None, None, False)
+    
+    return True, None, categorie, limite, curseur, sans_categorie
+
+def valider_creation_session(data: dict) -> Tuple[bool, Optional[str], Optional[List[str]]]:
+    """
+    Valide l'ouverture d'une session de diagnostic (corps facultatif)
+    
+    Body: {"symptomes": ["fumee_noire"], "vehicule": {...}} (champs facultatifs)
+    
+    Args:
+        data: Données de la requête (None sans corps)
+        
+    Returns:
+        (valide, message_erreur, symptomes_ids initiaux)
+    """
+    if data is None:
+        return True, None, []
+    
+    if not isinstance(data, dict):
+        return False, "Format de requête invalide", None
+    
+    symptomes = data.get('symptomes', [])
+    
+    if not isinstance(symptomes, list):
+        return False, "Les symptômes doivent être une liste", None
+    
+    if len(symptomes) > config.MAX_SYMPTOMES_PAR_SESSION:
+        return False, f"Maximum {config.MAX_SYMPTOMES_PAR_SESSION} symptômes par session", None
+    
+    if not all(isinstance(s, str) for s in symptomes):
+        return False, "Tous les symptômes doivent être des chaînes de caractères", None
+    
+    return True, None, [s.strip() for s in symptomes if s.strip()]
+
+def valider_symptome_session(data: dict) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Valide l'ajout d'un symptôme à une session
+    
+    Body: {"symptome": "fumee_noire"}
+    
+    Returns:
+        (valide, message_erreur, symptome_id)
+    """
+    if not isinstance(data, dict):
+        return False, "Format de requête invalide", None
+    
+    symptome = data.get('symptome')
+    
+    if not isinstance(symptome, str) or not symptome.strip():
+        return False, "Le symptôme doit être une chaîne de caractères non vide", None
+    
+    return True, None, symptome.strip()
+
+def valider_classement_session(args: dict) -> Tuple[bool, Optional[str], Optional[int]]:
+    """
+    Valide la taille du classement renvoyé par les routes de session (?limit=5)
+    
+    Returns:
+        (valide, message_erreur, limite)
+    """
+    limite_brute = args.get('limit', config.CLASSEMENT_SESSION)
+    try:
+        limite = int(limite_brute)
+    except (TypeError, ValueError):
+        return False, "La limite doit être un entier", None
+    
+    if limite < 1 or limite > config.MAX_CLASSEMENT_SESSION:
+        return False, f"La limite doit être comprise entre 1 et {config.MAX_CLASSEMENT_SESSION}", None
+    
+    return True, None, limite
+
+def valider_recommandation(data: dict) -> Tuple[bool, Optional[str], Optional[List[str]]]:
+    """
+    Valide une demande de symptômes à vérifier
+    
+    Body: {"symptomes": ["demarrage_difficile"], "vehicule": {...}} (vehicule facultatif)
+    
+    Returns:
+        (valide, message_erreur, symptomes_ids déjà constatés)
+    """
+    if not isinstance(data, dict):
+        return False, "Format de requête invalide", None
+    
+    symptomes = data.get('symptomes', [])
+    
+    if not isinstance(symptomes, list):
+        return False, "Les symptômes doivent être une liste", None
+    
+    if len(symptomes) > config.MAX_SYMPTOMES_PAR_SESSION:
+        return False, f"Maximum {config.MAX_SYMPTOMES_PAR_SESSION} symptômes autorisés", None
+    
+    if not all(isinstance(s, str) for s in symptomes):
+        return False, "Tous les symptômes doivent être des chaînes de caractères", None
+    
+    symptomes_clean = [s.strip() for s in symptomes if s.strip()]
+    
+    if not symptomes_clean:
+        return False, "Au moins un symptôme constaté est requis", None
+    
+    return True, None, symptomes_clean
+
+def valider_limite_recommandations(args: dict) -> Tuple[bool, Optional[str], Optional[int]]:
+    """
+    Valide le nombre de symptômes à vérifier proposés (?limit=5)
+    
+    Returns:
+        (valide, message_erreur, limite)
+    """
+    limite_brute = args.get('limit', config.RECOMMANDATIONS_PAR_DEFAUT)
+    try:
+        limite = int(limite_brute)
+    except (TypeError, ValueError):
+        return False, "La limite doit être un entier", None
+    
+    if limite < 1 or limite > config.MAX_RECOMMANDATIONS:
+        return False, f"La limite doit être comprise entre 1 et {config.MAX_RECOMMANDATIONS}", None
+    
+    return True, None, limite
+
+def valider_limite_statistiques(args: dict) -> Tuple[bool, Optional[str], Optional[int]]:
+    """
+    Valide le nombre d'entrées par liste de statistiques (?limit=20)
+    
+    Returns:
+        (valide, message_erreur, limite)
+    """
+    limite_brute = args.get('limit', config.STATISTIQUES_PAR_DEFAUT)
+    try:
+        limite = int(limite_brute)
+    except (TypeError, ValueError):
+        return False, "La limite doit être un entier", None
+    
+    if limite < 1 or limite > config.MAX_STATISTIQUES:
+        return False, f"La limite doit être comprise entre 1 et {config.MAX_STATISTIQUES}", None
+    
+    return True, None, limite